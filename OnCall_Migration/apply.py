@@ -8,6 +8,9 @@ Usage:
     python3 apply.py
     python3 apply.py -h
     python3 apply.py --apply --inventory inventory --remapping inventory/remapping.json
+    python3 apply.py --plan                                  # write inventory/apply_plan.json
+    python3 apply.py --apply --plan-file inventory/apply_plan.json
+    python3 apply.py --apply                                 # re-run: journaled creates are skipped
 """
 
 from __future__ import annotations
@@ -26,6 +29,42 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--apply", action="store_true", help="Execute writes (default is dry-run).")
     parser.add_argument("--inventory", default="inventory", help="Inventory directory path.")
     parser.add_argument("--remapping", default="inventory/remapping.json", help="Remapping file path.")
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Read the target org once and write the changeset apply would make; no writes.",
+    )
+    parser.add_argument(
+        "--plan-file",
+        help="Where --plan writes the plan (default <inventory>/apply_plan.json); "
+        "without --plan, execute only this plan's changeset.",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Append-only log of --apply create results (default <inventory>/apply_journal.jsonl); "
+        "creates it confirms are skipped without reads on the next --apply run.",
+    )
+    journal_mode = parser.add_mutually_exclusive_group()
+    journal_mode.add_argument(
+        "--reset-journal",
+        action="store_true",
+        help="Delete the journal first: re-check every object on the target, then journal afresh.",
+    )
+    journal_mode.add_argument(
+        "--ignore-journal",
+        action="store_true",
+        help="Neither read nor write the journal.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Apply items run concurrently once their dependencies exist; 1 applies one at a time.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Also write per-endpoint request metrics here in Prometheus text format.",
+    )
     return parser
 
 
@@ -35,19 +74,33 @@ if __name__ == "__main__":
 import json
 import logging
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
-
-import requests
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from utils.env_loader import PROJECT_ROOT, load_dotenv
-from utils.http_client import BaseVictorOpsClient
-from utils.io import load_json
+from utils.http_client import BaseVictorOpsClient, no_retries
+from utils.inventory_store import ROTATION_GROUP_EXECUTION_TYPES, open_store
+from utils.io import load_inventory
+from utils.journal import ApplyJournal
+from utils.task_graph import TaskGraph
+from utils.target_state import (
+    AlertRuleSignature,
+    TargetState,
+    alert_rule_signature,
+    alert_rule_signatures,
+    routing_key_names,
+    team_slugs_by_name,
+)
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
+DEFAULT_WORKERS = 4
+
 
 def post_succeeded(code: int, result: Any = None) -> bool:
     return code in (200, 201) and result is not None
@@ -72,11 +125,15 @@ class RemappingContext:
 
 
 class ApplyClient(BaseVictorOpsClient):
-    def __init__(self, api_id: str, api_key: str, org_slug: str, dry_run: bool = True):
+    def __init__(
+        self, api_id: str, api_key: str, org_slug: str, dry_run: bool = True, pool_size: int = DEFAULT_WORKERS
+    ):
         super().__init__(
             api_id,
             api_key,
             org_slug,
+            # One keep-alive connection per concurrent apply item.
+            pool_size=max(1, pool_size),
             retry_total=3,
             retry_backoff=1,
             allowed_methods=["GET", "POST"],
@@ -86,10 +143,9 @@ class ApplyClient(BaseVictorOpsClient):
 
     def get(self, endpoint: str, allow_404: bool = False) -> Tuple[Optional[Any], int]:
         url = self._url(endpoint, self.base_v1)
-        self.rate_limiter.wait()
         if self.dry_run and not allow_404:
             log.debug(f"DRY-RUN GET {url}")
-        resp = self.session.get(url, timeout=30)
+        resp = self._send_get(url, timeout=30)
         if resp.status_code == 404 and allow_404:
             return None, 404
         if resp.status_code != 200:
@@ -99,11 +155,11 @@ class ApplyClient(BaseVictorOpsClient):
 
     def post(self, endpoint: str, payload: Dict[str, Any]) -> Tuple[Optional[Any], int]:
         url = self._url(endpoint, self.base_v1)
-        self.rate_limiter.wait()
         if self.dry_run:
+            self.rate_limiter.wait()
             log.info(f"DRY-RUN POST {url}")
             return {"dry_run": True, "endpoint": endpoint, "payload": payload}, 200
-        resp = self.session.post(url, json=payload, timeout=30)
+        resp = self._send("POST", url, json=payload, timeout=30)
         if resp.status_code not in (200, 201):
             log.error(f"POST {url} -> {resp.status_code}: {resp.text[:200]}")
             return None, resp.status_code
@@ -115,11 +171,12 @@ class ApplyClient(BaseVictorOpsClient):
     def post_once(self, endpoint: str, payload: Dict[str, Any]) -> Tuple[Optional[Any], int]:
         """POST without urllib3 retries so a single error response is logged."""
         url = self._url(endpoint, self.base_v1)
-        self.rate_limiter.wait()
         if self.dry_run:
+            self.rate_limiter.wait()
             log.info(f"DRY-RUN POST {url}")
             return {"dry_run": True, "endpoint": endpoint, "payload": payload}, 200
-        resp = requests.post(url, json=payload, headers=dict(self.session.headers), timeout=30)
+        with no_retries():
+            resp = self._send("POST", url, json=payload, timeout=30)
         if resp.status_code not in (200, 201):
             log.error(f"POST {url} -> {resp.status_code}: {resp.text}")
             return None, resp.status_code
@@ -129,6 +186,55 @@ class ApplyClient(BaseVictorOpsClient):
             return {}, resp.status_code
 
 
+def _usernames(members: Any) -> List[str]:
+    return [m["username"] for m in members or [] if isinstance(m, dict) and m.get("username")]
+
+
+class ApplyItem:
+    """One unit of apply work and where it sits in the dependency graph.
+
+    ``provides`` is the source key other items name in ``needs`` as
+    ``(step, key)``; needs that no item provides are ignored. Items with the
+    same ``resource`` in one step touch the same target object and never run
+    at the same time.
+    """
+
+    def __init__(
+        self,
+        step: str,
+        run: Callable[[], None],
+        provides: Optional[str] = None,
+        needs: Any = (),
+        resource: Optional[str] = None,
+    ):
+        self.step = step
+        self.run = run
+        self.provides = provides
+        self.needs = list(needs)
+        self.resource = resource
+
+
+class OnDemand:
+    """A target listing fetched the first time an item needs it, then shared by every item.
+
+    Items that the journal resolves never call it, so a resumed run does not
+    re-read listings it has no use for.
+    """
+
+    def __init__(self, fetch: Callable[[], Any]):
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._fetched = False
+
+    def __call__(self) -> Any:
+        with self._lock:
+            if not self._fetched:
+                self._value = self._fetch()
+                self._fetched = True
+            return self._value
+
+
 class ApplyPipeline:
     def __init__(
         self,
@@ -136,58 +242,202 @@ class ApplyPipeline:
         inventory_dir: Path,
         remapping: RemappingContext,
         report_path: Path,
+        target: Optional[TargetState] = None,
+        plan_keys: Optional[Set[Tuple[str, str]]] = None,
+        workers: int = DEFAULT_WORKERS,
+        journal: Optional[ApplyJournal] = None,
     ):
         self.client = client
+        self.workers = max(1, workers)
+        # Creates confirmed by earlier runs are skipped; every POST result is appended.
+        self.journal = journal
         self.inventory_dir = inventory_dir
         self.remapping = remapping
         self.report_path = report_path
+        # Full snapshot of the target org, or a cache of per-team state filled on demand
+        # (existence checks outside the per-team caches are then their own GETs).
+        self.target = target if target is not None else TargetState()
+        # Executing a plan: only these (step, key) creates are sent.
+        self.plan_keys = plan_keys
+        self.plan_file: Optional[Path] = None
+        self.planning = False
+        self.changeset: List[Dict[str, Any]] = []
         self.team_slug_map: Dict[str, str] = {}
         self.policy_slug_map: Dict[str, str] = {}
         self.rtg_slug_map: Dict[str, str] = {}
         self.rtg_label_by_source_slug: Dict[str, str] = {}
+        # Source team -> {source rotation group slug: label}, from the team's policies.
+        self.source_rtgs_by_team: Dict[str, Dict[str, str]] = {}
         self.policy_team_map: Dict[str, str] = {}
         self.stats: Dict[str, Dict[str, int]] = {}
         self.failures: Dict[str, List[str]] = {}
+        self.executor: Dict[str, Any] = {}
+        # While an item runs on the executor, its stats, failures and changeset
+        # entries are queued here and replayed in item order afterwards.
+        self._recording = threading.local()
+        self._team_locks: Dict[str, threading.Lock] = {}
+        self._team_locks_guard = threading.Lock()
 
     def _load_json(self, name: str) -> Any:
-        return load_json(self.inventory_dir / f"{name}.json")
+        return load_inventory(self.inventory_dir, name)
+
+    def _defer(self, func: Callable[..., None], *args: Any) -> bool:
+        events = getattr(self._recording, "events", None)
+        if events is None:
+            return False
+        events.append((func, args))
+        return True
 
     def _bump(self, step: str, outcome: str) -> None:
-        self.stats.setdefault(step, {"created": 0, "skipped": 0, "failed": 0, "warned": 0})
+        if self._defer(self._bump, step, outcome):
+            return
+        self.stats.setdefault(step, {"created": 0, "skipped": 0, "failed": 0, "warned": 0, "resumed": 0})
         self.stats[step][outcome] += 1
 
     def _record_failure(self, step: str, detail: str) -> None:
+        if self._defer(self._record_failure, step, detail):
+            return
         self.failures.setdefault(step, []).append(detail)
 
+    def _items(self) -> List[ApplyItem]:
+        """Every item in step order, which is also the order results are recorded in."""
+        builders: List[Callable[[], List[ApplyItem]]] = [
+            self._user_items,
+            self._team_items,
+            self._member_items,
+            self._admin_items,
+            self._rotation_items,
+            self._policy_items,
+            self._routing_key_items,
+            self._alert_rule_items,
+        ]
+        items: List[ApplyItem] = []
+        for build in builders:
+            items.extend(build())
+        return items
+
     def run(self) -> Dict[str, Any]:
         self._index_policy_metadata()
         self._index_rotation_group_labels()
-        steps: List[Tuple[str, Callable[[], None]]] = [
-            ("users", self.apply_users),
-            ("teams", self.apply_teams),
-            ("members", self.apply_members),
-            ("admins", self.apply_admins),
-            ("rotations", self.apply_rotations),
-            ("escalation_policies", self.apply_escalation_policies),
-            ("routing_keys", self.apply_routing_keys),
-            ("alert_rules", self.apply_alert_rules),
-        ]
-        self._run_steps(steps)
+        self._replay_journal()
+        self._execute(self._items())
         return self._write_report()
 
-    def _run_steps(self, steps: List[Tuple[str, Callable[[], None]]]) -> None:
-        for name, func in steps:
-            log.info("=" * 60)
-            log.info(f"Apply step: {name}")
-            func()
+    def plan(self, plan_path: Path) -> Dict[str, Any]:
+        """Snapshot the target org, diff the inventory against it, and write the ordered changeset.
+
+        Nothing is written to the org. ``stats`` are the outcomes the apply
+        would report against the snapshot.
+        """
+        if not self.target.complete:
+            self.target = TargetState.fetch(self.client)
+        snapshot = self.target.to_dict()
+        self.planning = True
+        self._index_policy_metadata()
+        self._index_rotation_group_labels()
+        self._execute(self._items())
+        plan = {
+            "org_slug": self.client.org_slug,
+            "planned_at": datetime.now(timezone.utc).isoformat(),
+            "reads": self.target.reads,
+            "stats": self.stats,
+            "failures": self.failures,
+            "target_state": snapshot,
+            "changeset": self.changeset,
+        }
+        plan_path.parent.mkdir(parents=True, exist_ok=True)
+        plan_path.write_text(json.dumps(plan, indent=2))
+        log.info(f"Plan with {len(self.changeset)} changes written to {plan_path}")
+        return plan
+
+    @classmethod
+    def from_plan(
+        cls,
+        plan: Dict[str, Any],
+        plan_file: Path,
+        client: ApplyClient,
+        inventory_dir: Path,
+        remapping: RemappingContext,
+        report_path: Path,
+        workers: int = DEFAULT_WORKERS,
+        journal: Optional[ApplyJournal] = None,
+    ) -> "ApplyPipeline":
+        """A pipeline that trusts the plan's snapshot and sends only its changeset."""
+        pipeline = cls(
+            client,
+            inventory_dir,
+            remapping,
+            report_path,
+            target=TargetState.from_dict(plan.get("target_state", {})),
+            plan_keys={(op["step"], op["key"]) for op in plan.get("changeset", [])},
+            workers=workers,
+            journal=journal,
+        )
+        pipeline.plan_file = plan_file
+        return pipeline
+
+    def _run_in_order(self, items: List[ApplyItem]) -> None:
+        for item in items:
+            item.run()
+
+    def _execute(self, items: List[ApplyItem]) -> None:
+        """Run items as soon as what they need exists, ``workers`` at a time.
+
+        Every item waits for the earlier items that provide its needs and for
+        the previous item on the same resource. Stats, failures and changeset
+        entries are replayed in item order once the graph finishes, so they do
+        not depend on which thread finished first.
+        """
+        graph = TaskGraph(max_parallel=self.workers)
+        providers: Dict[Tuple[str, str], List[str]] = {}
+        last_on_resource: Dict[Tuple[str, str], str] = {}
+        events: List[List[Tuple[Callable[..., None], Tuple[Any, ...]]]] = [[] for _ in items]
+
+        def run_item(index: int, item: ApplyItem, _inputs: Dict[str, Any]) -> None:
+            self._recording.events = events[index]
+            try:
+                item.run()
+            finally:
+                self._recording.events = None
+
+        for index, item in enumerate(items):
+            name = f"{item.step}#{index}"
+            deps = {dep for need in item.needs for dep in providers.get(tuple(need), [])}
+            if item.resource is not None:
+                previous = last_on_resource.get((item.step, item.resource))
+                if previous:
+                    deps.add(previous)
+                last_on_resource[(item.step, item.resource)] = name
+            graph.add(name, partial(run_item, index, item), deps=sorted(deps))
+            if item.provides is not None:
+                providers.setdefault((item.step, item.provides), []).append(name)
+
+        log.info("=" * 60)
+        log.info(f"Applying {len(items)} items with {self.workers} worker(s)")
+        try:
+            graph.run()
+        finally:
+            for recorded in events:
+                for func, args in recorded:
+                    func(*args)
+            self.executor = {
+                "workers": self.workers,
+                "items": len(items),
+                "wall_seconds": round(graph.wall_seconds, 1),
+                "sequential_seconds": round(sum(graph.durations.values()), 1),
+            }
 
     def _write_report(self) -> Dict[str, Any]:
         report = {
             "org_slug": self.client.org_slug,
             "applied_at": datetime.now(timezone.utc).isoformat(),
             "dry_run": self.client.dry_run,
+            "plan_file": str(self.plan_file) if self.plan_file else None,
             "stats": self.stats,
             "failures": self.failures,
+            "executor": self.executor,
+            "journal": self.journal.stats() if self.journal is not None else None,
+            "request_metrics": self.client.request_metrics(),
             "slug_maps": {
                 "teams": self.team_slug_map,
                 "escalation_policies": self.policy_slug_map,
@@ -200,6 +450,12 @@ class ApplyPipeline:
         return report
 
     def _index_policy_metadata(self) -> None:
+        store = open_store(self.inventory_dir)
+        if store is not None:
+            # Indexed lookup instead of re-walking the grouped policy listing.
+            with store:
+                self.policy_team_map.update(store.policy_team_map())
+            return
         grouped = self._load_json("escalation_policies_inventory") or {}
         if not isinstance(grouped, dict):
             return
@@ -211,140 +467,222 @@ class ApplyPipeline:
                     self.policy_team_map[slug] = team_slug
 
     def _index_rotation_group_labels(self) -> None:
+        store = open_store(self.inventory_dir)
+        if store is not None:
+            with store:
+                self.rtg_label_by_source_slug.update(store.rotation_group_labels())
+                for team, groups in store.rotation_groups_by_team().items():
+                    self.source_rtgs_by_team.setdefault(team, {}).update(groups)
+            return
         details = self._load_json("escalation_policy_details_inventory") or {}
         if not isinstance(details, dict):
             return
-        for _policy_slug, steps in details.items():
+        for policy_slug, steps in details.items():
             if not isinstance(steps, list):
                 continue
+            team = self.policy_team_map.get(policy_slug)
             for step in steps:
                 for entry in step.get("entries", []):
-                    if entry.get("executionType") not in (
-                        "rotation_group",
-                        "rotation_group_next",
-                        "rotation_group_previous",
-                    ):
-                        continue
                     rg = entry.get("rotationGroup", {})
                     slug = rg.get("slug")
                     label = rg.get("label")
-                    if slug and label:
+                    if not (slug and label):
+                        continue
+                    # Every group a team's policies name is mapped, whatever the entry type.
+                    if team:
+                        self.source_rtgs_by_team.setdefault(team, {})[slug] = label
+                    if entry.get("executionType") in ROTATION_GROUP_EXECUTION_TYPES:
                         self.rtg_label_by_source_slug[slug] = label
 
     def apply_users(self) -> None:
-        users = self._load_json("users_inventory") or []
-        for user in users:
+        self._run_in_order(self._user_items())
+
+    def _user_items(self) -> List[ApplyItem]:
+        items = []
+        for user in self._load_json("users_inventory") or []:
             if not isinstance(user, dict):
                 continue
             source_username = user.get("username")
-            if not source_username or self.remapping.is_skipped("users", source_username):
-                self._bump("users", "skipped")
-                continue
-            target_username = self.remapping.map_value("users", source_username)
-            source_email = user.get("email") or f"{target_username}@example.com"
-            if self.remapping.is_skipped("emails", source_email):
-                self._bump("users", "skipped")
-                continue
-            target_email = self.remapping.map_value("emails", source_email)
-            existing, status = self.client.get(f"user/{target_username}", allow_404=True)
-            if status == 200 and existing:
-                log.info(f"  SKIP user exists: {target_username}")
-                self._bump("users", "skipped")
-                continue
-            payload = {
-                "firstName": user.get("firstName", ""),
-                "lastName": user.get("lastName", ""),
-                "username": target_username,
-                "email": target_email,
-            }
-            result, code = self.client.post("user", payload)
-            if post_succeeded(code, result):
-                self._bump("users", "created")
-            else:
-                log.error(
-                    f"  FAILED user create: {source_username} -> {target_username} (HTTP {code})"
-                )
-                self._record_failure("users", f"{source_username}->{target_username}")
-                self._bump("users", "failed")
+            target_username = self.remapping.map_value("users", source_username) if source_username else None
+            items.append(
+                ApplyItem("users", partial(self._apply_user, user), provides=source_username, resource=target_username)
+            )
+        return items
 
-    def _list_teams(self) -> List[Dict[str, Any]]:
-        data, status = self.client.get("team", allow_404=True)
-        if status != 200:
-            return []
-        if isinstance(data, list):
-            return [t for t in data if isinstance(t, dict)]
-        if isinstance(data, dict):
-            teams = data.get("teams")
-            if isinstance(teams, list):
-                return [t for t in teams if isinstance(t, dict)]
-        return []
+    def _apply_user(self, user: Dict[str, Any]) -> None:
+        source_username = user.get("username")
+        if not source_username or self.remapping.is_skipped("users", source_username):
+            self._bump("users", "skipped")
+            return
+        target_username = self.remapping.map_value("users", source_username)
+        source_email = user.get("email") or f"{target_username}@example.com"
+        if self.remapping.is_skipped("emails", source_email):
+            self._bump("users", "skipped")
+            return
+        target_email = self.remapping.map_value("emails", source_email)
+        if self._journaled("users", source_username):
+            self.target.users.add(target_username)
+            return
+        if self._user_exists(target_username):
+            log.info(f"  SKIP user exists: {target_username}")
+            self._bump("users", "skipped")
+            return
+        if self._unplanned("users", source_username):
+            return
+        payload = {
+            "firstName": user.get("firstName", ""),
+            "lastName": user.get("lastName", ""),
+            "username": target_username,
+            "email": target_email,
+        }
+        result, code = self._post("users", source_username, "user", payload)
+        if post_succeeded(code, result):
+            self.target.users.add(target_username)
+            self._bump("users", "created")
+        else:
+            log.error(
+                f"  FAILED user create: {source_username} -> {target_username} (HTTP {code})"
+            )
+            self._record_failure("users", f"{source_username}->{target_username}")
+            self._bump("users", "failed")
+
+    def _replay_journal(self) -> None:
+        """Rebuild the team, policy and rotation-group slug maps from journaled creates."""
+        if self.journal is None or not len(self.journal):
+            return
+        for record in self.journal.confirmed_in("teams"):
+            if record.get("slug"):
+                self.team_slug_map[record["key"]] = record["slug"]
+        for record in self.journal.confirmed_in("escalation_policies"):
+            if record.get("slug"):
+                self.policy_slug_map[record["key"]] = record["slug"]
+        for record in self.journal.confirmed_in("rotations"):
+            source_team, _, label = record["key"].partition("/")
+            if record.get("slug"):
+                self._map_rotation_groups(source_team, {label: record["slug"]})
+        log.info(
+            f"Journal {self.journal.path.name}: {len(self.journal)} create(s) already confirmed on the target"
+        )
+
+    def _journaled(self, step: str, key: str) -> Optional[Dict[str, Any]]:
+        """The journal record of a create an earlier run confirmed; it is counted as resumed."""
+        if self.journal is None or self.planning:
+            return None
+        record = self.journal.confirmed(step, key)
+        if record is not None:
+            log.info(f"  SKIP {step} '{key}': created by an earlier run")
+            self._bump(step, "resumed")
+        return record
+
+    def _listing(self, endpoint: str) -> Optional[Any]:
+        data, status = self.client.get(endpoint, allow_404=True)
+        return data if status == 200 else None
+
+    def _user_exists(self, username: str) -> bool:
+        if self.target.complete:
+            return username in self.target.users
+        existing, status = self.client.get(f"user/{username}", allow_404=True)
+        return status == 200 and bool(existing)
+
+    def _existing_teams(self) -> Dict[str, str]:
+        if self.target.complete:
+            return self.target.teams
+        return team_slugs_by_name(self._listing("team"))
+
+    def _existing_policy_slug(self, policy_slug: str) -> Optional[str]:
+        if self.target.complete:
+            return policy_slug if policy_slug in self.target.policies else None
+        existing, status = self.client.get(f"policies/{policy_slug}", allow_404=True)
+        if status == 200 and existing:
+            return existing.get("slug", policy_slug)
+        return None
 
     def _existing_routing_keys(self) -> Set[str]:
-        data, status = self.client.get("org/routing-keys", allow_404=True)
-        if status != 200:
-            return set()
-        if isinstance(data, list):
-            items = data
-        elif isinstance(data, dict):
-            items = data.get("routingKeys") or []
-        else:
-            items = []
-        return {rk.get("routingKey") for rk in items if isinstance(rk, dict) and rk.get("routingKey")}
+        if self.target.complete:
+            return self.target.routing_keys
+        return routing_key_names(self._listing("org/routing-keys"))
+
+    def _existing_alert_rule_signatures(self) -> Set[AlertRuleSignature]:
+        if self.target.complete:
+            return self.target.alert_rules
+        return alert_rule_signatures(self._listing("alertRules"))
+
+    def _unplanned(self, step: str, key: str) -> bool:
+        """When executing a plan, skip (and count) creates that are not in its changeset."""
+        if self.plan_keys is None or (step, key) in self.plan_keys:
+            return False
+        log.warning(f"  SKIP {step} '{key}': not in the plan being executed")
+        self._bump(step, "skipped")
+        return True
 
-    @staticmethod
-    def _alert_rule_signature(alert_field: Any, match_value: Any, rank: Any) -> Tuple[Any, Any, Any]:
-        return (alert_field, match_value, rank)
-
-    def _existing_alert_rule_signatures(self) -> Set[Tuple[Any, Any, Any]]:
-        data, status = self.client.get("alertRules", allow_404=True)
-        if status != 200:
-            return set()
-        if isinstance(data, list):
-            items = data
-        elif isinstance(data, dict):
-            items = data.get("alertRules") or []
-        else:
-            items = []
-        signatures: Set[Tuple[Any, Any, Any]] = set()
-        for rule in items:
-            if isinstance(rule, dict):
-                signatures.add(
-                    self._alert_rule_signature(
-                        rule.get("alertField"),
-                        rule.get("alertValueMatch", ""),
-                        rule.get("rank", 1),
-                    )
-                )
-        return signatures
+    def _post(
+        self, step: str, key: str, endpoint: str, payload: Dict[str, Any], once: bool = False
+    ) -> Tuple[Optional[Any], int]:
+        """Send one create, or add it to the changeset when planning.
+
+        A planned create answers with a placeholder slug so later steps can
+        refer to the object it would make.
+        """
+        if self.planning:
+            op = {"step": step, "key": key, "endpoint": endpoint, "payload": payload}
+            if not self._defer(self.changeset.append, op):
+                self.changeset.append(op)
+            return {"slug": f"planned:{step}:{key}"}, 200
+        result, code = self.client.post_once(endpoint, payload) if once else self.client.post(endpoint, payload)
+        if self.journal is not None and not self.client.dry_run:
+            # Journaled before the caller counts it, so a crash cannot lose a create.
+            self.journal.record(step, key, endpoint, code, result, post_succeeded(code, result))
+        return result, code
 
     def apply_teams(self) -> None:
+        self._run_in_order(self._team_items())
+
+    def _team_items(self) -> List[ApplyItem]:
         teams = self._load_json("teams_inventory") or []
-        existing_by_name = {t.get("name"): t.get("slug") for t in self._list_teams() if t.get("name")}
+        existing_by_name = OnDemand(self._existing_teams)
+        return [
+            ApplyItem(
+                "teams",
+                partial(self._apply_team, team, existing_by_name),
+                provides=team.get("slug"),
+                resource=team.get("name"),
+            )
+            for team in teams
+            if isinstance(team, dict)
+        ]
 
-        for team in teams:
-            if not isinstance(team, dict):
-                continue
-            source_slug = team.get("slug")
-            name = team.get("name")
-            if not source_slug or not name or self.remapping.is_skipped("teams", source_slug):
-                self._bump("teams", "skipped")
-                continue
-            if name in existing_by_name:
-                self.team_slug_map[source_slug] = existing_by_name[name]
-                log.info(f"  SKIP team exists: {name} -> {existing_by_name[name]}")
-                self._bump("teams", "skipped")
-                continue
-            payload = {"name": name}
-            if team.get("description"):
-                payload["description"] = team["description"]
-            result, code = self.client.post("team", payload)
-            if post_succeeded(code, result):
-                target_slug = result.get("slug", source_slug)
-                self.team_slug_map[source_slug] = target_slug
-                existing_by_name[name] = target_slug
-                self._bump("teams", "created")
-            else:
-                self._bump("teams", "failed")
+    def _apply_team(self, team: Dict[str, Any], existing: OnDemand) -> None:
+        source_slug = team.get("slug")
+        name = team.get("name")
+        if not source_slug or not name or self.remapping.is_skipped("teams", source_slug):
+            self._bump("teams", "skipped")
+            return
+        record = self._journaled("teams", source_slug)
+        if record:
+            target_slug = record.get("slug") or source_slug
+            self.team_slug_map[source_slug] = target_slug
+            self.target.resume_team(name, target_slug)
+            return
+        existing_by_name = existing()
+        if name in existing_by_name:
+            self.team_slug_map[source_slug] = existing_by_name[name]
+            log.info(f"  SKIP team exists: {name} -> {existing_by_name[name]}")
+            self._bump("teams", "skipped")
+            return
+        if self._unplanned("teams", source_slug):
+            return
+        payload = {"name": name}
+        if team.get("description"):
+            payload["description"] = team["description"]
+        result, code = self._post("teams", source_slug, "team", payload)
+        if post_succeeded(code, result):
+            target_slug = result.get("slug", source_slug)
+            self.team_slug_map[source_slug] = target_slug
+            existing_by_name[name] = target_slug
+            self.target.add_team(name, target_slug)
+            self._bump("teams", "created")
+        else:
+            self._bump("teams", "failed")
 
     def _target_team_slug(self, source_slug: str) -> Optional[str]:
         if self.remapping.is_skipped("teams", source_slug):
@@ -352,47 +690,104 @@ class ApplyPipeline:
         return self.team_slug_map.get(source_slug, self.remapping.map_value("teams", source_slug))
 
     def apply_members(self) -> None:
+        self._run_in_order(self._member_items())
+
+    def _team_resources(self) -> Dict[str, str]:
+        """Source team -> the target team it will resolve to, as far as the inventory tells.
+
+        Teams are matched and created by name, so source teams that share a
+        name land on one target team; teams not in the inventory resolve
+        through the remapping.
+        """
+        resources = {}
+        for team in self._load_json("teams_inventory") or []:
+            if isinstance(team, dict) and team.get("slug") and team.get("name"):
+                resources[team["slug"]] = f"name:{team['name']}"
+        return resources
+
+    def _team_resource(self, resources: Dict[str, str], source_team: str) -> Optional[str]:
+        return resources.get(source_team) or self.remapping.map_value("teams", source_team)
+
+    @contextmanager
+    def _target_team_lock(self, target_team: str) -> Iterator[None]:
+        """Serialize work on one target team even when its source teams were not predicted to collide."""
+        with self._team_locks_guard:
+            lock = self._team_locks.setdefault(target_team, threading.Lock())
+        with lock:
+            yield
+
+    def _member_items(self) -> List[ApplyItem]:
+        """One item per team: its member adds share the team's cached member set."""
         members_by_team = self._load_json("team_members_inventory") or {}
         if not isinstance(members_by_team, dict):
+            return []
+        resources = self._team_resources()
+        return [
+            ApplyItem(
+                "members",
+                partial(self._apply_team_members, source_team, members),
+                provides=source_team,
+                needs=[("teams", source_team)] + [("users", user) for user in _usernames(members)],
+                resource=self._team_resource(resources, source_team),
+            )
+            for source_team, members in members_by_team.items()
+        ]
+
+    def _apply_team_members(self, source_team: str, members: List[Any]) -> None:
+        target_team = self._target_team_slug(source_team)
+        if not target_team:
             return
-        for source_team, members in members_by_team.items():
-            target_team = self._target_team_slug(source_team)
-            if not target_team:
+        with self._target_team_lock(target_team):
+            self._add_team_members(source_team, target_team, members)
+
+    def _add_team_members(self, source_team: str, target_team: str, members: List[Any]) -> None:
+        for member in members:
+            if not isinstance(member, dict):
                 continue
-            for member in members:
-                if not isinstance(member, dict):
-                    continue
-                source_user = member.get("username")
-                if not source_user or self.remapping.is_skipped("users", source_user):
-                    self._bump("members", "skipped")
-                    continue
-                target_user = self.remapping.map_value("users", source_user)
-                team_members, status = self.client.get(f"team/{target_team}/members", allow_404=True)
-                if status == 200 and isinstance(team_members, dict):
-                    current = {m.get("username") for m in team_members.get("members", []) if isinstance(m, dict)}
-                    if target_user in current:
-                        self._bump("members", "skipped")
-                        continue
-                result, code = self.client.post(f"team/{target_team}/members", {"username": target_user})
-                if post_succeeded(code, result):
-                    self._bump("members", "created")
-                else:
-                    self._bump("members", "failed")
+            source_user = member.get("username")
+            if not source_user or self.remapping.is_skipped("users", source_user):
+                self._bump("members", "skipped")
+                continue
+            target_user = self.remapping.map_value("users", source_user)
+            key = f"{source_team}/{source_user}"
+            if self._journaled("members", key):
+                continue
+            current = self.target.team_members(self.client, target_team)
+            if current is not None and target_user in current:
+                self._bump("members", "skipped")
+                continue
+            if self._unplanned("members", key):
+                continue
+            result, code = self._post(
+                "members", key, f"team/{target_team}/members", {"username": target_user}
+            )
+            if post_succeeded(code, result):
+                if current is not None:
+                    current.add(target_user)
+                self._bump("members", "created")
+            else:
+                self._bump("members", "failed")
 
     def apply_admins(self) -> None:
-        """Team admin assignment has no public POST endpoint — record for manual follow-up."""
+        self._run_in_order(self._admin_items())
+
+    def _admin_items(self) -> List[ApplyItem]:
         admins_by_team = self._load_json("team_admins_inventory") or {}
         if not isinstance(admins_by_team, dict):
+            return []
+        return [
+            ApplyItem("admins", partial(self._warn_team_admins, source_team, admins))
+            for source_team, admins in admins_by_team.items()
+        ]
+
+    def _warn_team_admins(self, source_team: str, admins: List[Any]) -> None:
+        """Team admin assignment has no public POST endpoint — record for manual follow-up."""
+        if self.remapping.is_skipped("teams", source_team) or not admins:
             return
-        for source_team, admins in admins_by_team.items():
-            if self.remapping.is_skipped("teams", source_team):
-                continue
-            if not admins:
-                continue
-            log.warning(
-                f"  Team admins for '{source_team}' cannot be applied via API — configure in target UI."
-            )
-            self._bump("admins", "warned")
+        log.warning(
+            f"  Team admins for '{source_team}' cannot be applied via API — configure in target UI."
+        )
+        self._bump("admins", "warned")
 
     def _iso_to_epoch_ms(self, value: Any) -> int:
         if isinstance(value, (int, float)):
@@ -445,62 +840,102 @@ class ApplyPipeline:
             return None
         return {"label": rotation_label, "shifts": shifts_out}
 
-    def _refresh_rtg_map_for_team(self, source_team: str, target_team: str) -> None:
-        data, status = self.client.get(f"teams/{target_team}/rotations", allow_404=True)
-        if status != 200 or not isinstance(data, dict):
-            return
-        label_to_target = {
-            g.get("label"): g.get("slug")
-            for g in data.get("rotationGroups", [])
-            if isinstance(g, dict) and g.get("label") and g.get("slug")
-        }
-        details = self._load_json("escalation_policy_details_inventory") or {}
-        for policy_slug, steps in (details or {}).items():
-            if self.policy_team_map.get(policy_slug) != source_team:
-                continue
-            for step in steps or []:
-                for entry in step.get("entries", []):
-                    rg = entry.get("rotationGroup", {})
-                    source_rtg = rg.get("slug")
-                    source_label = rg.get("label")
-                    if source_rtg and source_label and source_label in label_to_target:
-                        self.rtg_slug_map[source_rtg] = label_to_target[source_label]
+    def _map_rotation_groups(self, source_team: str, label_to_target: Dict[str, str]) -> None:
+        """Map the team's source rotation groups to target slugs by label."""
+        for source_rtg, label in self.source_rtgs_by_team.get(source_team, {}).items():
+            if label in label_to_target:
+                self.rtg_slug_map[source_rtg] = label_to_target[label]
 
     def apply_rotations(self) -> None:
+        self._run_in_order(self._rotation_items())
+
+    def _rotation_items(self) -> List[ApplyItem]:
+        """One item per team; shift members must be on the team, so it waits for them."""
         rotations_by_team = self._load_json("rotation_definitions_inventory") or {}
         if not isinstance(rotations_by_team, dict):
-            return
-
+            return []
+        resources = self._team_resources()
+        items = []
         for source_team, payload in rotations_by_team.items():
-            target_team = self._target_team_slug(source_team)
-            if not target_team or not isinstance(payload, dict):
+            shift_users = [
+                user
+                for rotation in (payload.get("rotations", []) if isinstance(payload, dict) else [])
+                if isinstance(rotation, dict)
+                for shift in rotation.get("shifts", [])
+                if isinstance(shift, dict)
+                for user in _usernames(shift.get("shiftMembers", []))
+            ]
+            items.append(ApplyItem(
+                "rotations",
+                partial(self._apply_team_rotations, source_team, payload),
+                provides=source_team,
+                needs=[("teams", source_team), ("members", source_team)] + [("users", u) for u in shift_users],
+                resource=self._team_resource(resources, source_team),
+            ))
+        return items
+
+    def _apply_team_rotations(self, source_team: str, payload: Any) -> None:
+        target_team = self._target_team_slug(source_team)
+        if not target_team or not isinstance(payload, dict):
+            return
+        with self._target_team_lock(target_team):
+            self._create_team_rotations(source_team, target_team, payload)
+
+    def _create_team_rotations(self, source_team: str, target_team: str, payload: Dict[str, Any]) -> None:
+        # The team's groups are read on the first rotation the journal has not confirmed.
+        labels: Optional[Dict[str, str]] = None
+        read = False
+        journaled: Dict[str, str] = {}
+        # Re-read the team only if a create response did not include the new group's slug.
+        refresh = False
+        for rotation in payload.get("rotations", []):
+            if not isinstance(rotation, dict):
                 continue
-            for rotation in payload.get("rotations", []):
-                if not isinstance(rotation, dict):
-                    continue
-                label = rotation.get("label", "")
-                existing, status = self.client.get(f"teams/{target_team}/rotations", allow_404=True)
-                if status == 200 and isinstance(existing, dict):
-                    labels = {g.get("label") for g in existing.get("rotationGroups", []) if isinstance(g, dict)}
-                    if label in labels:
-                        self._bump("rotations", "skipped")
-                        self._refresh_rtg_map_for_team(source_team, target_team)
-                        continue
-                body = self._build_rotation_payload(rotation)
-                if body is None:
-                    self._bump("rotations", "skipped")
-                    continue
-                result, code = self.client.post_once(f"teams/{target_team}/rotations", body)
-                if post_succeeded(code, result):
-                    self._bump("rotations", "created")
+            label = rotation.get("label", "")
+            record = self._journaled("rotations", f"{source_team}/{label}")
+            if record:
+                if record.get("slug"):
+                    journaled[label] = record["slug"]
                 else:
-                    log.error(
-                        f"  FAILED rotation '{label}' on team {target_team} (HTTP {code})"
-                    )
-                    log.error(f"  Rotation POST payload: {json.dumps(body)[:4000]}")
-                    self._record_failure("rotations", f"{label}@{target_team}")
-                    self._bump("rotations", "failed")
-            self._refresh_rtg_map_for_team(source_team, target_team)
+                    refresh = True
+                continue
+            if not read:
+                labels = self.target.rotation_groups(self.client, target_team)
+                read = True
+            if labels is not None and label in labels:
+                self._bump("rotations", "skipped")
+                continue
+            body = self._build_rotation_payload(rotation)
+            if body is None:
+                self._bump("rotations", "skipped")
+                continue
+            if self._unplanned("rotations", f"{source_team}/{label}"):
+                continue
+            result, code = self._post(
+                "rotations", f"{source_team}/{label}", f"teams/{target_team}/rotations", body, once=True
+            )
+            if post_succeeded(code, result):
+                slug = result.get("slug") if isinstance(result, dict) else None
+                if slug and labels is not None:
+                    labels[label] = slug
+                else:
+                    refresh = True
+                self._bump("rotations", "created")
+            else:
+                log.error(
+                    f"  FAILED rotation '{label}' on team {target_team} (HTTP {code})"
+                )
+                log.error(f"  Rotation POST payload: {json.dumps(body)[:4000]}")
+                self._record_failure("rotations", f"{label}@{target_team}")
+                self._bump("rotations", "failed")
+        unmapped = any(label not in journaled for label in self.source_rtgs_by_team.get(source_team, {}).values())
+        if refresh or (labels is None and (read or unmapped)):
+            labels = self.target.rotation_groups(self.client, target_team, refresh=refresh or read)
+        if labels is not None:
+            labels.update(journaled)
+            self._map_rotation_groups(source_team, labels)
+        elif journaled:
+            self._map_rotation_groups(source_team, journaled)
 
     def _transform_policy_entry(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         execution_type = entry.get("executionType")
@@ -594,10 +1029,14 @@ class ApplyPipeline:
         return True
 
     def apply_escalation_policies(self) -> None:
+        self._run_in_order(self._policy_items())
+
+    def _policy_items(self) -> List[ApplyItem]:
+        """One item per policy, after its team's rotations, its users and the policies it routes to."""
         grouped = self._load_json("escalation_policies_inventory") or {}
         details = self._load_json("escalation_policy_details_inventory") or {}
         if not isinstance(grouped, dict) or not isinstance(details, dict):
-            return
+            return []
 
         all_slugs: List[str] = []
         policy_names: Dict[str, str] = {}
@@ -609,140 +1048,219 @@ class ApplyPipeline:
                     all_slugs.append(slug)
                     policy_names[slug] = policy.get("name", slug)
 
+        rtg_teams = {rtg: team for team, groups in self.source_rtgs_by_team.items() for rtg in groups}
+        items = []
         for source_slug in self._policy_sort_order(all_slugs, details):
-            if self.remapping.is_skipped("escalation_policies", source_slug):
-                self._bump("escalation_policies", "skipped")
-                continue
             source_team = self.policy_team_map.get(source_slug)
-            if not source_team or self.remapping.is_skipped("teams", source_team):
-                self._bump("escalation_policies", "skipped")
-                continue
-            target_team = self._target_team_slug(source_team)
-            if not target_team:
-                self._bump("escalation_policies", "failed")
-                continue
+            needs: List[Tuple[str, Any]] = [("teams", source_team), ("rotations", source_team)] if source_team else []
+            for step in details.get(source_slug, []) or []:
+                for entry in step.get("entries", []):
+                    if "rotationGroup" in entry:
+                        needs.append(("rotations", rtg_teams.get(entry["rotationGroup"].get("slug"))))
+                    elif entry.get("executionType") == "user":
+                        needs.append(("users", entry.get("user", {}).get("username")))
+                    elif entry.get("executionType") == "policy_routing":
+                        needs.append(("escalation_policies", entry.get("targetPolicy", {}).get("policySlug")))
+            items.append(ApplyItem(
+                "escalation_policies",
+                partial(self._apply_policy, source_slug, details, policy_names),
+                provides=source_slug,
+                needs=needs,
+                resource=self.remapping.map_value("escalation_policies", source_slug),
+            ))
+        return items
+
+    def _apply_policy(self, source_slug: str, details: Dict[str, Any], policy_names: Dict[str, str]) -> None:
+        if self.remapping.is_skipped("escalation_policies", source_slug):
+            self._bump("escalation_policies", "skipped")
+            return
+        source_team = self.policy_team_map.get(source_slug)
+        if not source_team or self.remapping.is_skipped("teams", source_team):
+            self._bump("escalation_policies", "skipped")
+            return
+        target_team = self._target_team_slug(source_team)
+        if not target_team:
+            self._bump("escalation_policies", "failed")
+            return
 
-            target_policy_slug = self.remapping.map_value("escalation_policies", source_slug)
-            if not target_policy_slug:
-                self._bump("escalation_policies", "skipped")
-                continue
-            existing, status = self.client.get(f"policies/{target_policy_slug}", allow_404=True)
-            if status == 200 and existing:
-                self.policy_slug_map[source_slug] = existing.get("slug", target_policy_slug)
-                self._bump("escalation_policies", "skipped")
-                continue
+        target_policy_slug = self.remapping.map_value("escalation_policies", source_slug)
+        if not target_policy_slug:
+            self._bump("escalation_policies", "skipped")
+            return
+        record = self._journaled("escalation_policies", source_slug)
+        if record:
+            self.policy_slug_map[source_slug] = record.get("slug") or target_policy_slug
+            return
+        existing_slug = self._existing_policy_slug(target_policy_slug)
+        if existing_slug:
+            self.policy_slug_map[source_slug] = existing_slug
+            self._bump("escalation_policies", "skipped")
+            return
 
-            if not self._policy_rotation_groups_mapped(source_slug, details):
-                self._record_failure("escalation_policies", source_slug)
-                self._bump("escalation_policies", "failed")
-                continue
+        if not self._policy_rotation_groups_mapped(source_slug, details):
+            self._record_failure("escalation_policies", source_slug)
+            self._bump("escalation_policies", "failed")
+            return
 
-            steps_out = []
-            for step in details.get(source_slug, []) or []:
-                entries_out = []
-                for entry in step.get("entries", []):
-                    transformed = self._transform_policy_entry(entry)
-                    if transformed:
-                        entries_out.append(transformed)
-                if entries_out:
-                    steps_out.append({"timeout": step.get("timeout", 0), "entries": entries_out})
-            if not steps_out:
-                self._bump("escalation_policies", "skipped")
-                continue
+        steps_out = []
+        for step in details.get(source_slug, []) or []:
+            entries_out = []
+            for entry in step.get("entries", []):
+                transformed = self._transform_policy_entry(entry)
+                if transformed:
+                    entries_out.append(transformed)
+            if entries_out:
+                steps_out.append({"timeout": step.get("timeout", 0), "entries": entries_out})
+        if not steps_out:
+            self._bump("escalation_policies", "skipped")
+            return
+        if self._unplanned("escalation_policies", source_slug):
+            return
 
-            payload = {
-                "name": policy_names.get(source_slug, source_slug),
-                "teamSlug": target_team,
-                "ignoreCustomPagingPolicies": False,
-                "steps": steps_out,
-            }
-            result, code = self.client.post("policies", payload)
-            if post_succeeded(code, result):
-                self.policy_slug_map[source_slug] = result.get("slug", target_policy_slug)
-                self._bump("escalation_policies", "created")
-            else:
-                self._bump("escalation_policies", "failed")
+        payload = {
+            "name": policy_names.get(source_slug, source_slug),
+            "teamSlug": target_team,
+            "ignoreCustomPagingPolicies": False,
+            "steps": steps_out,
+        }
+        result, code = self._post("escalation_policies", source_slug, "policies", payload)
+        if post_succeeded(code, result):
+            self.policy_slug_map[source_slug] = result.get("slug", target_policy_slug)
+            self.target.policies[self.policy_slug_map[source_slug]] = payload["name"]
+            self._bump("escalation_policies", "created")
+        else:
+            self._bump("escalation_policies", "failed")
+
+    @staticmethod
+    def _routing_key_policies(rk: Dict[str, Any]) -> List[str]:
+        """Source policy slugs a routing key targets (slug, or the last segment of its URL)."""
+        policies = []
+        for target in rk.get("targets", []):
+            source_policy = target.get("policySlug")
+            if not source_policy:
+                url = target.get("policyUrl") or target.get("_policyUrl") or ""
+                source_policy = url.rstrip("/").split("/")[-1] if url else ""
+            policies.append(source_policy)
+        return policies
 
     def apply_routing_keys(self) -> None:
+        self._run_in_order(self._routing_key_items())
+
+    def _routing_key_items(self) -> List[ApplyItem]:
         routing_keys = self._load_json("routing_keys_inventory") or []
-        existing_keys = self._existing_routing_keys()
+        existing_keys = OnDemand(self._existing_routing_keys)
+        items = []
         for rk in routing_keys:
             if not isinstance(rk, dict):
                 continue
             source_name = rk.get("routingKey")
-            if not source_name or self.remapping.is_skipped("routing_keys", source_name):
-                self._bump("routing_keys", "skipped")
-                continue
-            target_name = self.remapping.map_value("routing_keys", source_name)
-            if target_name in existing_keys:
-                log.info(f"  SKIP routing key exists: {target_name}")
-                self._bump("routing_keys", "skipped")
+            items.append(ApplyItem(
+                "routing_keys",
+                partial(self._apply_routing_key, rk, existing_keys),
+                provides=source_name,
+                needs=[("escalation_policies", policy) for policy in self._routing_key_policies(rk)],
+                resource=self.remapping.map_value("routing_keys", source_name) if source_name else None,
+            ))
+        return items
+
+    def _apply_routing_key(self, rk: Dict[str, Any], existing: OnDemand) -> None:
+        source_name = rk.get("routingKey")
+        if not source_name or self.remapping.is_skipped("routing_keys", source_name):
+            self._bump("routing_keys", "skipped")
+            return
+        target_name = self.remapping.map_value("routing_keys", source_name)
+        if self._journaled("routing_keys", source_name):
+            return
+        existing_keys = existing()
+        if target_name in existing_keys:
+            log.info(f"  SKIP routing key exists: {target_name}")
+            self._bump("routing_keys", "skipped")
+            return
+        targets = []
+        for source_policy in self._routing_key_policies(rk):
+            if not source_policy or self.remapping.is_skipped("escalation_policies", source_policy):
                 continue
-            targets = []
-            for target in rk.get("targets", []):
-                source_policy = target.get("policySlug")
-                if not source_policy:
-                    url = target.get("policyUrl") or target.get("_policyUrl") or ""
-                    source_policy = url.rstrip("/").split("/")[-1] if url else ""
-                if not source_policy or self.remapping.is_skipped("escalation_policies", source_policy):
-                    continue
-                target_policy = self.policy_slug_map.get(source_policy)
-                if not target_policy:
-                    log.error(
-                        f"  Routing key '{target_name}' targets policy '{source_policy}' "
-                        "which is not on target — apply escalation policies first."
-                    )
-                    continue
-                targets.append(target_policy)
-            if not targets:
-                log.warning(
-                    f"  Skipping routing key '{target_name}': no target policies available."
+            target_policy = self.policy_slug_map.get(source_policy)
+            if not target_policy:
+                log.error(
+                    f"  Routing key '{target_name}' targets policy '{source_policy}' "
+                    "which is not on target — apply escalation policies first."
                 )
-                self._bump("routing_keys", "skipped")
                 continue
-            payload = {"routingKey": target_name, "targets": targets}
-            result, code = self.client.post("org/routing-keys", payload)
-            if post_succeeded(code, result):
-                existing_keys.add(target_name)
-                self._bump("routing_keys", "created")
-            else:
-                self._bump("routing_keys", "failed")
+            targets.append(target_policy)
+        if not targets:
+            log.warning(
+                f"  Skipping routing key '{target_name}': no target policies available."
+            )
+            self._bump("routing_keys", "skipped")
+            return
+        if self._unplanned("routing_keys", source_name):
+            return
+        payload = {"routingKey": target_name, "targets": targets}
+        result, code = self._post("routing_keys", source_name, "org/routing-keys", payload)
+        if post_succeeded(code, result):
+            existing_keys.add(target_name)
+            self._bump("routing_keys", "created")
+        else:
+            self._bump("routing_keys", "failed")
 
     def apply_alert_rules(self) -> None:
+        self._run_in_order(self._alert_rule_items())
+
+    def _alert_rule_signature_for(self, rule: Dict[str, Any]) -> AlertRuleSignature:
+        match_value = rule.get("alertValueMatch", "")
+        if rule.get("alertField") == "routing_key" and match_value:
+            match_value = self.remapping.map_value("routing_keys", match_value) or match_value
+        return alert_rule_signature(rule.get("alertField"), match_value, rule.get("rank", 1))
+
+    def _alert_rule_items(self) -> List[ApplyItem]:
+        """One item per rule; a routing_key rule waits for the routing key it matches."""
         rules = self._load_json("alert_rules_inventory") or []
-        existing_signatures = self._existing_alert_rule_signatures()
-        for rule in rules:
-            if not isinstance(rule, dict):
-                continue
-            rule_id = str(rule.get("id", ""))
-            if not rule_id or self.remapping.is_skipped("alert_rules", rule_id):
-                self._bump("alert_rules", "skipped")
-                continue
-            match_value = rule.get("alertValueMatch", "")
-            if rule.get("alertField") == "routing_key" and match_value:
-                match_value = self.remapping.map_value("routing_keys", match_value) or match_value
-            rank = rule.get("rank", 1)
-            signature = self._alert_rule_signature(rule.get("alertField"), match_value, rank)
-            if signature in existing_signatures:
-                log.info(f"  SKIP alert rule exists: {signature}")
-                self._bump("alert_rules", "skipped")
-                continue
-            payload = {
-                "alertField": rule.get("alertField"),
-                "alertValueMatch": match_value,
-                "matchType": rule.get("matchType", "WILDCARD"),
-                "rank": rank,
-                "stopFlag": rule.get("stopFlag", False),
-                "notes": rule.get("notes", ""),
-            }
-            if rule.get("annotations"):
-                payload["annotations"] = rule["annotations"]
-            result, code = self.client.post("alertRules", payload)
-            if post_succeeded(code, result):
-                existing_signatures.add(signature)
-                self._bump("alert_rules", "created")
-            else:
-                self._bump("alert_rules", "failed")
+        existing_signatures = OnDemand(self._existing_alert_rule_signatures)
+        return [
+            ApplyItem(
+                "alert_rules",
+                partial(self._apply_alert_rule, rule, existing_signatures),
+                provides=str(rule.get("id", "")),
+                needs=[("routing_keys", rule.get("alertValueMatch"))] if rule.get("alertField") == "routing_key" else [],
+                resource=repr(self._alert_rule_signature_for(rule)),
+            )
+            for rule in rules
+            if isinstance(rule, dict)
+        ]
+
+    def _apply_alert_rule(self, rule: Dict[str, Any], existing: OnDemand) -> None:
+        rule_id = str(rule.get("id", ""))
+        if not rule_id or self.remapping.is_skipped("alert_rules", rule_id):
+            self._bump("alert_rules", "skipped")
+            return
+        signature = self._alert_rule_signature_for(rule)
+        _field, match_value, rank = signature
+        if self._journaled("alert_rules", rule_id):
+            return
+        existing_signatures = existing()
+        if signature in existing_signatures:
+            log.info(f"  SKIP alert rule exists: {signature}")
+            self._bump("alert_rules", "skipped")
+            return
+        payload = {
+            "alertField": rule.get("alertField"),
+            "alertValueMatch": match_value,
+            "matchType": rule.get("matchType", "WILDCARD"),
+            "rank": rank,
+            "stopFlag": rule.get("stopFlag", False),
+            "notes": rule.get("notes", ""),
+        }
+        if rule.get("annotations"):
+            payload["annotations"] = rule["annotations"]
+        if self._unplanned("alert_rules", rule_id):
+            return
+        result, code = self._post("alert_rules", rule_id, "alertRules", payload)
+        if post_succeeded(code, result):
+            existing_signatures.add(signature)
+            self._bump("alert_rules", "created")
+        else:
+            self._bump("alert_rules", "failed")
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -779,18 +1297,71 @@ def main(argv: list[str] | None = None) -> None:
         log.critical(f"Remapping file not found: {remapping_path}")
         sys.exit(1)
 
+    if args.plan and args.apply:
+        log.critical("--plan only reads the target org; run --apply --plan-file <plan> to execute it.")
+        sys.exit(1)
+
     remapping_data = json.loads(remapping_path.read_text())
-    client = ApplyClient(api_id, api_key, org_slug, dry_run=not args.apply)
-    pipeline = ApplyPipeline(
-        client,
-        Path(args.inventory),
-        RemappingContext(remapping_data),
-        Path(args.inventory) / "apply_report.json",
-    )
+    client = ApplyClient(api_id, api_key, org_slug, dry_run=not args.apply, pool_size=args.workers)
+    inventory_dir = Path(args.inventory)
+    report_path = inventory_dir / "apply_report.json"
+    journal = None
+    # Only --apply writes, so only --apply resumes; a dry run always checks the target itself.
+    if args.apply and not args.ignore_journal:
+        journal = ApplyJournal(
+            Path(args.journal) if args.journal else inventory_dir / "apply_journal.jsonl",
+            org_slug,
+            reset=args.reset_journal,
+        )
 
-    mode = "APPLY" if args.apply else "DRY-RUN"
-    log.info(f"Starting apply pipeline ({mode}) for org '{org_slug}'")
-    pipeline.run()
+    if args.plan:
+        plan_path = Path(args.plan_file) if args.plan_file else inventory_dir / "apply_plan.json"
+        pipeline = ApplyPipeline(
+            client, inventory_dir, RemappingContext(remapping_data), report_path, workers=args.workers
+        )
+        log.info(f"Planning apply for org '{org_slug}'")
+        pipeline.plan(plan_path)
+    elif args.plan_file:
+        plan_path = Path(args.plan_file)
+        if not plan_path.exists():
+            log.critical(f"Plan file not found: {plan_path}")
+            sys.exit(1)
+        plan = json.loads(plan_path.read_text())
+        if plan.get("org_slug") != org_slug:
+            log.critical(f"Plan {plan_path} was made for org '{plan.get('org_slug')}', not '{org_slug}'.")
+            sys.exit(1)
+        pipeline = ApplyPipeline.from_plan(
+            plan,
+            plan_path,
+            client,
+            inventory_dir,
+            RemappingContext(remapping_data),
+            report_path,
+            args.workers,
+            journal,
+        )
+        mode = "APPLY" if args.apply else "DRY-RUN"
+        log.info(
+            f"Executing plan {plan_path} ({len(plan.get('changeset', []))} changes, {mode}) for org '{org_slug}'"
+        )
+        pipeline.run()
+    else:
+        pipeline = ApplyPipeline(
+            client,
+            inventory_dir,
+            RemappingContext(remapping_data),
+            report_path,
+            workers=args.workers,
+            journal=journal,
+        )
+        mode = "APPLY" if args.apply else "DRY-RUN"
+        log.info(f"Starting apply pipeline ({mode}) for org '{org_slug}'")
+        pipeline.run()
+    if journal is not None:
+        journal.close()
+    if args.metrics_file:
+        client.metrics.write_prometheus(Path(args.metrics_file), {"org": org_slug, "stage": "apply"})
+        log.info(f"Request metrics written to {args.metrics_file}")
 
 
 if __name__ == "__main__":
@@ -39,7 +39,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from apply import RemappingContext
-from utils import load_dotenv, load_json
+from utils import load_dotenv, load_inventory, load_json
 from utils.http_client import BaseVictorOpsClient
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
@@ -63,8 +63,7 @@ class DeferredMigrationClient(BaseVictorOpsClient):
 
     def get(self, endpoint: str) -> Tuple[Optional[Any], int]:
         url = self._url(endpoint, self.base_v1)
-        self.rate_limiter.wait()
-        resp = self.session.get(url, timeout=30)
+        resp = self._send_get(url, timeout=30)
         if resp.status_code == 404:
             return None, 404
         if resp.status_code != 200:
@@ -83,11 +82,11 @@ class DeferredMigrationClient(BaseVictorOpsClient):
 
     def post(self, endpoint: str, payload: Dict[str, Any]) -> Tuple[Optional[Any], int]:
         url = self._url(endpoint, self.base_v1)
-        self.rate_limiter.wait()
         if self.dry_run:
+            self.rate_limiter.wait()
             log.info(f"DRY-RUN POST {url} payload={payload}")
             return {"dry_run": True, "endpoint": endpoint, "payload": payload}, 200
-        resp = self.session.post(url, json=payload, timeout=30)
+        resp = self._send("POST", url, json=payload, timeout=30)
         if resp.status_code not in (200, 201):
             log.error(f"POST {url} -> {resp.status_code}: {resp.text[:200]}")
             return None, resp.status_code
@@ -259,8 +258,8 @@ class DeferredPipeline:
 
     def run(self) -> None:
         log.info("Loading inventory files...")
-        contact_methods = load_json(self.inventory_dir / "contact_methods_inventory.json", default={})
-        paging_policies = load_json(self.inventory_dir / "paging_policies_inventory.json", default={})
+        contact_methods = load_inventory(self.inventory_dir, "contact_methods_inventory", default={})
+        paging_policies = load_inventory(self.inventory_dir, "paging_policies_inventory", default={})
 
         if not contact_methods:
             log.warning("Contact methods inventory is empty or not found.")
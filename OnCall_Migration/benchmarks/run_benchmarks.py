@@ -0,0 +1,256 @@
+"""End-to-end discovery / apply benchmark against the local VictorOps simulator.
+
+For each org size, runs ``DiscoveryPipeline`` against a synthetic source org,
+generates the remapping template, then runs ``ApplyPipeline`` and
+``DeferredPipeline`` (``--apply`` mode) against an empty simulated target org.
+Reports wall time, API calls, TCP connections opened, and peak Python heap
+(tracemalloc) per pipeline.
+
+Usage (from OnCall_Migration/):
+    python3 -m benchmarks.run_benchmarks
+    python3 -m benchmarks.run_benchmarks --sizes 100,1000 --latency-ms 20 --error-rate 0.01
+    python3 -m benchmarks.run_benchmarks --rate-hz 2      # include the production throttle
+    python3 -m benchmarks.run_benchmarks --rate-hz 2 --api-keys 3   # discovery spread over 3 key pairs
+    python3 -m benchmarks.run_benchmarks --slow-rate 0.02 --slow-ms 2000 --hedge   # hedge a slow tail
+    python3 -m benchmarks.run_benchmarks --latency-ms 20 --apply-workers 1   # apply one item at a time
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.cli import print_help_and_exit_if_requested
+
+DEFAULT_SIZES = "100,1000,10000"
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark discovery, apply, and deferred apply against a local API simulator.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated user counts.")
+    parser.add_argument("--users-per-team", type=int, default=10, help="Synthetic org team density.")
+    parser.add_argument("--policies-per-team", type=int, default=2)
+    parser.add_argument("--policy-depth", type=int, default=3, help="Length of policy_routing chains.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added server latency per request.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform extra latency per request.")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests given --slow-ms extra.")
+    parser.add_argument("--slow-ms", type=float, default=0.0, help="Extra latency of the slow tail.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered 429.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 503.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s.")
+    parser.add_argument(
+        "--rate-hz",
+        type=float,
+        default=0.0,
+        help="Client rate limit; 0 disables throttling to measure pipeline overhead.",
+    )
+    parser.add_argument(
+        "--api-keys",
+        type=int,
+        default=1,
+        help="API key pairs discovery spreads its requests across, each with its own --rate-hz budget.",
+    )
+    parser.add_argument("--hedge", action="store_true", help="Hedge discovery GETs (discovery.py --hedge).")
+    parser.add_argument(
+        "--apply-workers", type=int, default=4, help="Concurrent apply items (apply.py --workers)."
+    )
+    parser.add_argument(
+        "--pipelines",
+        default="discovery,apply,deferred",
+        help="Comma-separated subset to run (apply/deferred need discovery output).",
+    )
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip heap tracking (faster).")
+    parser.add_argument("--output", help="Write results as JSON to this path.")
+    parser.add_argument("--verbose", action="store_true", help="Keep pipeline INFO logging.")
+    return parser
+
+
+if __name__ == "__main__":
+    print_help_and_exit_if_requested(_build_arg_parser)
+
+from apply import DEFAULT_WORKERS, ApplyClient, ApplyPipeline, RemappingContext
+from apply_contact_methods_and_policies import DeferredMigrationClient, DeferredPipeline
+from benchmarks.simulator import Faults, SimulatedOrg, VictorOpsSimulator
+from discovery import DiscoveryPipeline, VictorOpsClient
+from generate_remapping import RemappingGenerator
+from utils.io import load_json
+
+PIPELINES = ("discovery", "apply", "deferred")
+
+
+def _configure_client(client: Any, simulator: VictorOpsSimulator, rate_hz: float) -> Any:
+    simulator.attach(client)
+    # 0 = unthrottled: the limiter still runs, but never sleeps between slots.
+    for credential in client.credentials:
+        credential.rate_limiter.delay = 1.0 / rate_hz if rate_hz > 0 else 0.0
+    return client
+
+
+def _measure(
+    name: str,
+    users: int,
+    simulator: VictorOpsSimulator,
+    client: Any,
+    trace_memory: bool,
+    run: Callable[[], Any],
+) -> Dict[str, Any]:
+    calls_before = simulator.request_count
+    connections_before = client.connection_stats()["connections_opened"]
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        run()
+    finally:
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    calls = simulator.request_count - calls_before
+    return {
+        "pipeline": name,
+        "users": users,
+        "wall_seconds": round(elapsed, 3),
+        "api_calls": calls,
+        "calls_per_second": round(calls / elapsed, 1) if elapsed else 0.0,
+        "connections": client.connection_stats()["connections_opened"] - connections_before,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2) if peak is not None else None,
+    }
+
+
+def run_size(
+    users: int,
+    workdir: Path,
+    *,
+    users_per_team: int = 10,
+    policies_per_team: int = 2,
+    policy_depth: int = 3,
+    faults: Optional[Faults] = None,
+    rate_hz: float = 0.0,
+    api_keys: int = 1,
+    hedge: bool = False,
+    apply_workers: int = DEFAULT_WORKERS,
+    pipelines: tuple = PIPELINES,
+    trace_memory: bool = True,
+) -> List[Dict[str, Any]]:
+    """Run the selected pipelines for one synthetic org size; return one result row each."""
+    inventory_dir = workdir / "inventory"
+    remapping_path = inventory_dir / "remapping.json"
+    source = SimulatedOrg.synthetic(
+        users,
+        teams=max(1, users // max(1, users_per_team)),
+        policies_per_team=policies_per_team,
+        policy_depth=policy_depth,
+    )
+    target = SimulatedOrg()
+    results: List[Dict[str, Any]] = []
+
+    if "discovery" in pipelines:
+        with VictorOpsSimulator(source, faults) as simulator:
+            extra_credentials = [(f"bench-id-{n}", f"bench-key-{n}") for n in range(2, max(1, api_keys) + 1)]
+            client = _configure_client(
+                VictorOpsClient(
+                    "bench-id", "bench-key", "bench-org", extra_credentials=extra_credentials, hedge=hedge
+                ),
+                simulator,
+                rate_hz,
+            )
+            results.append(_measure(
+                "discovery", users, simulator, client, trace_memory,
+                lambda: DiscoveryPipeline(client, inventory_dir).run(),
+            ))
+        RemappingGenerator(inventory_dir, remapping_path).generate()
+
+    remapping = RemappingContext(load_json(remapping_path, default={}))
+    with VictorOpsSimulator(target, faults) as simulator:
+        if "apply" in pipelines:
+            apply_client = _configure_client(
+                ApplyClient("bench-id", "bench-key", "bench-target", dry_run=False, pool_size=apply_workers),
+                simulator,
+                rate_hz,
+            )
+            pipeline = ApplyPipeline(
+                apply_client, inventory_dir, remapping, inventory_dir / "apply_report.json", workers=apply_workers
+            )
+            results.append(_measure("apply", users, simulator, apply_client, trace_memory, pipeline.run))
+        if "deferred" in pipelines:
+            deferred_client = _configure_client(
+                DeferredMigrationClient("bench-id", "bench-key", "bench-target", dry_run=False), simulator, rate_hz
+            )
+            deferred = DeferredPipeline(deferred_client, inventory_dir, remapping)
+            results.append(_measure("deferred", users, simulator, deferred_client, trace_memory, deferred.run))
+    return results
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    header = (
+        f"{'pipeline':<10} {'users':>7} {'wall s':>9} {'API calls':>10} {'calls/s':>9} {'conns':>6} {'peak MB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        peak = "-" if row["peak_memory_mb"] is None else f"{row['peak_memory_mb']:.2f}"
+        print(
+            f"{row['pipeline']:<10} {row['users']:>7} {row['wall_seconds']:>9.2f} "
+            f"{row['api_calls']:>10} {row['calls_per_second']:>9.1f} {row['connections']:>6} {peak:>9}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _build_arg_parser().parse_args(argv)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    pipelines = tuple(name.strip() for name in args.pipelines.split(",") if name.strip())
+    unknown = [name for name in pipelines if name not in PIPELINES]
+    if unknown:
+        sys.exit(f"Unknown pipeline(s): {', '.join(unknown)}")
+    if "discovery" not in pipelines:
+        sys.exit("apply/deferred benchmarks need the discovery output; include 'discovery'.")
+
+    results: List[Dict[str, Any]] = []
+    for users in sizes:
+        faults = Faults(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            slow_rate=args.slow_rate,
+            slow_ms=args.slow_ms,
+            throttle_rate=args.throttle_rate,
+            error_rate=args.error_rate,
+            retry_after=args.retry_after,
+        )
+        with tempfile.TemporaryDirectory(prefix="oncall-bench-") as tmp:
+            results.extend(run_size(
+                users,
+                Path(tmp),
+                users_per_team=args.users_per_team,
+                policies_per_team=args.policies_per_team,
+                policy_depth=args.policy_depth,
+                faults=faults,
+                rate_hz=args.rate_hz,
+                api_keys=args.api_keys,
+                hedge=args.hedge,
+                apply_workers=args.apply_workers,
+                pipelines=pipelines,
+                trace_memory=not args.no_tracemalloc,
+            ))
+
+    _print_table(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"config": vars(args), "results": results}, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
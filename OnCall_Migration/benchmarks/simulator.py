@@ -0,0 +1,432 @@
+"""Local stand-in for the VictorOps v1/v2 endpoints used by the pipeline scripts.
+
+``SimulatedOrg.synthetic()`` builds a source org with N users, M teams, and
+escalation policies chained ``policy_depth`` deep through ``policy_routing``
+entries; ``SimulatedOrg()`` is an empty target org that accepts the POSTs made
+by ``apply.py`` and ``apply_contact_methods_and_policies.py``. ``Faults`` adds
+latency, 429s (with ``Retry-After``) and 5xx responses. Bodies of at least
+``GZIP_MIN_BYTES`` are gzip-encoded when the client accepts it.
+
+    with VictorOpsSimulator(SimulatedOrg.synthetic(users=1000)) as sim:
+        sim.attach(client)          # point a BaseVictorOpsClient at the simulator
+        DiscoveryPipeline(client, Path("inventory")).run()
+
+Not a faithful API model: only the fields the pipelines read are produced.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from utils.metrics import endpoint_template
+
+JsonResponse = Tuple[int, Any]
+
+GZIP_MIN_BYTES = 1024
+
+
+class Faults:
+    """Injected per-request latency, a slow tail, and error rates (seeded, so runs repeat)."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """Return ``(delay_seconds, injected_status or None)`` for one request."""
+        with self._lock:
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000.0
+            # Drawn only when enabled, so seeded runs without a slow tail repeat exactly.
+            if self.slow_rate and self._random.random() < self.slow_rate:
+                delay += self.slow_ms / 1000.0
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return delay, 429
+        if roll < self.throttle_rate + self.error_rate:
+            return delay, 503
+        return delay, None
+
+
+_ID_COLLECTIONS = ("user", "profile", "team", "teams", "policies")
+
+
+def _route(parts: List[str]) -> str:
+    """``["team", "t1", "members"]`` -> ``"team/*/members"``."""
+    if len(parts) > 1 and parts[0] in _ID_COLLECTIONS:
+        parts = [parts[0], "*"] + parts[2:]
+    return "/".join(parts)
+
+
+def _slugify(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "x"
+
+
+class SimulatedOrg:
+    """In-memory org state; every mutation goes through ``handle`` under one lock."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self.members: Dict[str, List[str]] = {}
+        self.admins: Dict[str, List[str]] = {}
+        self.rotations: Dict[str, List[Dict[str, Any]]] = {}
+        self.policies: Dict[str, Dict[str, Any]] = {}
+        self.routing_keys: List[Dict[str, Any]] = []
+        self.alert_rules: List[Dict[str, Any]] = []
+        self.contact_methods: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self.paging_policies: Dict[str, List[Dict[str, Any]]] = {}
+        self.profile_policies: Dict[str, List[Dict[str, Any]]] = {}
+        self._ids = 0
+
+    @classmethod
+    def synthetic(
+        cls,
+        users: int,
+        teams: Optional[int] = None,
+        policies_per_team: int = 2,
+        policy_depth: int = 3,
+        seed: int = 0,
+    ) -> "SimulatedOrg":
+        """Deterministic org: every user is on one team, policies route ``policy_depth`` deep."""
+        rng = random.Random(seed)
+        org = cls()
+        team_count = teams if teams is not None else max(1, users // 10)
+        usernames = [f"user{i:05d}" for i in range(users)]
+        for i, username in enumerate(usernames):
+            org.users[username] = {
+                "username": username,
+                "firstName": "User",
+                "lastName": str(i),
+                "email": f"{username}@example.com",
+            }
+            org.contact_methods[username] = {
+                "emails": [org._record(f"{username}@example.com", "Default")],
+                "phones": [org._record(f"+1555{i:07d}", "Mobile")] if i % 2 == 0 else [],
+            }
+            org.paging_policies[username] = [
+                {"order": 0, "timeout": 0, "contactType": "email"},
+                {"order": 1, "timeout": 5, "contactType": "sms" if i % 2 == 0 else "email"},
+            ]
+
+        policy_slugs: List[str] = []
+        for t in range(team_count):
+            slug = f"team-{t:04d}"
+            team_users = usernames[t::team_count]
+            if not team_users and usernames:
+                team_users = [rng.choice(usernames)]
+            org.teams[slug] = {"slug": slug, "name": f"Team {t:04d}"}
+            org.members[slug] = list(team_users)
+            org.admins[slug] = team_users[:1]
+            label = f"{slug} primary"
+            org.rotations[slug] = [{
+                "label": label,
+                "slug": f"rtg-{slug}",
+                "shifts": [{
+                    "label": "weekly",
+                    "timezone": "UTC",
+                    "start": "2024-01-01T09:00:00Z",
+                    "duration": 7,
+                    "shifttype": "std",
+                    "mask": {"day": {"m": True, "t": True, "w": True, "th": True, "f": True}},
+                    "shiftMembers": [{"username": u} for u in team_users[:5]],
+                }],
+            }]
+            for p in range(policies_per_team):
+                policy_slug = f"pol-{t:04d}-{p}"
+                policy_slugs.append(policy_slug)
+                entries: List[Dict[str, Any]] = [
+                    {"executionType": "rotation_group", "rotationGroup": {"slug": f"rtg-{slug}", "label": label}},
+                ]
+                if team_users:
+                    entries.append({"executionType": "user", "user": {"username": team_users[0]}})
+                org.policies[policy_slug] = {
+                    "slug": policy_slug,
+                    "name": f"{slug} policy {p}",
+                    "team": slug,
+                    "steps": [{"timeout": 0, "entries": entries}],
+                }
+            org.routing_keys.append({
+                "routingKey": f"rk-{slug}",
+                "targets": [{"policySlug": f"pol-{t:04d}-0", "policyName": f"{slug} policy 0"}],
+            })
+            org.alert_rules.append({
+                "id": t + 1,
+                "rank": t + 1,
+                "alertField": "routing_key",
+                "alertValueMatch": f"rk-{slug}",
+                "matchType": "WILDCARD",
+                "stopFlag": False,
+                "notes": "",
+            })
+
+        # Chain policies: each links to the next until the chain is policy_depth long.
+        depth = max(1, policy_depth)
+        for index, policy_slug in enumerate(policy_slugs):
+            if index % depth != depth - 1 and index + 1 < len(policy_slugs):
+                org.policies[policy_slug]["steps"].append({
+                    "timeout": 10,
+                    "entries": [{"executionType": "policy_routing",
+                                 "targetPolicy": {"policySlug": policy_slugs[index + 1]}}],
+                })
+        return org
+
+    def _record(self, value: str, label: str) -> Dict[str, Any]:
+        self._ids += 1
+        return {"id": self._ids, "value": value, "label": label}
+
+    # --- routing ---
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: Any) -> JsonResponse:
+        parts = [p for p in path.split("/") if p]
+        if "api-public" in parts:
+            parts = parts[parts.index("api-public") + 1:]
+        if parts and parts[0] in ("v1", "v2"):
+            parts = parts[1:]
+        with self.lock:
+            if method == "GET":
+                return self._get(parts, params)
+            return self._post(parts, body if isinstance(body, dict) else {})
+
+    def _page(self, key: str, items: List[Any], params: Dict[str, str]) -> JsonResponse:
+        if "offset" in params or "limit" in params:
+            offset = int(params.get("offset", 0))
+            items = items[offset:offset + int(params.get("limit", 100))]
+        return 200, {key: items}
+
+    def _get(self, parts: List[str], params: Dict[str, str]) -> JsonResponse:
+        route = _route(parts)
+        if route == "user":
+            return self._page("users", list(self.users.values()), params)
+        if route == "team":
+            return self._page("teams", list(self.teams.values()), params)
+        if route == "policies":
+            listing = [
+                {"policy": {"slug": p["slug"], "name": p["name"]},
+                 "team": {"slug": p["team"], "name": self.teams.get(p["team"], {}).get("name", p["team"])}}
+                for p in self.policies.values()
+            ]
+            return self._page("policies", listing, params)
+        if route == "org/routing-keys":
+            return self._page("routingKeys", list(self.routing_keys), params)
+        if route == "alertRules":
+            return self._page("rules", list(self.alert_rules), params)
+        if route in ("webhooks", "overrides"):
+            return 200, {route: []}
+        if route == "user/*":
+            user = self.users.get(parts[1])
+            return (200, user) if user else (404, {"error": "not found"})
+        if route == "user/*/contact-methods":
+            methods = self.contact_methods.get(parts[1], {})
+            return 200, {
+                "devices": {"contactMethods": []},
+                "emails": {"contactMethods": list(methods.get("emails", []))},
+                "phones": {"contactMethods": list(methods.get("phones", []))},
+            }
+        if route in ("user/*/contact-methods/emails", "user/*/contact-methods/phones"):
+            return 200, {"contactMethods": list(self.contact_methods.get(parts[1], {}).get(parts[3], []))}
+        if route == "user/*/policies":
+            return self._page("policies", list(self.paging_policies.get(parts[1], [])), params)
+        if route == "profile/*/policies":
+            return 200, {"steps": list(self.profile_policies.get(parts[1], []))}
+        if route in ("team/*/members", "team/*/admins"):
+            table = self.members if parts[2] == "members" else self.admins
+            if parts[1] not in self.teams:
+                return 404, {"error": "team not found"}
+            return self._page(parts[2], [{"username": u} for u in table.get(parts[1], [])], params)
+        if route in ("team/*/rotations", "teams/*/rotations"):
+            rotations = self.rotations.get(parts[1], [])
+            return 200, {
+                "rotations": rotations,
+                "rotationGroups": [{"label": r["label"], "slug": r["slug"]} for r in rotations],
+            }
+        if route == "team/*/oncall/schedule":
+            return 200, {"schedules": [{"team": parts[1], "schedule": []}]}
+        if route == "policies/*":
+            policy = self.policies.get(parts[1])
+            return (200, policy["steps"]) if policy else (404, {"error": "not found"})
+        return 404, {"error": f"no route for GET {'/'.join(parts)}"}
+
+    def _post(self, parts: List[str], body: Dict[str, Any]) -> JsonResponse:
+        route = _route(parts)
+        if route == "user":
+            username = body.get("username")
+            if not username or username in self.users:
+                return 409, {"error": "user exists"}
+            self.users[username] = dict(body)
+            return 201, self.users[username]
+        if route == "team":
+            slug = _slugify(body.get("name", "team"))
+            self.teams[slug] = {"slug": slug, "name": body.get("name", slug)}
+            return 201, self.teams[slug]
+        if route == "team/*/members":
+            self.members.setdefault(parts[1], []).append(body.get("username"))
+            return 200, {"username": body.get("username")}
+        if route in ("team/*/rotations", "teams/*/rotations"):
+            rotation = {"label": body.get("label"), "slug": f"rtg-{parts[1]}-{len(self.rotations.get(parts[1], []))}",
+                        "shifts": body.get("shifts", [])}
+            self.rotations.setdefault(parts[1], []).append(rotation)
+            return 200, {"label": rotation["label"], "slug": rotation["slug"]}
+        if route == "policies":
+            slug = f"pol-{_slugify(body.get('name', 'policy'))}"
+            self.policies[slug] = {"slug": slug, "name": body.get("name"), "team": body.get("teamSlug"),
+                                   "steps": body.get("steps", [])}
+            return 200, {"slug": slug, "name": body.get("name")}
+        if route == "org/routing-keys":
+            self.routing_keys.append({"routingKey": body.get("routingKey"),
+                                      "targets": [{"policySlug": s} for s in body.get("targets", [])]})
+            return 200, {"routingKey": body.get("routingKey")}
+        if route == "alertRules":
+            rule = dict(body, id=len(self.alert_rules) + 1)
+            self.alert_rules.append(rule)
+            return 200, rule
+        if route in ("user/*/contact-methods/emails", "user/*/contact-methods/phones"):
+            value = body.get("email") or body.get("phone")
+            record = self._record(value, body.get("label", ""))
+            self.contact_methods.setdefault(parts[1], {}).setdefault(parts[3], []).append(record)
+            return 200, record
+        if route == "profile/*/policies":
+            self.profile_policies.setdefault(parts[1], []).append(body)
+            return 200, body
+        return 404, {"error": f"no route for POST {'/'.join(parts)}"}
+
+
+class VictorOpsSimulator:
+    """Threaded local HTTP server serving one ``SimulatedOrg``; counts requests per endpoint."""
+
+    def __init__(self, org: SimulatedOrg, faults: Optional[Faults] = None, host: str = "127.0.0.1", port: int = 0):
+        self.org = org
+        self.faults = faults or Faults()
+        self._counts: Dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; Nagle would hold the body ~40ms.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _serve(self, method: str) -> None:
+                split = urlsplit(self.path)
+                params = {k: v[-1] for k, v in parse_qs(split.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                simulator._count(method, split.path)
+
+                delay, injected = simulator.faults.draw()
+                if delay:
+                    time.sleep(delay)
+                headers: Dict[str, str] = {}
+                if injected == 429:
+                    status, payload = 429, {"error": "rate limited"}
+                    headers["Retry-After"] = f"{simulator.faults.retry_after:g}"
+                elif injected is not None:
+                    status, payload = injected, {"error": "injected failure"}
+                else:
+                    try:
+                        body = json.loads(raw) if raw else None
+                    except ValueError:
+                        body = None
+                    status, payload = simulator.org.handle(method, split.path, params, body)
+
+                data = json.dumps(payload).encode("utf-8")
+                if len(data) >= GZIP_MIN_BYTES and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    data = gzip.compress(data, compresslevel=5)
+                    headers["Content-Encoding"] = "gzip"
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                self._serve("GET")
+
+            def do_POST(self) -> None:
+                self._serve("POST")
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api-public"
+
+    @property
+    def base_v1(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def base_v2(self) -> str:
+        return f"{self.base_url}/v2"
+
+    def _count(self, method: str, path: str) -> None:
+        key = f"{method} {endpoint_template(path)}"
+        with self._counts_lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    @property
+    def request_count(self) -> int:
+        with self._counts_lock:
+            return sum(self._counts.values())
+
+    def request_counts(self) -> Dict[str, int]:
+        with self._counts_lock:
+            return dict(sorted(self._counts.items()))
+
+    def attach(self, client: Any) -> Any:
+        """Point a ``BaseVictorOpsClient`` at this server (same retry adapter for http://)."""
+        client.base_v1 = self.base_v1
+        client.base_v2 = self.base_v2
+        for credential in client.credentials:
+            credential.session.mount("http://", credential.session.get_adapter("https://"))
+        return client
+
+    def start(self) -> "VictorOpsSimulator":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="vo-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "VictorOpsSimulator":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
@@ -9,6 +9,16 @@ Usage:
     python3 discovery.py --inventory inventory
     python3 discovery.py --teams team-1234,team-5678,team-9012
     python3 discovery.py --teams-file inventory/team_scope.txt
+    python3 discovery.py --engine async    # asyncio fan-out (pip install aiohttp)
+    python3 discovery.py --resume          # continue an interrupted run from its checkpoint
+    python3 discovery.py --cache-dir .http_cache   # reuse responses across repeated runs
+    python3 discovery.py --since inventory         # delta run: refetch only new/changed entities
+    python3 discovery.py --plan            # count the calls a run would make and estimate its duration
+    python3 discovery.py --max-concurrency 32      # let the adaptive per-entity limit grow further
+    python3 discovery.py --hedge           # duplicate GETs slower than their endpoint's p95
+
+    # Extra read-only API keys for the same org (SOURCE_SPLUNK_ONCALL_API_ID_2 / _API_KEY_2, _3, ...)
+    # each add their own rate budget; requests go to the least-loaded key.
 
     # uv (with project .venv):
     uv run python3 discovery.py
@@ -17,6 +27,7 @@ Usage:
     uv run --with requests python3 discovery.py
 
 Output: inventory/*.json, inventory_summary.md, discovery_metadata.json
+(--plan writes only discovery_plan.json)
 
 Next steps: validate_inventory.py, generate_remapping.py, validate_apply.py, apply.py
 """
@@ -27,6 +38,14 @@ import sys
 from utils.cli import print_help_and_exit_if_requested
 
 
+# Mirrors utils.response_cache defaults; kept here so --help works before heavy imports.
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_CACHE_MAX_MB = 256.0
+STORE_MODES = ("json", "sqlite", "both")
+# Mirrors utils.concurrency.DEFAULT_MAX_LIMIT.
+DEFAULT_MAX_CONCURRENCY = 16
+
+
 def _build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Export discoverable Splunk On-Call config from the source org to JSON.",
@@ -42,32 +61,124 @@ def _build_arg_parser() -> argparse.ArgumentParser:
         "--teams-file",
         help="Path to file with one team slug per line (# comments allowed).",
     )
+    parser.add_argument(
+        "--since",
+        metavar="PREVIOUS_INVENTORY",
+        help="Delta run: carry per-entity data over from this earlier inventory for entities "
+        "whose user/team/policy listing summary is unchanged (may equal --inventory).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse per-entity fetches journaled by an interrupted run in the same --inventory.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Enable the on-disk GET response cache in this directory (e.g. .http_cache).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help="Seconds a cached response is served without revalidation (0 = always revalidate).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_MB,
+        help="Size bound for --cache-dir; least recently used entries are evicted first.",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=("json", "compact", "ndjson"),
+        default="json",
+        help="Layout of *_inventory.json files: indented JSON, single-line JSON, or NDJSON "
+        "(all readable by utils.io.load_json).",
+    )
+    parser.add_argument(
+        "--store",
+        choices=STORE_MODES,
+        default="json",
+        help="Where *_inventory documents go: JSON files, an indexed inventory.sqlite "
+        "(read by every later stage), or both.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Also write per-endpoint request metrics here in Prometheus text format.",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Fetch only the global listings (plus the policy closure for --teams), count the "
+        "per-entity calls a run would make, estimate its wall time, and write discovery_plan.json.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="Upper bound for the adaptive number of in-flight per-entity requests, per API key (starts at 4 "
+        "and moves with observed latency and errors; the rate limit still applies). 4 keeps the old fixed pool.",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a duplicate GET when one outlasts its endpoint's p95 latency and the rate budget has "
+        "room; the first response wins. Hedges are capped at 5%% of requests (threaded engine only).",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "async"),
+        default="threads",
+        help="Per-entity fetch engine; 'async' uses asyncio coroutines (requires aiohttp).",
+    )
+    parser.add_argument(
+        "--async-concurrency",
+        type=int,
+        default=16,
+        help="Max in-flight requests for --engine async (rate limit still applies).",
+    )
     return parser
 
 
 if __name__ == "__main__":
     print_help_and_exit_if_requested(_build_arg_parser)
 
+import asyncio
 import itertools
-import json
 import logging
 import os
+import shutil
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple
 
 import requests
 
-from utils.env_loader import PROJECT_ROOT, load_dotenv
-from utils.exceptions import ApiError, NetworkError
-from utils.http_client import BaseVictorOpsClient
+from utils.async_client import AsyncVictorOpsClient
+from utils.concurrency import AdaptiveConcurrency
+from utils.delta import DeltaBaseline
+from utils.env_loader import PROJECT_ROOT, load_dotenv, numbered_credentials
+from utils.exceptions import ApiError, MigrationError, NetworkError, TransientError
+from utils.hedging import HedgePolicy
+from utils.http_client import RETRY_STATUSES, BaseVictorOpsClient, no_retries, retries_disabled
+from utils.inventory_store import STORE_FILENAME, InventoryStore
+from utils.inventory_writer import EntityShard, write_inventory
+from utils.journal import FetchJournal
+from utils.metrics import endpoint_template
+from utils.progress import DEFAULT_LATENCY_SECONDS, CallPlan, ProgressTracker, format_duration, throughput
+from utils.retry_queue import CircuitBreaker, RetryQueue
+from utils.single_flight import memo_disabled, no_memo
 from utils.summary_reporter import SummaryReporter
+from utils.task_graph import DEFAULT_MAX_PARALLEL, TaskGraph
 from utils.migration_types import InventoryCounts
+from utils.pagination import DEFAULT_PAGE_LIMIT, page_requests
+from utils.response_cache import ResponseCache
 from utils.team_scope import (
     collect_usernames,
-    expand_policy_closure,
     filter_alert_rules,
     filter_overrides,
     filter_policy_details,
@@ -77,6 +188,7 @@ from utils.team_scope import (
     group_policies_by_team,
     parse_teams_arg,
     parse_teams_file,
+    policy_routing_targets,
     routing_key_names,
     seed_policy_slugs,
     team_slugs_for_policies,
@@ -86,10 +198,43 @@ from utils.team_scope import (
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
 
+# Per-entity fetch workers; the limiter burst matches so idle slots are not wasted.
+PER_ENTITY_WORKERS = 4
+
+# Offset pages kept in flight once a listing is known to span several pages.
+PAGE_PREFETCH = 4
+
+# Checkpoint of completed per-entity fetches, kept in --inventory until a run completes.
+CHECKPOINT_JOURNAL = ".discovery_journal.jsonl"
+
+# Per-entity NDJSON shards live here while a phase streams its results.
+SHARD_DIR = ".shards"
+
+# Worth re-queueing: the same request may succeed later.
+TRANSIENT_REQUEST_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.RetryError,
+)
+
 
 class VictorOpsClient(BaseVictorOpsClient):
     """Encapsulates API session, base URLs, rate limiting, and generic fetching."""
-    def __init__(self, api_id: str, api_key: str, org_slug: str):
+    def __init__(
+        self,
+        api_id: str,
+        api_key: str,
+        org_slug: str,
+        response_cache: Optional[ResponseCache] = None,
+        page_prefetch: int = PAGE_PREFETCH,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        extra_credentials: Sequence[Tuple[str, str]] = (),
+        hedge: bool = False,
+        rate_hz: float = 2.0,
+    ):
+        # Each extra API key pair brings its own rate budget, so the in-flight limit scales with it.
+        keys = 1 + len(extra_credentials)
+        max_concurrency = max(1, max_concurrency) * keys
         super().__init__(
             api_id,
             api_key,
@@ -97,79 +242,188 @@ class VictorOpsClient(BaseVictorOpsClient):
             retry_total=6,
             retry_backoff=2,
             allowed_methods=["GET"],
+            rate_hz=rate_hz,
+            rate_burst=PER_ENTITY_WORKERS,
+            response_cache=response_cache,
+            # One keep-alive connection per thread that can hold a request open:
+            # phase coordinators, per-entity workers, and offset-page prefetchers.
+            pool_size=DEFAULT_MAX_PARALLEL + max_concurrency + max(1, page_prefetch),
+            concurrency_limit=AdaptiveConcurrency(
+                initial=min(PER_ENTITY_WORKERS * keys, max_concurrency), max_limit=max_concurrency
+            ),
+            extra_credentials=extra_credentials,
+            hedge_policy=HedgePolicy() if hedge else None,
         )
+        self.page_prefetch = page_prefetch
+        self._page_executor: Optional[ThreadPoolExecutor] = None
+        self._page_executor_lock = threading.Lock()
+
+    def _page_pool(self) -> ThreadPoolExecutor:
+        with self._page_executor_lock:
+            if self._page_executor is None:
+                self._page_executor = ThreadPoolExecutor(
+                    max_workers=self.page_prefetch, thread_name_prefix="page"
+                )
+            return self._page_executor
+
+    def _send_page(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        first_url: str,
+        in_flight: Dict[int, Tuple[Dict[str, Any], Future]],
+    ) -> Any:
+        """Send one page request, speculatively fetching the following offset pages.
+
+        Offset pagination is only walked past the first page when that page was
+        full, so from then on the next ``page_prefetch`` offsets are requested
+        concurrently (within the shared rate budget) and consumed in order.
+        """
+        offset = params.get("offset")
+        if self.page_prefetch <= 1 or url != first_url or not offset:
+            return self._send_get(url, params)
+        limit = params.get("limit", DEFAULT_PAGE_LIMIT)
+        for ahead in range(self.page_prefetch):
+            next_offset = offset + ahead * limit
+            if next_offset not in in_flight:
+                next_params = {**params, "offset": next_offset}
+                in_flight[next_offset] = (
+                    next_params,
+                    self._page_pool().submit(
+                        self._send_prefetch, url, next_params, retries_disabled(), memo_disabled()
+                    ),
+                )
+        sent_params, future = in_flight.pop(offset)
+        if sent_params != params:
+            future.cancel()
+            return self._send_get(url, params)
+        return future.result()
+
+    def _send_prefetch(self, url: str, params: Dict[str, Any], once: bool, unmemoized: bool = False) -> Any:
+        """Page-pool task; keeps the requesting worker's ``no_retries()`` / ``no_memo()`` modes."""
+        with no_retries() if once else nullcontext(), no_memo() if unmemoized else nullcontext():
+            return self._send_get(url, params)
 
     def get(self, endpoint: str, params: Optional[Dict] = None, use_v2: bool = False, paginate: bool = True, required: bool = False) -> Any:
         base_url = self.base_v2 if use_v2 else self.base_v1
-        url = self._url(endpoint, base_url)
-
-        merged = []
-        is_list_response = False
-        current_params = params.copy() if params else {}
-        if paginate:
-            current_params.setdefault("limit", 100)
-            current_params.setdefault("offset", 0)
-
-        while url:
-            self.rate_limiter.wait()
-            try:
-                resp = self.session.get(url, params=current_params, timeout=30)
-            except requests.RequestException as exc:
-                log.error(f"Network Error: {url} - {exc}")
-                raise NetworkError(f"Failed to fetch {url}: {exc}") from exc
-
-            if resp.status_code == 404:
-                msg = f"Endpoint not found (404): {url}"
-                if required:
-                    log.critical(msg)
-                    raise ApiError(msg)
-                log.warning(f"Not Found (404) for {url}, skipping.")
-                return None
-
-            if resp.status_code != 200:
-                log.error(f"HTTP {resp.status_code} {url} - {resp.text[:200]}")
-                resp.raise_for_status()
-
-            data = resp.json()
-
-            if isinstance(data, list):
-                if not paginate:
-                    return data
-                is_list_response = True
-                merged.extend(data)
-                break
-
-            if isinstance(data, dict):
-                list_keys = [k for k, v in data.items() if isinstance(v, list)]
-                if list_keys and paginate:
-                    if len(list_keys) > 1:
-                        # Multi-list dict (e.g. contact-methods) returned intact to prevent data loss
-                        return data
-
-                    is_list_response = True
-                    primary_key = next(
-                        (k for k in list_keys if data[k] and isinstance(data[k][0], dict)),
-                        list_keys[0],
-                    )
-                    page_items = data[primary_key]
-                    merged.extend(page_items)
-
-                    next_url = data.get("nextPage") or data.get("next_page") or data.get("next")
-                    if next_url:
-                        url = self._url(next_url, base_url)
-                        current_params = {}
-                        continue
-
-                    limit = current_params.get("limit", 100)
-                    if page_items and len(page_items) == limit and isinstance(page_items[0], dict):
-                        current_params["offset"] = current_params.get("offset", 0) + limit
-                        continue
-                    break
-                return data
+        pager = page_requests(
+            self._url(endpoint, base_url), params, paginate, lambda u: self._url(u, base_url)
+        )
+        url, current_params = next(pager)
+        first_url = url
+        in_flight: Dict[int, Tuple[Dict[str, Any], Future]] = {}
+        try:
+            while True:
+                try:
+                    resp = self._send_page(url, current_params, first_url, in_flight)
+                except TRANSIENT_REQUEST_ERRORS as exc:
+                    log.warning(f"Network Error: {url} - {exc}")
+                    raise TransientError(f"Failed to fetch {url}: {exc}") from exc
+                except requests.RequestException as exc:
+                    log.error(f"Network Error: {url} - {exc}")
+                    raise NetworkError(f"Failed to fetch {url}: {exc}") from exc
+
+                if resp.status_code == 404:
+                    msg = f"Endpoint not found (404): {url}"
+                    if required:
+                        log.critical(msg)
+                        raise ApiError(msg)
+                    log.warning(f"Not Found (404) for {url}, skipping.")
+                    return None
+
+                if resp.status_code in RETRY_STATUSES:
+                    log.warning(f"HTTP {resp.status_code} {url} - {resp.text[:200]}")
+                    raise TransientError(f"HTTP {resp.status_code} for {url}")
+                if resp.status_code != 200:
+                    log.error(f"HTTP {resp.status_code} {url} - {resp.text[:200]}")
+                    resp.raise_for_status()
+
+                try:
+                    url, current_params = pager.send(resp.json())
+                except StopIteration as done:
+                    return done.value
+        finally:
+            # Speculative pages past the last short page are discarded.
+            for _params, future in in_flight.values():
+                future.cancel()
+
+
+class _EntityEndpoint:
+    """One per-entity endpoint of a phase: where results go, and its first-attempt and retry calls.
+
+    ``fetch`` is a worker's single attempt. On a transient failure it parks the
+    entity in ``retry_queue`` and returns; while the endpoint's circuit breaker
+    is open it parks the entity unsent, so no attempt is counted. ``fetch_once``
+    is the attempt the queue retries with. Both journal each result and store
+    it in ``results``.
+    """
 
-            url = None
+    def __init__(
+        self,
+        pipeline: "DiscoveryPipeline",
+        id_key: str,
+        endpoint_factory: Callable[[str], str],
+        label: str,
+        use_v2: bool = False,
+        paginate: bool = True,
+        results: Optional[MutableMapping[str, Any]] = None,
+    ):
+        self.pipeline = pipeline
+        self.id_key = id_key
+        self.endpoint_factory = endpoint_factory
+        self.label = label
+        self.use_v2 = use_v2
+        self.paginate = paginate
+        self.results: MutableMapping[str, Any] = results if results is not None else {}
+        self.retry_queue = pipeline._new_retry_queue()
+
+    @property
+    def template(self) -> str:
+        """``v1/team/{t}/members``-style template, as ``CallPlan`` and ``ProgressTracker.plan()`` name it."""
+        return f"{'v2' if self.use_v2 else 'v1'}/{endpoint_template(self.endpoint_factory('_'))}"
+
+    def prefill(self, entities: List[Dict]) -> List[Dict]:
+        """Fill results from ``--since`` / the journal; return entities still to fetch."""
+        return self.pipeline._prefill_results(
+            entities, self.id_key, self.endpoint_factory, self.label, self.use_v2, self.results
+        )
 
-        return merged if is_list_response else data
+    def fetch_once(self, entity: Dict) -> None:
+        entity_id = entity[self.id_key]
+        endpoint = self.endpoint_factory(entity_id)
+        # One-shot read: sent once, and not memoized by the client's SingleFlight.
+        with no_retries(), no_memo():
+            data = self.pipeline.client.get(endpoint, use_v2=self.use_v2, paginate=self.paginate)
+        self.pipeline._journal_fetch(endpoint, self.use_v2, entity_id, data)
+        # Stored by the worker so completed futures do not pin response bodies.
+        self.pipeline._record_entity_result(self.results, entity_id, data, self.label)
+
+    def fetch(self, entity: Dict) -> int:
+        """First attempt; return 1 when the entity has no identifier."""
+        entity_id = entity.get(self.id_key)
+        if not entity_id:
+            return self.pipeline._record_entity_result(self.results, entity_id, None, self.label)
+        breaker = self.pipeline.circuit_breaker
+        breaker_key = endpoint_template(self.endpoint_factory(entity_id))
+        if not breaker.allow(breaker_key):
+            self.retry_queue.requeue(breaker_key, entity)
+            return 0
+        try:
+            self.fetch_once(entity)
+        except TransientError:
+            breaker.record(breaker_key, ok=False)
+            self.retry_queue.defer(breaker_key, entity)
+            return 0
+        breaker.record(breaker_key, ok=True)
+        return 0
+
+    def drain(self, executor: Executor) -> None:
+        """Retry every parked entity on ``executor`` (see ``RetryQueue.drain``)."""
+        if not len(self.retry_queue):
+            return
+        log.info(f"  -> Retrying {len(self.retry_queue)} deferred {self.label} fetch(es)")
+        recovered = self.retry_queue.drain(self.fetch_once, executor)
+        log.info(f"  -> Recovered {recovered} deferred {self.label} fetch(es)")
 
 
 class DiscoveryPipeline:
@@ -180,26 +434,49 @@ class DiscoveryPipeline:
         output_dir: Path,
         reporter: Optional[SummaryReporter] = None,
         requested_team_slugs: Optional[List[str]] = None,
+        journal: Optional[FetchJournal] = None,
+        delta: Optional[DeltaBaseline] = None,
+        output_format: str = "json",
+        store: str = "json",
     ):
         self.client = client
         self.output_dir = output_dir
         self.inventory_counts: InventoryCounts = {}
         self.reporter = reporter or SummaryReporter(output_dir, client.org_slug, self.inventory_counts)
         self.requested_team_slugs = requested_team_slugs
+        self.journal = journal
+        self.delta = delta
+        self.output_format = output_format
+        self.store_mode = store
+        self._store: Optional[InventoryStore] = None
         self.scope_metadata: Optional[Dict[str, Any]] = None
+        self.scheduler_metrics: Optional[Dict[str, Any]] = None
+        self._entity_executor: Optional[ThreadPoolExecutor] = None
+        # Shared by every phase: a failing endpoint stays open across phases.
+        self.circuit_breaker = CircuitBreaker()
+        self.retry_stats: Dict[str, int] = {"deferred": 0, "retries": 0, "recovered": 0}
+        self._retry_stats_lock = threading.Lock()
+        self.progress = ProgressTracker(self._predicted_rate)
 
     def save_json(self, name: str, data: Any):
         self.output_dir.mkdir(parents=True, exist_ok=True)
         path = self.output_dir / f"{name}.json"
 
-        # Atomic writes prevent corrupted half-states
-        temp_path = path.with_suffix('.tmp')
-        temp_path.write_text(json.dumps(data, indent=2))
-        temp_path.replace(path)
+        # Atomic, streamed writes prevent corrupted half-states; --output-format
+        # applies to *_inventory files, metadata stays pretty-printed.
+        if self._store is not None and name.endswith("_inventory"):
+            self._store.save(name, data)
+            if self.store_mode == "sqlite":
+                # A JSON copy from an earlier run would shadow the store for readers.
+                path.unlink(missing_ok=True)
+                log.info(f"  -> Saved {len(data)} entries to {STORE_FILENAME}:{name}")
+                return
+        output_format = self.output_format if name.endswith("_inventory") else "json"
+        write_inventory(path, data, output_format)
 
         if isinstance(data, list):
             log.info(f"  -> Saved {len(data)} items to {path.name}")
-        elif isinstance(data, dict):
+        elif isinstance(data, Mapping):
             log.info(f"  -> Saved {len(data)} entities to {path.name}")
         else:
             log.info(f"  -> Saved to {path.name}")
@@ -242,37 +519,183 @@ class DiscoveryPipeline:
         label: str,
         use_v2: bool = False,
         paginate: bool = True,
-    ) -> Dict[str, Any]:
-        """Concurrent per-entity fetching controlled by thread-safe rate limiter."""
-        results = {}
+        sink: Optional[EntityShard] = None,
+    ) -> Mapping[str, Any]:
+        """Concurrent per-entity fetching controlled by thread-safe rate limiter.
+
+        Uses the run's shared worker pool when one is active, so fetches queued by
+        overlapping phases share the same workers and rate budget. With ``sink``,
+        each result is spilled to that on-disk shard as it arrives and the shard
+        is returned instead of an in-memory dict.
+
+        Workers send each request once. A transient failure (429, 5xx, transport)
+        parks the entity in a ``RetryQueue`` and the worker moves on; parked
+        entities are retried with jittered backoff after the first pass, and
+        endpoints whose circuit breaker is open are not called meanwhile.
+        """
+        endpoint = _EntityEndpoint(self, id_key, endpoint_factory, label, use_v2, paginate, sink)
         skipped = 0
+        entities_to_fetch = endpoint.prefill(entities)
+        self.progress.expect(len(entities_to_fetch), endpoint.template)
 
-        def fetch(entity):
+        executor, owns_executor = self._worker_pool()
+        try:
+            futures = [executor.submit(endpoint.fetch, e) for e in entities_to_fetch]
+            for future in as_completed(futures):
+                skipped += future.result()
+                self.progress.advance(label)
+            endpoint.drain(executor)
+        finally:
+            self._record_retry_stats(endpoint.retry_queue)
+            if owns_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        return self._finish_entity_results(entities, id_key, label, endpoint.results, skipped)
+
+    def _worker_pool(self) -> Tuple[Executor, bool]:
+        """The run's shared per-entity pool, or a private one (``True``: caller shuts it down)."""
+        if self._entity_executor is not None:
+            return self._entity_executor, False
+        return ThreadPoolExecutor(max_workers=self._pool_workers()), True
+
+    def _new_retry_queue(self) -> RetryQueue:
+        return RetryQueue(self.circuit_breaker)
+
+    def _record_retry_stats(self, retry_queue: RetryQueue) -> None:
+        with self._retry_stats_lock:
+            for key, value in retry_queue.stats().items():
+                self.retry_stats[key] += value
+
+    def _prefill_results(
+        self,
+        entities: List[Dict],
+        id_key: str,
+        endpoint_factory: Callable[[str], str],
+        label: str,
+        use_v2: bool,
+        results: MutableMapping[str, Any],
+    ) -> List[Dict]:
+        """Fill ``results`` without HTTP where possible; return entities still to fetch."""
+        remaining = self._carry_over_unchanged(entities, id_key, endpoint_factory, label, results)
+        return self._resume_from_journal(remaining, id_key, endpoint_factory, label, use_v2, results)
+
+    def _carry_over_unchanged(
+        self,
+        entities: List[Dict],
+        id_key: str,
+        endpoint_factory: Callable[[str], str],
+        label: str,
+        results: MutableMapping[str, Any],
+    ) -> List[Dict]:
+        """Reuse ``--since`` data for entities whose listing summary has not changed."""
+        if self.delta is None:
+            return entities
+        template = endpoint_factory("{}")
+        remaining: List[Dict] = []
+        for entity in entities:
             entity_id = entity.get(id_key)
-            if not entity_id:
-                return None, None
-            data = self.client.get(
-                endpoint_factory(entity_id), use_v2=use_v2, paginate=paginate
-            )
-            return entity_id, data
-
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {executor.submit(fetch, e): e for e in entities}
-            for i, future in enumerate(as_completed(futures), 1):
-                entity_id, data = future.result()
-                if entity_id:
-                    if data is not None:
-                        results[entity_id] = data
-                    else:
-                        log.debug(f"No data for {label} '{entity_id}'")
-                else:
-                    skipped += 1
-                if i % 25 == 0 or i == len(entities):
-                    log.info(f"  [{i}/{len(entities)}] {label} fetched")
+            if entity_id:
+                found, data = self.delta.carry_over(template, label, entity_id)
+                if found:
+                    self._record_entity_result(results, entity_id, data, label)
+                    continue
+            remaining.append(entity)
+        carried = len(entities) - len(remaining)
+        self.delta.record_endpoint(template, carried, len(remaining))
+        if carried:
+            log.info(f"  -> Carried over {carried} unchanged {label}(s) for {template} from --since inventory")
+        return remaining
+
+    def _resume_from_journal(
+        self,
+        entities: List[Dict],
+        id_key: str,
+        endpoint_factory: Callable[[str], str],
+        label: str,
+        use_v2: bool,
+        results: MutableMapping[str, Any],
+    ) -> List[Dict]:
+        """Fill ``results`` from the checkpoint journal; return entities still to fetch."""
+        if self.journal is None:
+            return entities
+        remaining: List[Dict] = []
+        reused = 0
+        for entity in entities:
+            entity_id = entity.get(id_key)
+            if entity_id:
+                found, data = self.journal.lookup(endpoint_factory(entity_id), use_v2)
+                if found:
+                    reused += 1
+                    self._record_entity_result(results, entity_id, data, label)
+                    continue
+            remaining.append(entity)
+        if reused:
+            log.info(f"  -> Reused {reused} {label} fetch(es) from checkpoint journal")
+        return remaining
+
+    def _journal_fetch(self, endpoint: str, use_v2: bool, entity_id: str, data: Any) -> None:
+        if self.journal is not None:
+            self.journal.record(endpoint, use_v2, entity_id, data)
+
+    def _record_entity_result(
+        self, results: MutableMapping[str, Any], entity_id: Optional[str], data: Any, label: str
+    ) -> int:
+        """Store one per-entity result; return 1 when the entity had no identifier."""
+        if not entity_id:
+            return 1
+        if data is not None:
+            results[entity_id] = data
+        else:
+            log.debug(f"No data for {label} '{entity_id}'")
+        return 0
+
+    def _fetch_workers(self) -> int:
+        """Per-entity requests in flight right now (the adaptive limit), for estimates."""
+        limit = self.client.concurrency_limit
+        return int(limit.limit) if limit is not None else PER_ENTITY_WORKERS
+
+    def _pool_workers(self) -> int:
+        """Per-entity worker threads: enough for the adaptive limit's ceiling."""
+        limit = self.client.concurrency_limit
+        return limit.max_limit if limit is not None else PER_ENTITY_WORKERS
+
+    def _rate_hz(self) -> float:
+        """Configured request rate of every API key together (0 when the limiter is disabled)."""
+        return self.client.credentials.rate_hz()
+
+    def _mean_latency(self) -> float:
+        totals = self.client.metrics.snapshot()["totals"]
+        if not totals["requests"]:
+            return DEFAULT_LATENCY_SECONDS
+        return totals["latency_seconds"] / totals["requests"]
 
+    def _predicted_rate(self) -> float:
+        return throughput(self._rate_hz(), self._mean_latency(), self._fetch_workers())
+
+    def _finish_entity_results(
+        self,
+        entities: List[Dict],
+        id_key: str,
+        label: str,
+        results: MutableMapping[str, Any],
+        skipped: int,
+    ) -> Mapping[str, Any]:
+        """Warn about unidentified entities and order results like the input list.
+
+        Completion order varies between runs and engines; input order keeps the
+        saved inventory byte-for-byte reproducible.
+        """
         if skipped:
             log.warning(f"  -> Skipped {skipped} {label}s with no '{id_key}' identifier.")
-        return results
+        if isinstance(results, EntityShard):
+            results.reorder(entity.get(id_key) for entity in entities)
+            return results
+        ordered: Dict[str, Any] = {}
+        for entity in entities:
+            entity_id = entity.get(id_key)
+            if entity_id in results and entity_id not in ordered:
+                ordered[entity_id] = results[entity_id]
+        return ordered
 
     def get_scheduled_overrides(self) -> Dict[str, List[Any]]:
         log.info("Fetching Scheduled Overrides...")
@@ -311,32 +734,186 @@ class DiscoveryPipeline:
             log.info(f"Team scope: {', '.join(self.requested_team_slugs)}")
         log.info("=" * 60)
 
+        graph = TaskGraph()
         if self.requested_team_slugs:
-            self._run_scoped()
+            self._add_scoped_tasks(graph)
         else:
-            users, teams = self._process_global_entities()
-            self._process_user_scoped_entities(users)
-            policies_list = self._process_team_scoped_entities(teams)
-            if policies_list is not None:
-                self._process_policy_details(policies_list)
+            self._add_full_tasks(graph)
+        self._open_store()
+        try:
+            self._run_graph(graph)
+        finally:
+            self._close_store()
+        # Each phase discards its own shard; drop the directory once empty.
+        shutil.rmtree(self.output_dir / SHARD_DIR, ignore_errors=True)
+        self._publish_store()
 
         elapsed = time.monotonic() - start_time
         self._finalize_run(elapsed)
+        if self.journal is not None:
+            # Inventory is complete on disk; the checkpoint is no longer needed.
+            self.journal.discard()
         return self.inventory_counts
 
-    def _fetch_team_members(self, teams: List[Any]) -> Dict[str, Any]:
+    def plan(self) -> Dict[str, Any]:
+        """Count the requests a run would send and estimate its wall time.
+
+        A full-export plan fetches only the global listings. A team-scoped plan
+        also runs the policy-closure and team fetches that decide which teams
+        and users are in scope; the run repeats those, so they are counted too.
+        Nothing is reused from ``--resume``, ``--since`` or a response cache, so
+        runs using them send fewer calls than planned.
+        """
+        start_time = time.monotonic()
+        log.info("=" * 60)
+        log.info(f"Splunk On-Call Discovery plan | Org: {self.client.org_slug}")
+        if self.requested_team_slugs:
+            log.info(f"Team scope: {', '.join(self.requested_team_slugs)}")
+        log.info("=" * 60)
+
+        plan = CallPlan()
+        if self.requested_team_slugs:
+            graph = TaskGraph()
+            self._add_scoped_closure_tasks(graph)
+            r = self._run_graph(graph)
+            teams = filter_teams(r["all_teams"], r["team_slugs"])
+            users = r["scoped_users"]
+            plan.add_per_entity("v2/team/{t}/oncall/schedule", len(self._ids(teams, "slug")))
+        else:
+            users = self.extract_list(self.client.get("user", required=True), "users")
+            all_teams = self.extract_list(self.client.get("team", required=True), "teams")
+            for endpoint in ("org/routing-keys", "alertRules", "webhooks"):
+                self.client.get(endpoint, required=True)
+            teams = self._ids(all_teams, "slug")
+            for template in (
+                "v1/team/{t}/members",
+                "v1/team/{t}/admins",
+                "v2/team/{t}/rotations",
+                "v2/team/{t}/oncall/schedule",
+            ):
+                plan.add_per_entity(template, len(teams))
+            if teams:
+                self.client.get("overrides", required=True)
+                policy_slugs = self._policy_slugs(self._fetch_policies_list())
+                plan.add_per_entity("v1/policies/{p}", len(policy_slugs))
+        usernames = self._ids(users, "username")
+        plan.add_per_entity("v1/user/{u}/contact-methods", len(usernames))
+        plan.add_per_entity("v1/user/{u}/policies", len(usernames))
+        # Requests the plan itself sent are ones the run will send again.
+        for name, row in self.client.metrics.snapshot()["endpoints"].items():
+            template = name.split(" ", 1)[1]
+            if "{" in template:
+                plan.add_per_entity(template, row["requests"])
+            else:
+                plan.add_listing(template, row["requests"])
+
+        estimate = plan.estimate(self._rate_hz(), self._mean_latency(), self._fetch_workers())
+        document = {
+            "org_slug": self.client.org_slug,
+            "planned_at": datetime.now(timezone.utc).isoformat(),
+            "mode": "teams" if self.requested_team_slugs else "full",
+            **plan.snapshot(),
+            "estimate": estimate,
+            "plan_seconds": round(time.monotonic() - start_time, 1),
+        }
+        if self.requested_team_slugs:
+            document["scope"] = {"teams": sorted(self.requested_team_slugs), "expanded_teams": sorted(r["team_slugs"])}
+        self._log_plan(plan, estimate)
+        self.save_json("discovery_plan", document)
+        return document
+
+    @staticmethod
+    def _ids(entities: List[Any], id_key: str) -> List[Any]:
+        """Entities a per-entity phase would fetch (those carrying ``id_key``)."""
+        return [entity for entity in entities if isinstance(entity, dict) and entity.get(id_key)]
+
+    def _log_plan(self, plan: CallPlan, estimate: Dict[str, Any]) -> None:
+        width = max(len(template) for template in [*plan.listing, *plan.per_entity, ""])
+        for template, calls in sorted(plan.listing.items()):
+            log.info(f"  {template:<{width}}  {calls:>7,}  listing")
+        for template, calls in sorted(plan.per_entity.items()):
+            log.info(f"  {template:<{width}}  {calls:>7,}")
+        log.info(
+            f"Planned calls: {plan.total_calls:,} ({plan.listing_calls:,} listing, "
+            f"{plan.per_entity_calls:,} per-entity)"
+        )
+        rate = f"{estimate['rate_hz']:g} req/s limit" if estimate["rate_hz"] else "no rate limit"
+        log.info(
+            f"Estimated discovery time: ~{format_duration(estimate['estimated_seconds'])} "
+            f"({rate}, {estimate['latency_seconds']:.2f}s measured latency, {estimate['workers']} workers "
+            f"-> {estimate['throughput_per_second']:g} req/s)"
+        )
+
+    def _store_paths(self) -> Tuple[Path, Path]:
+        path = self.output_dir / STORE_FILENAME
+        return path, path.with_name(path.name + ".tmp")
+
+    def _open_store(self) -> None:
+        path, temp_path = self._store_paths()
+        if self.store_mode == "json":
+            # A store from an earlier --store run would no longer match the JSON files.
+            path.unlink(missing_ok=True)
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        temp_path.unlink(missing_ok=True)
+        self._store = InventoryStore(temp_path)
+
+    def _close_store(self) -> None:
+        if self._store is not None:
+            self._store.close()
+
+    def _publish_store(self) -> None:
+        """Swap the freshly built store into place (readers never see a partial one)."""
+        if self._store is None:
+            return
+        path, temp_path = self._store_paths()
+        temp_path.replace(path)
+        self._store = None
+        log.info(f"  -> Inventory store written to {path.name}")
+
+    def _run_graph(self, graph: TaskGraph) -> Dict[str, Any]:
+        """Run phase tasks against one shared per-entity worker pool and rate budget."""
+        executor = ThreadPoolExecutor(max_workers=self._pool_workers(), thread_name_prefix="fetch")
+        self._entity_executor = executor
+        try:
+            results = graph.run()
+        finally:
+            self._entity_executor = None
+            executor.shutdown(wait=True, cancel_futures=True)
+        self.scheduler_metrics = graph.timing()
+        log.info(
+            "Phase scheduler: %.1fs wall vs %.1fs of back-to-back phase time (saved ~%.1fs).",
+            self.scheduler_metrics["wall_seconds"],
+            self.scheduler_metrics["sequential_seconds"],
+            self.scheduler_metrics["saved_seconds"],
+        )
+        return results
+
+    def _fetch_team_members(
+        self, teams: List[Any], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
+        if not teams:
+            return {}
         log.info("Fetching Team Members...")
         return self.fetch_per_entity_concurrent(
-            teams, "slug", lambda t: f"team/{t}/members", "team"
+            teams, "slug", lambda t: f"team/{t}/members", "team", sink=sink
         )
 
-    def _fetch_team_admins(self, teams: List[Any]) -> Dict[str, Any]:
+    def _fetch_team_admins(
+        self, teams: List[Any], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
+        if not teams:
+            return {}
         log.info("Fetching Team Admins...")
         return self.fetch_per_entity_concurrent(
-            teams, "slug", lambda t: f"team/{t}/admins", "team"
+            teams, "slug", lambda t: f"team/{t}/admins", "team", sink=sink
         )
 
-    def _fetch_rotations(self, teams: List[Any]) -> Dict[str, Any]:
+    def _fetch_rotations(
+        self, teams: List[Any], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
+        if not teams:
+            return {}
         log.info("Fetching Team Rotation Definitions...")
         return self.fetch_per_entity_concurrent(
             teams,
@@ -345,20 +922,33 @@ class DiscoveryPipeline:
             "team",
             use_v2=True,
             paginate=False,
+            sink=sink,
         )
 
-    def _fetch_schedules(self, teams: List[Any]) -> Dict[str, Any]:
+    def _fetch_schedules(
+        self, teams: List[Any], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
+        if not teams:
+            return {}
         log.info("Fetching On-Call Schedules v2...")
         return self.fetch_per_entity_concurrent(
-            teams, "slug", lambda t: f"team/{t}/oncall/schedule", "team", use_v2=True
+            teams, "slug", lambda t: f"team/{t}/oncall/schedule", "team", use_v2=True, sink=sink
         )
 
     def _fetch_policies_list(self) -> List[Any]:
         log.info("Fetching Escalation Policies summaries...")
         policies_raw = self.client.get("policies", required=True)
-        return self.extract_list(policies_raw, "policies")
+        return self._observe_listing("policy", self.extract_list(policies_raw, "policies"))
+
+    def _observe_listing(self, kind: str, items: List[Any]) -> List[Any]:
+        """Hand a listing to the ``--since`` baseline for change detection; return it."""
+        if self.delta is not None:
+            self.delta.observe_listing(kind, items)
+        return items
 
-    def _fetch_policy_details(self, policy_slugs: Set[str]) -> Dict[str, Any]:
+    def _fetch_policy_details(
+        self, policy_slugs: Set[str], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
         if not policy_slugs:
             return {}
         slugs_sorted = sorted(policy_slugs)
@@ -368,97 +958,236 @@ class DiscoveryPipeline:
             "slug",
             lambda slug: f"policies/{slug}",
             "policy",
+            sink=sink,
         )
 
-    def _fetch_user_contact_methods(self, users: List[Any]) -> Dict[str, Any]:
+    def _fetch_user_contact_methods(
+        self, users: List[Any], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
+        if not users:
+            return {}
         log.info("Fetching User Contact Methods...")
         return self.fetch_per_entity_concurrent(
-            users, "username", lambda u: f"user/{u}/contact-methods", "user"
+            users, "username", lambda u: f"user/{u}/contact-methods", "user", sink=sink
         )
 
-    def _fetch_user_paging_policies(self, users: List[Any]) -> Dict[str, Any]:
+    def _fetch_user_paging_policies(
+        self, users: List[Any], sink: Optional[EntityShard] = None
+    ) -> Mapping[str, Any]:
+        if not users:
+            return {}
         log.info("Fetching User Paging Policies...")
         return self.fetch_per_entity_concurrent(
-            users, "username", lambda u: f"user/{u}/policies", "user"
+            users, "username", lambda u: f"user/{u}/policies", "user", sink=sink
         )
 
-    def _run_scoped(self) -> None:
-        requested = self.requested_team_slugs or []
-        requested_set = set(requested)
+    def _add_scoped_tasks(self, graph: TaskGraph) -> None:
+        """Team-scoped export: per-team and per-policy fetches overlap; the policy
+        closure and team fetches gate the scoped user set."""
+        self._add_scoped_closure_tasks(graph)
+        graph.add(
+            "schedules",
+            lambda r: self._fetch_schedules(filter_teams(r["all_teams"], r["team_slugs"])),
+            deps=["all_teams", "team_slugs"],
+        )
+        graph.add(
+            "contact_methods",
+            lambda r: self._fetch_user_contact_methods(r["scoped_users"]),
+            deps=["scoped_users"],
+        )
+        graph.add(
+            "paging_policies",
+            lambda r: self._fetch_user_paging_policies(r["scoped_users"]),
+            deps=["scoped_users"],
+        )
+        graph.add(
+            "save",
+            self._save_scoped,
+            deps=[
+                "all_teams", "all_routing_keys", "all_rules", "policies_list", "overrides",
+                "policy_closure", "team_slugs", "schedules", "scoped_users",
+                "seed_members", "seed_admins", "seed_rotations",
+                "contact_methods", "paging_policies",
+            ],
+        )
 
-        log.info("[Phase 1/4] Fetching global entities...")
-        all_users = self.extract_list(self.client.get("user", required=True), "users")
-        all_teams = self.extract_list(self.client.get("team", required=True), "teams")
-        all_routing_keys = self.extract_list(
-            self.client.get("org/routing-keys", required=True), "routingKeys"
+    def _add_scoped_closure_tasks(self, graph: TaskGraph) -> None:
+        """Listings plus the fetches that decide which teams, policies and users are in scope."""
+        graph.add(
+            "all_users",
+            lambda _: self._observe_listing("user", self.extract_list(self.client.get("user", required=True), "users")),
+        )
+        graph.add(
+            "all_teams",
+            lambda _: self._observe_listing("team", self.extract_list(self.client.get("team", required=True), "teams")),
+        )
+        graph.add(
+            "all_routing_keys",
+            lambda _: self.extract_list(self.client.get("org/routing-keys", required=True), "routingKeys"),
+        )
+        graph.add("all_rules", lambda _: self.extract_list(self.client.get("alertRules", required=True), "rules"))
+        graph.add("policies_list", lambda _: self._fetch_policies_list())
+        graph.add("overrides", lambda _: self.get_scheduled_overrides())
+
+        graph.add("seed_teams", lambda r: self._scoped_seed_teams(r["all_teams"]), deps=["all_teams"])
+        graph.add("seed_members", lambda r: self._fetch_team_members(r["seed_teams"]), deps=["seed_teams"])
+        graph.add("seed_admins", lambda r: self._fetch_team_admins(r["seed_teams"]), deps=["seed_teams"])
+        graph.add("seed_rotations", lambda r: self._fetch_rotations(r["seed_teams"]), deps=["seed_teams"])
+
+        graph.add(
+            "policy_closure",
+            lambda r: self._scoped_policy_closure(r["policies_list"], r["all_teams"]),
+            deps=["policies_list", "all_teams", "seed_teams"],
+        )
+        graph.add("team_slugs", lambda r: r["policy_closure"]["teams"], deps=["policy_closure"])
+        graph.add(
+            "scoped_users",
+            self._scoped_users,
+            deps=["all_users", "team_slugs", "policy_closure", "seed_members", "seed_admins", "seed_rotations"],
         )
-        all_rules = self.extract_list(self.client.get("alertRules", required=True), "rules")
-        policies_list = self._fetch_policies_list()
 
+    def _scoped_seed_teams(self, all_teams: List[Any]) -> List[Any]:
+        requested = self.requested_team_slugs or []
         unknown = unknown_team_slugs(requested, all_teams)
         if unknown:
             log.critical(f"Unknown team slug(s): {', '.join(unknown)}")
             sys.exit(1)
+        teams = filter_teams(all_teams, set(requested))
+        log.info(f"Fetching team-scoped entities ({len(teams)} requested teams)...")
+        return teams
+
+    def _scoped_policy_closure(self, policies_list: List[Any], all_teams: List[Any]) -> Dict[str, Any]:
+        """Fetch the requested teams' escalation-policy closure without a barrier per hop.
+
+        Seed policies are the requested teams' own. Whenever a policy's details
+        land, its not-yet-seen ``policy_routing`` targets go straight onto the
+        shared worker pool. A target owned by a team outside the scope starts that
+        team's member, admin and rotation fetches right away. Parked retries are
+        drained once nothing else is in flight, and the loop stops when no fetch
+        is pending or parked.
+
+        Returns ``details``, ``policies`` (the closure), ``teams`` (requested plus
+        added), and ``members`` / ``admins`` / ``rotations`` of the added teams.
+        """
+        requested = set(self.requested_team_slugs or [])
+        policy = _EntityEndpoint(self, "slug", lambda slug: f"policies/{slug}", "policy")
+        team_endpoints = [
+            _EntityEndpoint(self, "slug", lambda t: f"team/{t}/members", "team"),
+            _EntityEndpoint(self, "slug", lambda t: f"team/{t}/admins", "team"),
+            _EntityEndpoint(self, "slug", lambda t: f"team/{t}/rotations", "team", use_v2=True, paginate=False),
+        ]
+        endpoints = [policy, *team_endpoints]
+        expanded = seed_policy_slugs(policies_list, requested)
+        team_slugs = set(requested)
+        expanded_from: Set[str] = set()
+        pending: Dict[Future, _EntityEndpoint] = {}
+        skipped = 0
 
-        team_slugs = set(requested_set)
-        teams_for_fetch = filter_teams(all_teams, team_slugs)
-
-        log.info(f"\n[Phase 3/4] Fetching team-scoped entities ({len(teams_for_fetch)} teams)...")
-        team_members = self._fetch_team_members(teams_for_fetch)
-        team_admins = self._fetch_team_admins(teams_for_fetch)
-        rotations = self._fetch_rotations(teams_for_fetch)
-
-        seed_slugs = seed_policy_slugs(policies_list, team_slugs)
-        policy_details = self._fetch_policy_details(seed_slugs)
-        expanded_policies = expand_policy_closure(policy_details, seed_slugs)
-
-        missing_details = expanded_policies - set(policy_details.keys())
-        if missing_details:
-            policy_details.update(self._fetch_policy_details(missing_details))
-            expanded_policies = expand_policy_closure(policy_details, seed_slugs)
-
-        expanded_teams = team_slugs_for_policies(policies_list, expanded_policies)
-        added_teams = expanded_teams - team_slugs
-        if added_teams:
-            log.info(f"Policy closure added team slug(s): {', '.join(sorted(added_teams))}")
-            extra_teams = filter_teams(all_teams, added_teams)
-            team_members.update(self._fetch_team_members(extra_teams))
-            team_admins.update(self._fetch_team_admins(extra_teams))
-            rotations.update(self._fetch_rotations(extra_teams))
-            team_slugs |= added_teams
-
-        teams_for_fetch = filter_teams(all_teams, team_slugs)
-        schedules = self._fetch_schedules(teams_for_fetch)
-        overrides = filter_overrides(self.get_scheduled_overrides(), team_slugs)
+        executor, owns_executor = self._worker_pool()
+
+        def submit(endpoint: _EntityEndpoint, entities: List[Dict]) -> None:
+            to_fetch = endpoint.prefill(entities)
+            self.progress.expect(len(to_fetch), endpoint.template)
+            for entity in to_fetch:
+                pending[executor.submit(endpoint.fetch, entity)] = endpoint
+
+        def expand_landed() -> None:
+            """Queue whatever the policies fetched so far (or prefilled) route to, until nothing is new."""
+            while True:
+                landed = [slug for slug in list(policy.results) if slug not in expanded_from]
+                if not landed:
+                    return
+                new_slugs: Set[str] = set()
+                for slug in landed:
+                    expanded_from.add(slug)
+                    new_slugs |= policy_routing_targets(policy.results[slug]) - expanded
+                expanded.update(new_slugs)
+                submit(policy, [{"slug": slug} for slug in sorted(new_slugs)])
+                new_teams = team_slugs_for_policies(policies_list, new_slugs) - team_slugs
+                if new_teams:
+                    log.info(f"Policy closure added team slug(s): {', '.join(sorted(new_teams))}")
+                    team_slugs.update(new_teams)
+                    for endpoint in team_endpoints:
+                        submit(endpoint, filter_teams(all_teams, new_teams))
+
+        log.info(f"Fetching policy closure of {len(expanded)} seed policies...")
+        try:
+            submit(policy, [{"slug": slug} for slug in sorted(expanded)])
+            while True:
+                expand_landed()
+                if pending:
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        endpoint = pending.pop(future)
+                        skipped += future.result()
+                        self.progress.advance(endpoint.label)
+                    continue
+                parked = [endpoint for endpoint in endpoints if len(endpoint.retry_queue)]
+                if not parked:
+                    break
+                for endpoint in parked:
+                    endpoint.drain(executor)
+        finally:
+            for endpoint in endpoints:
+                self._record_retry_stats(endpoint.retry_queue)
+            if owns_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
 
+        if skipped:
+            log.warning(f"  -> Skipped {skipped} policy/team fetch(es) with no 'slug' identifier.")
+        added_teams = filter_teams(all_teams, team_slugs - requested)
+        members, admins, rotations = (
+            self._finish_entity_results(added_teams, "slug", "team", endpoint.results, 0)
+            for endpoint in team_endpoints
+        )
+        return {
+            "details": {slug: policy.results[slug] for slug in sorted(policy.results)},
+            "policies": expanded,
+            "teams": team_slugs,
+            "members": members,
+            "admins": admins,
+            "rotations": rotations,
+        }
+
+    def _scoped_users(self, r: Dict[str, Any]) -> List[Any]:
+        team_slugs = r["team_slugs"]
+        closure = r["policy_closure"]
         usernames = collect_usernames(
-            team_members,
-            rotations,
+            {**r["seed_members"], **closure["members"]},
+            {**r["seed_rotations"], **closure["rotations"]},
             team_slugs,
-            admins_by_team=team_admins,
-            policy_details=policy_details,
-            policy_slugs=expanded_policies,
+            admins_by_team={**r["seed_admins"], **closure["admins"]},
+            policy_details=closure["details"],
+            policy_slugs=closure["policies"],
         )
-        users = filter_users(all_users, usernames)
+        users = filter_users(r["all_users"], usernames)
         log.info(f"Scoped user set: {len(users)} user(s) from {len(team_slugs)} team(s)")
-
-        filtered_routing_keys = filter_routing_keys(all_routing_keys, expanded_policies)
-        filtered_rules = filter_alert_rules(all_rules, routing_key_names(filtered_routing_keys))
-
-        grouped_policies = group_policies_by_team(policies_list, team_slugs, expanded_policies)
+        if not users:
+            log.warning("No users in scope — skipping user-scoped entities.")
+        return users
+
+    def _save_scoped(self, r: Dict[str, Any]) -> None:
+        requested_set = set(self.requested_team_slugs or [])
+        team_slugs = r["team_slugs"]
+        closure = r["policy_closure"]
+        policy_details, expanded_policies = closure["details"], closure["policies"]
+        users = r["scoped_users"]
+        team_members = {**r["seed_members"], **closure["members"]}
+        team_admins = {**r["seed_admins"], **closure["admins"]}
+        rotations = {**r["seed_rotations"], **closure["rotations"]}
+        schedules = r["schedules"]
+        contact_methods = r["contact_methods"]
+        paging_policies = r["paging_policies"]
+        overrides = filter_overrides(r["overrides"], team_slugs)
+
+        filtered_routing_keys = filter_routing_keys(r["all_routing_keys"], expanded_policies)
+        filtered_rules = filter_alert_rules(r["all_rules"], routing_key_names(filtered_routing_keys))
+
+        grouped_policies = group_policies_by_team(r["policies_list"], team_slugs, expanded_policies)
         policy_details = filter_policy_details(policy_details, expanded_policies)
-        teams = filter_teams(all_teams, team_slugs)
-
-        log.info(f"\n[Phase 2/4] Fetching user-scoped entities ({len(users)} users)...")
-        if users:
-            contact_methods = self._fetch_user_contact_methods(users)
-            paging_policies = self._fetch_user_paging_policies(users)
-        else:
-            log.warning("[Phase 2/4] No users in scope — skipping user-scoped entities.")
-            contact_methods = {}
-            paging_policies = {}
+        teams = filter_teams(r["all_teams"], team_slugs)
 
-        log.info("\n[Phase 4/4] Scoped export complete — saving filtered inventory...")
+        log.info("Scoped export complete — saving filtered inventory...")
 
         self.save_json("users_inventory", users)
         self.inventory_counts["users_inventory"] = len(users)
@@ -506,76 +1235,110 @@ class DiscoveryPipeline:
             len(users),
         )
 
-    def _process_global_entities(self) -> Tuple[List[Any], List[Any]]:
-        log.info("[Phase 1/4] Fetching global entities...")
-        users = self.extract_list(self.client.get("user", required=True), "users")
-        self.save_json("users_inventory", users)
-        self.inventory_counts["users_inventory"] = len(users)
-
-        teams = self.extract_list(self.client.get("team", required=True), "teams")
-        self.save_json("teams_inventory", teams)
-        self.inventory_counts["teams_inventory"] = len(teams)
-
-        routing_keys = self.extract_list(
-            self.client.get("org/routing-keys", required=True), "routingKeys"
+    def _add_full_tasks(self, graph: TaskGraph) -> None:
+        """Full-org export: per-user and per-team phases start as soon as their listing lands."""
+        self.inventory_counts["integrations_inventory"] = 0
+        graph.add(
+            "users",
+            lambda _: self._plan_phases(
+                self._observe_listing("user", self._export_listing("users_inventory", "user", "users")),
+                "username",
+                "v1/user/{u}/contact-methods",
+                "v1/user/{u}/policies",
+            ),
+        )
+        graph.add(
+            "teams",
+            lambda _: self._plan_phases(
+                self._observe_listing("team", self._export_listing("teams_inventory", "team", "teams")),
+                "slug",
+                "v1/team/{t}/members",
+                "v1/team/{t}/admins",
+                "v2/team/{t}/rotations",
+                "v2/team/{t}/oncall/schedule",
+            ),
+        )
+        graph.add(
+            "routing_keys",
+            lambda _: self._export_listing("routing_keys_inventory", "org/routing-keys", "routingKeys"),
+        )
+        graph.add("alert_rules", lambda _: self._export_alert_rules())
+        graph.add(
+            "webhooks",
+            lambda _: self._export_listing("outbound_webhooks_inventory", "webhooks", "webhooks"),
         )
-        self.save_json("routing_keys_inventory", routing_keys)
-        self.inventory_counts["routing_keys_inventory"] = len(routing_keys)
 
-        rules_raw = self.client.get("alertRules", required=True)
-        rules_list = self.extract_list(rules_raw, "rules")
+        for name, fetch in (
+            ("contact_methods_inventory", self._fetch_user_contact_methods),
+            ("paging_policies_inventory", self._fetch_user_paging_policies),
+        ):
+            graph.add(
+                name,
+                lambda r, name=name, fetch=fetch: self._export_per_entity(name, fetch, r["users"], "users"),
+                deps=["users"],
+            )
+        for name, fetch in (
+            ("team_members_inventory", self._fetch_team_members),
+            ("team_admins_inventory", self._fetch_team_admins),
+            ("rotation_definitions_inventory", self._fetch_rotations),
+            ("schedules_inventory", self._fetch_schedules),
+        ):
+            graph.add(
+                name,
+                lambda r, name=name, fetch=fetch: self._export_per_entity(name, fetch, r["teams"], "teams"),
+                deps=["teams"],
+            )
+        graph.add("policies", lambda r: self._export_policies(r["teams"]), deps=["teams"])
+        graph.add("overrides", lambda r: self._export_overrides(r["teams"]), deps=["teams"])
+        graph.add("policy_details", lambda r: self._export_policy_details(r["policies"]), deps=["policies"])
+
+    def _plan_phases(self, entities: List[Any], id_key: str, *templates: str) -> List[Any]:
+        """Tell the progress line what the phases sized by this listing will fetch; return the listing."""
+        calls = len(self._ids(entities, id_key))
+        for template in templates:
+            self.progress.plan(template, calls)
+        return entities
+
+    def _export_listing(self, name: str, endpoint: str, key: str) -> List[Any]:
+        items = self.extract_list(self.client.get(endpoint, required=True), key)
+        self.save_json(name, items)
+        self.inventory_counts[name] = len(items)
+        return items
+
+    def _export_alert_rules(self) -> List[Any]:
+        rules_list = self.extract_list(self.client.get("alertRules", required=True), "rules")
         rules_list.sort(key=lambda x: x.get("rank", 0))
         self.save_json("alert_rules_inventory", rules_list)
         self.inventory_counts["alert_rules_inventory"] = len(rules_list)
+        return rules_list
 
-        webhooks = self.extract_list(self.client.get("webhooks", required=True), "webhooks")
-        self.save_json("outbound_webhooks_inventory", webhooks)
-        self.inventory_counts["outbound_webhooks_inventory"] = len(webhooks)
-
-        self.inventory_counts["integrations_inventory"] = 0
-        return users, teams
-
-    def _process_user_scoped_entities(self, users: List[Any]) -> None:
-        if users:
-            log.info(f"\n[Phase 2/4] Fetching user-scoped entities ({len(users)} users)...")
-            contact_methods = self._fetch_user_contact_methods(users)
-            self.save_json("contact_methods_inventory", contact_methods)
-            self.inventory_counts["contact_methods_inventory"] = len(contact_methods)
-
-            paging_policies = self._fetch_user_paging_policies(users)
-            self.save_json("paging_policies_inventory", paging_policies)
-            self.inventory_counts["paging_policies_inventory"] = len(paging_policies)
+    def _export_per_entity(
+        self,
+        name: str,
+        fetch: Callable[..., Mapping[str, Any]],
+        entities: List[Any],
+        kind: str,
+    ) -> None:
+        if not entities:
+            log.warning(f"No {kind} found — skipping {name}.")
+            self.inventory_counts[name] = 0
             return
+        shard = self._open_shard(name)
+        try:
+            data = fetch(entities, sink=shard)
+            self.save_json(name, data)
+            self.inventory_counts[name] = len(data)
+        finally:
+            shard.discard()
 
-        log.warning("[Phase 2/4] No users found — skipping user-scoped entities.")
-        self.inventory_counts["contact_methods_inventory"] = 0
-        self.inventory_counts["paging_policies_inventory"] = 0
+    def _open_shard(self, name: str) -> EntityShard:
+        """On-disk shard that per-entity results stream into until ``name`` is saved."""
+        return EntityShard(self.output_dir / SHARD_DIR / f"{name}.ndjson")
 
-    def _process_team_scoped_entities(self, teams: List[Any]) -> Optional[List[Any]]:
+    def _export_policies(self, teams: List[Any]) -> Optional[List[Any]]:
         if not teams:
-            log.warning("[Phase 3/4] No teams found — skipping team-scoped entities.")
-            self.inventory_counts["team_members_inventory"] = 0
-            self.inventory_counts["team_admins_inventory"] = 0
-            self.inventory_counts["rotation_definitions_inventory"] = 0
             self.inventory_counts["escalation_policies_inventory"] = 0
-            self.inventory_counts["schedules_inventory"] = 0
-            self.inventory_counts["scheduled_overrides_inventory"] = 0
-            self.inventory_counts["escalation_policy_details_inventory"] = 0
             return None
-
-        log.info(f"\n[Phase 3/4] Fetching team-scoped entities ({len(teams)} teams)...")
-        team_members = self._fetch_team_members(teams)
-        self.save_json("team_members_inventory", team_members)
-        self.inventory_counts["team_members_inventory"] = len(team_members)
-
-        team_admins = self._fetch_team_admins(teams)
-        self.save_json("team_admins_inventory", team_admins)
-        self.inventory_counts["team_admins_inventory"] = len(team_admins)
-
-        rotations = self._fetch_rotations(teams)
-        self.save_json("rotation_definitions_inventory", rotations)
-        self.inventory_counts["rotation_definitions_inventory"] = len(rotations)
-
         policies_list = self._fetch_policies_list()
 
         grouped_policies = {}
@@ -586,28 +1349,44 @@ class DiscoveryPipeline:
 
         self.save_json("escalation_policies_inventory", grouped_policies)
         self.inventory_counts["escalation_policies_inventory"] = len(grouped_policies)
+        self.progress.plan("v1/policies/{p}", len(self._policy_slugs(policies_list)))
+        return policies_list
 
-        schedules = self._fetch_schedules(teams)
-        self.save_json("schedules_inventory", schedules)
-        self.inventory_counts["schedules_inventory"] = len(schedules)
-
+    def _export_overrides(self, teams: List[Any]) -> None:
+        if not teams:
+            self.inventory_counts["scheduled_overrides_inventory"] = 0
+            return
         overrides = self.get_scheduled_overrides()
         self.save_json("scheduled_overrides_inventory", overrides)
         self.inventory_counts["scheduled_overrides_inventory"] = len(overrides)
-        return policies_list
 
-    def _process_policy_details(self, policies_list: List[Any]) -> None:
-        log.info("\n[Phase 4/4] Fetching escalation policy details...")
-        unique_slugs = {
+    @staticmethod
+    def _policy_slugs(policies_list: List[Any]) -> Set[str]:
+        return {
             policy.get("policy", {}).get("slug")
             for policy in policies_list
             if policy.get("policy", {}).get("slug")
         }
-        policy_details = self._fetch_policy_details(unique_slugs)
-        self.save_json("escalation_policy_details_inventory", policy_details)
-        self.inventory_counts["escalation_policy_details_inventory"] = len(policy_details)
+
+    def _export_policy_details(self, policies_list: Optional[List[Any]]) -> None:
+        if policies_list is None:
+            self.inventory_counts["escalation_policy_details_inventory"] = 0
+            return
+        unique_slugs = self._policy_slugs(policies_list)
+        shard = self._open_shard("escalation_policy_details_inventory")
+        try:
+            policy_details = self._fetch_policy_details(unique_slugs, sink=shard)
+            self.save_json("escalation_policy_details_inventory", policy_details)
+            self.inventory_counts["escalation_policy_details_inventory"] = len(policy_details)
+        finally:
+            shard.discard()
 
     def _finalize_run(self, elapsed: float) -> None:
+        if self.delta is not None:
+            self.save_json("delta_manifest", self.delta.manifest())
+        else:
+            # A manifest left by an earlier delta run would describe the wrong export.
+            (self.output_dir / "delta_manifest.json").unlink(missing_ok=True)
         self.save_metadata(elapsed)
         self.reporter.write_summary(elapsed)
 
@@ -626,7 +1405,7 @@ class DiscoveryPipeline:
             "exported_at": datetime.now(timezone.utc).isoformat(),
             "api_version": "v1/v2",
             "elapsed_seconds": round(elapsed_seconds, 1),
-            "inventory_counts": self.inventory_counts,
+            "inventory_counts": dict(sorted(self.inventory_counts.items())),
             "files_written": files_written,
             "manual_capture_required": ["integrations", "user_permissions", "sso_settings"],
             "notes": {
@@ -636,6 +1415,28 @@ class DiscoveryPipeline:
                 ),
             },
         }
+        if self.store_mode != "json":
+            metadata["store"] = {"mode": self.store_mode, "path": STORE_FILENAME}
+        metadata["request_metrics"] = self.client.request_metrics()
+        if self.scheduler_metrics:
+            metadata["scheduler"] = self.scheduler_metrics
+        if self.retry_stats["deferred"]:
+            metadata["retry_queue"] = {
+                **self.retry_stats,
+                "breaker_trips": self.circuit_breaker.trips,
+            }
+        if self.client.response_cache is not None:
+            metadata["response_cache"] = self.client.response_cache.stats()
+        if self.delta is not None:
+            manifest = self.delta.manifest()
+            metadata["delta"] = {
+                "since": manifest["since"],
+                "summary": manifest["summary"],
+                "endpoints": manifest["endpoints"],
+                "manifest": "delta_manifest.json",
+            }
+        if self.journal is not None and self.journal.reused:
+            metadata["resumed_fetches"] = self.journal.reused
         if self.scope_metadata:
             metadata["scope"] = self.scope_metadata
             metadata["notes"]["scoped_export"] = (
@@ -645,6 +1446,159 @@ class DiscoveryPipeline:
         self.save_json("discovery_metadata", metadata)
 
 
+class _LoopExecutor(Executor):
+    """Runs coroutine functions on an event loop owned by another thread (for ``RetryQueue.drain``)."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return asyncio.run_coroutine_threadsafe(fn(*args, **kwargs), self.loop)
+
+
+class _AsyncEntityEndpoint(_EntityEndpoint):
+    """``_EntityEndpoint`` whose attempts are coroutines on the run's ``AsyncVictorOpsClient``."""
+
+    def __init__(self, pipeline: "AsyncDiscoveryPipeline", async_client: AsyncVictorOpsClient, *args: Any):
+        super().__init__(pipeline, *args)
+        self.async_client = async_client
+
+    async def fetch_once(self, entity: Dict) -> None:
+        entity_id = entity[self.id_key]
+        endpoint = self.endpoint_factory(entity_id)
+        data = await self.async_client.get(endpoint, use_v2=self.use_v2, paginate=self.paginate)
+        self.pipeline._journal_fetch(endpoint, self.use_v2, entity_id, data)
+        self.pipeline._record_entity_result(self.results, entity_id, data, self.label)
+
+    async def fetch(self, entity: Dict) -> int:
+        entity_id = entity.get(self.id_key)
+        if not entity_id:
+            return self.pipeline._record_entity_result(self.results, entity_id, None, self.label)
+        breaker = self.pipeline.circuit_breaker
+        breaker_key = endpoint_template(self.endpoint_factory(entity_id))
+        if not breaker.allow(breaker_key):
+            self.retry_queue.requeue(breaker_key, entity)
+            return 0
+        try:
+            await self.fetch_once(entity)
+        except TransientError:
+            breaker.record(breaker_key, ok=False)
+            self.retry_queue.defer(breaker_key, entity)
+            return 0
+        breaker.record(breaker_key, ok=True)
+        return 0
+
+
+class AsyncDiscoveryPipeline(DiscoveryPipeline):
+    """DiscoveryPipeline whose per-entity fan-out runs as coroutines (``--engine async``).
+
+    Global list calls still use the sync client; both share one ``RateLimiter``.
+    Every phase submits to one event loop and one ``AsyncVictorOpsClient`` per
+    run, so ``concurrency`` bounds in-flight requests across the whole run.
+    Inventory output is identical to the threaded engine.
+    """
+
+    def __init__(
+        self,
+        client: VictorOpsClient,
+        output_dir: Path,
+        reporter: Optional[SummaryReporter] = None,
+        requested_team_slugs: Optional[List[str]] = None,
+        journal: Optional[FetchJournal] = None,
+        delta: Optional[DeltaBaseline] = None,
+        output_format: str = "json",
+        store: str = "json",
+        *,
+        concurrency: int = 16,
+        async_client_factory: Optional[Callable[[], AsyncVictorOpsClient]] = None,
+    ):
+        super().__init__(
+            client, output_dir, reporter, requested_team_slugs, journal, delta, output_format, store
+        )
+        self.concurrency = concurrency
+        self.async_client_factory = async_client_factory or (
+            lambda: AsyncVictorOpsClient.from_client(self.client, concurrency=self.concurrency)
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client: Optional[AsyncVictorOpsClient] = None
+
+    def _fetch_workers(self) -> int:
+        return self.concurrency
+
+    def run(self) -> Dict[str, Any]:
+        with self._shared_async_client():
+            return super().run()
+
+    @contextmanager
+    def _shared_async_client(self) -> Iterator[None]:
+        """Open one event loop (on its own thread) and one async client for every phase."""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="discovery-async", daemon=True)
+        thread.start()
+        async_client = self.async_client_factory()
+        try:
+            asyncio.run_coroutine_threadsafe(async_client.__aenter__(), loop).result()
+            self._loop, self._async_client = loop, async_client
+            yield
+        finally:
+            self._loop = self._async_client = None
+            try:
+                asyncio.run_coroutine_threadsafe(async_client.__aexit__(None, None, None), loop).result()
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+
+    def fetch_per_entity_concurrent(
+        self,
+        entities: List[Dict],
+        id_key: str,
+        endpoint_factory: Callable[[str], str],
+        label: str,
+        use_v2: bool = False,
+        paginate: bool = True,
+        sink: Optional[EntityShard] = None,
+    ) -> Mapping[str, Any]:
+        """Per-entity fetching as bounded coroutines under the shared rate limiter.
+
+        Transient failures and open circuit breakers park entities in a
+        ``RetryQueue`` exactly as in the threaded engine; the queue is drained
+        on the event loop after the first pass.
+        """
+        if self._loop is None:
+            with self._shared_async_client():
+                return self.fetch_per_entity_concurrent(
+                    entities, id_key, endpoint_factory, label, use_v2, paginate, sink
+                )
+        assert self._async_client is not None
+        endpoint = _AsyncEntityEndpoint(
+            self, self._async_client, id_key, endpoint_factory, label, use_v2, paginate, sink
+        )
+        entities_to_fetch = endpoint.prefill(entities)
+        try:
+            skipped = asyncio.run_coroutine_threadsafe(
+                self._first_pass_async(endpoint, entities_to_fetch), self._loop
+            ).result()
+            endpoint.drain(_LoopExecutor(self._loop))
+        finally:
+            self._record_retry_stats(endpoint.retry_queue)
+        return self._finish_entity_results(entities, id_key, label, endpoint.results, skipped)
+
+    async def _first_pass_async(self, endpoint: _AsyncEntityEndpoint, entities: List[Dict]) -> int:
+        """One attempt per entity, as concurrent tasks; return how many had no identifier."""
+        skipped = 0
+        self.progress.expect(len(entities), endpoint.template)
+        tasks = [asyncio.ensure_future(endpoint.fetch(e)) for e in entities]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                skipped += await next_done
+                self.progress.advance(endpoint.label)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return skipped
+
+
 def main(argv: Optional[List[str]] = None) -> None:
     args = _build_arg_parser().parse_args(argv)
 
@@ -662,6 +1616,14 @@ def main(argv: Optional[List[str]] = None) -> None:
         log.critical("Missing required environment variables. Set SOURCE_SPLUNK_ONCALL_API_ID, SOURCE_SPLUNK_ONCALL_API_KEY, SOURCE_SPLUNK_ONCALL_ORG_SLUG.")
         sys.exit(1)
 
+    try:
+        extra_credentials = numbered_credentials("SOURCE_SPLUNK_ONCALL")
+    except MigrationError as exc:
+        log.critical(str(exc))
+        sys.exit(1)
+    if extra_credentials:
+        log.info(f"Spreading requests across {1 + len(extra_credentials)} API key pairs")
+
     requested_teams: Optional[List[str]] = None
     if args.teams:
         requested_teams = parse_teams_arg(args.teams)
@@ -676,9 +1638,68 @@ def main(argv: Optional[List[str]] = None) -> None:
         log.critical("No team slugs provided via --teams or --teams-file.")
         sys.exit(1)
 
-    client = VictorOpsClient(api_id, api_key, org_slug)
-    pipeline = DiscoveryPipeline(client, Path(args.inventory), requested_team_slugs=requested_teams)
+    output_dir = Path(args.inventory)
+    delta: Optional[DeltaBaseline] = None
+    journal: Optional[FetchJournal] = None
+    response_cache: Optional[ResponseCache] = None
+    if args.plan:
+        # A plan must not discard an interrupted run's checkpoint or be served from cache.
+        if args.since or args.resume or args.cache_dir:
+            log.info("--plan ignores --since, --resume and --cache-dir; counts assume a full refetch.")
+    else:
+        if args.since:
+            try:
+                delta = DeltaBaseline(Path(args.since))
+            except MigrationError as exc:
+                log.critical(str(exc))
+                sys.exit(1)
+            log.info(f"Delta run against {Path(args.since).resolve()} (exported {delta.previous_exported_at or 'unknown'})")
+        journal = FetchJournal(output_dir / CHECKPOINT_JOURNAL, resume=args.resume)
+        if args.cache_dir:
+            response_cache = ResponseCache(
+                Path(args.cache_dir),
+                ttl_seconds=args.cache_ttl,
+                max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                namespace=f"{org_slug}:{api_id}",
+            )
+            log.info(f"Response cache: {Path(args.cache_dir).resolve()} (ttl {args.cache_ttl:g}s)")
+    client = VictorOpsClient(
+        api_id,
+        api_key,
+        org_slug,
+        response_cache=response_cache,
+        max_concurrency=args.max_concurrency,
+        extra_credentials=extra_credentials,
+        hedge=args.hedge,
+    )
+    if args.engine == "async":
+        pipeline: DiscoveryPipeline = AsyncDiscoveryPipeline(
+            client,
+            output_dir,
+            requested_team_slugs=requested_teams,
+            journal=journal,
+            delta=delta,
+            output_format=args.output_format,
+            store=args.store,
+            concurrency=args.async_concurrency,
+        )
+    else:
+        pipeline = DiscoveryPipeline(
+            client,
+            output_dir,
+            requested_team_slugs=requested_teams,
+            journal=journal,
+            delta=delta,
+            output_format=args.output_format,
+            store=args.store,
+        )
+    if args.plan:
+        pipeline.plan()
+        return
     pipeline.run()
+    if args.metrics_file:
+        client.metrics.write_prometheus(Path(args.metrics_file), {"org": org_slug, "stage": "discovery"})
+        log.info(f"Request metrics written to {args.metrics_file}")
 
 if __name__ == "__main__":
     main()
@@ -15,7 +15,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from utils.cli import print_help_and_exit_if_requested
-from utils.io import load_json
+from utils.io import load_inventory
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
 log = logging.getLogger(__name__)
@@ -49,7 +49,7 @@ class RemappingGenerator:
         self.username_suffix = username_suffix
 
     def _load_json(self, filename: str) -> Any:
-        return load_json(self.inventory_dir / filename, default=[], logger=log)
+        return load_inventory(self.inventory_dir, Path(filename).stem, default=[], logger=log)
 
     def _collect_emails(self, users: Any, policy_details: Any, contact_methods: Any = None) -> Dict[str, str]:
         emails: Dict[str, str] = {}
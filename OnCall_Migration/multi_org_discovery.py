@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Run discovery for several source orgs at once, one process per org.
+
+Each org gets its own credentials, team scope, inventory directory, and
+``RateLimiter`` (the API rate limit is per org), so total wall time is close to
+the slowest org's rather than the sum. Child log records, request counts, and
+results flow back over one queue; the parent prints a combined progress line
+and writes a summary.
+
+Usage:
+    cp orgs.example.json orgs.json   # one entry per source org
+    python3 multi_org_discovery.py --config orgs.json
+    python3 multi_org_discovery.py --config orgs.json --max-parallel 2 --verbose
+    python3 multi_org_discovery.py --config orgs.json --resume
+
+Config (JSON): ``{"orgs": [{"name": "east", "env_prefix": "EAST", "inventory": "inventory/east"}, ...]}``.
+Credentials come from ``<env_prefix>_SPLUNK_ONCALL_API_ID`` / ``_API_KEY`` /
+``_ORG_SLUG`` (``.env`` is loaded first); ``api_id`` / ``api_key`` / ``org_slug``
+keys in the entry override them. Optional per org: ``teams`` (list of slugs),
+``teams_file``, ``store``, ``output_format``, ``rate_hz``, ``api_base``.
+
+Output: each org's usual inventory in its ``inventory`` directory, plus the
+combined summary (default ``inventory/multi_org_summary.json``).
+"""
+
+import argparse
+import sys
+
+from utils.cli import print_help_and_exit_if_requested
+
+DEFAULT_SUMMARY = "inventory/multi_org_summary.json"
+DEFAULT_PROGRESS_INTERVAL = 30.0
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run discovery for several source orgs concurrently (one process per org).",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--config", required=True, help="JSON file listing the source orgs.")
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=0,
+        help="Orgs discovered at the same time (0 = all of them).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse per-entity fetches journaled by interrupted runs in each org's inventory.",
+    )
+    parser.add_argument("--summary", default=DEFAULT_SUMMARY, help="Where to write the combined summary JSON.")
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=DEFAULT_PROGRESS_INTERVAL,
+        help="Seconds between combined progress lines.",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Forward every org's INFO log lines.")
+    return parser
+
+
+if __name__ == "__main__":
+    print_help_and_exit_if_requested(_build_arg_parser)
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from discovery import CHECKPOINT_JOURNAL, STORE_MODES, DiscoveryPipeline, VictorOpsClient
+from utils.env_loader import load_dotenv
+from utils.exceptions import MigrationError
+from utils.journal import FetchJournal
+from utils.team_scope import parse_teams_file
+
+log = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("json", "compact", "ndjson")
+CREDENTIAL_KEYS = ("api_id", "api_key", "org_slug")
+
+# How often each child reports its request count to the parent.
+HEARTBEAT_SECONDS = 5.0
+
+
+class OrgSpec:
+    """One source org from the config; plain attributes so it pickles into the child."""
+
+    def __init__(
+        self,
+        name: str,
+        api_id: str,
+        api_key: str,
+        org_slug: str,
+        inventory: Path,
+        teams: Optional[List[str]] = None,
+        store: str = "json",
+        output_format: str = "json",
+        rate_hz: float = 2.0,
+        api_base: Optional[str] = None,
+    ):
+        self.name = name
+        self.api_id = api_id
+        self.api_key = api_key
+        self.org_slug = org_slug
+        self.inventory = inventory
+        self.teams = teams
+        self.store = store
+        self.output_format = output_format
+        self.rate_hz = rate_hz
+        self.api_base = api_base
+
+
+def _org_spec(entry: Any, index: int) -> OrgSpec:
+    if not isinstance(entry, dict) or not entry.get("name"):
+        raise MigrationError(f"orgs[{index}]: each entry needs a 'name'")
+    name = str(entry["name"])
+    prefix = str(entry.get("env_prefix") or "SOURCE")
+    credentials = {
+        key: entry.get(key) or os.getenv(f"{prefix}_SPLUNK_ONCALL_{key.upper()}") for key in CREDENTIAL_KEYS
+    }
+    missing = [f"{prefix}_SPLUNK_ONCALL_{key.upper()}" for key, value in credentials.items() if not value]
+    if missing:
+        raise MigrationError(f"{name}: missing credentials ({', '.join(missing)})")
+
+    teams: Optional[List[str]] = None
+    if entry.get("teams") and entry.get("teams_file"):
+        raise MigrationError(f"{name}: set 'teams' or 'teams_file', not both")
+    if entry.get("teams"):
+        if not isinstance(entry["teams"], list):
+            raise MigrationError(f"{name}: 'teams' must be a list of team slugs")
+        teams = [str(slug).strip() for slug in entry["teams"] if str(slug).strip()]
+    elif entry.get("teams_file"):
+        teams_path = Path(entry["teams_file"])
+        if not teams_path.exists():
+            raise MigrationError(f"{name}: teams file not found: {teams_path}")
+        teams = parse_teams_file(teams_path)
+    if teams is not None and not teams:
+        raise MigrationError(f"{name}: team scope is empty")
+
+    store = entry.get("store", "json")
+    if store not in STORE_MODES:
+        raise MigrationError(f"{name}: 'store' must be one of {', '.join(STORE_MODES)}")
+    output_format = entry.get("output_format", "json")
+    if output_format not in OUTPUT_FORMATS:
+        raise MigrationError(f"{name}: 'output_format' must be one of {', '.join(OUTPUT_FORMATS)}")
+
+    return OrgSpec(
+        name,
+        str(credentials["api_id"]),
+        str(credentials["api_key"]),
+        str(credentials["org_slug"]),
+        inventory=Path(entry.get("inventory", f"inventory/{name}")),
+        teams=teams,
+        store=store,
+        output_format=output_format,
+        rate_hz=float(entry.get("rate_hz", 2.0)),
+        api_base=entry.get("api_base"),
+    )
+
+
+def load_org_specs(config_path: Path) -> List[OrgSpec]:
+    """Parse and validate the multi-org config (raises ``MigrationError``)."""
+    try:
+        config = json.loads(config_path.read_text())
+    except (OSError, ValueError) as exc:
+        raise MigrationError(f"Cannot read org config {config_path}: {exc}") from exc
+    entries = config.get("orgs") if isinstance(config, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise MigrationError(f"{config_path}: expected a non-empty 'orgs' list")
+
+    specs = [_org_spec(entry, index) for index, entry in enumerate(entries)]
+    for attr, label in (("name", "names"), ("inventory", "inventory directories")):
+        values = [str(getattr(spec, attr)) for spec in specs]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise MigrationError(f"Org {label} must be unique: {', '.join(duplicates)}")
+    return specs
+
+
+class _OrgQueueHandler(QueueHandler):
+    """Forward child log records to the parent, prefixed with the org name."""
+
+    def __init__(self, events: Any, name: str):
+        super().__init__(events)
+        self.org_name = name
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        record.msg = f"[{self.org_name}] {record.msg}"
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put(("log", self.org_name, record))
+
+
+def _discover_org(spec: OrgSpec, resume: bool, events: Any) -> None:
+    """Child process entry point: run one org's ``DiscoveryPipeline`` and report back."""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_OrgQueueHandler(events, spec.name))
+    root.setLevel(logging.INFO)
+
+    started = time.monotonic()
+    client = VictorOpsClient(spec.api_id, spec.api_key, spec.org_slug, rate_hz=spec.rate_hz)
+    if spec.api_base:
+        client.base_v1 = f"{spec.api_base.rstrip('/')}/v1"
+        client.base_v2 = f"{spec.api_base.rstrip('/')}/v2"
+
+    stop = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            events.put(("progress", spec.name, {"requests": client.metrics.snapshot()["totals"]["requests"]}))
+
+    threading.Thread(target=heartbeat, name="heartbeat", daemon=True).start()
+    result: Dict[str, Any] = {"org_slug": spec.org_slug, "inventory": str(spec.inventory)}
+    try:
+        pipeline = DiscoveryPipeline(
+            client,
+            spec.inventory,
+            requested_team_slugs=spec.teams,
+            journal=FetchJournal(spec.inventory / CHECKPOINT_JOURNAL, resume=resume),
+            output_format=spec.output_format,
+            store=spec.store,
+        )
+        result["inventory_counts"] = pipeline.run()
+        result["status"] = "ok"
+    except Exception as exc:  # reported to the parent; one org failing must not stop the others
+        logging.getLogger(__name__).exception("Discovery failed")
+        result["status"] = "failed"
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        stop.set()
+    result["wall_seconds"] = round(time.monotonic() - started, 3)
+    result["requests"] = client.metrics.snapshot()["totals"]["requests"]
+    events.put(("done", spec.name, result))
+
+
+def _duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes}m{secs:02d}s" if minutes else f"{secs}s"
+
+
+class MultiOrgRunner:
+    """Start one discovery process per org (at most ``max_parallel`` at once) and collect results."""
+
+    def __init__(
+        self,
+        specs: List[OrgSpec],
+        *,
+        max_parallel: int = 0,
+        resume: bool = False,
+        progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+        verbose: bool = False,
+    ):
+        self.specs = specs
+        self.max_parallel = max_parallel if max_parallel > 0 else len(specs)
+        self.resume = resume
+        self.progress_interval = progress_interval
+        self.verbose = verbose
+        self.state: Dict[str, Dict[str, Any]] = {spec.name: {"status": "queued"} for spec in specs}
+
+    def _status_line(self) -> str:
+        now = time.monotonic()
+        parts = []
+        for spec in self.specs:
+            state = self.state[spec.name]
+            part = f"{spec.name}: {state['status']}"
+            if "requests" in state:
+                part += f" {state['requests']} req"
+            if "started" in state:
+                part += f" {_duration(state.get('wall_seconds', now - state['started']))}"
+            parts.append(part)
+        return " | ".join(parts)
+
+    def run(self) -> Dict[str, Any]:
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        pending = list(self.specs)
+        processes: Dict[str, Any] = {}
+        started = time.monotonic()
+        last_progress = started
+
+        while pending or processes:
+            while pending and len(processes) < self.max_parallel:
+                spec = pending.pop(0)
+                process = context.Process(
+                    target=_discover_org, args=(spec, self.resume, events), name=f"discover-{spec.name}"
+                )
+                process.start()
+                processes[spec.name] = process
+                self.state[spec.name] = {"status": "running", "started": time.monotonic(), "requests": 0}
+                log.info(f"[{spec.name}] started (pid {process.pid}) -> {spec.inventory}")
+
+            try:
+                kind, name, payload = events.get(timeout=1.0)
+            except queue.Empty:
+                self._reap(processes, drained=True)
+            else:
+                if kind == "log":
+                    if self.verbose or payload.levelno >= logging.WARNING:
+                        logging.getLogger().handle(payload)
+                elif name not in processes:
+                    pass  # already reaped as crashed
+                elif kind == "progress":
+                    self.state[name]["requests"] = payload["requests"]
+                elif kind == "done":
+                    self._finish(name, payload)
+                    processes.pop(name).join()
+                self._reap(processes, drained=False)
+
+            if time.monotonic() - last_progress >= self.progress_interval:
+                last_progress = time.monotonic()
+                log.info(f"Progress | {self._status_line()}")
+
+        wall = time.monotonic() - started
+        orgs = {
+            spec.name: {key: value for key, value in self.state[spec.name].items() if key != "started"}
+            for spec in self.specs
+        }
+        return {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "wall_seconds": round(wall, 3),
+            "sequential_seconds": round(sum(org.get("wall_seconds", 0.0) for org in orgs.values()), 3),
+            "failed": sorted(name for name, org in orgs.items() if org["status"] != "ok"),
+            "orgs": orgs,
+        }
+
+    def _reap(self, processes: Dict[str, Any], drained: bool) -> None:
+        """Fail children that exited without reporting ``done``.
+
+        A non-zero exit code is a crash however busy the queue is. A clean exit
+        may still have its ``done`` event in flight, so it only counts once the
+        queue has been ``drained``.
+        """
+        for name, process in list(processes.items()):
+            if process.is_alive() or (process.exitcode == 0 and not drained):
+                continue
+            process.join()
+            self._finish(name, {"status": "failed", "error": f"exit code {process.exitcode}"})
+            del processes[name]
+
+    def _finish(self, name: str, result: Dict[str, Any]) -> None:
+        state = self.state[name]
+        state.update(result)
+        line = f"[{name}] {state['status']}"
+        if "started" in state:
+            line += f" after {_duration(state.get('wall_seconds', time.monotonic() - state['started']))}"
+        if result.get("error"):
+            log.error(f"{line}: {result['error']}")
+        else:
+            log.info(f"{line} ({state.get('requests', 0)} requests)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _build_arg_parser().parse_args(argv)
+    load_dotenv()
+    try:
+        specs = load_org_specs(Path(args.config))
+    except MigrationError as exc:
+        log.critical(str(exc))
+        sys.exit(1)
+
+    log.info(f"Discovering {len(specs)} orgs: {', '.join(spec.name for spec in specs)}")
+    summary = MultiOrgRunner(
+        specs,
+        max_parallel=args.max_parallel,
+        resume=args.resume,
+        progress_interval=args.progress_interval,
+        verbose=args.verbose,
+    ).run()
+
+    summary_path = Path(args.summary)
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary_path.write_text(json.dumps(summary, indent=2))
+    for name, org in summary["orgs"].items():
+        log.info(
+            f"  {name:<20} {org['status']:<7} {org.get('requests', 0):>7} req "
+            f"{org.get('wall_seconds', 0.0):>9.1f}s  {org.get('inventory', '')}"
+        )
+    log.info(
+        f"Wall time {summary['wall_seconds']:.1f}s (sequential would be ~{summary['sequential_seconds']:.1f}s). "
+        f"Summary written to {summary_path}"
+    )
+    if summary["failed"]:
+        log.error(f"Discovery failed for: {', '.join(summary['failed'])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
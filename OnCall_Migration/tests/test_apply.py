@@ -5,11 +5,21 @@ from __future__ import annotations
 import json
 import os
 import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 from unittest import mock
 
-from apply import ApplyClient, ApplyPipeline, RemappingContext
+from apply import ApplyClient, ApplyItem, ApplyPipeline, RemappingContext
+from benchmarks.run_benchmarks import _configure_client
+from benchmarks.simulator import Faults, SimulatedOrg, VictorOpsSimulator
+from discovery import DiscoveryPipeline, VictorOpsClient
+from generate_remapping import RemappingGenerator
+from utils.exceptions import NetworkError
+from utils.inventory_store import STORE_FILENAME, InventoryStore
+from utils.io import load_json
+from utils.journal import ApplyJournal
 
 
 class FakeResponse:
@@ -128,6 +138,9 @@ class ApplyPipelineTest(unittest.TestCase):
         self.assertTrue(self.pipeline.report_path.exists())
         self.assertTrue(report["dry_run"])
         self.client.session.post.assert_not_called()
+        metrics = report["request_metrics"]
+        self.assertEqual(metrics["totals"]["requests"], self.client.session.get.call_count)
+        self.assertFalse([name for name in metrics["endpoints"] if name.startswith("POST ")])
 
     def test_apply_posts_with_remapped_payload(self) -> None:
         self.client.dry_run = False
@@ -174,7 +187,7 @@ class ApplyPipelineTest(unittest.TestCase):
 
         self.client.session.post = mock.MagicMock(side_effect=fake_post)
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.run()
 
         user_post = next(body for url, body in posted if url.endswith("/user"))
@@ -253,7 +266,7 @@ class ApplyPipelineTest(unittest.TestCase):
 
         self.client.session.post = mock.MagicMock(side_effect=fake_post)
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline._index_policy_metadata()
             self.pipeline.apply_escalation_policies()
 
@@ -271,7 +284,7 @@ class ApplyPipelineTest(unittest.TestCase):
             return_value=FakeResponse({"username": "alice"}, status_code=201)
         )
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.apply_users()
 
         self.assertEqual(self.pipeline.stats["users"]["created"], 1)
@@ -301,7 +314,7 @@ class ApplyPipelineTest(unittest.TestCase):
         self.client.session.get = mock.MagicMock(side_effect=fake_get)
         self.client.session.post = mock.MagicMock()
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline._index_policy_metadata()
             self.pipeline.apply_escalation_policies()
 
@@ -320,7 +333,7 @@ class ApplyPipelineTest(unittest.TestCase):
         self.client.session.get = mock.MagicMock(side_effect=fake_get)
         self.client.session.post = mock.MagicMock()
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.apply_routing_keys()
 
         self.client.session.post.assert_not_called()
@@ -344,7 +357,7 @@ class ApplyPipelineTest(unittest.TestCase):
         self.client.session.get = mock.MagicMock(side_effect=fake_get)
         self.client.session.post = mock.MagicMock()
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.apply_alert_rules()
 
         self.client.session.post.assert_not_called()
@@ -405,7 +418,7 @@ class ApplyPipelineTest(unittest.TestCase):
 
         self.client.post_once = mock.MagicMock(side_effect=fake_post_once)
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.team_slug_map["team-alpha"] = "team-target"
             self.pipeline.apply_rotations()
 
@@ -424,7 +437,7 @@ class ApplyPipelineTest(unittest.TestCase):
         self.client.session.get = mock.MagicMock(side_effect=fake_get)
         self.client.session.post = mock.MagicMock()
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline._index_policy_metadata()
             self.pipeline.apply_escalation_policies()
 
@@ -441,13 +454,375 @@ class ApplyPipelineTest(unittest.TestCase):
         )
         self.client.session.post = mock.MagicMock()
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.apply_routing_keys()
 
         self.client.session.post.assert_not_called()
         self.assertEqual(self.pipeline.stats["routing_keys"]["skipped"], 1)
 
 
+    def test_team_members_read_once_per_team(self) -> None:
+        (self.inventory_dir / "team_members_inventory.json").write_text(
+            json.dumps({"team-alpha": [{"username": "alice"}, {"username": "bob"}, {"username": "carol"}]})
+        )
+        self.client.dry_run = False
+        self.client.session.get = mock.MagicMock(return_value=FakeResponse({"members": [{"username": "bob"}]}))
+        self.client.session.post = mock.MagicMock(return_value=FakeResponse({"ok": True}))
+
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            self.pipeline.apply_members()
+
+        self.assertEqual(self.client.session.get.call_count, 1)
+        self.assertEqual(self.client.session.post.call_count, 2)
+        self.assertEqual(self.pipeline.stats["members"]["created"], 2)
+        self.assertEqual(self.pipeline.stats["members"]["skipped"], 1)
+        self.assertEqual(self.pipeline.target.members["team-alpha"], {"alice", "bob", "carol"})
+
+    def _two_rotations_one_existing(self) -> None:
+        shift = {
+            "label": "Day",
+            "timezone": "UTC",
+            "start": "2020-01-01T00:00:00Z",
+            "duration": 7,
+            "shifttype": "std",
+            "mask": {"day": {}, "time": []},
+            "shiftMembers": [{"username": "alice"}],
+        }
+        (self.inventory_dir / "rotation_definitions_inventory.json").write_text(json.dumps({
+            "team-alpha": {"rotations": [{"label": "Primary", "shifts": [shift]}, {"label": "Backup", "shifts": [shift]}]}
+        }))
+        (self.inventory_dir / "escalation_policy_details_inventory.json").write_text(json.dumps({
+            "pol-alpha": [{"timeout": 0, "entries": [
+                {"executionType": "rotation_group", "rotationGroup": {"slug": "rtg-src", "label": "Primary"}},
+                {"executionType": "rotation_group_next", "rotationGroup": {"slug": "rtg-src-2", "label": "Backup"}},
+            ]}]
+        }))
+        self.client.dry_run = False
+        self.client.session.get = mock.MagicMock(
+            return_value=FakeResponse({"rotationGroups": [{"label": "Primary", "slug": "rtg-target"}]})
+        )
+        self.pipeline._index_policy_metadata()
+        self.pipeline._index_rotation_group_labels()
+
+    def test_rotation_groups_read_once_and_mapped_from_create_response(self) -> None:
+        self._two_rotations_one_existing()
+        self.client.session.post = mock.MagicMock(return_value=FakeResponse({"label": "Backup", "slug": "rtg-backup"}))
+
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            self.pipeline.apply_rotations()
+
+        self.assertEqual(self.client.session.get.call_count, 1)
+        self.client.session.post.assert_called_once()
+        self.assertEqual(self.pipeline.rtg_slug_map, {"rtg-src": "rtg-target", "rtg-src-2": "rtg-backup"})
+        self.assertEqual(self.pipeline.stats["rotations"], {"created": 1, "skipped": 1, "failed": 0, "warned": 0, "resumed": 0})
+
+    def test_rotation_groups_reread_when_create_response_has_no_slug(self) -> None:
+        self._two_rotations_one_existing()
+        self.client.session.post = mock.MagicMock(return_value=FakeResponse({}, status_code=201))
+
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            self.pipeline.apply_rotations()
+
+        self.assertEqual(self.client.session.get.call_count, 2)
+        self.assertEqual(self.pipeline.rtg_slug_map, {"rtg-src": "rtg-target"})
+
+    def test_every_rotation_group_a_policy_names_is_mapped(self) -> None:
+        details = {"pol-alpha": [{"timeout": 0, "entries": [
+            {"executionType": "rotation_group", "rotationGroup": {"slug": "rtg-src", "label": "Primary"}},
+            {"executionType": "team_page", "rotationGroup": {"slug": "rtg-src-2", "label": "Backup"}},
+        ]}]}
+        (self.inventory_dir / "escalation_policy_details_inventory.json").write_text(json.dumps(details))
+        expected = {"team-alpha": {"rtg-src": "Primary", "rtg-src-2": "Backup"}}
+
+        self.pipeline._index_policy_metadata()
+        self.pipeline._index_rotation_group_labels()
+        self.assertEqual(self.pipeline.source_rtgs_by_team, expected)
+        self.assertEqual(self.pipeline.rtg_label_by_source_slug, {"rtg-src": "Primary"})
+
+        with InventoryStore(self.inventory_dir / STORE_FILENAME) as store:
+            for path in self.inventory_dir.glob("*_inventory.json"):
+                store.save(path.stem, load_json(path))
+        self.pipeline.source_rtgs_by_team.clear()
+        self.pipeline._index_rotation_group_labels()
+        self.assertEqual(self.pipeline.source_rtgs_by_team, expected)
+
+    def test_source_teams_landing_on_one_target_team_do_not_race(self) -> None:
+        rotation = json.loads((self.inventory_dir / "rotation_definitions_inventory.json").read_text())["team-alpha"]
+        # team-alpha-2 shares Alpha Team's name; team-ghost is not in the teams inventory
+        # and is remapped onto the existing target team.
+        teams = ["team-alpha", "team-alpha-2", "team-ghost"]
+        (self.inventory_dir / "teams_inventory.json").write_text(json.dumps(
+            [{"slug": "team-alpha", "name": "Alpha Team"}, {"slug": "team-alpha-2", "name": "Alpha Team"}]
+        ))
+        (self.inventory_dir / "team_members_inventory.json").write_text(
+            json.dumps({team: [{"username": "bob"}] for team in teams})
+        )
+        (self.inventory_dir / "rotation_definitions_inventory.json").write_text(
+            json.dumps({team: rotation for team in teams})
+        )
+        self.remapping.remapping["teams"]["team-ghost"] = "team-target"
+        self.client.dry_run = False
+        self.client.session.get = mock.MagicMock(side_effect=self._target_listing)
+        posted = []
+
+        def slow_post(url, json=None, timeout=30):
+            posted.append(url.rsplit("/api-public/v1/", 1)[1])
+            time.sleep(0.05)
+            if "/rotations" in url:
+                return FakeResponse({"label": "Primary", "slug": "rtg-target"})
+            return FakeResponse({"ok": True})
+
+        self.client.session.post = mock.MagicMock(side_effect=slow_post)
+        self.pipeline.workers = 4
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            self.pipeline._execute(
+                self.pipeline._team_items() + self.pipeline._member_items() + self.pipeline._rotation_items()
+            )
+
+        self.assertEqual(posted.count("team/team-target/members"), 1)
+        self.assertEqual(posted.count("teams/team-target/rotations"), 1)
+        self.assertEqual(self.pipeline.stats["members"], {"created": 1, "skipped": 2, "failed": 0, "warned": 0, "resumed": 0})
+        self.assertEqual(self.pipeline.stats["rotations"], {"created": 1, "skipped": 2, "failed": 0, "warned": 0, "resumed": 0})
+
+    def _target_listing(self, url, timeout=30):
+        """Target org with Alpha Team (and alice on it) but nothing else."""
+        if url.endswith("/team"):
+            return FakeResponse({"teams": [{"name": "Alpha Team", "slug": "team-target"}]})
+        if url.endswith("/team/team-target/members"):
+            return FakeResponse({"members": [{"username": "alice"}]})
+        if url.endswith("/teams/team-target/rotations"):
+            return FakeResponse({"rotationGroups": []})
+        listings = {"/user": "users", "/policies": "policies", "/org/routing-keys": "routingKeys", "/alertRules": "rules"}
+        for suffix, key in listings.items():
+            if url.endswith(suffix):
+                return FakeResponse({key: []})
+        return FakeResponse({}, status_code=404)
+
+    def test_plan_reads_each_listing_once_and_writes_nothing(self) -> None:
+        self.client.session.get = mock.MagicMock(side_effect=self._target_listing)
+        self.client.session.post = mock.MagicMock()
+        plan_path = self.inventory_dir / "apply_plan.json"
+
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            plan = self.pipeline.plan(plan_path)
+
+        self.client.session.post.assert_not_called()
+        self.assertEqual(self.client.session.get.call_count, 7)
+        self.assertEqual(plan["reads"], 7)
+        self.assertEqual(json.loads(plan_path.read_text())["changeset"], plan["changeset"])
+        self.assertEqual(
+            [(op["step"], op["key"]) for op in plan["changeset"]],
+            [
+                ("users", "alice"),
+                ("rotations", "team-alpha/Primary"),
+                ("escalation_policies", "pol-alpha"),
+                ("routing_keys", "ALPHA"),
+                ("alert_rules", "1"),
+            ],
+        )
+        policy = plan["changeset"][2]["payload"]
+        self.assertEqual(policy["teamSlug"], "team-target")
+        self.assertEqual(
+            policy["steps"][0]["entries"][0]["rotationGroup"]["slug"], "planned:rotations:team-alpha/Primary"
+        )
+        self.assertEqual(plan["stats"]["members"]["skipped"], 1)
+        self.assertEqual(plan["target_state"]["teams"], {"Alpha Team": "team-target"})
+
+    def test_executing_plan_sends_only_its_changeset_without_reads(self) -> None:
+        self.client.session.get = mock.MagicMock(side_effect=self._target_listing)
+        plan_path = self.inventory_dir / "apply_plan.json"
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            plan = self.pipeline.plan(plan_path)
+        plan["changeset"] = [op for op in plan["changeset"] if op["step"] != "users"]
+
+        client = ApplyClient("id", "key", "target-org", dry_run=False)
+        client.session.get = mock.MagicMock()
+        posted = []
+
+        def fake_post(url, json=None, timeout=30):
+            posted.append((url, json))
+            if "/rotations" in url:
+                return FakeResponse({"label": "Primary", "slug": "rtg-target"})
+            if url.endswith("/policies"):
+                return FakeResponse({"slug": "pol-target"})
+            return FakeResponse({"ok": True})
+
+        client.session.post = mock.MagicMock(side_effect=fake_post)
+        pipeline = ApplyPipeline.from_plan(
+            plan, plan_path, client, self.inventory_dir, self.remapping, self.inventory_dir / "apply_report.json"
+        )
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            report = pipeline.run()
+
+        client.session.get.assert_not_called()
+        self.assertEqual(
+            [url.rsplit("/api-public/v1/", 1)[1] for url, _ in posted],
+            ["teams/team-target/rotations", "policies", "org/routing-keys", "alertRules"],
+        )
+        policy = next(body for url, body in posted if url.endswith("/policies"))
+        self.assertEqual(policy["steps"][0]["entries"][0]["rotationGroup"]["slug"], "rtg-target")
+        self.assertEqual(posted[2][1]["targets"], ["pol-target"])
+        self.assertEqual(report["stats"]["users"]["skipped"], 1)
+        self.assertEqual(report["plan_file"], str(plan_path))
+
+
+class ConcurrentApplyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.inventory_dir = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _pipeline(self, client: ApplyClient, workers: int) -> ApplyPipeline:
+        remapping = RemappingContext(load_json(self.inventory_dir / "remapping.json", default={}))
+        return ApplyPipeline(
+            client, self.inventory_dir, remapping, self.inventory_dir / f"report_{workers}.json", workers=workers
+        )
+
+    def test_items_wait_for_needs_and_results_keep_item_order(self) -> None:
+        pipeline = self._pipeline(ApplyClient("id", "key", "target-org"), workers=4)
+        events = []
+        lock = threading.Lock()
+
+        def item(name: str, seconds: float, outcome: str):
+            def run() -> None:
+                with lock:
+                    events.append(f"start {name}")
+                time.sleep(seconds)
+                pipeline._bump("users", outcome)
+                if outcome == "failed":
+                    pipeline._record_failure("users", name)
+                with lock:
+                    events.append(f"end {name}")
+            return run
+
+        pipeline._execute([
+            ApplyItem("users", item("slow", 0.2, "failed"), provides="alice", resource="one"),
+            ApplyItem("users", item("fast", 0.0, "failed"), provides="bob"),
+            ApplyItem("users", item("same-resource", 0.0, "created"), resource="one"),
+            ApplyItem("members", item("needs-alice", 0.0, "created"), needs=[("users", "alice"), ("users", "x")]),
+        ])
+
+        self.assertLess(events.index("end fast"), events.index("end slow"))
+        self.assertLess(events.index("end slow"), events.index("start same-resource"))
+        self.assertLess(events.index("end slow"), events.index("start needs-alice"))
+        self.assertEqual(pipeline.failures, {"users": ["slow", "fast"]})
+        self.assertEqual(pipeline.stats["users"], {"created": 2, "skipped": 0, "failed": 2, "warned": 0, "resumed": 0})
+        self.assertEqual(pipeline.executor["items"], 4)
+
+    def test_concurrent_apply_matches_one_at_a_time(self) -> None:
+        with VictorOpsSimulator(SimulatedOrg.synthetic(40, teams=4)) as sim:
+            client = _configure_client(VictorOpsClient("id", "key", "source-org"), sim, 0)
+            DiscoveryPipeline(client, self.inventory_dir).run()
+        RemappingGenerator(self.inventory_dir, self.inventory_dir / "remapping.json").generate()
+
+        reports = {}
+        for workers in (1, 4):
+            with VictorOpsSimulator(SimulatedOrg(), Faults(jitter_ms=5, seed=workers)) as sim:
+                client = _configure_client(ApplyClient("id", "key", "target-org", dry_run=False), sim, 0)
+                reports[workers] = self._pipeline(client, workers).run()
+
+        sequential, concurrent = reports[1], reports[4]
+        self.assertEqual(concurrent["stats"], sequential["stats"])
+        self.assertEqual(concurrent["failures"], sequential["failures"])
+        self.assertEqual(concurrent["slug_maps"], sequential["slug_maps"])
+        self.assertEqual(sequential["failures"], {})
+        self.assertEqual(concurrent["stats"]["escalation_policies"]["created"], 8)
+        self.assertEqual(concurrent["executor"]["workers"], 4)
+
+    def test_interrupted_apply_resumes_from_journal_without_reads(self) -> None:
+        with VictorOpsSimulator(SimulatedOrg.synthetic(40, teams=4)) as sim:
+            client = _configure_client(VictorOpsClient("id", "key", "source-org"), sim, 0)
+            DiscoveryPipeline(client, self.inventory_dir).run()
+        RemappingGenerator(self.inventory_dir, self.inventory_dir / "remapping.json").generate()
+        journal_path = self.inventory_dir / "apply_journal.jsonl"
+
+        def totals(sim):
+            counts = sim.request_counts()
+            return {
+                method: sum(n for name, n in counts.items() if name.startswith(method)) for method in ("GET", "POST")
+            }
+
+        target = SimulatedOrg()
+        with VictorOpsSimulator(target) as sim:
+            client = _configure_client(ApplyClient("id", "key", "target-org", dry_run=False), sim, 0)
+            pipeline = self._pipeline(client, workers=4)
+            pipeline.journal = ApplyJournal(journal_path, "target-org")
+            send = client._send
+            posts = []
+            lock = threading.Lock()
+
+            def fail_after_50_posts(method, url, **kwargs):
+                if method == "POST":
+                    with lock:
+                        posts.append(url)
+                        if len(posts) > 50:
+                            raise NetworkError("connection reset")
+                return send(method, url, **kwargs)
+
+            with mock.patch.object(client, "_send", side_effect=fail_after_50_posts):
+                with self.assertRaises(NetworkError):
+                    pipeline.run()
+            pipeline.journal.close()
+            first = totals(sim)
+            before = sim.request_counts()
+
+            client = _configure_client(ApplyClient("id", "key", "target-org", dry_run=False), sim, 0)
+            pipeline = self._pipeline(client, workers=4)
+            pipeline.journal = ApplyJournal(journal_path, "target-org")
+            report = pipeline.run()
+            pipeline.journal.close()
+            second = totals(sim)
+            reads = {name: n - before.get(name, 0) for name, n in sim.request_counts().items()}
+
+        created = sum(outcomes["created"] for outcomes in report["stats"].values())
+        self.assertEqual(first["POST"], 50)
+        self.assertEqual(report["journal"]["replayed"], 50)
+        self.assertEqual(report["journal"]["recorded"], created)
+        self.assertEqual(second["POST"] - first["POST"], created)
+        self.assertEqual(report["failures"], {})
+        self.assertEqual(len(target.users), 40)
+        self.assertEqual(len(report["slug_maps"]["escalation_policies"]), 8)
+        # Users and teams the first run created are neither re-read nor re-sent;
+        # a resumed team's members are read once, since the first run may have added some.
+        self.assertEqual(report["stats"]["users"]["resumed"], 40)
+        self.assertEqual(reads.get("GET v1/user/{u}", 0), 0)
+        self.assertEqual(reads.get("GET v1/team/{t}/members", 0), report["stats"]["teams"]["resumed"])
+        self.assertEqual(reads.get("GET v1/team", 0), 0)
+
+        with VictorOpsSimulator(SimulatedOrg()) as sim:
+            client = _configure_client(ApplyClient("id", "key", "target-org", dry_run=False), sim, 0)
+            clean = self._pipeline(client, workers=4).run()
+        self.assertEqual(sum(outcomes["resumed"] for outcomes in report["stats"].values()), 50)
+        for step, outcomes in clean["stats"].items():
+            resumed = report["stats"][step]
+            self.assertEqual(outcomes["created"], resumed["created"] + resumed["resumed"], step)
+            self.assertEqual(outcomes["skipped"], resumed["skipped"], step)
+
+    def test_rerun_after_complete_apply_sends_no_requests(self) -> None:
+        with VictorOpsSimulator(SimulatedOrg.synthetic(20, teams=2)) as sim:
+            client = _configure_client(VictorOpsClient("id", "key", "source-org"), sim, 0)
+            DiscoveryPipeline(client, self.inventory_dir).run()
+        RemappingGenerator(self.inventory_dir, self.inventory_dir / "remapping.json").generate()
+        journal_path = self.inventory_dir / "apply_journal.jsonl"
+
+        with VictorOpsSimulator(SimulatedOrg()) as sim:
+            reports = []
+            for _run in range(2):
+                client = _configure_client(ApplyClient("id", "key", "target-org", dry_run=False), sim, 0)
+                pipeline = self._pipeline(client, workers=4)
+                pipeline.journal = ApplyJournal(journal_path, "target-org")
+                before = sum(sim.request_counts().values())
+                reports.append(pipeline.run())
+                pipeline.journal.close()
+            sent = sum(sim.request_counts().values()) - before
+
+        self.assertEqual(sent, 0)
+        self.assertEqual(reports[1]["slug_maps"], reports[0]["slug_maps"])
+        for step, outcomes in reports[0]["stats"].items():
+            self.assertEqual(reports[1]["stats"][step]["resumed"], outcomes["created"], step)
+
 class ApplyMainEnvTest(unittest.TestCase):
     def test_main_exits_when_target_env_missing(self) -> None:
         import apply as apply_module
@@ -501,5 +876,66 @@ class ApplyMainEnvTest(unittest.TestCase):
             mock_run.assert_called_once()
 
 
+    def _run_main(self, tmp: str, argv: list) -> None:
+        import apply as apply_module
+
+        env = {
+            "TARGET_SPLUNK_ONCALL_API_ID": "id",
+            "TARGET_SPLUNK_ONCALL_API_KEY": "key",
+            "TARGET_SPLUNK_ONCALL_ORG_SLUG": "org",
+        }
+        remapping = Path(tmp) / "remapping.json"
+        remapping.write_text("{}")
+        with mock.patch.dict(os.environ, env, clear=True):
+            with mock.patch("apply.load_dotenv", return_value=Path(tmp) / ".env"):
+                apply_module.main(["--inventory", tmp, "--remapping", str(remapping), *argv])
+
+    def test_main_plan_writes_default_plan_file(self) -> None:
+        import apply as apply_module
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with mock.patch.object(apply_module.ApplyPipeline, "plan", return_value={}) as mock_plan, \
+                    mock.patch.object(apply_module.ApplyPipeline, "run") as mock_run:
+                self._run_main(tmp, ["--plan"])
+            mock_plan.assert_called_once_with(Path(tmp) / "apply_plan.json")
+            mock_run.assert_not_called()
+
+    def test_main_rejects_plan_with_apply(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(SystemExit):
+                self._run_main(tmp, ["--plan", "--apply"])
+
+    def test_main_rejects_plan_for_another_org(self) -> None:
+        import apply as apply_module
+
+        with tempfile.TemporaryDirectory() as tmp:
+            plan_path = Path(tmp) / "apply_plan.json"
+            plan_path.write_text(json.dumps({"org_slug": "other-org", "changeset": []}))
+            with mock.patch.object(apply_module.ApplyPipeline, "run") as mock_run:
+                with self.assertRaises(SystemExit):
+                    self._run_main(tmp, ["--apply", "--plan-file", str(plan_path)])
+            mock_run.assert_not_called()
+
+
+    def _journal_used_by(self, tmp: str, argv: list):
+        import apply as apply_module
+
+        with mock.patch.object(apply_module.ApplyPipeline, "run", autospec=True, return_value={}) as mock_run:
+            self._run_main(tmp, argv)
+        return mock_run.call_args[0][0].journal
+
+    def test_main_journals_only_apply_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "apply_journal.jsonl"
+            path.write_text(json.dumps({"org": "org", "step": "users", "key": "bob", "ok": True}) + "\n")
+
+            self.assertIsNone(self._journal_used_by(tmp, []))
+            self.assertIsNone(self._journal_used_by(tmp, ["--apply", "--ignore-journal"]))
+            journal = self._journal_used_by(tmp, ["--apply"])
+            self.assertEqual(journal.path, path)
+            self.assertIsNotNone(journal.confirmed("users", "bob"))
+            self.assertEqual(len(self._journal_used_by(tmp, ["--apply", "--reset-journal"])), 0)
+            self.assertFalse(path.exists())
+
 if __name__ == "__main__":
     unittest.main()
@@ -99,7 +99,7 @@ class DeferredPipelineTest(unittest.TestCase):
             paging_policies={"alice": [{"order": 1, "timeout": 5, "contactType": "push"}]},
         )
         self.client.session.post = mock.MagicMock()
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             self.pipeline.run()
         self.client.session.post.assert_not_called()
         self.assertEqual(self.pipeline.stats["emails"]["created"], 1)
@@ -123,7 +123,7 @@ class DeferredPipelineTest(unittest.TestCase):
         self.client.dry_run = False
         with mock.patch.object(self.client, "get", return_value=(None, 404)):
             with mock.patch.object(self.client, "post", return_value=({}, 200)) as mock_post:
-                with mock.patch.object(self.client.rate_limiter, "wait"):
+                with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                     self.pipeline.run()
 
         self.assertEqual(mock_post.call_count, 2)
@@ -167,7 +167,7 @@ class DeferredPipelineTest(unittest.TestCase):
 
         with mock.patch.object(self.client, "get", return_value=(None, 404)):
             with mock.patch.object(self.client, "post", return_value=({}, 200)) as mock_post:
-                with mock.patch.object(self.client.rate_limiter, "wait"):
+                with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                     self.pipeline.run()
 
         mock_post.assert_called_once_with(
@@ -212,7 +212,7 @@ class DeferredPipelineTest(unittest.TestCase):
 
         with mock.patch.object(self.client, "get", side_effect=fake_get):
             with mock.patch.object(self.client, "post", return_value=({}, 200)) as mock_post:
-                with mock.patch.object(self.client.rate_limiter, "wait"):
+                with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                     self.pipeline.run()
 
         mock_post.assert_any_call(
@@ -241,7 +241,7 @@ class DeferredPipelineTest(unittest.TestCase):
 
         with mock.patch.object(self.client, "get", side_effect=fake_get):
             with mock.patch.object(self.client, "post", return_value=({}, 200)) as mock_post:
-                with mock.patch.object(self.client.rate_limiter, "wait"):
+                with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                     self.pipeline.run()
 
         self.assertFalse(
@@ -257,7 +257,7 @@ class DeferredPipelineTest(unittest.TestCase):
         self.client.dry_run = False
         with mock.patch.object(self.client, "get", return_value=(None, 404)):
             with mock.patch.object(self.client, "post", return_value=({}, 200)) as mock_post:
-                with mock.patch.object(self.client.rate_limiter, "wait"):
+                with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                     self.pipeline.run()
         mock_post.assert_called_once_with(
             "profile/bob-suffix/policies",
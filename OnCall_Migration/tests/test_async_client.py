@@ -0,0 +1,185 @@
+"""Unit tests for utils.async_client (fake aiohttp-style session — no live API calls)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+import requests
+
+from utils.async_client import AsyncVictorOpsClient
+from utils.exceptions import ApiError, NetworkError, TransientError
+from utils.http_client import BaseVictorOpsClient
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
+
+
+class FakeAsyncRaw:
+    def __init__(self, payload: Any, status: int = 200, headers: Dict[str, str] | None = None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = json.dumps(payload)
+
+    async def text(self) -> str:
+        return self._body
+
+    async def __aenter__(self) -> "FakeAsyncRaw":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class FakeAsyncSession:
+    """Minimal aiohttp.ClientSession stand-in: routes GETs through ``responder``."""
+
+    def __init__(self, responder: Callable[[str, Dict[str, Any]], FakeAsyncRaw]):
+        self.responder = responder
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.request_headers: List[Dict[str, str]] = []
+        self.closed = False
+
+    def get(
+        self, url: str, params: Dict[str, Any] | None = None, headers: Dict[str, str] | None = None
+    ) -> FakeAsyncRaw:
+        self.calls.append((url, dict(params or {})))
+        self.request_headers.append(dict(headers or {}))
+        return self.responder(url, dict(params or {}))
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def make_client(session: FakeAsyncSession, **kwargs: Any) -> AsyncVictorOpsClient:
+    return AsyncVictorOpsClient(
+        "https://v1.example",
+        "https://v2.example",
+        {"X-VO-Api-Id": "id"},
+        "org",
+        RateLimiter(rate_hz=1000.0),
+        session_factory=lambda headers, timeout, limit: session,
+        **kwargs,
+    )
+
+
+class AsyncVictorOpsClientTest(unittest.TestCase):
+    def _run(self, client: AsyncVictorOpsClient, *args: Any, **kwargs: Any) -> Any:
+        async def go() -> Any:
+            async with client:
+                return await client.get(*args, **kwargs)
+
+        return asyncio.run(go())
+
+    def test_offset_pagination_merges_pages(self) -> None:
+        def responder(url: str, params: Dict[str, Any]) -> FakeAsyncRaw:
+            offset = params.get("offset", 0)
+            if offset == 0:
+                return FakeAsyncRaw({"users": [{"username": f"u{i}"} for i in range(2)]})
+            return FakeAsyncRaw({"users": [{"username": "u2"}]})
+
+        session = FakeAsyncSession(responder)
+        result = self._run(make_client(session), "user", params={"limit": 2})
+
+        self.assertEqual([u["username"] for u in result], ["u0", "u1", "u2"])
+        self.assertEqual([params["offset"] for _, params in session.calls], [0, 2])
+        self.assertTrue(session.closed)
+
+    def test_multi_list_dict_returned_intact(self) -> None:
+        payload = {"emails": [], "phones": [], "devices": []}
+        session = FakeAsyncSession(lambda url, params: FakeAsyncRaw(payload))
+
+        self.assertEqual(self._run(make_client(session), "user/a/contact-methods"), payload)
+
+    def test_required_404_raises_and_optional_returns_none(self) -> None:
+        session = FakeAsyncSession(lambda url, params: FakeAsyncRaw({}, status=404))
+
+        self.assertIsNone(self._run(make_client(session), "team/x/members"))
+        with self.assertRaises(ApiError):
+            self._run(make_client(session), "alertRules", required=True)
+
+    def test_other_error_status_raises_http_error_like_threaded_client(self) -> None:
+        session = FakeAsyncSession(lambda url, params: FakeAsyncRaw({}, status=403))
+
+        with self.assertRaises(requests.HTTPError) as raised:
+            self._run(make_client(session), "team/x/members")
+        self.assertEqual(raised.exception.response.status_code, 403)
+
+    def test_retries_5xx_then_succeeds(self) -> None:
+        responses = [FakeAsyncRaw({}, status=503), FakeAsyncRaw({"rotations": []})]
+        session = FakeAsyncSession(lambda url, params: responses.pop(0))
+
+        with mock.patch("utils.async_client.asyncio.sleep", new=mock.AsyncMock()) as fake_sleep:
+            result = self._run(make_client(session), "team/x/rotations", use_v2=True, paginate=False)
+
+        self.assertEqual(result, {"rotations": []})
+        self.assertEqual(session.calls[0][0], "https://v2.example/team/x/rotations")
+        fake_sleep.assert_awaited()
+
+    def test_exhausted_retries_and_transport_errors_match_threaded_client(self) -> None:
+        session = FakeAsyncSession(lambda url, params: FakeAsyncRaw({}, status=429))
+        with mock.patch("utils.async_client.asyncio.sleep", new=mock.AsyncMock()):
+            with self.assertRaises(TransientError):
+                self._run(make_client(session, retry_total=1), "team")
+        self.assertEqual(len(session.calls), 2)
+
+        def refuse(url: str, params: Dict[str, Any]) -> FakeAsyncRaw:
+            raise ConnectionRefusedError("refused")
+
+        with self.assertRaises(TransientError):
+            self._run(make_client(FakeAsyncSession(refuse)), "team")
+
+        def deny(url: str, params: Dict[str, Any]) -> FakeAsyncRaw:
+            raise PermissionError("denied")
+
+        with self.assertRaises(NetworkError) as caught:
+            self._run(make_client(FakeAsyncSession(deny)), "team")
+        self.assertNotIsInstance(caught.exception, TransientError)
+
+    def test_from_client_spreads_requests_across_every_key_pair(self) -> None:
+        client = BaseVictorOpsClient(
+            "id-1", "key-1", "org", retry_total=0, retry_backoff=0, allowed_methods=["GET"],
+            rate_hz=1000.0, extra_credentials=[("id-2", "key-2")],
+        )
+        session = FakeAsyncSession(lambda url, params: FakeAsyncRaw({"rotations": []}))
+        async_client = AsyncVictorOpsClient.from_client(
+            client, session_factory=lambda headers, timeout, limit: session
+        )
+
+        async def go() -> None:
+            async with async_client:
+                for i in range(4):
+                    await async_client.get(f"team/t{i}/rotations", paginate=False)
+
+        asyncio.run(go())
+
+        used = [(h["X-VO-Api-Id"], h["X-VO-Api-Key"]) for h in session.request_headers]
+        self.assertEqual(sorted(set(used)), [("id-1", "key-1"), ("id-2", "key-2")])
+        self.assertEqual([entry["requests"] for entry in client.credentials.stats()], [2, 2])
+
+    def test_response_cache_serves_repeat_get_and_revalidates_stale(self) -> None:
+        def responder(url: str, params: Dict[str, Any]) -> FakeAsyncRaw:
+            return FakeAsyncRaw({"teams": [{"slug": "a"}]}, headers={"ETag": '"t1"'})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            session = FakeAsyncSession(responder)
+            cache = ResponseCache(Path(tmp), ttl_seconds=60)
+            first = self._run(make_client(session, response_cache=cache), "team")
+            second = self._run(make_client(session, response_cache=cache), "team")
+            self.assertEqual(first, second)
+            self.assertEqual(len(session.calls), 1)
+
+            cache.ttl_seconds = 0
+            session.responder = lambda url, params: FakeAsyncRaw(None, status=304)
+            third = self._run(make_client(session, response_cache=cache), "team")
+            self.assertEqual(third, first)
+            self.assertEqual(session.request_headers[-1], {"If-None-Match": '"t1"'})
+            self.assertEqual(cache.stats()["revalidated"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
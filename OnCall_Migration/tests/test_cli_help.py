@@ -9,6 +9,7 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 PIPELINE_SCRIPTS = (
     "discovery.py",
+    "multi_org_discovery.py",
     "validate_inventory.py",
     "generate_remapping.py",
     "validate_apply.py",
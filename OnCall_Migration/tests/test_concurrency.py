@@ -0,0 +1,152 @@
+"""Unit tests for utils.concurrency."""
+
+from __future__ import annotations
+
+import threading
+import unittest
+
+from utils.concurrency import DEFAULT_MAX_TIMEOUT, MIN_SAMPLES, MIN_TIMEOUT, AdaptiveConcurrency
+
+
+def _complete(limiter: AdaptiveConcurrency, latency: float, limiter_wait: float = 0.0) -> None:
+    """Fill every slot, finish one timed request on the full pool, then free the rest untimed."""
+    slots = int(limiter.limit)
+    for _ in range(slots):
+        limiter.acquire()
+    limiter.release(latency, True, limiter_wait)
+    for _ in range(slots - 1):
+        limiter.release(None, True)
+
+
+class AdaptiveConcurrencyTest(unittest.TestCase):
+    def test_grows_about_one_slot_per_window_when_saturated(self) -> None:
+        limiter = AdaptiveConcurrency(initial=4, max_limit=16)
+
+        for _ in range(5):
+            _complete(limiter, 0.05)
+
+        self.assertEqual(int(limiter.limit), 5)
+        self.assertEqual(limiter.increases, 1)
+        self.assertEqual(limiter.stats()["highest"], 5)
+
+    def test_never_exceeds_max_limit(self) -> None:
+        limiter = AdaptiveConcurrency(initial=4, max_limit=6)
+
+        for _ in range(200):
+            _complete(limiter, 0.05)
+
+        self.assertEqual(int(limiter.limit), 6)
+
+    def test_does_not_grow_when_rate_limiter_is_the_bottleneck(self) -> None:
+        limiter = AdaptiveConcurrency(initial=4)
+
+        for _ in range(50):
+            _complete(limiter, 0.05, limiter_wait=0.2)
+
+        self.assertEqual(int(limiter.limit), 4)
+        self.assertEqual(limiter.increases, 0)
+
+    def test_does_not_grow_when_pool_is_not_full(self) -> None:
+        limiter = AdaptiveConcurrency(initial=4)
+
+        for _ in range(50):
+            limiter.acquire()
+            limiter.release(0.05, True)
+
+        self.assertEqual(int(limiter.limit), 4)
+
+    def test_error_halves_limit_once_per_window(self) -> None:
+        limiter = AdaptiveConcurrency(initial=8)
+
+        for _ in range(3):
+            limiter.acquire()
+        for _ in range(3):
+            limiter.release(None, False)
+
+        self.assertEqual(int(limiter.limit), 4)
+        self.assertEqual(limiter.decreases, 1)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(0.05, True)
+        limiter.acquire()
+        limiter.release(None, False)
+
+        self.assertEqual(int(limiter.limit), 2)
+        self.assertEqual(limiter.stats()["lowest"], 2)
+
+    def test_does_not_drop_below_min_limit(self) -> None:
+        limiter = AdaptiveConcurrency(initial=2, min_limit=2)
+
+        for _ in range(10):
+            limiter.acquire()
+            limiter.release(None, False)
+
+        self.assertEqual(int(limiter.limit), 2)
+
+    def test_rising_latency_shrinks_limit(self) -> None:
+        limiter = AdaptiveConcurrency(initial=10)
+        for _ in range(MIN_SAMPLES):
+            limiter.acquire()
+            limiter.release(0.05, True)
+
+        # The first slow response decreases; the rest of that window reports the same congestion.
+        for _ in range(9):
+            limiter.acquire()
+            limiter.release(0.5, True)
+
+        self.assertEqual(int(limiter.limit), 9)
+        self.assertEqual(limiter.decreases, 1)
+
+    def test_timeout_follows_p99_within_bounds(self) -> None:
+        limiter = AdaptiveConcurrency(max_timeout=20.0)
+        self.assertEqual(limiter.timeout(), 20.0)
+
+        for _ in range(MIN_SAMPLES):
+            limiter.acquire()
+            limiter.release(0.1, True)
+        self.assertEqual(limiter.timeout(), MIN_TIMEOUT)
+
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(4.0, True)
+        self.assertEqual(limiter.timeout(), 12.0)
+
+        for _ in range(100):
+            limiter.acquire()
+            limiter.release(60.0, True)
+        self.assertEqual(limiter.timeout(), 20.0)
+        self.assertEqual(AdaptiveConcurrency().max_timeout, DEFAULT_MAX_TIMEOUT)
+
+    def test_timeout_is_per_endpoint_when_keyed(self) -> None:
+        limiter = AdaptiveConcurrency(max_timeout=30.0)
+        for _ in range(200):
+            limiter.acquire()
+            limiter.release(0.1, True, key="v1/user/{u}/contact-methods")
+        for _ in range(MIN_SAMPLES):
+            limiter.acquire()
+            limiter.release(8.0, True, key="v1/user")
+
+        self.assertEqual(limiter.timeout("v1/user/{u}/contact-methods"), MIN_TIMEOUT)
+        self.assertEqual(limiter.timeout("v1/user"), 24.0)
+        self.assertEqual(limiter.timeout("v1/team"), 30.0)
+
+    def test_acquire_blocks_until_a_slot_is_released(self) -> None:
+        limiter = AdaptiveConcurrency(initial=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def second() -> None:
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(0.01, True)
+        self.assertTrue(acquired.wait(1.0))
+        thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
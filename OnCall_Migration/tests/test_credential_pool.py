@@ -0,0 +1,107 @@
+"""Unit tests for utils.credential_pool and multi-key discovery clients."""
+
+from __future__ import annotations
+
+import unittest
+
+import requests
+
+from benchmarks.simulator import SimulatedOrg, VictorOpsSimulator
+from discovery import VictorOpsClient
+from utils.credential_pool import ApiCredential, CredentialPool
+from utils.rate_limiter import RateLimiter
+
+
+def _credential(api_id: str) -> ApiCredential:
+    return ApiCredential(api_id, requests.Session(), RateLimiter(rate_hz=2.0))
+
+
+class CredentialPoolTest(unittest.TestCase):
+    def test_spreads_requests_across_keys_by_rate_budget(self) -> None:
+        pool = CredentialPool([_credential("key-aaaa"), _credential("key-bbbb"), _credential("key-cccc")])
+
+        chosen = []
+        for _ in range(6):
+            credential = pool.acquire()
+            credential.rate_limiter._reserve()
+            chosen.append(credential.api_id)
+            pool.release(credential)
+
+        self.assertEqual(sorted(set(chosen)), ["key-aaaa", "key-bbbb", "key-cccc"])
+        self.assertEqual([entry["requests"] for entry in pool.stats()], [2, 2, 2])
+
+    def test_throttled_key_loses_its_load_to_the_others(self) -> None:
+        first, second = _credential("key-aaaa"), _credential("key-bbbb")
+        pool = CredentialPool([first, second])
+        first.rate_limiter.backoff(30.0)
+
+        chosen = []
+        for _ in range(5):
+            credential = pool.acquire()
+            credential.rate_limiter._reserve()
+            chosen.append(credential.api_id)
+            pool.release(credential)
+
+        self.assertEqual(chosen, ["key-bbbb"] * 5)
+        self.assertEqual(pool.stats()[0]["throttled"], 1)
+
+    def test_ties_go_to_key_with_fewest_requests_in_flight(self) -> None:
+        pool = CredentialPool([_credential("key-aaaa"), _credential("key-bbbb")])
+        pool._credentials[0].rate_limiter.delay = 0.0
+        pool._credentials[1].rate_limiter.delay = 0.0
+
+        held = pool.acquire()
+        self.assertEqual(pool.acquire().api_id, "key-bbbb")
+        pool.release(held)
+        # Both idle again: the key that has sent fewer requests goes next.
+        pool.release(pool._credentials[1])
+        pool._credentials[1].requests += 1
+        self.assertEqual(pool.acquire().api_id, "key-aaaa")
+
+    def test_rate_hz_adds_key_budgets(self) -> None:
+        pool = CredentialPool([_credential("a"), _credential("b"), _credential("c")])
+        self.assertAlmostEqual(pool.rate_hz(), 6.0)
+        pool._credentials[1].rate_limiter.delay = 0.0
+        self.assertEqual(pool.rate_hz(), 0.0)
+
+    def test_stats_show_only_id_suffix(self) -> None:
+        pool = CredentialPool([_credential("secret-app-id-1234")])
+        self.assertEqual(pool.stats()[0]["api_id"], "...1234")
+
+    def test_needs_a_credential(self) -> None:
+        with self.assertRaises(ValueError):
+            CredentialPool([])
+
+
+class MultiKeyClientTest(unittest.TestCase):
+    def test_each_key_has_its_own_session_headers_and_limiter(self) -> None:
+        client = VictorOpsClient("id-1", "key-1", "org", extra_credentials=[("id-2", "key-2")])
+        first, second = list(client.credentials)
+
+        self.assertIs(first.session, client.session)
+        self.assertIs(first.rate_limiter, client.rate_limiter)
+        self.assertEqual(second.session.headers["X-VO-Api-Id"], "id-2")
+        self.assertEqual(second.session.headers["X-VO-Api-Key"], "key-2")
+        retry = second.session.get_adapter("https://api.victorops.com").max_retries
+        self.assertIs(retry.rate_limiter, second.rate_limiter)
+        self.assertIsNot(second.rate_limiter, first.rate_limiter)
+        self.assertEqual(client.concurrency_limit.max_limit, 32)
+
+    def test_requests_are_sent_with_every_key(self) -> None:
+        org = SimulatedOrg.synthetic(users=20)
+        with VictorOpsSimulator(org) as sim:
+            client = sim.attach(
+                VictorOpsClient("id-1", "key-1", "org", extra_credentials=[("id-2", "key-2"), ("id-3", "key-3")])
+            )
+            for credential in client.credentials:
+                credential.rate_limiter.delay = 0.05
+            for username in list(org.users)[:9]:
+                client.get(f"user/{username}/contact-methods")
+
+        per_key = [entry["requests"] for entry in client.request_metrics()["credentials"]]
+        self.assertEqual(per_key, [3, 3, 3])
+        self.assertEqual(client.connection_stats()["pools"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Unit tests for utils/delta.py."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.delta import DeltaBaseline
+from utils.exceptions import MigrationError
+
+
+def write_inventory(directory: Path, **files: object) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, data in files.items():
+        (directory / f"{name}.json").write_text(json.dumps(data))
+
+
+class DeltaBaselineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.previous = Path(self._tmp.name)
+        write_inventory(
+            self.previous,
+            users_inventory=[{"username": "alice"}],
+            teams_inventory=[{"slug": "team-a", "memberCount": 1}],
+            escalation_policies_inventory={"team-a": [{"policy": {"slug": "pol-a", "name": "A"}}]},
+            team_members_inventory={"team-a": {"members": [{"username": "alice"}]}},
+            escalation_policy_details_inventory={"pol-a": {"steps": []}},
+            discovery_metadata={"exported_at": "2026-01-01T00:00:00+00:00"},
+        )
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_missing_listing_files_raise(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(MigrationError):
+                DeltaBaseline(Path(tmp))
+
+    def test_unchanged_summary_carries_previous_data(self) -> None:
+        delta = DeltaBaseline(self.previous)
+        delta.observe_listing("team", [{"memberCount": 1, "slug": "team-a"}])
+        self.assertEqual(
+            delta.carry_over("team/{}/members", "team", "team-a"),
+            (True, {"members": [{"username": "alice"}]}),
+        )
+        # No previous data for admins -> fetch.
+        self.assertEqual(delta.carry_over("team/{}/admins", "team", "team-a"), (False, None))
+        # Schedules are never carried over.
+        self.assertEqual(delta.carry_over("team/{}/oncall/schedule", "team", "team-a"), (False, None))
+
+    def test_changed_new_and_unlisted_entities_are_fetched(self) -> None:
+        delta = DeltaBaseline(self.previous)
+        delta.observe_listing("team", [{"slug": "team-a", "memberCount": 2}, {"slug": "team-b"}])
+        self.assertEqual(delta.status("team", "team-a"), "changed")
+        self.assertEqual(delta.status("team", "team-b"), "new")
+        self.assertEqual(delta.carry_over("team/{}/members", "team", "team-a"), (False, None))
+        # Policy listing not observed yet: never trust the old details.
+        self.assertEqual(delta.carry_over("policies/{}", "policy", "pol-a"), (False, None))
+        delta.observe_listing("policy", [{"policy": {"slug": "pol-a", "name": "A"}}])
+        self.assertEqual(delta.carry_over("policies/{}", "policy", "pol-a"), (True, {"steps": []}))
+
+    def test_manifest_lists_every_entity_status(self) -> None:
+        delta = DeltaBaseline(self.previous)
+        delta.observe_listing("user", [{"username": "bob"}])
+        delta.observe_listing("team", [{"slug": "team-a", "memberCount": 1}])
+        delta.record_endpoint("team/{}/members", carried_over=1, fetched=0)
+
+        manifest = delta.manifest()
+        self.assertEqual(manifest["previous_exported_at"], "2026-01-01T00:00:00+00:00")
+        self.assertEqual(manifest["entities"]["user"], {"alice": "removed", "bob": "new"})
+        self.assertEqual(manifest["summary"]["team"]["unchanged"], 1)
+        self.assertEqual(manifest["endpoints"], {"team/{}/members": {"carried_over": 1, "fetched": 0}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import tempfile
+import threading
 import unittest
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,15 +16,30 @@ os.environ.setdefault("SOURCE_SPLUNK_ONCALL_API_ID", "test-id")
 os.environ.setdefault("SOURCE_SPLUNK_ONCALL_API_KEY", "test-key")
 os.environ.setdefault("SOURCE_SPLUNK_ONCALL_ORG_SLUG", "test-org")
 
-from discovery import DiscoveryPipeline, VictorOpsClient
-from utils.exceptions import ApiError
+from discovery import (
+    CHECKPOINT_JOURNAL,
+    PER_ENTITY_WORKERS,
+    AsyncDiscoveryPipeline,
+    DiscoveryPipeline,
+    VictorOpsClient,
+)
+from tests.test_async_client import FakeAsyncRaw, FakeAsyncSession
+from utils.async_client import AsyncVictorOpsClient
+from utils.delta import DeltaBaseline
+from utils.exceptions import ApiError, TransientError
+from utils.inventory_store import STORE_FILENAME
+from utils.io import load_inventory, load_json
+from utils.journal import FetchJournal
+from utils.response_cache import ResponseCache
+from utils.retry_queue import RetryQueue
 
 
 class FakeResponse:
-    def __init__(self, payload: object, status_code: int = 200):
+    def __init__(self, payload: object, status_code: int = 200, headers: dict | None = None):
         self.status_code = status_code
         self._payload = payload
         self.text = json.dumps(payload)
+        self.headers = headers or {}
 
     def json(self) -> object:
         return self._payload
@@ -44,7 +61,7 @@ class VictorOpsClientTest(unittest.TestCase):
         }
         self.client.session.get = mock.MagicMock(return_value=FakeResponse(payload))
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             result = self.client.get("user/alice/contact-methods")
 
         self.assertIsInstance(result, dict)
@@ -53,20 +70,99 @@ class VictorOpsClientTest(unittest.TestCase):
     def test_get_required_404_raises(self) -> None:
         self.client.session.get = mock.MagicMock(return_value=FakeResponse({}, status_code=404))
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             with self.assertRaises(ApiError):
                 self.client.get("alertRules", required=True)
 
+    def test_get_retryable_status_raises_transient_error(self) -> None:
+        self.client.session.get = mock.MagicMock(return_value=FakeResponse({}, status_code=503))
+
+        with self.assertLogs("discovery", level="WARNING"), self.assertRaises(TransientError):
+            self.client.get("users")
+
+    def test_rate_hz_applies_to_every_credential(self) -> None:
+        client = VictorOpsClient("id", "key", "org", rate_hz=0.5, extra_credentials=[("id-2", "key-2")])
+        self.assertEqual([c.rate_limiter.delay for c in client.credentials], [2.0, 2.0])
+        self.assertEqual(client.rate_limiter.burst, PER_ENTITY_WORKERS)
+        self.assertEqual(VictorOpsClient("id", "key", "org", rate_hz=0).credentials.rate_hz(), 0.0)
+
     def test_get_paginate_false_returns_rotation_dict(self) -> None:
         payload = {"rotations": [{"name": "primary"}]}
         self.client.session.get = mock.MagicMock(return_value=FakeResponse(payload))
 
-        with mock.patch.object(self.client.rate_limiter, "wait"):
+        with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
             result = self.client.get("team/team-a/rotations", use_v2=True, paginate=False)
 
         self.assertEqual(result, payload)
 
 
+class VictorOpsClientPrefetchTest(unittest.TestCase):
+    def _paged_get(self, total: int, gate: threading.Event | None = None):
+        def session_get(url, params=None, timeout=30):
+            offset = params.get("offset", 0)
+            if gate is not None and offset == 100:
+                # Page 2 only answers once page 3 was requested alongside it.
+                self.assertTrue(gate.wait(timeout=5), "offset pages were not fetched concurrently")
+            if gate is not None and offset == 200:
+                gate.set()
+            users = [{"username": f"u{i}"} for i in range(offset, min(offset + 100, total))]
+            return FakeResponse({"users": users})
+
+        return mock.MagicMock(side_effect=session_get)
+
+    def test_offset_pages_are_prefetched_concurrently_and_merged_in_order(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = self._paged_get(total=350, gate=threading.Event())
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            users = client.get("user")
+
+        self.assertEqual([u["username"] for u in users], [f"u{i}" for i in range(350)])
+        offsets = sorted(c.kwargs["params"]["offset"] for c in client.session.get.call_args_list)
+        # The window slides as pages merge, so a few offsets past the last page
+        # (300) may be requested before its short page is seen; never more than
+        # the window allows.
+        self.assertEqual(offsets[:4], [0, 100, 200, 300])
+        self.assertLessEqual(len([offset for offset in offsets if offset > 300]), client.page_prefetch)
+
+    def test_single_page_listing_is_not_speculated(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = self._paged_get(total=40)
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            users = client.get("user")
+
+        self.assertEqual(len(users), 40)
+        self.assertEqual(client.session.get.call_count, 1)
+
+    def test_prefetch_disabled_walks_offsets_serially(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org", page_prefetch=1)
+        client.session.get = self._paged_get(total=200)
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            users = client.get("user")
+
+        self.assertEqual(len(users), 200)
+        offsets = [c.kwargs["params"]["offset"] for c in client.session.get.call_args_list]
+        self.assertEqual(offsets, [0, 100, 200])
+
+    def test_next_page_links_are_followed_without_speculation(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        pages = {
+            "https://api.victorops.com/api-public/v1/user": FakeResponse(
+                {"users": [{"username": f"u{i}"} for i in range(100)], "nextPage": "/user?page=2"}
+            ),
+            "https://api.victorops.com/api-public/v1/user?page=2": FakeResponse({"users": [{"username": "last"}]}),
+        }
+        client.session.get = mock.MagicMock(side_effect=lambda url, params=None, timeout=30: pages[url])
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            users = client.get("user")
+
+        self.assertEqual(len(users), 101)
+        self.assertEqual(client.session.get.call_count, 2)
+
+
 class DiscoveryPipelineTest(unittest.TestCase):
     def setUp(self) -> None:
         self.client = VictorOpsClient("test-id", "test-key", "test-org")
@@ -162,6 +258,42 @@ class DiscoveryPipelineTest(unittest.TestCase):
         )
         self.assertEqual(results["team-a"], {"rotations": [{"name": "primary"}]})
 
+    def test_fetch_per_entity_concurrent_defers_transient_failures(self) -> None:
+        users = [{"username": "alice"}, {"username": "bob"}]
+        attempts = {"alice": 0, "bob": 0}
+
+        def flaky_get(endpoint, use_v2=False, paginate=True):
+            username = endpoint.split("/")[1]
+            attempts[username] += 1
+            if username == "alice" and attempts[username] < 3:
+                raise TransientError("HTTP 503")
+            return {"devices": [], "emails": [], "phones": []}
+
+        self.client.get = mock.MagicMock(side_effect=flaky_get)
+        self.pipeline._new_retry_queue = lambda: RetryQueue(
+            self.pipeline.circuit_breaker, base_delay=0.0
+        )
+
+        results = self.pipeline.fetch_per_entity_concurrent(
+            users, "username", lambda u: f"user/{u}/contact-methods", "user"
+        )
+
+        self.assertEqual(set(results), {"alice", "bob"})
+        self.assertEqual(attempts, {"alice": 3, "bob": 1})
+        self.assertEqual(self.pipeline.retry_stats, {"deferred": 1, "retries": 2, "recovered": 1})
+
+    def test_fetch_per_entity_concurrent_raises_when_retries_exhausted(self) -> None:
+        self.client.get = mock.MagicMock(side_effect=TransientError("HTTP 503"))
+        self.pipeline._new_retry_queue = lambda: RetryQueue(
+            self.pipeline.circuit_breaker, max_attempts=2, base_delay=0.0
+        )
+
+        with self.assertRaises(TransientError):
+            self.pipeline.fetch_per_entity_concurrent(
+                [{"username": "alice"}], "username", lambda u: f"user/{u}/contact-methods", "user"
+            )
+        self.assertEqual(self.client.get.call_count, 2)
+
     def test_run_scoped_saves_filtered_inventory_and_metadata(self) -> None:
         with tempfile.TemporaryDirectory() as tmp:
             output_dir = Path(tmp)
@@ -263,7 +395,7 @@ class DiscoveryPipelineTest(unittest.TestCase):
 
             self.client.get = mock.MagicMock(side_effect=fake_get)
 
-            with mock.patch.object(self.client.rate_limiter, "wait"):
+            with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                 pipeline.run()
 
             users = json.loads((output_dir / "users_inventory.json").read_text())
@@ -282,6 +414,8 @@ class DiscoveryPipelineTest(unittest.TestCase):
             self.assertEqual([rule["id"] for rule in alert_rules], [1])
             self.assertEqual(metadata["scope"]["teams"], ["team-a"])
             self.assertIn("pol-a", metadata["scope"]["expanded_policies"])
+            self.assertIn("saved_seconds", metadata["scheduler"])
+            self.assertIn("policy_closure", metadata["scheduler"]["tasks"])
 
             member_calls = [
                 call.args[0]
@@ -371,7 +505,7 @@ class DiscoveryPipelineTest(unittest.TestCase):
 
             self.client.get = mock.MagicMock(side_effect=fake_get)
 
-            with mock.patch.object(self.client.rate_limiter, "wait"):
+            with mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
                 pipeline.run()
 
             teams = json.loads((output_dir / "teams_inventory.json").read_text())
@@ -392,5 +526,464 @@ class DiscoveryPipelineTest(unittest.TestCase):
             self.assertEqual({rule["id"] for rule in alert_rules}, {1, 2})
 
 
+class ScopedPolicyClosureTest(unittest.TestCase):
+    def test_multi_hop_closure_is_fetched_and_added_teams_start_while_it_expands(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        pipeline = DiscoveryPipeline(client, Path("inventory"), requested_team_slugs=["team-a"])
+        chain = ["pol-a", "pol-b", "pol-c", "pol-d"]
+        all_teams = [{"slug": f"team-{slug[-1]}"} for slug in chain]
+        policies_list = [{"policy": {"slug": slug}, "team": {"slug": f"team-{slug[-1]}"}} for slug in chain]
+        team_b_started = threading.Event()
+
+        def fake_get(endpoint, params=None, use_v2=False, paginate=True, required=False):
+            if endpoint == "team/team-b/members":
+                team_b_started.set()
+            if endpoint.startswith("team/"):
+                return {endpoint.split("/")[-1]: [{"username": endpoint.split("/")[1]}]}
+            slug = endpoint.split("/")[1]
+            if slug == "pol-c":
+                # pol-c is two hops out; team-b (added by pol-b) must not wait for it.
+                self.assertTrue(team_b_started.wait(timeout=5), "added team waited for the closure")
+            index = chain.index(slug)
+            entries = [{"executionType": "user", "user": {"username": f"u-{slug}"}}]
+            if index + 1 < len(chain):
+                entries.append({"executionType": "policy_routing", "targetPolicy": {"policySlug": chain[index + 1]}})
+            return [{"timeout": 0, "entries": entries}]
+
+        client.get = mock.MagicMock(side_effect=fake_get)
+
+        closure = pipeline._scoped_policy_closure(policies_list, all_teams)
+
+        self.assertEqual(list(closure["details"]), chain)
+        self.assertEqual(closure["policies"], set(chain))
+        self.assertEqual(closure["teams"], {"team-a", "team-b", "team-c", "team-d"})
+        self.assertEqual(list(closure["members"]), ["team-b", "team-c", "team-d"])
+        self.assertEqual(set(closure["rotations"]), {"team-b", "team-c", "team-d"})
+        fetched = [call.args[0] for call in client.get.call_args_list]
+        self.assertEqual(sorted(slug for slug in fetched if slug.startswith("policies/")), [f"policies/{s}" for s in chain])
+        self.assertNotIn("team/team-a/members", fetched)
+
+
+FULL_ORG_PAYLOADS = {
+    "user": {"users": [{"username": name} for name in ("carol", "alice", "bob")]},
+    "team": {"teams": [{"slug": slug, "name": slug.upper()} for slug in ("team-b", "team-a")]},
+    "org/routing-keys": {"routingKeys": [{"routingKey": "ALPHA", "targets": []}]},
+    "alertRules": {"rules": [{"id": 2, "rank": 2}, {"id": 1, "rank": 1}]},
+    "webhooks": {"webhooks": []},
+    "overrides": {"overrides": []},
+    "policies": {
+        "policies": [
+            {"policy": {"slug": "pol-b"}, "team": {"slug": "team-b"}},
+            {"policy": {"slug": "pol-a"}, "team": {"slug": "team-a"}},
+        ]
+    },
+}
+
+
+def full_org_payload(endpoint: str) -> object:
+    if endpoint in FULL_ORG_PAYLOADS:
+        return FULL_ORG_PAYLOADS[endpoint]
+    parts = endpoint.split("/")
+    if endpoint.endswith("/contact-methods"):
+        return {"devices": [], "emails": [{"value": f"{parts[1]}@example.com"}], "phones": []}
+    if parts[0] == "user" and endpoint.endswith("/policies"):
+        return {"policies": [{"order": 0, "contactType": "email", "user": parts[1]}]}
+    if endpoint.endswith("/members") or endpoint.endswith("/admins"):
+        return {parts[-1]: [{"username": "alice"}]}
+    if endpoint.endswith("/rotations"):
+        return {"rotations": [{"label": parts[1]}]}
+    if endpoint.endswith("/oncall/schedule"):
+        return {"schedules": [{"team": parts[1]}]}
+    if parts[0] == "policies":
+        return [{"timeout": 0, "entries": [{"executionType": "user", "user": {"username": "bob"}}]}]
+    return None
+
+
+def endpoint_from_url(url: str) -> str:
+    for base in (VictorOpsClient.BASE_V2, VictorOpsClient.BASE_V1):
+        if url.startswith(base):
+            return url[len(base) + 1:]
+    return url
+
+
+def full_org_session_get(url, params=None, timeout=30):
+    payload = full_org_payload(endpoint_from_url(url))
+    return FakeResponse(payload, status_code=200 if payload is not None else 404)
+
+
+class DiscoveryPipelineRunTest(unittest.TestCase):
+    def test_full_run_writes_every_inventory_and_scheduler_timing(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        with tempfile.TemporaryDirectory() as tmp:
+            output_dir = Path(tmp)
+            pipeline = DiscoveryPipeline(client, output_dir)
+            with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+                counts = pipeline.run()
+
+            metadata = json.loads((output_dir / "discovery_metadata.json").read_text())
+            details = json.loads((output_dir / "escalation_policy_details_inventory.json").read_text())
+
+        self.assertEqual(counts["users_inventory"], 3)
+        self.assertEqual(counts["contact_methods_inventory"], 3)
+        self.assertEqual(counts["schedules_inventory"], 2)
+        self.assertEqual(list(details), ["pol-a", "pol-b"])
+        self.assertEqual(list(metadata["inventory_counts"]), sorted(metadata["inventory_counts"]))
+        self.assertIn("contact_methods_inventory", metadata["scheduler"]["tasks"])
+        # Every phase the listings planned was matched when it started, so the ETA's total was the run's.
+        self.assertEqual(pipeline.progress.planned, {})
+        self.assertEqual(pipeline.progress.total, pipeline.progress.done)
+
+    def test_plan_counts_every_call_a_run_sends_without_writing_inventory(self) -> None:
+        for teams in (None, ["team-a"]):
+            with self.subTest(teams=teams), tempfile.TemporaryDirectory() as tmp:
+                sent = {}
+                for mode in ("plan", "run"):
+                    client = VictorOpsClient("test-id", "test-key", "test-org")
+                    client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+                    pipeline = DiscoveryPipeline(client, Path(tmp) / mode, requested_team_slugs=teams)
+                    with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+                        result = getattr(pipeline, mode)()
+                    sent[mode] = client.session.get.call_count
+                    if mode == "plan":
+                        plan = result
+                written = sorted(path.name for path in (Path(tmp) / "plan").iterdir())
+
+            self.assertEqual(written, ["discovery_plan.json"])
+            self.assertEqual(plan["total_calls"], sent["run"])
+            self.assertEqual(plan["per_entity"]["v1/user/{u}/contact-methods"], 3 if teams is None else 2)
+            estimate = plan["estimate"]
+            self.assertEqual(estimate["rate_hz"], 2.0)
+            self.assertAlmostEqual(
+                estimate["estimated_seconds"], plan["total_calls"] / estimate["throughput_per_second"], places=0
+            )
+
+    def test_scoped_run_unknown_team_exits(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = DiscoveryPipeline(client, Path(tmp), requested_team_slugs=["team-zzz"])
+            with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+                with self.assertRaises(SystemExit):
+                    pipeline.run()
+
+
+class DiscoveryEngineParityTest(unittest.TestCase):
+    def _run_threads(self, output_dir: Path) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            DiscoveryPipeline(client, output_dir).run()
+
+    def _run_async(self, output_dir: Path) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+
+        def responder(url, params):
+            payload = full_org_payload(endpoint_from_url(url))
+            return FakeAsyncRaw(payload, status=200 if payload is not None else 404)
+
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        session = FakeAsyncSession(responder)
+        pipeline = AsyncDiscoveryPipeline(
+            client,
+            output_dir,
+            concurrency=3,
+            async_client_factory=lambda: AsyncVictorOpsClient.from_client(
+                client, concurrency=3, session_factory=lambda headers, timeout, limit: session
+            ),
+        )
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                mock.patch.object(client.rate_limiter, "wait_async", new=mock.AsyncMock(return_value=0.0)):
+            pipeline.run()
+        self.assertTrue(any("/contact-methods" in url for url, _ in session.calls))
+
+    def test_async_engine_output_matches_threaded_engine(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            threads_dir = Path(tmp) / "threads"
+            async_dir = Path(tmp) / "async"
+            self._run_threads(threads_dir)
+            self._run_async(async_dir)
+
+            inventory_files = sorted(p.name for p in threads_dir.glob("*_inventory.json"))
+            self.assertIn("contact_methods_inventory.json", inventory_files)
+            self.assertEqual(inventory_files, sorted(p.name for p in async_dir.glob("*_inventory.json")))
+            for name in inventory_files:
+                with self.subTest(file=name):
+                    self.assertEqual(
+                        (threads_dir / name).read_bytes(), (async_dir / name).read_bytes()
+                    )
+
+            members = json.loads((threads_dir / "team_members_inventory.json").read_text())
+            self.assertEqual(list(members), ["team-b", "team-a"])
+
+    def test_async_engine_defers_and_retries_transient_failures(self) -> None:
+        failed = []
+
+        def responder(url, params):
+            if "/contact-methods" in url and not failed:
+                failed.append(url)
+                return FakeAsyncRaw({}, status=503)
+            payload = full_org_payload(endpoint_from_url(url))
+            return FakeAsyncRaw(payload, status=200 if payload is not None else 404)
+
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        session = FakeAsyncSession(responder)
+        with tempfile.TemporaryDirectory() as tmp:
+            threads_dir = Path(tmp) / "threads"
+            self._run_threads(threads_dir)
+            pipeline = AsyncDiscoveryPipeline(
+                client,
+                Path(tmp) / "async",
+                async_client_factory=lambda: AsyncVictorOpsClient.from_client(
+                    client, retry_total=0, session_factory=lambda headers, timeout, limit: session
+                ),
+            )
+            pipeline._new_retry_queue = lambda: RetryQueue(pipeline.circuit_breaker, base_delay=0.0)
+            with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                    mock.patch.object(client.rate_limiter, "wait_async", new=mock.AsyncMock(return_value=0.0)):
+                pipeline.run()
+
+            self.assertEqual(len(failed), 1)
+            self.assertEqual(pipeline.retry_stats["recovered"], 1)
+            name = "contact_methods_inventory.json"
+            self.assertEqual((threads_dir / name).read_bytes(), (Path(tmp) / "async" / name).read_bytes())
+
+    def test_async_engine_shares_one_client_and_limit_across_phases(self) -> None:
+        in_flight = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        class SlowRaw(FakeAsyncRaw):
+            async def text(self) -> str:
+                with lock:
+                    in_flight["now"] += 1
+                    in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+                await asyncio.sleep(0.005)
+                with lock:
+                    in_flight["now"] -= 1
+                return await super().text()
+
+        def responder(url, params):
+            payload = full_org_payload(endpoint_from_url(url))
+            return SlowRaw(payload, status=200 if payload is not None else 404)
+
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        session = FakeAsyncSession(responder)
+        opened = []
+
+        def factory() -> AsyncVictorOpsClient:
+            opened.append(1)
+            return AsyncVictorOpsClient.from_client(
+                client, concurrency=2, session_factory=lambda headers, timeout, limit: session
+            )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = AsyncDiscoveryPipeline(client, Path(tmp), concurrency=2, async_client_factory=factory)
+            with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                    mock.patch.object(client.rate_limiter, "wait_async", new=mock.AsyncMock(return_value=0.0)):
+                pipeline.run()
+
+        self.assertEqual(len(opened), 1)
+        self.assertTrue(session.closed)
+        self.assertGreater(len(session.calls), 2)
+        self.assertLessEqual(in_flight["peak"], 2)
+
+
+class DiscoveryOutputFormatTest(unittest.TestCase):
+    def _run(self, output_dir: Path, output_format: str) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            DiscoveryPipeline(client, output_dir, output_format=output_format).run()
+
+    def test_compact_and_ndjson_load_back_like_json(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            dirs = {fmt: Path(tmp) / fmt for fmt in ("json", "compact", "ndjson")}
+            for fmt, output_dir in dirs.items():
+                self._run(output_dir, fmt)
+
+            self.assertFalse((dirs["json"] / ".shards").exists())
+            names = sorted(p.name for p in dirs["json"].glob("*_inventory.json"))
+            self.assertIn("contact_methods_inventory.json", names)
+            for name in names:
+                expected = load_json(dirs["json"] / name)
+                for fmt in ("compact", "ndjson"):
+                    with self.subTest(file=name, output_format=fmt):
+                        self.assertEqual(load_json(dirs[fmt] / name), expected)
+            self.assertTrue(
+                (dirs["ndjson"] / "contact_methods_inventory.json").read_text().startswith('{"__ndjson__"')
+            )
+            metadata = json.loads((dirs["ndjson"] / "discovery_metadata.json").read_text())
+            self.assertEqual(metadata["inventory_counts"]["users_inventory"], 3)
+            contact_methods = metadata["request_metrics"]["endpoints"]["GET v1/user/{u}/contact-methods"]
+            self.assertEqual(contact_methods["requests"], 3)
+            self.assertEqual(contact_methods["statuses"], {"200": 3})
+
+    def test_sqlite_store_serves_the_same_documents(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            json_dir = Path(tmp) / "json"
+            sqlite_dir = Path(tmp) / "sqlite"
+            self._run(json_dir, "json")
+            client = VictorOpsClient("test-id", "test-key", "test-org")
+            client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+            with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+                DiscoveryPipeline(client, sqlite_dir, store="sqlite").run()
+
+            self.assertTrue((sqlite_dir / STORE_FILENAME).exists())
+            self.assertFalse((sqlite_dir / f"{STORE_FILENAME}.tmp").exists())
+            self.assertEqual(list(sqlite_dir.glob("*_inventory.json")), [])
+            for path in json_dir.glob("*_inventory.json"):
+                with self.subTest(file=path.name):
+                    self.assertEqual(load_inventory(sqlite_dir, path.stem), load_json(path))
+            metadata = load_json(sqlite_dir / "discovery_metadata.json")
+            self.assertEqual(metadata["store"], {"mode": "sqlite", "path": STORE_FILENAME})
+            self.assertIn("## Users (3)", (sqlite_dir / "inventory_summary.md").read_text())
+
+            # A later JSON-only run drops the now-stale store.
+            self._run(sqlite_dir, "json")
+            self.assertFalse((sqlite_dir / STORE_FILENAME).exists())
+
+
+class DiscoveryResumeTest(unittest.TestCase):
+    def _client(self, fail_on: str = "") -> VictorOpsClient:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+
+        def session_get(url, params=None, timeout=30):
+            if fail_on and fail_on in url:
+                raise KeyboardInterrupt
+            return full_org_session_get(url, params=params, timeout=timeout)
+
+        client.session.get = mock.MagicMock(side_effect=session_get)
+        return client
+
+    def test_resumed_run_reuses_journal_and_matches_clean_run(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            clean_dir = Path(tmp) / "clean"
+            resumed_dir = Path(tmp) / "resumed"
+
+            clean = self._client()
+            with mock.patch.object(clean.rate_limiter, "wait", return_value=0.0):
+                DiscoveryPipeline(clean, clean_dir, journal=FetchJournal(clean_dir / CHECKPOINT_JOURNAL)).run()
+            self.assertFalse((clean_dir / CHECKPOINT_JOURNAL).exists())
+
+            interrupted = self._client(fail_on="/policies/pol-")
+            journal = FetchJournal(resumed_dir / CHECKPOINT_JOURNAL)
+            with mock.patch.object(interrupted.rate_limiter, "wait", return_value=0.0):
+                with self.assertRaises(KeyboardInterrupt):
+                    DiscoveryPipeline(interrupted, resumed_dir, journal=journal).run()
+            journal.close()
+            self.assertTrue((resumed_dir / CHECKPOINT_JOURNAL).exists())
+
+            resumed = self._client()
+            journal = FetchJournal(resumed_dir / CHECKPOINT_JOURNAL, resume=True)
+            loaded = len(journal)
+            self.assertGreater(loaded, 0)
+            with mock.patch.object(resumed.rate_limiter, "wait", return_value=0.0):
+                DiscoveryPipeline(resumed, resumed_dir, journal=journal).run()
+
+            self.assertLess(resumed.session.get.call_count, clean.session.get.call_count)
+            self.assertFalse((resumed_dir / CHECKPOINT_JOURNAL).exists())
+            metadata = json.loads((resumed_dir / "discovery_metadata.json").read_text())
+            self.assertEqual(metadata["resumed_fetches"], loaded)
+            for path in sorted(clean_dir.glob("*_inventory.json")):
+                with self.subTest(file=path.name):
+                    self.assertEqual(path.read_bytes(), (resumed_dir / path.name).read_bytes())
+
+
+class DiscoveryResponseCacheTest(unittest.TestCase):
+    def _run(self, output_dir: Path, cache: ResponseCache) -> VictorOpsClient:
+        client = VictorOpsClient("test-id", "test-key", "test-org", response_cache=cache)
+        client.session.get = mock.MagicMock(side_effect=full_org_session_get)
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            DiscoveryPipeline(client, output_dir, requested_team_slugs=["team-a"]).run()
+        return client
+
+    def test_warm_rerun_is_served_from_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cold_dir = Path(tmp) / "cold"
+            warm_dir = Path(tmp) / "warm"
+            cold = self._run(cold_dir, ResponseCache(Path(tmp) / "cache", namespace="test-org"))
+            warm = self._run(warm_dir, ResponseCache(Path(tmp) / "cache", namespace="test-org"))
+
+            self.assertGreater(cold.session.get.call_count, 0)
+            # Only 404s (never cached) go back to the network.
+            self.assertLess(warm.session.get.call_count, cold.session.get.call_count)
+            metadata = json.loads((warm_dir / "discovery_metadata.json").read_text())
+            self.assertGreater(metadata["response_cache"]["hits"], 0)
+            self.assertEqual(metadata["response_cache"]["stores"], 0)
+            for path in sorted(cold_dir.glob("*_inventory.json")):
+                with self.subTest(file=path.name):
+                    self.assertEqual(path.read_bytes(), (warm_dir / path.name).read_bytes())
+
+
+class DiscoveryDeltaTest(unittest.TestCase):
+    def _run(self, output_dir: Path, delta=None, payloads=None) -> VictorOpsClient:
+        payloads = payloads or {}
+
+        def session_get(url, params=None, timeout=30):
+            endpoint = endpoint_from_url(url)
+            if endpoint in payloads:
+                return FakeResponse(payloads[endpoint])
+            return full_org_session_get(url, params=params, timeout=timeout)
+
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.session.get = mock.MagicMock(side_effect=session_get)
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0):
+            DiscoveryPipeline(client, output_dir, delta=delta).run()
+        return client
+
+    def _endpoints(self, client: VictorOpsClient) -> list:
+        return [endpoint_from_url(c.args[0]) for c in client.session.get.call_args_list]
+
+    def test_unchanged_org_carries_over_everything_but_listings_and_schedules(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            first_dir = Path(tmp) / "first"
+            second_dir = Path(tmp) / "second"
+            self._run(first_dir)
+            client = self._run(second_dir, delta=DeltaBaseline(first_dir))
+
+            per_entity = [e for e in self._endpoints(client) if "/" in e and e != "org/routing-keys"]
+            self.assertTrue(per_entity)
+            self.assertTrue(all(e.endswith("/oncall/schedule") for e in per_entity), per_entity)
+            for path in sorted(first_dir.glob("*_inventory.json")):
+                with self.subTest(file=path.name):
+                    self.assertEqual(path.read_bytes(), (second_dir / path.name).read_bytes())
+            manifest = json.loads((second_dir / "delta_manifest.json").read_text())
+            self.assertEqual(manifest["summary"]["team"]["unchanged"], 2)
+            self.assertEqual(manifest["endpoints"]["team/{}/members"], {"carried_over": 2, "fetched": 0})
+
+    def test_changed_and_new_entities_are_refetched(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            first_dir = Path(tmp) / "first"
+            second_dir = Path(tmp) / "second"
+            self._run(first_dir)
+            payloads = {
+                "team": {"teams": [
+                    {"slug": "team-b", "name": "TEAM-B"},
+                    {"slug": "team-a", "name": "Team A renamed"},
+                ]},
+                "user": {"users": [{"username": name} for name in ("carol", "alice", "dave")]},
+                "team/team-a/members": {"members": [{"username": "dave"}]},
+            }
+            client = self._run(second_dir, delta=DeltaBaseline(first_dir), payloads=payloads)
+
+            endpoints = self._endpoints(client)
+            self.assertIn("team/team-a/members", endpoints)
+            self.assertNotIn("team/team-b/members", endpoints)
+            self.assertIn("user/dave/contact-methods", endpoints)
+            self.assertNotIn("user/alice/contact-methods", endpoints)
+            members = json.loads((second_dir / "team_members_inventory.json").read_text())
+            self.assertEqual(members["team-a"], [{"username": "dave"}])
+            self.assertEqual(members["team-b"], [{"username": "alice"}])
+
+            manifest = json.loads((second_dir / "delta_manifest.json").read_text())
+            self.assertEqual(manifest["entities"]["team"], {"team-a": "changed", "team-b": "unchanged"})
+            self.assertEqual(manifest["entities"]["user"]["dave"], "new")
+            self.assertEqual(manifest["entities"]["user"]["bob"], "removed")
+            metadata = json.loads((second_dir / "discovery_metadata.json").read_text())
+            self.assertEqual(metadata["delta"]["manifest"], "delta_manifest.json")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,8 +6,10 @@ import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from utils.env_loader import load_dotenv
+from utils.env_loader import load_dotenv, numbered_credentials
+from utils.exceptions import MigrationError
 
 
 class EnvLoaderTest(unittest.TestCase):
@@ -44,5 +46,27 @@ class EnvLoaderTest(unittest.TestCase):
             self.assertIsNone(load_dotenv(missing))
 
 
+class NumberedCredentialsTest(unittest.TestCase):
+    def test_reads_consecutive_pairs(self) -> None:
+        env = {
+            "SRC_API_ID_2": "id-2",
+            "SRC_API_KEY_2": "key-2",
+            "SRC_API_ID_3": "id-3",
+            "SRC_API_KEY_3": "key-3",
+            "SRC_API_ID_5": "id-5",
+            "SRC_API_KEY_5": "key-5",
+        }
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(numbered_credentials("SRC"), [("id-2", "key-2"), ("id-3", "key-3")])
+
+    def test_none_configured(self) -> None:
+        self.assertEqual(numbered_credentials("NO_SUCH_PREFIX"), [])
+
+    def test_half_pair_is_an_error(self) -> None:
+        with mock.patch.dict(os.environ, {"SRC_API_ID_2": "id-2"}):
+            with self.assertRaises(MigrationError):
+                numbered_credentials("SRC")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,101 @@
+"""Unit tests for utils.hedging and hedged GETs in the shared client."""
+
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from discovery import VictorOpsClient
+from utils.hedging import MIN_SAMPLES, HedgePolicy
+from utils.http_client import no_retries, retries_disabled
+
+TEMPLATE = "v1/user/{u}/contact-methods"
+URL = "https://api.victorops.com/api-public/v1/user/alice/contact-methods"
+
+
+class HedgePolicyTest(unittest.TestCase):
+    def test_delay_is_endpoint_p95_once_enough_samples(self) -> None:
+        policy = HedgePolicy()
+        for latency in range(1, MIN_SAMPLES):
+            policy.record(TEMPLATE, latency / 100)
+        self.assertIsNone(policy.delay(TEMPLATE))
+
+        policy.record(TEMPLATE, 0.2)
+        self.assertEqual(policy.delay(TEMPLATE), 0.2)
+        self.assertIsNone(policy.delay("v2/team/{t}/rotations"))
+
+    def test_hedges_capped_at_share_of_requests(self) -> None:
+        policy = HedgePolicy(max_share=0.05)
+        for _ in range(40):
+            policy.sent()
+
+        granted = [policy.try_hedge(True) for _ in range(4)]
+
+        self.assertEqual(granted, [True, True, False, False])
+        self.assertEqual(policy.stats()["hedged"], 2)
+
+    def test_no_spare_capacity_denies_once_per_request(self) -> None:
+        policy = HedgePolicy()
+        for _ in range(100):
+            policy.sent()
+
+        self.assertFalse(policy.try_hedge(False))
+        self.assertFalse(policy.try_hedge(False, first_check=False))
+
+        self.assertEqual(policy.stats()["denied"], 1)
+        self.assertEqual(policy.stats()["hedged"], 0)
+
+
+class HedgedClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = VictorOpsClient("test-id", "test-key", "test-org", hedge=True)
+        self.client.rate_limiter.delay = 0.0
+        policy = self.client.hedge_policy
+        for _ in range(MIN_SAMPLES):
+            policy.record(TEMPLATE, 0.01)
+            policy.sent()
+        self.calls = 0
+        self.retry_modes = []
+        self.lock = threading.Lock()
+
+    def _slow_then_fast(self, url, **kwargs):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            self.retry_modes.append(retries_disabled())
+        if call == 1:
+            time.sleep(0.5)
+        return mock.Mock(status_code=200, headers={}, text="slow" if call == 1 else "fast")
+
+    def test_slow_get_is_hedged_and_first_response_wins(self) -> None:
+        with mock.patch.object(self.client.session, "get", side_effect=self._slow_then_fast):
+            started = time.monotonic()
+            with no_retries():
+                resp = self.client._send_get(URL)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(resp.text, "fast")
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(self.retry_modes, [True, True])
+        stats = self.client.request_metrics()["hedging"]
+        self.assertEqual((stats["hedged"], stats["won"]), (1, 1))
+
+    def test_no_hedge_without_spare_capacity(self) -> None:
+        with mock.patch.object(self.client.session, "get", side_effect=self._slow_then_fast), \
+                mock.patch.object(self.client, "_spare_capacity", return_value=False):
+            resp = self.client._send_get(URL)
+
+        self.assertEqual(resp.text, "slow")
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.client.hedge_policy.stats()["denied"], 1)
+
+    def test_hedge_off_by_default(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        self.assertIsNone(client.hedge_policy)
+        self.assertNotIn("hedging", client.request_metrics())
+
+
+if __name__ == "__main__":
+    unittest.main()
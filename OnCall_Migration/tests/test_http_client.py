@@ -4,15 +4,23 @@ from __future__ import annotations
 
 import os
 import unittest
+from unittest import mock
+
+import requests
 
 os.environ.setdefault("SOURCE_SPLUNK_ONCALL_API_ID", "test-id")
 os.environ.setdefault("SOURCE_SPLUNK_ONCALL_API_KEY", "test-key")
 os.environ.setdefault("SOURCE_SPLUNK_ONCALL_ORG_SLUG", "test-org")
 
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
 from apply import ApplyClient
-from discovery import VictorOpsClient
-from utils.http_client import BaseVictorOpsClient
+from benchmarks.simulator import Faults, SimulatedOrg, VictorOpsSimulator
+from discovery import DEFAULT_MAX_CONCURRENCY, PAGE_PREFETCH, PER_ENTITY_WORKERS, VictorOpsClient
+from utils.concurrency import AdaptiveConcurrency
+from utils.http_client import ACCEPT_ENCODING, BaseVictorOpsClient, LimiterAwareRetry, no_retries
 from utils.rate_limiter import RateLimiter
+from utils.task_graph import DEFAULT_MAX_PARALLEL
 
 
 class BaseVictorOpsClientTest(unittest.TestCase):
@@ -33,6 +41,7 @@ class BaseVictorOpsClientTest(unittest.TestCase):
         self.assertEqual(headers["X-VO-Api-Key"], "api-key")
         self.assertEqual(headers["Accept"], "application/json")
         self.assertEqual(headers["Content-Type"], "application/json")
+        self.assertEqual(headers["Accept-Encoding"], ACCEPT_ENCODING)
 
     def test_base_urls(self) -> None:
         self.assertEqual(self.client.base_v1, BaseVictorOpsClient.BASE_V1)
@@ -49,6 +58,150 @@ class BaseVictorOpsClientTest(unittest.TestCase):
         absolute = "https://example.com/next"
         self.assertEqual(self.client._url(absolute, self.client.base_v1), absolute)
 
+    def test_adapter_retry_shares_client_rate_limiter(self) -> None:
+        retry = self.client.session.get_adapter("https://api.victorops.com").max_retries
+        self.assertIsInstance(retry, LimiterAwareRetry)
+        self.assertIs(retry.rate_limiter, self.client.rate_limiter)
+        self.assertIs(retry.new(total=1).rate_limiter, self.client.rate_limiter)
+
+    def test_retry_after_mid_retry_backs_off_globally(self) -> None:
+        retry = LimiterAwareRetry(total=3, rate_limiter=self.client.rate_limiter)
+        response = mock.Mock(status=429, headers={"Retry-After": "4"})
+
+        with mock.patch.object(self.client.rate_limiter, "backoff") as backoff, \
+                mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0) as wait, \
+                mock.patch.object(retry, "_sleep_backoff") as sleep_backoff:
+            retry.sleep(response)
+
+        backoff.assert_called_once_with(4.0)
+        wait.assert_called_once()
+        sleep_backoff.assert_not_called()
+
+    def test_headerless_429_mid_retry_keeps_exponential_backoff(self) -> None:
+        retry = LimiterAwareRetry(total=6, backoff_factor=2, rate_limiter=self.client.rate_limiter)
+        response = mock.Mock(spec=["status", "headers"], status=429, headers={})
+
+        with mock.patch.object(retry, "get_backoff_time", return_value=8.0), \
+                mock.patch.object(self.client.rate_limiter, "backoff") as backoff, \
+                mock.patch.object(self.client.rate_limiter, "wait", return_value=0.0):
+            retry.sleep(response)
+
+        backoff.assert_called_once_with(8.0)
+
+    def test_final_429_response_hook_backs_off(self) -> None:
+        response = mock.Mock(status_code=429, headers={})
+        with mock.patch.object(self.client.rate_limiter, "backoff") as backoff:
+            for hook in self.client.session.hooks["response"]:
+                hook(response)
+        backoff.assert_called_once()
+
+
+class SingleFlightClientTest(unittest.TestCase):
+    def test_repeat_gets_are_memoized_until_a_post_touches_the_path(self) -> None:
+        client = ApplyClient("id", "key", "target-org", dry_run=False)
+        rotations = mock.Mock(status_code=200, text="{}", json=mock.Mock(return_value={"rotationGroups": []}))
+        created = mock.Mock(status_code=200, text="{}", json=mock.Mock(return_value={}))
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                mock.patch.object(client.session, "get", return_value=rotations) as get, \
+                mock.patch.object(client.session, "post", return_value=created):
+            client.get("team/t1/rotations")
+            client.get("team/t1/rotations")
+            client.post("team/t1/rotations", {"label": "Primary"})
+            client.get("team/t1/rotations")
+
+        self.assertEqual(get.call_count, 2)
+        totals = client.request_metrics()["totals"]
+        self.assertEqual(totals["requests"], 3)
+        self.assertEqual(totals["deduplicated"], 1)
+
+    def test_non_200_gets_are_not_memoized(self) -> None:
+        client = ApplyClient("id", "key", "target-org", dry_run=True)
+        missing = mock.Mock(status_code=404, text="")
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                mock.patch.object(client.session, "get", return_value=missing) as get:
+            client.get("user/alice", allow_404=True)
+            client.get("user/alice", allow_404=True)
+
+        self.assertEqual(get.call_count, 2)
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def test_pool_size_matches_discovery_concurrency(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        adapter = client.session.get_adapter("https://api.victorops.com")
+        self.assertEqual(adapter._pool_maxsize, DEFAULT_MAX_PARALLEL + DEFAULT_MAX_CONCURRENCY + PAGE_PREFETCH)
+        self.assertEqual(int(client.concurrency_limit.limit), PER_ENTITY_WORKERS)
+        self.assertEqual(client.concurrency_limit.max_limit, DEFAULT_MAX_CONCURRENCY)
+
+    def test_no_retries_is_thread_local_and_raises_first_error(self) -> None:
+        retry = LimiterAwareRetry(total=3, status_forcelist=[503], allowed_methods=["POST"])
+        self.assertTrue(retry.is_retry("POST", 503))
+        with no_retries():
+            self.assertFalse(retry.is_retry("POST", 503))
+            with self.assertRaises(MaxRetryError):
+                retry.increment("POST", "/x", error=NewConnectionError(None, "refused"))
+        self.assertTrue(retry.is_retry("POST", 503))
+
+    def test_post_once_reuses_pooled_connection_without_retries(self) -> None:
+        with VictorOpsSimulator(SimulatedOrg(), Faults(error_rate=1.0)) as sim:
+            client = sim.attach(ApplyClient("id", "key", "target-org", dry_run=False))
+            client.rate_limiter.delay = 0.0
+            _, code = client.post_once("teams/t1/rotations", {"label": "Primary"})
+            sim.faults = Faults()
+            client.get("team")
+            client.get("user")
+            stats = client.connection_stats()
+
+        self.assertEqual(code, 503)
+        self.assertEqual(sim.request_counts(), {"GET v1/team": 1, "GET v1/user": 1, "POST v1/teams/{t}/rotations": 1})
+        self.assertEqual(stats, {"pools": 1, "connections_opened": 1, "requests": 3, "reused": 2})
+
+
+class AdaptiveConcurrencyClientTest(unittest.TestCase):
+    def test_send_uses_adaptive_timeout_and_releases_slot_on_error(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.concurrency_limit = AdaptiveConcurrency(initial=1, max_timeout=12.0)
+        ok = mock.Mock(status_code=200, headers={})
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                mock.patch.object(client.session, "get", return_value=ok) as get:
+            client._send("GET", "https://api.victorops.com/api-public/v1/team")
+        self.assertEqual(get.call_args.kwargs["timeout"], 12.0)
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                mock.patch.object(client.session, "get", side_effect=requests.ConnectionError("reset")):
+            with self.assertRaises(requests.ConnectionError):
+                client._send("GET", "https://api.victorops.com/api-public/v1/team", timeout=3)
+            # The only slot came back, so a second request does not block.
+            with self.assertRaises(requests.ConnectionError):
+                client._send("GET", "https://api.victorops.com/api-public/v1/team")
+
+        self.assertEqual(client.request_metrics()["concurrency"]["limit"], 1)
+
+    def test_slow_listing_keeps_its_own_timeout_and_explicit_floor(self) -> None:
+        client = VictorOpsClient("test-id", "test-key", "test-org")
+        client.concurrency_limit = AdaptiveConcurrency(initial=4, max_timeout=30.0)
+        for _ in range(100):
+            client.concurrency_limit.acquire()
+            client.concurrency_limit.release(0.1, True, key="v1/user/{u}/contact-methods")
+        ok = mock.Mock(status_code=200, headers={})
+
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.0), \
+                mock.patch.object(client.session, "get", return_value=ok) as get:
+            client._send("GET", "https://api.victorops.com/api-public/v1/user/alice/contact-methods")
+            self.assertEqual(get.call_args.kwargs["timeout"], 5.0)
+            client._send("GET", "https://api.victorops.com/api-public/v1/user/bob/contact-methods", timeout=20)
+            self.assertEqual(get.call_args.kwargs["timeout"], 20)
+            client._send("GET", "https://api.victorops.com/api-public/v1/user")
+            self.assertEqual(get.call_args.kwargs["timeout"], 30.0)
+
+    def test_apply_client_has_no_limit(self) -> None:
+        client = ApplyClient("id", "key", "target-org", dry_run=True)
+        self.assertIsNone(client.concurrency_limit)
+        self.assertNotIn("concurrency", client.request_metrics())
+
 
 class SubclassCompatibilityTest(unittest.TestCase):
     def test_victorops_client_exposes_expected_attributes(self) -> None:
@@ -0,0 +1,109 @@
+"""Unit tests for utils/inventory_store.py."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.inventory_store import STORE_FILENAME, InventoryStore, main, open_store
+from utils.io import load_inventory
+
+DETAILS = {
+    "pol-a": [
+        {
+            "timeout": 5,
+            "entries": [
+                {"executionType": "user", "user": {"username": "alice"}},
+                {"executionType": "rotation_group", "rotationGroup": {"slug": "rtg-1", "label": "Primary"}},
+            ],
+        },
+        {"entries": [{"executionType": "policy_routing", "targetPolicy": {"policySlug": "pol-b"}}]},
+    ],
+    "pol-b": [{"entries": [{"executionType": "email", "email": {"address": "ops@example.com"}}]}],
+}
+
+
+class InventoryStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        self.store = InventoryStore(self.base / STORE_FILENAME)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_documents_round_trip_in_order(self) -> None:
+        samples = {
+            "teams_inventory": [{"slug": "b", "name": "B"}, {"slug": "a", "name": "A"}],
+            "team_members_inventory": {"b": [{"username": "é"}], "a": []},
+            "custom": "scalar",
+            "empty_inventory": {},
+        }
+        for name, data in samples.items():
+            self.store.save(name, data)
+        for name, data in samples.items():
+            with self.subTest(name=name):
+                loaded = self.store.load(name)
+                self.assertEqual(loaded, data)
+                self.assertEqual(json.dumps(loaded), json.dumps(data))
+        self.assertIsNone(self.store.load("missing"))
+        self.assertEqual(self.store.names(), sorted(samples))
+
+    def test_save_replaces_document_and_typed_rows(self) -> None:
+        self.store.save("team_members_inventory", {"t1": [{"username": "alice"}]})
+        self.store.save("team_admins_inventory", {"t1": [{"username": "alice"}]})
+        self.store.save("team_members_inventory", {"t2": [{"username": "alice"}]})
+        self.assertEqual(self.store.load("team_members_inventory"), {"t2": [{"username": "alice"}]})
+        self.assertEqual(self.store.teams_for_user("alice"), [("t1", "admin"), ("t2", "member")])
+
+    def test_indexed_lookups(self) -> None:
+        self.store.save("escalation_policies_inventory", {
+            "team-a": [{"policy": {"slug": "pol-a", "name": "A"}}],
+            "team-b": [{"policy": {"slug": "pol-b", "name": "B"}}],
+        })
+        self.store.save("escalation_policy_details_inventory", DETAILS)
+        self.store.save("users_inventory", [{"username": "alice", "email": "alice@example.com"}])
+        self.store.save("contact_methods_inventory", {
+            "alice": {"emails": {"contactMethods": [{"value": "alt@example.com"}]}},
+        })
+        self.store.save("routing_keys_inventory", [
+            {"routingKey": "rk1", "targets": [{"policySlug": "pol-a"}, {"_policyUrl": "/api/policies/pol-x"}]},
+        ])
+
+        self.assertEqual(self.store.policy_team_map(), {"pol-a": "team-a", "pol-b": "team-b"})
+        self.assertEqual(self.store.rotation_group_labels(), {"rtg-1": "Primary"})
+        self.assertEqual(self.store.rotation_groups_by_team(), {"team-a": {"rtg-1": "Primary"}})
+        self.assertEqual(self.store.policies_referencing("user", "alice"), ["pol-a"])
+        self.assertEqual(self.store.policies_referencing("policy_routing", "pol-b"), ["pol-a"])
+        self.assertEqual(self.store.routing_targets_missing_details(), [("rk1", "pol-x")])
+        self.assertEqual(
+            self.store.email_addresses(), ["alice@example.com", "alt@example.com", "ops@example.com"]
+        )
+
+    def test_load_inventory_prefers_json_then_store(self) -> None:
+        self.store.save("users_inventory", [{"username": "from-store"}])
+        self.store.close()
+        self.assertEqual(load_inventory(self.base, "users_inventory"), [{"username": "from-store"}])
+        self.assertEqual(load_inventory(self.base, "teams_inventory", []), [])
+
+        (self.base / "users_inventory.json").write_text(json.dumps([{"username": "from-json"}]))
+        self.assertEqual(load_inventory(self.base, "users_inventory"), [{"username": "from-json"}])
+        self.store = InventoryStore(self.base / STORE_FILENAME)
+
+    def test_export_cli_writes_json_files(self) -> None:
+        self.store.save("escalation_policy_details_inventory", DETAILS)
+        self.store.close()
+        out = self.base / "out"
+        main([str(self.base), "--output-dir", str(out)])
+        self.assertEqual(
+            (out / "escalation_policy_details_inventory.json").read_text(), json.dumps(DETAILS, indent=2)
+        )
+        self.assertIsNone(open_store(out))
+        self.store = InventoryStore(self.base / STORE_FILENAME)
+
+
+if __name__ == "__main__":
+    unittest.main()
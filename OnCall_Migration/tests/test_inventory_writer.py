@@ -0,0 +1,82 @@
+"""Unit tests for utils/inventory_writer.py."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from utils.inventory_writer import EntityShard, write_inventory
+from utils.io import load_json
+
+SAMPLES = [
+    {},
+    [],
+    {"team-b": [{"username": "alice", "nested": {"x": [1, 2]}}], "team-a": []},
+    [{"username": "é", "roles": []}, {"username": "bob", "tags": {}}],
+    {"k": None, "n": 1.5, "s": "line\nbreak"},
+    "scalar",
+]
+
+
+class WriteInventoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_json_format_matches_json_dumps_indent_2(self) -> None:
+        path = self.base / "x.json"
+        for sample in SAMPLES:
+            with self.subTest(sample=sample):
+                write_inventory(path, sample, "json")
+                self.assertEqual(path.read_text(), json.dumps(sample, indent=2))
+
+    def test_every_format_round_trips_through_load_json(self) -> None:
+        path = self.base / "x.json"
+        for output_format in ("json", "compact", "ndjson"):
+            for sample in SAMPLES:
+                with self.subTest(output_format=output_format, sample=sample):
+                    write_inventory(path, sample, output_format)
+                    self.assertEqual(load_json(path), sample)
+        self.assertFalse((self.base / "x.tmp").exists())
+
+    def test_unknown_format_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            write_inventory(self.base / "x.json", {}, "yaml")
+
+
+class EntityShardTest(unittest.TestCase):
+    def test_concurrent_appends_read_back_lazily_in_reordered_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            shard = EntityShard(Path(tmp) / "shards" / "members.ndjson")
+            threads = [
+                threading.Thread(target=shard.__setitem__, args=(f"t{i}", [{"i": i}]))
+                for i in range(20)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            shard.reorder([f"t{i}" for i in reversed(range(20))] + ["missing", "t0"])
+            self.assertEqual(list(shard), [f"t{i}" for i in reversed(range(20))])
+            self.assertEqual(len(shard), 20)
+            self.assertEqual(shard["t7"], [{"i": 7}])
+            self.assertNotIn("missing", shard)
+
+            path = Path(tmp) / "members_inventory.json"
+            write_inventory(path, shard, "json")
+            expected = {f"t{i}": [{"i": i}] for i in reversed(range(20))}
+            self.assertEqual(path.read_text(), json.dumps(expected, indent=2))
+
+            shard.discard()
+            self.assertFalse(shard.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
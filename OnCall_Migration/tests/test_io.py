@@ -64,6 +64,16 @@ class LoadJsonTest(unittest.TestCase):
         logger.error.assert_called_once()
         self.assertIn(str(path), logger.error.call_args[0][0])
 
+    def test_ndjson_dict_and_list_inventories_load_as_json_layout(self) -> None:
+        (self.base / "d.json").write_text('{"__ndjson__": "dict"}\n["a", [1]]\n["b", {"x": 2}]\n')
+        (self.base / "l.json").write_text('{"__ndjson__": "list"}\n{"n": 1}\n\n{"n": 2}\n')
+        self.assertEqual(load_json(self.base / "d.json"), {"a": [1], "b": {"x": 2}})
+        self.assertEqual(load_json(self.base / "l.json"), [{"n": 1}, {"n": 2}])
+
+    def test_compact_json_loads(self) -> None:
+        (self.base / "c.json").write_text('{"a":[1,2]}')
+        self.assertEqual(load_json(self.base / "c.json"), {"a": [1, 2]})
+
 
 if __name__ == "__main__":
     unittest.main()
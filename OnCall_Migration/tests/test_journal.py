@@ -0,0 +1,116 @@
+"""Unit tests for utils/journal.py."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.journal import ApplyJournal, FetchJournal, JsonlJournal
+
+
+class JsonlJournalTest(unittest.TestCase):
+    def test_load_skips_truncated_tail_and_append_starts_new_line(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "journal.jsonl"
+            path.write_text('{"n": 1}\n{"n": 2')
+
+            journal = JsonlJournal(path)
+            self.assertEqual(journal.load(), [{"n": 1}])
+            self.assertEqual(journal.corrupt_lines, 1)
+
+            journal.append({"n": 3})
+            journal.close()
+            self.assertEqual(JsonlJournal(path).load(), [{"n": 1}, {"n": 3}])
+
+    def test_discard_removes_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "journal.jsonl"
+            journal = JsonlJournal(path)
+            journal.append({"n": 1})
+            journal.discard()
+            self.assertFalse(path.exists())
+
+
+class FetchJournalTest(unittest.TestCase):
+    def test_resume_reloads_recorded_fetches_including_404s(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fetches.jsonl"
+            journal = FetchJournal(path)
+            journal.record("team/a/members", False, "a", {"members": []})
+            journal.record("profile/bob/policies", True, "bob", None)
+            journal.close()
+
+            resumed = FetchJournal(path, resume=True)
+            self.assertEqual(len(resumed), 2)
+            self.assertEqual(resumed.lookup("team/a/members", False), (True, {"members": []}))
+            self.assertEqual(resumed.lookup("profile/bob/policies", True), (True, None))
+            self.assertEqual(resumed.lookup("profile/bob/policies", False), (False, None))
+            self.assertEqual(resumed.reused, 2)
+
+    def test_bodies_are_dropped_once_used_and_not_kept_for_new_records(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fetches.jsonl"
+            journal = FetchJournal(path)
+            journal.record("team/a/members", False, "a", {"members": []})
+            journal.close()
+
+            resumed = FetchJournal(path, resume=True)
+            resumed.record("team/b/members", False, "b", {"members": [{"username": "bob"}]})
+            self.assertEqual(len(resumed), 2)
+            self.assertEqual(resumed.lookup("team/a/members", False), (True, {"members": []}))
+            self.assertEqual(resumed.lookup("team/a/members", False), (False, None))
+            self.assertEqual(resumed.lookup("team/b/members", False), (False, None))
+            self.assertEqual(resumed._loaded, {})
+            resumed.close()
+
+    def test_fresh_run_discards_stale_journal(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "fetches.jsonl"
+            journal = FetchJournal(path)
+            journal.record("team/a/members", False, "a", {"members": []})
+            journal.close()
+
+            fresh = FetchJournal(path)
+            self.assertEqual(len(fresh), 0)
+            self.assertFalse(path.exists())
+
+
+class ApplyJournalTest(unittest.TestCase):
+    def test_reload_keeps_successful_creates_for_the_same_org(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "apply_journal.jsonl"
+            journal = ApplyJournal(path, "target-org")
+            journal.record("teams", "team-a", "team", 200, {"slug": "team-x"}, ok=True)
+            journal.record("users", "bob", "user", 409, None, ok=False)
+            journal.close()
+            other = ApplyJournal(path, "other-org")
+            other.record("users", "carol", "user", 200, {}, ok=True)
+            other.close()
+
+            resumed = ApplyJournal(path, "target-org")
+            self.assertEqual(len(resumed), 1)
+            self.assertEqual(resumed.confirmed("teams", "team-a")["slug"], "team-x")
+            self.assertIsNone(resumed.confirmed("users", "bob"))
+            self.assertIsNone(resumed.confirmed("users", "carol"))
+            self.assertEqual([r["key"] for r in resumed.confirmed_in("teams")], ["team-a"])
+            self.assertEqual(resumed.stats()["replayed"], 1)
+            self.assertEqual(len(JsonlJournal(path).load()), 3)
+
+
+    def test_reset_discards_and_other_orgs_are_reported(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "apply_journal.jsonl"
+            journal = ApplyJournal(path, "old-org")
+            journal.record("users", "bob", "user", 200, {}, ok=True)
+            journal.close()
+
+            with self.assertLogs("utils.journal", level="WARNING") as logs:
+                self.assertEqual(len(ApplyJournal(path, "target-org")), 0)
+            self.assertIn("old-org", logs.output[0])
+
+            self.assertEqual(len(ApplyJournal(path, "old-org", reset=True)), 0)
+            self.assertFalse(path.exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Unit tests for utils/metrics.py."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+
+from utils.http_client import BaseVictorOpsClient
+from utils.metrics import Histogram, RequestMetrics, endpoint_template
+
+
+def _client() -> BaseVictorOpsClient:
+    return BaseVictorOpsClient(
+        "id", "key", "org", retry_total=0, retry_backoff=0, allowed_methods=["GET", "POST"]
+    )
+
+
+class EndpointTemplateTest(unittest.TestCase):
+    def test_entity_ids_fold_into_placeholders(self) -> None:
+        cases = {
+            "https://api.victorops.com/api-public/v1/user/alice/contact-methods": "v1/user/{u}/contact-methods",
+            "https://api.victorops.com/api-public/v1/user/bob/contact-methods?x=1": "v1/user/{u}/contact-methods",
+            "https://api.victorops.com/api-public/v2/team/team-a/rotations": "v2/team/{t}/rotations",
+            "https://api.victorops.com/api-public/v1/policies/pol-1": "v1/policies/{p}",
+            "https://api.victorops.com/api-public/v1/user": "v1/user",
+            "profile/alice/policies": "profile/{u}/policies",
+            "org/routing-keys": "org/routing-keys",
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(endpoint_template(url), expected)
+
+
+class HistogramTest(unittest.TestCase):
+    def test_buckets_are_cumulative_with_le_semantics(self) -> None:
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [("0.1", 2), ("1", 3), ("+Inf", 4)])
+        self.assertEqual(histogram.snapshot()["max"], 3.0)
+
+
+class RequestMetricsTest(unittest.TestCase):
+    def test_snapshot_groups_by_method_and_template(self) -> None:
+        metrics = RequestMetrics()
+        retried = SimpleNamespace(
+            status_code=200, content=b"abcd", raw=SimpleNamespace(retries=SimpleNamespace(history=(1, 2)))
+        )
+        metrics.observe_response("GET", "v1/user/alice/contact-methods", retried, 0.2, 1.5)
+        metrics.observe("GET", "v1/user/bob/contact-methods", status=429, latency=0.1)
+        metrics.observe("GET", "v1/user/carol/contact-methods", status=None, latency=30.0)
+        metrics.observe_cache_hit("GET", "v1/user/dave/contact-methods")
+
+        snapshot = metrics.snapshot()
+        row = snapshot["endpoints"]["GET v1/user/{u}/contact-methods"]
+        self.assertEqual(row["requests"], 3)
+        self.assertEqual(row["errors"], 1)
+        self.assertEqual(row["statuses"], {"200": 1, "429": 1})
+        self.assertEqual(row["retries"], 2)
+        self.assertEqual(row["bytes_received"], 4)
+        self.assertEqual(row["cache_hits"], 1)
+        self.assertEqual(row["limiter_wait_seconds"]["buckets"]["0"], 2)
+        self.assertEqual(snapshot["totals"]["requests"], 3)
+        self.assertEqual(snapshot["totals"]["limiter_wait_seconds"], 1.5)
+
+    def test_prometheus_text(self) -> None:
+        metrics = RequestMetrics()
+        metrics.observe("POST", "v1/team/t1/members", status=201, latency=0.3, bytes_received=10)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.prom"
+            metrics.write_prometheus(path, {"org": "acme"})
+            text = path.read_text()
+        self.assertIn(
+            'victorops_requests_total{org="acme",method="POST",endpoint="v1/team/{t}/members",status="201"} 1',
+            text,
+        )
+        self.assertIn("# TYPE victorops_request_latency_seconds histogram", text)
+        self.assertIn(
+            'victorops_request_latency_seconds_bucket{org="acme",method="POST",endpoint="v1/team/{t}/members",le="+Inf"} 1',
+            text,
+        )
+
+
+class ClientInstrumentationTest(unittest.TestCase):
+    def test_send_records_response_and_transport_errors(self) -> None:
+        client = _client()
+        ok = SimpleNamespace(status_code=200, text='{"a": 1}', content=b'{"a": 1}', raw=None)
+        client.session.get = mock.MagicMock(side_effect=[ok, requests.ConnectionError("boom")])
+        with mock.patch.object(client.rate_limiter, "wait", return_value=0.25):
+            client._send_get("https://api.victorops.com/api-public/v1/team/a/members")
+            with self.assertRaises(requests.ConnectionError):
+                client._send_get("https://api.victorops.com/api-public/v1/team/b/members")
+
+        report = client.request_metrics()
+        row = report["endpoints"]["GET v1/team/{t}/members"]
+        self.assertEqual((row["requests"], row["errors"], row["bytes_received"]), (2, 1, 8))
+        self.assertEqual(row["limiter_wait_seconds"]["sum"], 0.5)
+        self.assertIn("rate_limiter", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
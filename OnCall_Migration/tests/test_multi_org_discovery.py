@@ -0,0 +1,118 @@
+"""Tests for multi_org_discovery.py (local simulator, child processes, no live API)."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.simulator import SimulatedOrg, VictorOpsSimulator
+from multi_org_discovery import MultiOrgRunner, OrgSpec, load_org_specs, main
+from utils.exceptions import MigrationError
+from utils.io import load_json
+
+
+class LoadOrgSpecsTest(unittest.TestCase):
+    def _write(self, tmp: str, orgs: object) -> Path:
+        path = Path(tmp) / "orgs.json"
+        path.write_text(json.dumps({"orgs": orgs}))
+        return path
+
+    def test_credentials_from_env_prefix_with_inline_overrides(self) -> None:
+        env = {
+            "EAST_SPLUNK_ONCALL_API_ID": "east-id",
+            "EAST_SPLUNK_ONCALL_API_KEY": "east-key",
+            "EAST_SPLUNK_ONCALL_ORG_SLUG": "east-org",
+        }
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, env):
+            specs = load_org_specs(self._write(tmp, [
+                {"name": "east", "env_prefix": "EAST", "teams": ["team-a", " "]},
+                {"name": "west", "env_prefix": "EAST", "org_slug": "west-org", "inventory": "inv/w"},
+            ]))
+
+        east, west = specs
+        self.assertEqual((east.api_id, east.org_slug, east.teams), ("east-id", "east-org", ["team-a"]))
+        self.assertEqual(east.inventory, Path("inventory/east"))
+        self.assertEqual((west.api_key, west.org_slug, west.inventory), ("east-key", "west-org", Path("inv/w")))
+
+    def test_invalid_configs_raise(self) -> None:
+        creds = {"api_id": "i", "api_key": "k", "org_slug": "o"}
+        cases = {
+            "missing credentials": [{"name": "a", "env_prefix": "NOPE"}],
+            "must be unique": [{"name": "a", **creds}, {"name": "b", "inventory": "inventory/a", **creds}],
+            "'store' must be one of": [{"name": "a", "store": "csv", **creds}],
+            "not both": [{"name": "a", "teams": ["t"], "teams_file": "x.txt", **creds}],
+            "non-empty 'orgs'": [],
+        }
+        for message, orgs in cases.items():
+            with self.subTest(message=message), tempfile.TemporaryDirectory() as tmp:
+                with self.assertRaisesRegex(MigrationError, message):
+                    load_org_specs(self._write(tmp, orgs))
+
+
+class MultiOrgRunTest(unittest.TestCase):
+    def test_orgs_run_concurrently_and_one_failure_is_reported(self) -> None:
+        creds = {"api_id": "id", "api_key": "key", "rate_hz": 0}
+        with VictorOpsSimulator(SimulatedOrg.synthetic(users=12, teams=3)) as east, \
+                VictorOpsSimulator(SimulatedOrg.synthetic(users=6, teams=2)) as west, \
+                tempfile.TemporaryDirectory() as tmp:
+            blocked = Path(tmp) / "blocked"
+            blocked.write_text("not a directory")
+            config = Path(tmp) / "orgs.json"
+            config.write_text(json.dumps({"orgs": [
+                {"name": "east", "org_slug": "east-org", "inventory": f"{tmp}/east",
+                 "api_base": east.base_url, **creds},
+                {"name": "west", "org_slug": "west-org", "inventory": f"{tmp}/west",
+                 "api_base": west.base_url, "store": "sqlite", **creds},
+                {"name": "broken", "org_slug": "broken-org", "inventory": str(blocked),
+                 "api_base": west.base_url, **creds},
+            ]}))
+            summary_path = Path(tmp) / "summary.json"
+
+            with self.assertRaises(SystemExit) as exit_info, self.assertLogs(level=logging.INFO) as logs:
+                main(["--config", str(config), "--summary", str(summary_path)])
+
+            summary = load_json(summary_path)
+            east_users = load_json(Path(tmp) / "east" / "users_inventory.json")
+            west_store = (Path(tmp) / "west" / "inventory.sqlite").exists()
+
+        self.assertEqual(exit_info.exception.code, 1)
+        self.assertEqual(summary["failed"], ["broken"])
+        orgs = summary["orgs"]
+        self.assertEqual(orgs["east"]["status"], "ok")
+        self.assertEqual(orgs["east"]["inventory_counts"]["users_inventory"], 12)
+        self.assertEqual(orgs["west"]["inventory_counts"]["users_inventory"], 6)
+        self.assertGreater(orgs["east"]["requests"], 0)
+        self.assertEqual(orgs["broken"]["status"], "failed")
+        self.assertIn("NotADirectoryError", orgs["broken"]["error"])
+        # Child tracebacks are forwarded to the parent's log, prefixed with the org name.
+        self.assertTrue(any("[broken] Discovery failed" in line for line in logs.output))
+        self.assertEqual(len(east_users), 12)
+        self.assertTrue(west_store)
+
+    def test_crashed_child_is_reaped_while_others_keep_reporting(self) -> None:
+        specs = [OrgSpec(name, "id", "key", f"{name}-org", Path(name)) for name in ("busy", "crashed", "clean")]
+        runner = MultiOrgRunner(specs)
+        busy = mock.Mock(exitcode=None, **{"is_alive.return_value": True})
+        crashed = mock.Mock(exitcode=-9, **{"is_alive.return_value": False})
+        clean = mock.Mock(exitcode=0, **{"is_alive.return_value": False})
+        processes = {"busy": busy, "crashed": crashed, "clean": clean}
+
+        with self.assertLogs(level=logging.ERROR):
+            runner._reap(processes, drained=False)
+        # A clean exit may still have its result queued; it is only failed once the queue drains.
+        self.assertEqual(set(processes), {"busy", "clean"})
+        self.assertEqual(runner.state["crashed"], {"status": "failed", "error": "exit code -9"})
+
+        with self.assertLogs(level=logging.ERROR):
+            runner._reap(processes, drained=True)
+        self.assertEqual(set(processes), {"busy"})
+        self.assertEqual(runner.state["clean"]["status"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Unit tests for utils.progress."""
+
+from __future__ import annotations
+
+import unittest
+
+from utils.progress import MIN_MEASURED_CALLS, CallPlan, ProgressTracker, format_duration, throughput
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class EstimateTest(unittest.TestCase):
+    def test_throughput_is_capped_by_rate_or_in_flight_requests(self) -> None:
+        self.assertEqual(throughput(2.0, 0.25, 4), 2.0)
+        self.assertEqual(throughput(100.0, 0.5, 4), 8.0)
+        self.assertEqual(throughput(0.0, 0.5, 4), 8.0)
+        self.assertEqual(throughput(0.0, 0.0, 4), 0.0)
+
+    def test_format_duration(self) -> None:
+        self.assertEqual(format_duration(7.4), "7s")
+        self.assertEqual(format_duration(65), "1m 05s")
+        self.assertEqual(format_duration(4000), "1h 06m 40s")
+
+    def test_call_plan_totals_and_estimate(self) -> None:
+        plan = CallPlan()
+        plan.add_listing("v1/user", 3)
+        plan.add_per_entity("v1/user/{u}/contact-methods", 1000)
+        plan.add_per_entity("v1/user/{u}/policies", 1000)
+        plan.add_per_entity("v1/policies/{p}", 0)
+
+        snapshot = plan.snapshot()
+        estimate = plan.estimate(2.0, 0.3, 4)
+
+        self.assertEqual(snapshot["total_calls"], 2003)
+        self.assertEqual(snapshot["per_entity_calls"], 2000)
+        self.assertNotIn("v1/policies/{p}", snapshot["per_entity"])
+        self.assertEqual(estimate["throughput_per_second"], 2.0)
+        self.assertEqual(estimate["estimated_seconds"], 1001.5)
+        self.assertEqual(estimate["estimated"], "16m 42s")
+
+
+class ProgressTrackerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.tracker = ProgressTracker(lambda: 2.0, log_interval=10.0, clock=self.clock)
+
+    def test_logs_first_call_then_at_interval_and_on_completion(self) -> None:
+        self.tracker.expect(100)
+        with self.assertLogs("utils.progress", level="INFO") as logs:
+            self.tracker.advance("user")
+            for _ in range(49):
+                self.tracker.advance("user")
+            self.clock.now = 10.0
+            self.tracker.advance("user")
+            for _ in range(49):
+                self.tracker.advance("user")
+
+        lines = [record.getMessage() for record in logs.records]
+        self.assertEqual(len(lines), 3)
+        self.assertIn("[1/100] 1% of per-entity calls (user) | 2.0/s | ETA 50s", lines[0])
+        self.assertIn("[51/100] 51% of per-entity calls (user) | 5.1/s | ETA 10s", lines[1])
+        self.assertIn("[100/100] 100%", lines[2])
+        self.assertTrue(lines[2].endswith("| done"))
+
+    def test_predicted_rate_is_used_until_enough_calls_completed(self) -> None:
+        self.tracker.expect(1000)
+        self.clock.now = 100.0
+        with self.assertLogs("utils.progress", level="INFO") as logs:
+            for _ in range(MIN_MEASURED_CALLS - 1):
+                self.tracker.advance("team")
+            self.clock.now = 200.0
+            self.tracker.advance("team")
+
+        self.assertIn("| 2.0/s |", logs.records[0].getMessage())
+        self.assertIn("| 0.1/s |", logs.records[1].getMessage())
+
+    def test_eta_covers_planned_phases_before_they_start(self) -> None:
+        self.tracker.plan("v1/user/{u}/contact-methods", 100)
+        self.tracker.plan("v1/user/{u}/policies", 100)
+        self.tracker.expect(80, "v1/user/{u}/contact-methods")
+        with self.assertLogs("utils.progress", level="INFO") as logs:
+            self.tracker.advance("user")
+            for _ in range(79):
+                self.tracker.advance("user")
+
+        lines = [record.getMessage() for record in logs.records]
+        self.assertIn("[1/180] 0%", lines[0])
+        self.assertIn("ETA 1m 30s", lines[0])
+        # Finishing one phase is not the end of the run while another is still planned.
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(self.tracker.total, 180)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,21 +5,121 @@ from __future__ import annotations
 import unittest
 from unittest import mock
 
-from utils.rate_limiter import RateLimiter
+from utils.rate_limiter import RateLimiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self, start: float = 100.0):
+        self.now = start
+        self.sleeps: list = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
 
 
 class RateLimiterTest(unittest.TestCase):
-    @mock.patch("utils.rate_limiter.time.sleep")
-    @mock.patch("utils.rate_limiter.time.monotonic")
-    def test_wait_enforces_minimum_spacing(self, mock_monotonic: mock.Mock, mock_sleep: mock.Mock) -> None:
-        mock_monotonic.side_effect = [1.0, 1.0, 1.1, 1.1]
+    def _patched(self, clock: FakeClock):
+        return mock.patch.multiple(
+            "utils.rate_limiter.time", monotonic=clock.monotonic, sleep=clock.sleep
+        )
+
+    def test_wait_enforces_minimum_spacing(self) -> None:
+        clock = FakeClock(start=1.0)
+        limiter = RateLimiter(rate_hz=2.0)
+
+        with self._patched(clock):
+            limiter.wait()
+            clock.now = 1.1
+            limiter.wait()
+
+        self.assertEqual(len(clock.sleeps), 1)
+        self.assertAlmostEqual(clock.sleeps[0], 0.4)
+
+    def test_burst_spends_idle_capacity_then_spaces_calls(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(rate_hz=2.0, burst=3)
+
+        with self._patched(clock):
+            waits = [limiter.wait() for _ in range(5)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.5)
+        self.assertAlmostEqual(waits[4], 0.5)
+
+    def test_backoff_pauses_all_callers_and_is_counted(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(rate_hz=2.0, burst=4)
+
+        with self._patched(clock):
+            limiter.wait()
+            limiter.backoff(3.0)
+            waited = limiter.wait()
+            second = limiter.wait()
+
+        self.assertAlmostEqual(waited, 3.0)
+        self.assertAlmostEqual(second, 0.5)
+        stats = limiter.stats()
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["throttled"], 1)
+        self.assertAlmostEqual(stats["total_wait_seconds"], 3.5)
+
+    def test_observe_response_uses_retry_after_header(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(rate_hz=2.0)
+        resp = mock.Mock(status_code=429, headers={"Retry-After": "7"})
+
+        with self._patched(clock):
+            self.assertEqual(limiter.observe_response(resp), 7.0)
+            self.assertAlmostEqual(limiter.wait(), 7.0)
+
+    def test_backoff_while_asleep_moves_the_slot_instead_of_taking_another(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(rate_hz=2.0)
+        sleep = clock.sleep
+
+        def others_queue_then_429(seconds: float) -> None:
+            # Three other callers reserve slots 101.0-102.0, then a 429 pauses for 0.8s.
+            if len(clock.sleeps) == 0:
+                for _ in range(3):
+                    limiter._reserve()
+                limiter.backoff(0.8)
+            sleep(seconds)
+
+        with self._patched(clock):
+            limiter.wait()
+            with mock.patch("utils.rate_limiter.time.sleep", side_effect=others_queue_then_429):
+                waited = limiter.wait()
+            ready_in = limiter.ready_in()
+
+        # Slot 100.5 moves to 101.3; the queue behind it ends at 102.8, so the next slot is 103.3.
+        self.assertAlmostEqual(waited, 1.3)
+        self.assertAlmostEqual(ready_in, 2.0)
+
+    def test_observe_response_without_retry_after_uses_retry_backoff(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(rate_hz=2.0, burst=2)
+        resp = mock.Mock(status_code=429, headers={})
+
+        with self._patched(clock):
+            self.assertEqual(limiter.observe_response(resp), 1.0)
+            self.assertEqual(limiter.observe_response(resp, retry_backoff=8.0), 8.0)
+
+    def test_observe_response_ignores_success_without_header(self) -> None:
         limiter = RateLimiter(rate_hz=2.0)
+        resp = mock.Mock(status_code=200, headers={})
 
-        limiter.wait()
-        limiter.wait()
+        self.assertIsNone(limiter.observe_response(resp))
+        self.assertEqual(limiter.stats()["throttled"], 0)
 
-        mock_sleep.assert_called_once()
-        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.4)
+    def test_parse_retry_after_accepts_seconds_and_rejects_garbage(self) -> None:
+        self.assertEqual(parse_retry_after("2.5"), 2.5)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""Unit tests for utils/response_cache.py."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from utils.response_cache import ResponseCache
+
+URL = "https://api.example/v1/team"
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _age(self, cache: ResponseCache, params: dict, seconds: float) -> None:
+        path = cache.cache_dir / f"{cache.key(URL, params)}.json"
+        entry = cache.lookup(URL, params)
+        assert entry is not None
+        text = path.read_text().replace(
+            f'"stored_at":{entry.stored_at}', f'"stored_at":{entry.stored_at - seconds}'
+        )
+        path.write_text(text)
+
+    def test_fresh_entry_is_a_hit_without_request(self) -> None:
+        cache = ResponseCache(self.cache_dir, ttl_seconds=60)
+        hit, entry, _ = cache.before_request(URL, {"offset": 0})
+        self.assertIsNone(hit)
+        cache.after_response(URL, {"offset": 0}, entry, 200, '{"teams": []}', {})
+
+        hit, _, headers = cache.before_request(URL, {"offset": 0})
+        self.assertEqual(hit.json(), {"teams": []})
+        self.assertEqual(headers, {})
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_params_and_namespace_are_part_of_the_key(self) -> None:
+        cache = ResponseCache(self.cache_dir, ttl_seconds=60, namespace="org-a")
+        cache.after_response(URL, {"offset": 0}, None, 200, "[1]", {})
+        self.assertIsNone(cache.lookup(URL, {"offset": 100}))
+        other = ResponseCache(self.cache_dir, ttl_seconds=60, namespace="org-b")
+        self.assertIsNone(other.lookup(URL, {"offset": 0}))
+
+    def test_stale_entry_revalidates_with_validators_and_304_refreshes(self) -> None:
+        cache = ResponseCache(self.cache_dir, ttl_seconds=60)
+        validators = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        cache.after_response(URL, None, None, 200, '{"teams": [1]}', validators)
+        self._age(cache, None, 120)
+
+        hit, entry, headers = cache.before_request(URL, None)
+        self.assertIsNone(hit)
+        self.assertEqual(
+            headers,
+            {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+        resp = cache.after_response(URL, None, entry, 304, "", {})
+        self.assertEqual(resp.json(), {"teams": [1]})
+        self.assertTrue(cache.is_fresh(cache.lookup(URL, None)))
+        self.assertEqual(cache.lookup(URL, None).etag, '"v1"')
+        self.assertEqual(cache.stats()["revalidated"], 1)
+
+    def test_non_200_is_not_stored(self) -> None:
+        cache = ResponseCache(self.cache_dir)
+        cache.after_response(URL, None, None, 404, "", {})
+        self.assertIsNone(cache.lookup(URL, None))
+
+    def test_size_bound_evicts_least_recently_used(self) -> None:
+        cache = ResponseCache(self.cache_dir, ttl_seconds=60, max_bytes=700)
+        body = "x" * 150
+        cache.after_response(URL, {"offset": 0}, None, 200, body, {})
+        cache.after_response(URL, {"offset": 1}, None, 200, body, {})
+        past = time.time() - 100
+        os.utime(cache.cache_dir / f"{cache.key(URL, {'offset': 0})}.json", (past, past))
+        cache.after_response(URL, {"offset": 2}, None, 200, body, {})
+
+        self.assertIsNone(cache.lookup(URL, {"offset": 0}))
+        self.assertIsNotNone(cache.lookup(URL, {"offset": 2}))
+        self.assertLessEqual(cache.stats()["bytes"], 700)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_read_refreshes_lru_order_and_reopen_orders_by_mtime(self) -> None:
+        cache = ResponseCache(self.cache_dir, ttl_seconds=60, max_bytes=700)
+        body = "x" * 150
+        cache.after_response(URL, {"offset": 0}, None, 200, body, {})
+        cache.after_response(URL, {"offset": 1}, None, 200, body, {})
+        hit, _entry, _headers = cache.before_request(URL, {"offset": 0})
+        self.assertIsNotNone(hit)
+        cache.after_response(URL, {"offset": 2}, None, 200, body, {})
+
+        self.assertIsNone(cache.lookup(URL, {"offset": 1}))
+        self.assertIsNotNone(cache.lookup(URL, {"offset": 0}))
+
+        past = time.time() - 100
+        os.utime(cache.cache_dir / f"{cache.key(URL, {'offset': 2})}.json", (past, past))
+        reopened = ResponseCache(self.cache_dir, ttl_seconds=60, max_bytes=700)
+        self.assertEqual(reopened.stats()["bytes"], cache.stats()["bytes"])
+        reopened.after_response(URL, {"offset": 3}, None, 200, body, {})
+        self.assertIsNone(reopened.lookup(URL, {"offset": 2}))
+        self.assertIsNotNone(reopened.lookup(URL, {"offset": 0}))
+
+    def test_reopened_cache_counts_existing_entries(self) -> None:
+        ResponseCache(self.cache_dir).after_response(URL, None, None, 200, "[]", {})
+        self.assertEqual(ResponseCache(self.cache_dir).stats()["entries"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
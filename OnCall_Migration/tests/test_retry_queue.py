@@ -0,0 +1,157 @@
+"""Unit tests for utils.retry_queue."""
+
+from __future__ import annotations
+
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.exceptions import ApiError, TransientError
+from utils.retry_queue import CircuitBreaker, RetryQueue
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_threshold_and_half_opens_after_cooldown(self) -> None:
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=10.0, clock=clock)
+
+        breaker.record("v1/user/{u}/contact-methods", ok=False)
+        self.assertTrue(breaker.allow("v1/user/{u}/contact-methods"))
+        breaker.record("v1/user/{u}/contact-methods", ok=False)
+
+        self.assertFalse(breaker.allow("v1/user/{u}/contact-methods"))
+        self.assertTrue(breaker.allow("v2/team/{t}/rotations"))
+        self.assertEqual(breaker.open_keys(), ["v1/user/{u}/contact-methods"])
+        self.assertEqual(breaker.trips, 1)
+
+        clock.now = 10.0
+        self.assertTrue(breaker.allow("v1/user/{u}/contact-methods"))
+        breaker.record("v1/user/{u}/contact-methods", ok=False)
+        self.assertEqual(breaker.retry_in("v1/user/{u}/contact-methods"), 10.0)
+        self.assertEqual(breaker.trips, 1)
+
+        breaker.record("v1/user/{u}/contact-methods", ok=True)
+        self.assertTrue(breaker.allow("v1/user/{u}/contact-methods"))
+        self.assertEqual(breaker.open_keys(), [])
+
+
+class RetryQueueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+
+    def _queue(self, **kwargs) -> RetryQueue:
+        breaker = kwargs.pop("breaker", None) or CircuitBreaker(clock=self.clock)
+        return RetryQueue(
+            breaker, rng=random.Random(7), clock=self.clock, sleep=self.clock.sleep, **kwargs
+        )
+
+    def test_backoff_uses_equal_jitter_capped_at_max_delay(self) -> None:
+        queue = self._queue(base_delay=1.0, max_delay=8.0)
+        for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (9, 8.0)]:
+            delay = queue.backoff(attempt)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+    def test_drain_retries_until_recovered(self) -> None:
+        queue = self._queue(base_delay=1.0)
+        failures = {"a": 2, "b": 0}
+        calls = []
+
+        def fetch(item: str) -> None:
+            calls.append(item)
+            if failures[item]:
+                failures[item] -= 1
+                raise TransientError("HTTP 503")
+
+        queue.defer("k", "a")
+        queue.defer("k", "b")
+
+        self.assertEqual(queue.drain(fetch), 2)
+        self.assertEqual(sorted(calls), ["a", "a", "a", "b"])
+        self.assertEqual(queue.stats(), {"deferred": 2, "retries": 4, "recovered": 2})
+        self.assertEqual(len(queue), 0)
+        self.assertTrue(self.clock.sleeps)
+
+    def test_drain_raises_once_attempts_are_exhausted(self) -> None:
+        queue = self._queue(max_attempts=3)
+        calls = []
+
+        def fetch(item: str) -> None:
+            calls.append(item)
+            raise TransientError("HTTP 503")
+
+        queue.defer("k", "a")
+
+        with self.assertRaises(TransientError):
+            queue.drain(fetch)
+        self.assertEqual(len(calls), 2)
+
+    def test_requeue_behind_open_breaker_costs_no_attempt(self) -> None:
+        queue = self._queue(max_attempts=3)
+        calls = []
+
+        def fetch(item: str) -> None:
+            calls.append(item)
+            raise TransientError("HTTP 503")
+
+        queue.requeue("k", "a")
+
+        with self.assertRaises(TransientError):
+            queue.drain(fetch)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(queue.stats()["deferred"], 1)
+
+    def test_non_transient_error_is_not_retried(self) -> None:
+        queue = self._queue()
+        calls = []
+
+        def fetch(item: str) -> None:
+            calls.append(item)
+            raise ApiError("HTTP 404")
+
+        queue.defer("k", "a")
+
+        with self.assertRaises(ApiError):
+            queue.drain(fetch)
+        self.assertEqual(calls, ["a"])
+
+    def test_drain_waits_for_open_breaker(self) -> None:
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=30.0, clock=self.clock)
+        breaker.record("k", ok=False)
+        queue = self._queue(breaker=breaker, base_delay=1.0)
+        called_at = []
+
+        queue.defer("k", "a")
+        queue.drain(lambda item: called_at.append(self.clock.now))
+
+        self.assertEqual(called_at, [30.0])
+        self.assertTrue(breaker.allow("k"))
+
+    def test_ready_items_run_as_one_batch_on_executor(self) -> None:
+        queue = self._queue(base_delay=0.0)
+        for item in range(6):
+            queue.defer("k", item)
+        seen = []
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            self.assertEqual(queue.drain(seen.append, executor), 6)
+
+        self.assertEqual(sorted(seen), list(range(6)))
+        self.assertEqual(self.clock.sleeps, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for the benchmark simulator and harness (local HTTP, no live API calls)."""
+
+from __future__ import annotations
+
+import json
+import logging
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from benchmarks.run_benchmarks import run_size
+from benchmarks.simulator import Faults, SimulatedOrg, VictorOpsSimulator
+from utils.io import load_json
+
+
+class SimulatorTest(unittest.TestCase):
+    def test_offset_paging_and_entity_routes(self) -> None:
+        with VictorOpsSimulator(SimulatedOrg.synthetic(users=150, teams=3)) as sim:
+            with urllib.request.urlopen(f"{sim.base_v1}/user?offset=100&limit=100") as resp:
+                page = json.loads(resp.read())
+            with urllib.request.urlopen(f"{sim.base_v2}/team/team-0001/members") as resp:
+                members = json.loads(resp.read())
+            with self.assertRaises(urllib.error.HTTPError) as missing:
+                urllib.request.urlopen(f"{sim.base_v1}/policies/nope")
+
+            self.assertEqual(len(page["users"]), 50)
+            self.assertEqual(len(members["members"]), 50)
+            self.assertEqual(missing.exception.code, 404)
+            self.assertEqual(
+                sim.request_counts(),
+                {"GET v1/policies/{p}": 1, "GET v1/user": 1, "GET v2/team/{t}/members": 1},
+            )
+
+    def test_injected_faults(self) -> None:
+        for faults, status in ((Faults(throttle_rate=1.0, retry_after=3), 429), (Faults(error_rate=1.0), 503)):
+            with self.subTest(status=status), VictorOpsSimulator(SimulatedOrg(), faults) as sim:
+                with self.assertRaises(urllib.error.HTTPError) as error:
+                    urllib.request.urlopen(f"{sim.base_v1}/team")
+                self.assertEqual(error.exception.code, status)
+                if status == 429:
+                    self.assertEqual(error.exception.headers["Retry-After"], "3")
+
+
+class BenchmarkHarnessTest(unittest.TestCase):
+    def test_pipelines_migrate_a_small_org_end_to_end(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = run_size(12, Path(tmp), users_per_team=4, trace_memory=False)
+            metadata = load_json(Path(tmp) / "inventory" / "discovery_metadata.json")
+            report = load_json(Path(tmp) / "inventory" / "apply_report.json")
+
+        self.assertEqual([row["pipeline"] for row in rows], ["discovery", "apply", "deferred"])
+        self.assertTrue(all(row["api_calls"] > 0 for row in rows))
+        self.assertEqual(metadata["inventory_counts"]["users_inventory"], 12)
+        self.assertEqual(metadata["inventory_counts"]["escalation_policy_details_inventory"], 6)
+        stats = report["stats"]
+        self.assertEqual(stats["users"]["created"], 12)
+        self.assertEqual(stats["teams"]["created"], 3)
+        self.assertEqual(stats["rotations"]["created"], 3)
+        self.assertEqual(stats["escalation_policies"]["created"], 6)
+        self.assertEqual(stats["routing_keys"]["created"], 3)
+        self.assertEqual(stats["alert_rules"]["created"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
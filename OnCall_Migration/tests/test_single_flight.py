@@ -0,0 +1,132 @@
+"""Unit tests for utils.single_flight.SingleFlight."""
+
+from __future__ import annotations
+
+import threading
+import unittest
+from unittest import mock
+
+from utils.single_flight import SingleFlight, no_memo
+
+BASE = "https://api.victorops.com/api-public/v1"
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_identical_calls_share_one_result(self) -> None:
+        flight = SingleFlight(ttl_seconds=0)
+        release = threading.Event()
+        calls = []
+
+        def fetch() -> str:
+            calls.append(1)
+            release.wait(5)
+            return "body"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do(("k", ()), fetch)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while flight.stats()["shared"] < 3:
+            threading.Event().wait(0.005)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [("body", False)] + [("body", True)] * 3)
+        self.assertEqual(flight.stats(), {"shared": 3, "memo_hits": 0, "memoized": 0})
+
+    def test_memo_serves_repeats_until_ttl_expires(self) -> None:
+        flight = SingleFlight(ttl_seconds=30)
+        fetch = mock.Mock(side_effect=["first", "second"])
+        key = SingleFlight.key(f"{BASE}/team/t1/rotations")
+
+        with mock.patch("utils.single_flight.time.monotonic", return_value=100.0):
+            self.assertEqual(flight.do(key, fetch), ("first", False))
+            self.assertEqual(flight.do(key, fetch), ("first", True))
+        with mock.patch("utils.single_flight.time.monotonic", return_value=131.0):
+            self.assertEqual(flight.do(key, fetch), ("second", False))
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_insert_drops_expired_entries_and_no_memo_skips_the_memo(self) -> None:
+        flight = SingleFlight(ttl_seconds=30)
+
+        with mock.patch("utils.single_flight.time.monotonic", return_value=100.0):
+            for user in ("a", "b"):
+                flight.do(SingleFlight.key(f"{BASE}/user/{user}"), lambda: user)
+        with mock.patch("utils.single_flight.time.monotonic", return_value=131.0):
+            flight.do(SingleFlight.key(f"{BASE}/user/c"), lambda: "c")
+            self.assertEqual(flight.stats()["memoized"], 1)
+            with no_memo():
+                flight.do(SingleFlight.key(f"{BASE}/user/d"), lambda: "d")
+        self.assertEqual(flight.stats()["memoized"], 1)
+
+    def test_params_are_part_of_the_key(self) -> None:
+        self.assertEqual(
+            SingleFlight.key("u", {"offset": 0, "limit": 100}),
+            SingleFlight.key("u", {"limit": "100", "offset": "0"}),
+        )
+        self.assertNotEqual(SingleFlight.key("u", {"offset": 0}), SingleFlight.key("u", {"offset": 100}))
+
+    def test_invalidate_drops_path_parents_and_children_only(self) -> None:
+        flight = SingleFlight()
+        urls = [f"{BASE}/team/t1", f"{BASE}/team/t1/members", f"{BASE}/team/t1/members/alice", f"{BASE}/team/t2"]
+        for url in urls:
+            flight.do(SingleFlight.key(url), lambda: url)
+
+        self.assertEqual(flight.invalidate(f"{BASE}/team/t1/members"), 3)
+        self.assertEqual(flight.do(SingleFlight.key(f"{BASE}/team/t2"), lambda: "fresh"), (f"{BASE}/team/t2", True))
+        self.assertEqual(flight.do(SingleFlight.key(f"{BASE}/team/t1"), lambda: "fresh"), ("fresh", False))
+
+    def test_result_racing_a_write_is_not_memoized(self) -> None:
+        flight = SingleFlight()
+        key = SingleFlight.key(f"{BASE}/team/t1/members")
+
+        def fetch_while_written() -> str:
+            flight.invalidate(f"{BASE}/team/t1/members")
+            return "stale"
+
+        flight.do(key, fetch_while_written)
+        self.assertEqual(flight.do(key, lambda: "fresh"), ("fresh", False))
+
+    def test_errors_propagate_to_waiters_and_are_not_memoized(self) -> None:
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fail() -> str:
+            release.wait(5)
+            raise ConnectionError("boom")
+
+        errors = []
+
+        def call() -> None:
+            try:
+                flight.do(("k", ()), fail)
+            except ConnectionError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while flight.stats()["shared"] < 1:
+            threading.Event().wait(0.005)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(flight.do(("k", ()), lambda: "ok"), ("ok", False))
+
+    def test_uncacheable_results_are_not_memoized(self) -> None:
+        flight = SingleFlight(cacheable=lambda result: result != "404")
+        fetch = mock.Mock(return_value="404")
+        flight.do(("k", ()), fetch)
+        flight.do(("k", ()), fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Unit tests for utils.target_state."""
+
+from __future__ import annotations
+
+import json
+import unittest
+from unittest import mock
+
+from apply import ApplyClient
+from benchmarks.simulator import SimulatedOrg, VictorOpsSimulator
+from utils.target_state import TargetState, alert_rule_signatures, listing_items
+
+
+class TargetStateFetchTest(unittest.TestCase):
+    def test_one_listing_per_category_plus_two_reads_per_team(self) -> None:
+        org = SimulatedOrg.synthetic(users=40, teams=4)
+        with VictorOpsSimulator(org) as sim:
+            client = sim.attach(ApplyClient("id", "key", "target-org"))
+            client.rate_limiter.delay = 0.0
+            state = TargetState.fetch(client)
+
+            self.assertEqual(sim.request_count, 5 + 2 * 4)
+        self.assertEqual(state.reads, 13)
+        self.assertEqual(len(state.users), 40)
+        self.assertEqual(state.teams["Team 0001"], "team-0001")
+        self.assertEqual(state.members["team-0001"], set(org.members["team-0001"]))
+        self.assertEqual(state.rotations["team-0001"], {"team-0001 primary": "rtg-team-0001"})
+        self.assertEqual(state.policies["pol-0001-0"], "team-0001 policy 0")
+        self.assertIn("rk-team-0002", state.routing_keys)
+        self.assertIn(("routing_key", "rk-team-0003", 4), state.alert_rules)
+
+    def test_round_trips_through_json(self) -> None:
+        state = TargetState()
+        state.users = {"bob", "alice"}
+        state.add_team("Alpha Team", "team-alpha")
+        state.members["team-alpha"].add("alice")
+        state.rotations["team-alpha"]["Primary"] = "rtg-1"
+        state.policies["pol-alpha"] = "Alpha Policy"
+        state.routing_keys = {"ALPHA"}
+        state.alert_rules = {("routing_key", "ALPHA", 1)}
+
+        restored = TargetState.from_dict(json.loads(json.dumps(state.to_dict())))
+
+        self.assertEqual(restored.to_dict(), state.to_dict())
+        self.assertEqual(restored.alert_rules, {("routing_key", "ALPHA", 1)})
+        self.assertEqual(restored.members, {"team-alpha": {"alice"}})
+
+
+class TeamMembersCacheTest(unittest.TestCase):
+    def _client(self, *responses):
+        client = mock.Mock()
+        client.get.side_effect = list(responses)
+        return client
+
+    def test_members_read_once_per_team(self) -> None:
+        client = self._client(({"members": [{"username": "alice"}]}, 200), (None, 404))
+        state = TargetState()
+
+        members = state.team_members(client, "team-alpha")
+        members.add("bob")
+
+        self.assertEqual(state.team_members(client, "team-alpha"), {"alice", "bob"})
+        self.assertEqual(state.team_members(client, "team-new"), set())
+        self.assertEqual(state.team_members(client, "team-new"), set())
+        self.assertEqual(client.get.call_count, 2)
+        self.assertEqual(state.reads, 2)
+        self.assertFalse(state.complete)
+
+    def test_failed_read_is_not_cached(self) -> None:
+        client = self._client((None, 500), ({"members": []}, 200))
+        state = TargetState()
+
+        self.assertIsNone(state.team_members(client, "team-alpha"))
+        self.assertEqual(state.team_members(client, "team-alpha"), set())
+        self.assertEqual(client.get.call_count, 2)
+
+    def test_rotation_groups_cached_until_refresh(self) -> None:
+        client = self._client(
+            ({"rotationGroups": [{"label": "Primary", "slug": "rtg-1"}]}, 200),
+            ({"rotationGroups": [{"label": "Primary", "slug": "rtg-1"}, {"label": "Backup", "slug": "rtg-2"}]}, 200),
+        )
+        state = TargetState()
+
+        self.assertEqual(state.rotation_groups(client, "team-alpha"), {"Primary": "rtg-1"})
+        self.assertEqual(state.rotation_groups(client, "team-alpha"), {"Primary": "rtg-1"})
+        refreshed = state.rotation_groups(client, "team-alpha", refresh=True)
+
+        self.assertEqual(refreshed, {"Primary": "rtg-1", "Backup": "rtg-2"})
+        self.assertIs(state.rotations["team-alpha"], refreshed)
+        self.assertEqual(client.get.call_count, 2)
+
+    def test_created_team_needs_no_read(self) -> None:
+        client = self._client()
+        state = TargetState()
+        state.add_team("Alpha Team", "team-alpha")
+
+        self.assertEqual(state.team_members(client, "team-alpha"), set())
+        client.get.assert_not_called()
+
+    def test_resumed_team_is_read_from_the_target(self) -> None:
+        client = self._client(
+            ({"members": [{"username": "alice"}]}, 200),
+            ({"rotationGroups": [{"label": "Primary", "slug": "rtg-1"}]}, 200),
+        )
+        state = TargetState()
+        state.add_team("Alpha Team", "team-alpha")
+        state.resume_team("Alpha Team", "team-alpha")
+
+        self.assertEqual(state.team_members(client, "team-alpha"), {"alice"})
+        self.assertEqual(state.rotation_groups(client, "team-alpha"), {"Primary": "rtg-1"})
+        self.assertEqual(state.teams, {"Alpha Team": "team-alpha"})
+
+
+class ListingParsingTest(unittest.TestCase):
+    def test_listing_items_accepts_lists_pages_and_wrapped_bodies(self) -> None:
+        self.assertEqual(listing_items([{"a": 1}, "junk"], "x"), [{"a": 1}])
+        self.assertEqual(listing_items({"users": [[{"a": 1}], [{"a": 2}]]}, "users"), [{"a": 1}, {"a": 2}])
+        self.assertEqual(listing_items(None, "users"), [])
+
+    def test_alert_rules_listed_under_rules_or_alert_rules(self) -> None:
+        rule = {"alertField": "routing_key", "alertValueMatch": "ALPHA", "rank": 2}
+        expected = {("routing_key", "ALPHA", 2)}
+        self.assertEqual(alert_rule_signatures({"rules": [rule]}), expected)
+        self.assertEqual(alert_rule_signatures({"alertRules": [rule]}), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
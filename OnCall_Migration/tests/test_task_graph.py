@@ -0,0 +1,68 @@
+"""Unit tests for utils.task_graph."""
+
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from utils.task_graph import TaskGraph
+
+
+class TaskGraphTest(unittest.TestCase):
+    def test_dependencies_receive_upstream_results(self) -> None:
+        graph = TaskGraph()
+        graph.add("a", lambda _: 1)
+        graph.add("b", lambda _: 2)
+        graph.add("sum", lambda r: r["a"] + r["b"], deps=["a", "b"])
+
+        results = graph.run()
+
+        self.assertEqual(results["sum"], 3)
+        self.assertEqual(set(graph.timing()["tasks"]), {"a", "b", "sum"})
+
+    def test_independent_tasks_overlap(self) -> None:
+        barrier = threading.Barrier(2, timeout=2)
+        graph = TaskGraph(max_parallel=2)
+        # Each task waits for the other; this only completes if both run at once.
+        graph.add("left", lambda _: barrier.wait())
+        graph.add("right", lambda _: barrier.wait())
+
+        graph.run()
+
+    def test_timing_reports_saved_time(self) -> None:
+        graph = TaskGraph(max_parallel=3)
+        for name in ("x", "y", "z"):
+            graph.add(name, lambda _: time.sleep(0.05))
+
+        graph.run()
+        timing = graph.timing()
+
+        self.assertGreaterEqual(timing["sequential_seconds"], timing["wall_seconds"])
+        self.assertGreaterEqual(timing["saved_seconds"], 0.0)
+
+    def test_failure_stops_dependents_and_propagates(self) -> None:
+        ran = []
+        graph = TaskGraph()
+        graph.add("boom", lambda _: (_ for _ in ()).throw(SystemExit(1)))
+        graph.add("after", lambda _: ran.append("after"), deps=["boom"])
+
+        with self.assertRaises(SystemExit):
+            graph.run()
+        self.assertEqual(ran, [])
+
+    def test_cycle_and_unknown_dependency_rejected(self) -> None:
+        graph = TaskGraph()
+        graph.add("a", lambda _: None, deps=["b"])
+        graph.add("b", lambda _: None, deps=["a"])
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            graph.run()
+
+        graph = TaskGraph()
+        graph.add("a", lambda _: None, deps=["missing"])
+        with self.assertRaisesRegex(ValueError, "unknown"):
+            graph.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
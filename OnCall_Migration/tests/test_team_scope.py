@@ -13,6 +13,7 @@ from utils.team_scope import (
     filter_routing_keys,
     parse_teams_arg,
     parse_teams_file,
+    policy_routing_targets,
     unknown_team_slugs,
 )
 
@@ -108,6 +109,20 @@ class TeamScopeTest(unittest.TestCase):
         expanded = expand_policy_closure(details, {"pol-a"})
         self.assertEqual(expanded, {"pol-a", "pol-b", "pol-c"})
 
+    def test_policy_routing_targets_ignores_other_entries(self) -> None:
+        steps = [
+            {"entries": [{"executionType": "user", "user": {"username": "alice"}}]},
+            {
+                "entries": [
+                    {"executionType": "policy_routing", "targetPolicy": {"policySlug": "pol-b"}},
+                    {"executionType": "policy_routing", "targetPolicy": {}},
+                    "not-an-entry",
+                ]
+            },
+        ]
+        self.assertEqual(policy_routing_targets(steps), {"pol-b"})
+        self.assertEqual(policy_routing_targets(None), set())
+
     def test_filter_routing_keys_by_policy_slug(self) -> None:
         routing_keys = [
             {
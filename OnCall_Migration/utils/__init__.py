@@ -9,7 +9,7 @@ so importing `utils` stays safe before heavy dependencies are available
 from utils.cli import print_help_and_exit_if_requested
 from utils.env_loader import PROJECT_ROOT, load_dotenv
 from utils.exceptions import ApiError, MigrationError, NetworkError
-from utils.io import load_json
+from utils.io import load_inventory, load_json
 from utils.rate_limiter import RateLimiter
 
 __all__ = [
@@ -19,6 +19,7 @@ __all__ = [
     "NetworkError",
     "RateLimiter",
     "load_dotenv",
+    "load_inventory",
     "load_json",
     "print_help_and_exit_if_requested",
 ]
@@ -0,0 +1,254 @@
+"""Asyncio VictorOps client for discovery's ``--engine async`` fan-out.
+
+Requires the optional ``aiohttp`` package, imported lazily when a session is
+opened so the threaded engine keeps working with ``requests`` alone.
+Pagination semantics are shared with ``discovery.VictorOpsClient.get`` through
+``utils.pagination.page_requests``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from utils.credential_pool import ApiCredential, CredentialPool
+from utils.exceptions import ApiError, MigrationError, NetworkError, TransientError
+from utils.http_client import RETRY_STATUSES
+from utils.metrics import RequestMetrics
+from utils.pagination import page_requests
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
+
+log = logging.getLogger(__name__)
+
+
+class AsyncResponse:
+    """Status and body of a completed async request (body already read)."""
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict[str, str]] = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self) -> Any:
+        return json.loads(self.text) if self.text else None
+
+
+def _transport_errors() -> Tuple[Tuple[type, ...], Tuple[type, ...]]:
+    """(transient, other) transport errors, mirroring discovery's ``TRANSIENT_REQUEST_ERRORS``."""
+    transient: Tuple[type, ...] = (asyncio.TimeoutError, ConnectionError)
+    try:
+        import aiohttp
+    except ImportError:
+        return transient, (OSError,)
+    return transient + (aiohttp.ClientConnectionError,), (OSError, aiohttp.ClientError)
+
+
+def _aiohttp_session_factory(headers: Dict[str, str], timeout: float, limit: int) -> Any:
+    try:
+        import aiohttp
+    except ImportError as exc:
+        raise MigrationError(
+            "The async discovery engine requires aiohttp: pip install aiohttp"
+        ) from exc
+    return aiohttp.ClientSession(
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        connector=aiohttp.TCPConnector(limit=limit),
+    )
+
+
+class AsyncVictorOpsClient:
+    """Coroutine GET client sharing base URLs, auth headers, and a ``RateLimiter``.
+
+    ``concurrency`` bounds in-flight requests; the shared limiter bounds their rate.
+    With ``credentials`` each request goes to the pool's least-loaded API key pair
+    and is paced by that key's limiter, as in the threaded client.
+    Use as ``async with AsyncVictorOpsClient(...) as client``.
+    """
+
+    def __init__(
+        self,
+        base_v1: str,
+        base_v2: str,
+        headers: Dict[str, str],
+        org_slug: str,
+        rate_limiter: RateLimiter,
+        *,
+        concurrency: int = 16,
+        retry_total: int = 6,
+        retry_backoff: float = 2.0,
+        timeout: float = 30.0,
+        session_factory: Optional[Callable[[Dict[str, str], float, int], Any]] = None,
+        response_cache: Optional[ResponseCache] = None,
+        metrics: Optional[RequestMetrics] = None,
+        credentials: Optional[CredentialPool] = None,
+    ):
+        self.base_v1 = base_v1
+        self.base_v2 = base_v2
+        self.headers = dict(headers)
+        self.org_slug = org_slug
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.retry_total = retry_total
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self._session_factory = session_factory or _aiohttp_session_factory
+        self.response_cache = response_cache
+        self.metrics = metrics or RequestMetrics()
+        self.credentials = credentials
+        self._session: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_client(cls, client: Any, **kwargs: Any) -> "AsyncVictorOpsClient":
+        """Build from a sync ``BaseVictorOpsClient`` so both engines share one rate budget."""
+        kwargs.setdefault("response_cache", getattr(client, "response_cache", None))
+        kwargs.setdefault("metrics", getattr(client, "metrics", None))
+        kwargs.setdefault("credentials", getattr(client, "credentials", None))
+        return cls(
+            client.base_v1,
+            client.base_v2,
+            {k: v for k, v in client.session.headers.items() if k.startswith(("X-VO-", "Accept"))},
+            client.org_slug,
+            client.rate_limiter,
+            **kwargs,
+        )
+
+    async def __aenter__(self) -> "AsyncVictorOpsClient":
+        self._session = self._session_factory(self.headers, self.timeout, self.concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def _key_headers(request_kwargs: Dict[str, Any], credential: Optional[ApiCredential]) -> Dict[str, Any]:
+        """``request_kwargs`` with the chosen key pair's auth headers (if any) added."""
+        if credential is None:
+            return request_kwargs
+        keys = {k: v for k, v in credential.session.headers.items() if k.startswith("X-VO-Api-")}
+        return {**request_kwargs, "headers": {**request_kwargs.get("headers", {}), **keys}}
+
+    def _url(self, endpoint: str, base: str) -> str:
+        if endpoint.startswith("http"):
+            return endpoint
+        return f"{base}/{endpoint.lstrip('/')}"
+
+    async def _send(self, url: str, params: Dict[str, Any]) -> Any:
+        """One GET via the response cache (if set) and the network."""
+        cache = self.response_cache
+        if cache is None:
+            return await self._send_network(url, params, {})
+        hit, entry, conditional = cache.before_request(url, params)
+        if hit is not None:
+            self.metrics.observe_cache_hit("GET", url)
+            return hit
+        resp = await self._send_network(url, params, conditional)
+        revalidated = cache.after_response(
+            url, params, entry, resp.status_code, resp.text, resp.headers
+        )
+        return revalidated if revalidated is not None else resp
+
+    async def _send_network(
+        self, url: str, params: Dict[str, Any], headers: Dict[str, str]
+    ) -> AsyncResponse:
+        """One GET with limiter pacing and retries on 429/5xx (no thread sleeps)."""
+        assert self._semaphore is not None, "use 'async with' to open the client"
+        request_kwargs: Dict[str, Any] = {"params": params}
+        if headers:
+            request_kwargs["headers"] = headers
+        transient_errors, other_errors = _transport_errors()
+        attempt = 0
+        waited = 0.0
+        started = time.monotonic()
+        while True:
+            credential = self.credentials.acquire() if self.credentials is not None else None
+            limiter = credential.rate_limiter if credential is not None else self.rate_limiter
+            try:
+                waited += await limiter.wait_async()
+                async with self._semaphore:
+                    try:
+                        async with self._session.get(url, **self._key_headers(request_kwargs, credential)) as raw:
+                            resp = AsyncResponse(raw.status, await raw.text(), dict(raw.headers))
+                    except transient_errors + other_errors as exc:
+                        self.metrics.observe(
+                            "GET", url, status=None, latency=time.monotonic() - started,
+                            limiter_wait=waited, retries=attempt,
+                        )
+                        if isinstance(exc, transient_errors):
+                            log.warning(f"Network Error: {url} - {exc}")
+                            raise TransientError(f"Failed to fetch {url}: {exc}") from exc
+                        log.error(f"Network Error: {url} - {exc}")
+                        raise NetworkError(f"Failed to fetch {url}: {exc}") from exc
+            finally:
+                if credential is not None:
+                    self.credentials.release(credential)
+
+            if resp.status_code not in RETRY_STATUSES or attempt >= self.retry_total:
+                if resp.status_code == 429:
+                    limiter.observe_response(resp)
+                self.metrics.observe(
+                    "GET",
+                    url,
+                    status=resp.status_code,
+                    latency=time.monotonic() - started,
+                    limiter_wait=waited,
+                    retries=attempt,
+                    bytes_received=len(resp.text.encode("utf-8")),
+                )
+                return resp
+            backoff = self.retry_backoff * (2 ** attempt)
+            if limiter.observe_response(resp, backoff) is None:
+                await asyncio.sleep(backoff)
+            attempt += 1
+
+    async def get(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        use_v2: bool = False,
+        paginate: bool = True,
+        required: bool = False,
+    ) -> Any:
+        """Async twin of ``VictorOpsClient.get`` with identical pagination, 404 handling and error types.
+
+        A required 404 raises ``ApiError``, a retryable status left after retries
+        ``TransientError``, and any other error status ``requests.HTTPError``.
+        """
+        base_url = self.base_v2 if use_v2 else self.base_v1
+        pager = page_requests(
+            self._url(endpoint, base_url), params, paginate, lambda u: self._url(u, base_url)
+        )
+        url, current_params = next(pager)
+        while True:
+            resp = await self._send(url, current_params)
+
+            if resp.status_code == 404:
+                msg = f"Endpoint not found (404): {url}"
+                if required:
+                    log.critical(msg)
+                    raise ApiError(msg)
+                log.warning(f"Not Found (404) for {url}, skipping.")
+                return None
+
+            if resp.status_code in RETRY_STATUSES:
+                log.warning(f"HTTP {resp.status_code} {url} - {resp.text[:200]}")
+                raise TransientError(f"HTTP {resp.status_code} for {url}")
+            if resp.status_code != 200:
+                log.error(f"HTTP {resp.status_code} {url} - {resp.text[:200]}")
+                # Same type ``raise_for_status()`` gives the threaded client.
+                raise requests.HTTPError(f"{resp.status_code} Error for url: {url}", response=resp)
+
+            try:
+                url, current_params = pager.send(resp.json())
+            except StopIteration as done:
+                return done.value
@@ -0,0 +1,156 @@
+"""Adaptive limit on in-flight API requests, with timeouts from observed latency.
+
+``AdaptiveConcurrency`` is an AIMD limiter. While requests come back healthy,
+the pool is full, and the ``RateLimiter`` did not make them wait, the limit
+grows by about one slot per round trip. That lets a slow or distant API region
+use the whole rate budget. It shrinks when latency drifts well above the
+fastest recent responses, before an overloaded API starts failing. A 429, 5xx
+or transport error halves it. ``timeout(key)`` derives request timeouts from
+the p99 of recent latencies for that endpoint instead of a fixed 30 seconds,
+so cheap per-entity GETs do not set the timeout of slow listings.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MAX_LIMIT = 16
+DEFAULT_MAX_TIMEOUT = 30.0
+MIN_TIMEOUT = 5.0
+TIMEOUT_MULTIPLIER = 3.0
+LATENCY_WINDOW = 256
+# Healthy responses needed before latency drives the limit or the timeout.
+MIN_SAMPLES = 20
+# Smoothed latency this many times the window's 10th percentile counts as queueing.
+LATENCY_TOLERANCE = 2.0
+LATENCY_SMOOTHING = 0.2
+ERROR_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.9
+# Limiter waits longer than this mean the rate budget, not concurrency, is the bottleneck.
+RATE_BOUND_WAIT = 0.01
+
+
+class AdaptiveConcurrency:
+    """Thread-safe AIMD in-flight limit between ``min_limit`` and ``max_limit``.
+
+    Callers wrap each request in ``acquire()`` / ``release()``. A decrease
+    happens at most once per ``limit`` completions, because requests that were
+    already in flight report the same congestion.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        max_timeout: float = DEFAULT_MAX_TIMEOUT,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.max_timeout = max_timeout
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._key_latencies: Dict[str, Deque[float]] = {}
+        self._smoothed: Optional[float] = None
+        self._since_decrease = int(self.limit)
+        self.increases = 0
+        self.decreases = 0
+        self.lowest = self.highest = int(self.limit)
+
+    def acquire(self) -> None:
+        """Block until fewer than ``limit`` requests are in flight, then take a slot."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def spare(self) -> int:
+        """Free slots under the current limit."""
+        with self._cond:
+            return int(self.limit) - self._in_flight
+
+    def release(
+        self, latency: Optional[float], ok: bool, limiter_wait: float = 0.0, key: Optional[str] = None
+    ) -> None:
+        """Return a slot. ``ok=False`` for 429 / 5xx / transport errors (``latency`` may be None).
+
+        ``key`` (an endpoint template) also records the latency for ``timeout(key)``.
+        """
+        with self._cond:
+            saturated = self._in_flight >= int(self.limit)
+            self._in_flight -= 1
+            self._since_decrease += 1
+            if not ok:
+                self._decrease(ERROR_BACKOFF)
+            elif latency is not None:
+                self._latencies.append(latency)
+                if key is not None:
+                    self._key_latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(latency)
+                self._smoothed = (
+                    latency
+                    if self._smoothed is None
+                    else self._smoothed + LATENCY_SMOOTHING * (latency - self._smoothed)
+                )
+                if self._queueing():
+                    self._decrease(LATENCY_BACKOFF)
+                elif saturated and limiter_wait < RATE_BOUND_WAIT and self.limit < self.max_limit:
+                    before = int(self.limit)
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                    if int(self.limit) > before:
+                        self.increases += 1
+                        self.highest = max(self.highest, int(self.limit))
+            self._cond.notify_all()
+
+    def _queueing(self) -> bool:
+        if len(self._latencies) < MIN_SAMPLES or self._smoothed is None:
+            return False
+        ordered = sorted(self._latencies)
+        return self._smoothed > LATENCY_TOLERANCE * ordered[len(ordered) // 10]
+
+    def _decrease(self, factor: float) -> None:
+        if self._since_decrease < self.limit or self.limit <= self.min_limit:
+            return
+        self._since_decrease = 0
+        self.limit = max(float(self.min_limit), self.limit * factor)
+        self.decreases += 1
+        self.lowest = min(self.lowest, int(self.limit))
+        # Latency measured at the old limit no longer describes the new one.
+        self._smoothed = None
+
+    def _p99(self, key: Optional[str] = None) -> Optional[float]:
+        latencies = self._latencies if key is None else self._key_latencies.get(key, ())
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+    def timeout(self, key: Optional[str] = None) -> float:
+        """Seconds to allow one request: ``TIMEOUT_MULTIPLIER`` x p99, within [5s, max_timeout].
+
+        With ``key`` only that endpoint's latencies count; until it has
+        ``MIN_SAMPLES`` of them its requests get ``max_timeout``.
+        """
+        with self._cond:
+            p99 = self._p99(key)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(MIN_TIMEOUT, p99 * TIMEOUT_MULTIPLIER))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            p99 = self._p99()
+            limit = int(self.limit)
+        return {
+            "limit": limit,
+            "lowest": self.lowest,
+            "highest": self.highest,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "p99_latency_seconds": round(p99, 3) if p99 is not None else None,
+            "timeout_seconds": round(self.timeout(), 2),
+        }
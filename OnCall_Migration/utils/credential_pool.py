@@ -0,0 +1,84 @@
+"""Several API key pairs for one org, each with its own session and rate budget.
+
+The VictorOps public API rate-limits each API key pair, so an org that issues
+several read-only keys can be read several times faster. ``CredentialPool``
+holds one ``ApiCredential`` per pair. ``acquire()`` gives each request to the
+least-loaded key: the one whose ``RateLimiter`` would let it send soonest;
+fewer requests in flight, then fewer requests sent, break ties. A 429 blocks
+only that key's limiter, so its share of the work moves to the other keys
+until the backoff ends.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterator, List
+
+import requests
+
+from utils.rate_limiter import RateLimiter
+
+
+class ApiCredential:
+    """One API key pair: its session, rate limiter, and request counters."""
+
+    def __init__(self, api_id: str, session: requests.Session, rate_limiter: RateLimiter):
+        self.api_id = api_id
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.in_flight = 0
+        self.requests = 0
+
+
+class CredentialPool:
+    """Thread-safe least-loaded choice between the credentials of one org."""
+
+    def __init__(self, credentials: List[ApiCredential]):
+        if not credentials:
+            raise ValueError("CredentialPool needs at least one credential")
+        self._credentials = list(credentials)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._credentials)
+
+    def __iter__(self) -> Iterator[ApiCredential]:
+        return iter(self._credentials)
+
+    def acquire(self) -> ApiCredential:
+        """Pick the credential for one request; pair with ``release()``."""
+        with self._lock:
+            if len(self._credentials) == 1:
+                credential = self._credentials[0]
+            else:
+                credential = min(
+                    self._credentials,
+                    key=lambda c: (c.rate_limiter.ready_in(), c.in_flight, c.requests),
+                )
+            credential.in_flight += 1
+            credential.requests += 1
+            return credential
+
+    def release(self, credential: ApiCredential) -> None:
+        with self._lock:
+            credential.in_flight -= 1
+
+    def ready_in(self) -> float:
+        """Seconds until some key may send (0: the rate budget has room now)."""
+        return min(c.rate_limiter.ready_in() for c in self._credentials)
+
+    def rate_hz(self) -> float:
+        """Combined request rate of every key (0 when any limiter is disabled)."""
+        delays = [c.rate_limiter.delay for c in self._credentials]
+        if any(delay <= 0 for delay in delays):
+            return 0.0
+        return sum(1.0 / delay for delay in delays)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Requests and limiter totals per key; API ids are shown by their last 4 characters."""
+        with self._lock:
+            counts = [(c.api_id, c.requests, c.rate_limiter) for c in self._credentials]
+        return [
+            {"api_id": f"...{api_id[-4:]}", "requests": requests_sent, **limiter.stats()}
+            for api_id, requests_sent, limiter in counts
+        ]
@@ -0,0 +1,154 @@
+"""Delta discovery against a previous inventory snapshot (no HTTP).
+
+Listing summaries (``user``, ``team``, ``policies``) are cheap to re-read. When
+an entity's summary is unchanged since the previous export, its per-entity
+endpoints are carried over from the previous ``*_inventory.json`` files instead
+of being fetched again. Detail-only edits that do not touch the listing summary
+(e.g. a new contact method) are therefore only picked up by a full run.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.exceptions import MigrationError
+from utils.io import load_inventory, load_json
+from utils.team_scope import policy_slug_from_summary
+
+# Per-entity endpoint template -> inventory file it is saved to. Schedules are
+# not listed: they describe who is on call now, so they are always re-fetched.
+CARRY_OVER_INVENTORIES: Dict[str, str] = {
+    "team/{}/members": "team_members_inventory",
+    "team/{}/admins": "team_admins_inventory",
+    "team/{}/rotations": "rotation_definitions_inventory",
+    "policies/{}": "escalation_policy_details_inventory",
+    "user/{}/contact-methods": "contact_methods_inventory",
+    "user/{}/policies": "paging_policies_inventory",
+}
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+
+
+def fingerprint(summary: Any) -> str:
+    return json.dumps(summary, sort_keys=True, separators=(",", ":"))
+
+
+def _summaries_by_id(kind: str, items: Any) -> Dict[str, str]:
+    """Map entity id -> summary fingerprint for a ``user``/``team``/``policy`` listing."""
+    if kind == "policy" and isinstance(items, dict):
+        # escalation_policies_inventory.json is grouped by team slug.
+        items = [entry for entries in items.values() if isinstance(entries, list) for entry in entries]
+    summaries: Dict[str, str] = {}
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        if kind == "user":
+            entity_id = item.get("username")
+        elif kind == "team":
+            entity_id = item.get("slug")
+        else:
+            entity_id = policy_slug_from_summary(item)
+        if entity_id:
+            summaries[entity_id] = fingerprint(item)
+    return summaries
+
+
+class DeltaBaseline:
+    """Previous inventory snapshot plus the change status of each listed entity.
+
+    Everything is read up front, so ``previous_dir`` may be the directory the
+    current run writes to.
+    """
+
+    LISTINGS = {
+        "user": "users_inventory",
+        "team": "teams_inventory",
+        "policy": "escalation_policies_inventory",
+    }
+
+    def __init__(self, previous_dir: Path):
+        self.previous_dir = Path(previous_dir)
+        listings = {kind: load_inventory(self.previous_dir, name) for kind, name in self.LISTINGS.items()}
+        missing = [f"{self.LISTINGS[kind]}.json" for kind, data in listings.items() if data is None]
+        if missing:
+            raise MigrationError(
+                f"--since {self.previous_dir}: missing {', '.join(missing)} (not a discovery inventory?)"
+            )
+        self._lock = threading.Lock()
+        self._previous: Dict[str, Dict[str, str]] = {
+            kind: _summaries_by_id(kind, data) for kind, data in listings.items()
+        }
+        self._current: Dict[str, Dict[str, str]] = {}
+        self._inventories: Dict[str, Dict[str, Any]] = {}
+        for name in CARRY_OVER_INVENTORIES.values():
+            data = load_inventory(self.previous_dir, name, {})
+            self._inventories[name] = data if isinstance(data, dict) else {}
+        metadata = load_json(self.previous_dir / "discovery_metadata.json", {})
+        self.previous_exported_at: Optional[str] = (
+            metadata.get("exported_at") if isinstance(metadata, dict) else None
+        )
+        self._endpoints: Dict[str, Dict[str, int]] = {}
+
+    def observe_listing(self, kind: str, items: List[Any]) -> None:
+        """Record the current run's listing for ``kind`` (``user``, ``team``, ``policy``)."""
+        summaries = _summaries_by_id(kind, items)
+        with self._lock:
+            self._current.setdefault(kind, {}).update(summaries)
+
+    def status(self, kind: str, entity_id: str) -> str:
+        with self._lock:
+            current = self._current.get(kind, {}).get(entity_id)
+        previous = self._previous.get(kind, {}).get(entity_id)
+        if previous is None:
+            return NEW
+        if current is None or current != previous:
+            # Not in the current listing (e.g. a closure-only slug): fetch to be safe.
+            return CHANGED
+        return UNCHANGED
+
+    def carry_over(self, template: str, kind: str, entity_id: str) -> Tuple[bool, Any]:
+        """Return ``(True, previous_data)`` when ``entity_id`` can skip ``template``."""
+        name = CARRY_OVER_INVENTORIES.get(template)
+        if name is None or self.status(kind, entity_id) != UNCHANGED:
+            return False, None
+        previous = self._inventories[name]
+        if entity_id not in previous:
+            return False, None
+        return True, previous[entity_id]
+
+    def record_endpoint(self, template: str, carried_over: int, fetched: int) -> None:
+        with self._lock:
+            counts = self._endpoints.setdefault(template, {"carried_over": 0, "fetched": 0})
+            counts["carried_over"] += carried_over
+            counts["fetched"] += fetched
+
+    def manifest(self) -> Dict[str, Any]:
+        """Per-entity change status (``new``/``changed``/``unchanged``/``removed``) and endpoint counts."""
+        entities: Dict[str, Dict[str, str]] = {}
+        summary: Dict[str, Dict[str, int]] = {}
+        for kind in self.LISTINGS:
+            with self._lock:
+                current = dict(self._current.get(kind, {}))
+            previous = self._previous.get(kind, {})
+            statuses = {entity_id: self.status(kind, entity_id) for entity_id in current}
+            statuses.update({entity_id: REMOVED for entity_id in previous if entity_id not in current})
+            entities[kind] = dict(sorted(statuses.items()))
+            counts = {NEW: 0, CHANGED: 0, UNCHANGED: 0, REMOVED: 0}
+            for status in statuses.values():
+                counts[status] += 1
+            summary[kind] = counts
+        with self._lock:
+            endpoints = {template: dict(counts) for template, counts in sorted(self._endpoints.items())}
+        return {
+            "since": str(self.previous_dir),
+            "previous_exported_at": self.previous_exported_at,
+            "summary": summary,
+            "endpoints": endpoints,
+            "entities": entities,
+        }
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+
+from utils.exceptions import MigrationError
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
@@ -28,3 +30,22 @@ def load_dotenv(path: Optional[Path] = None) -> Optional[Path]:
         os.environ.setdefault(key, value)
 
     return env_path
+
+
+def numbered_credentials(prefix: str) -> List[Tuple[str, str]]:
+    """Extra API key pairs ``<prefix>_API_ID_2`` / ``<prefix>_API_KEY_2``, ``_3``, ... in order.
+
+    Numbering stops at the first index with neither variable set. Raises
+    ``MigrationError`` when only half of a pair is set.
+    """
+    pairs: List[Tuple[str, str]] = []
+    index = 2
+    while True:
+        api_id = os.getenv(f"{prefix}_API_ID_{index}")
+        api_key = os.getenv(f"{prefix}_API_KEY_{index}")
+        if not api_id and not api_key:
+            return pairs
+        if not (api_id and api_key):
+            raise MigrationError(f"Set both {prefix}_API_ID_{index} and {prefix}_API_KEY_{index}, or neither.")
+        pairs.append((api_id, api_key))
+        index += 1
@@ -11,5 +11,9 @@ class NetworkError(MigrationError):
     """Raised when an HTTP request fails due to network or transport errors."""
 
 
+class TransientError(NetworkError):
+    """Raised for a retryable failure (429, 5xx, connection or timeout) a caller may re-queue."""
+
+
 class ApiError(MigrationError):
     """Raised when the VictorOps API returns an unrecoverable response."""
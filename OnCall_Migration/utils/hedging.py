@@ -0,0 +1,85 @@
+"""Hedged GETs: a duplicate request when the first one is slower than usual.
+
+``HedgePolicy`` keeps recent latencies per endpoint template. A GET that has
+not finished by its endpoint's p95 gets a second, identical request, and the
+first good response wins. GETs are idempotent, so the loser is simply
+discarded. Hedges are capped at ``max_share`` of the GETs sent and are only
+sent while the rate budget has room (the caller checks that), so they shorten
+the tail of a batch without crowding out first attempts.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+# A hedge may add at most this share of extra GETs.
+DEFAULT_MAX_SHARE = 0.05
+LATENCY_WINDOW = 200
+# Latencies needed per endpoint before it is hedged.
+MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 0.95
+
+
+class HedgePolicy:
+    """Thread-safe per-endpoint p95 delays, hedge budget and counters."""
+
+    def __init__(self, max_share: float = DEFAULT_MAX_SHARE):
+        self.max_share = max_share
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self.denied = 0
+
+    def delay(self, template: str) -> Optional[float]:
+        """Seconds to wait before hedging a GET to ``template`` (None: too few samples)."""
+        with self._lock:
+            window = self._latencies.get(template)
+            if window is None or len(window) < MIN_SAMPLES:
+                return None
+            ordered = sorted(window)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE))]
+
+    def record(self, template: str, latency: float) -> None:
+        """Latency of one successful GET, from send to response."""
+        with self._lock:
+            window = self._latencies.get(template)
+            if window is None:
+                window = self._latencies[template] = deque(maxlen=LATENCY_WINDOW)
+            window.append(latency)
+
+    def sent(self) -> None:
+        """Count one first attempt (the budget is a share of these)."""
+        with self._lock:
+            self.requests += 1
+
+    def try_hedge(self, spare_capacity: bool, first_check: bool = True) -> bool:
+        """Take a hedge from the budget; ``spare_capacity`` is the caller's rate-budget check.
+
+        ``denied`` counts slow requests refused on their first check; later
+        checks of the same request are not counted again.
+        """
+        with self._lock:
+            if not spare_capacity or self.hedged + 1 > self.max_share * self.requests:
+                if first_check:
+                    self.denied += 1
+                return False
+            self.hedged += 1
+            return True
+
+    def hedge_won(self) -> None:
+        with self._lock:
+            self.won += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "won": self.won,
+                "denied": self.denied,
+                "max_share": self.max_share,
+            }
@@ -2,19 +2,109 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from utils.concurrency import AdaptiveConcurrency
+from utils.credential_pool import ApiCredential, CredentialPool
+from utils.hedging import HedgePolicy
+from utils.metrics import RequestMetrics, endpoint_template
 from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
+from utils.single_flight import DEFAULT_TTL_SECONDS, SingleFlight
+
+# Connections kept per host. Discovery passes its worker count plus page prefetch.
+DEFAULT_POOL_SIZE = 4
+
+# Request timeout when the caller gives none and there is no adaptive limit.
+DEFAULT_TIMEOUT = 30.0
+
+# Both are decoded by urllib3 without optional packages.
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Responses urllib3 retries (and discovery re-queues under no_retries()).
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_retry_state = threading.local()
+
+
+def retries_disabled() -> bool:
+    return getattr(_retry_state, "disabled", False)
+
+
+@contextmanager
+def no_retries() -> Iterator[None]:
+    """Send this thread's requests once: no urllib3 retries, same pooled connections."""
+    previous = retries_disabled()
+    _retry_state.disabled = True
+    try:
+        yield
+    finally:
+        _retry_state.disabled = previous
+
+
+class LimiterAwareRetry(Retry):
+    """urllib3 ``Retry`` that routes backoff and re-sends through a shared ``RateLimiter``.
+
+    A 429 or ``Retry-After`` seen mid-retry pauses every thread via the limiter
+    instead of only the retrying one, and each re-send consumes a limiter slot.
+    """
+
+    def __init__(self, *args: Any, rate_limiter: Optional[RateLimiter] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def new(self, **kw: Any) -> "LimiterAwareRetry":
+        retry = super().new(**kw)
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if retries_disabled():
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def increment(self, *args: Any, **kwargs: Any) -> Retry:
+        if retries_disabled():
+            # Exhausted on the first error, so the original failure is raised.
+            return Retry.increment(self.new(total=0), *args, **kwargs)
+        return super().increment(*args, **kwargs)
+
+    def sleep(self, response: Any = None) -> None:
+        if self.rate_limiter is None:
+            super().sleep(response)
+            return
+        if response is None or self.rate_limiter.observe_response(response, self.get_backoff_time()) is None:
+            self._sleep_backoff()
+        self.rate_limiter.wait()
 
 
 class BaseVictorOpsClient:
     """Shared session, auth headers, retries, base URLs, and rate limiting.
 
     Subclasses implement their own request verbs (paginated GET, POST, etc.).
+    An optional ``ResponseCache`` serves repeat GETs sent through ``_send_get``.
+    Requests sent through ``_send`` / ``_send_get`` are recorded in ``metrics``.
+    Identical concurrent GETs through ``_send_get`` share one request, and 200s
+    are memoized for ``single_flight_ttl`` seconds (0 disables the memo); any
+    successful write through ``_send`` invalidates memoized GETs on its path.
+    Every request shares one keep-alive pool of ``pool_size`` connections per
+    host; ``connection_stats()`` reports how many connections were opened.
+    With ``concurrency_limit`` set, requests sent through ``_send`` also wait
+    for an adaptive in-flight slot and get its latency-derived timeout.
+    ``extra_credentials`` adds more API key pairs for the same org, each with
+    its own session and ``RateLimiter``; ``_send`` spreads requests across
+    every pair through ``credentials`` (``session`` / ``rate_limiter`` are the
+    first pair's). With ``hedge_policy`` set, a GET through ``_send_get`` that
+    outlasts its endpoint's p95 is sent again while the rate budget has room,
+    and the first good response wins.
     """
 
     BASE_V1 = "https://api.victorops.com/api-public/v1"
@@ -31,6 +121,13 @@ class BaseVictorOpsClient:
         allowed_methods: List[str],
         extra_headers: Optional[Dict[str, str]] = None,
         rate_hz: float = 2.0,
+        rate_burst: float = 1.0,
+        response_cache: Optional[ResponseCache] = None,
+        single_flight_ttl: float = DEFAULT_TTL_SECONDS,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        concurrency_limit: Optional[AdaptiveConcurrency] = None,
+        extra_credentials: Sequence[Tuple[str, str]] = (),
+        hedge_policy: Optional[HedgePolicy] = None,
     ):
         self.api_id = api_id
         self.api_key = api_key
@@ -38,25 +135,238 @@ class BaseVictorOpsClient:
         self.base_v1 = self.BASE_V1
         self.base_v2 = self.BASE_V2
 
-        self.session = requests.Session()
-        retries = Retry(
+        self.rate_limiter = RateLimiter(rate_hz=rate_hz, burst=rate_burst)
+        self.concurrency_limit = concurrency_limit
+        self.response_cache = response_cache
+        self.metrics = RequestMetrics()
+        self.single_flight = SingleFlight(
+            single_flight_ttl, cacheable=lambda resp: getattr(resp, "status_code", None) == 200
+        )
+
+        retries = LimiterAwareRetry(
             total=retry_total,
             backoff_factor=retry_backoff,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=list(RETRY_STATUSES),
             allowed_methods=allowed_methods,
         )
-        self.session.mount("https://", HTTPAdapter(max_retries=retries))
+        self.session = self._new_session(api_id, api_key, self.rate_limiter, retries, pool_size, extra_headers)
+        credentials = [ApiCredential(api_id, self.session, self.rate_limiter)]
+        for extra_id, extra_key in extra_credentials:
+            limiter = RateLimiter(rate_hz=rate_hz, burst=rate_burst)
+            session = self._new_session(extra_id, extra_key, limiter, retries, pool_size, extra_headers)
+            credentials.append(ApiCredential(extra_id, session, limiter))
+        self.credentials = CredentialPool(credentials)
+        self.hedge_policy = hedge_policy
+        # A hedged GET holds up to two attempt threads.
+        self._hedge_workers = 2 * pool_size * len(self.credentials)
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor_lock = threading.Lock()
+
+    @staticmethod
+    def _new_session(
+        api_id: str,
+        api_key: str,
+        rate_limiter: RateLimiter,
+        retries: LimiterAwareRetry,
+        pool_size: int,
+        extra_headers: Optional[Dict[str, str]],
+    ) -> requests.Session:
+        """Session for one API key pair; its retries and 429 hook back off ``rate_limiter``."""
+        session = requests.Session()
+        key_retries = retries.new()
+        key_retries.rate_limiter = rate_limiter
+        session.mount("https://", HTTPAdapter(pool_maxsize=pool_size, max_retries=key_retries))
         headers = {
             "X-VO-Api-Id": api_id,
             "X-VO-Api-Key": api_key,
             "Accept": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
         headers.update(extra_headers or {})
-        self.session.headers.update(headers)
+        session.headers.update(headers)
 
-        self.rate_limiter = RateLimiter(rate_hz=rate_hz)
+        def observe_response(resp: requests.Response, *args: Any, **kwargs: Any) -> None:
+            """Session hook: a final 429 / ``Retry-After`` backs off every caller of this key."""
+            rate_limiter.observe_response(resp)
+
+        session.hooks["response"].append(observe_response)
+        return session
 
     def _url(self, endpoint: str, base: str) -> str:
         if endpoint.startswith("http"):
             return endpoint
         return f"{base}/{endpoint.lstrip('/')}"
+
+    def _send_get(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """Rate-limited GET, answered from / revalidated against the response cache if set.
+
+        Goes through ``single_flight``, so concurrent callers of the same URL and
+        params share one result. Raises ``requests.RequestException`` like
+        ``session.get``; callers map it.
+        """
+        resp, deduplicated = self.single_flight.do(
+            SingleFlight.key(url, params), lambda: self._fetch_get(url, params, timeout)
+        )
+        if deduplicated:
+            self.metrics.observe_deduplicated("GET", url)
+        return resp
+
+    def _fetch_get(self, url: str, params: Optional[Dict[str, Any]], timeout: Optional[float]) -> Any:
+        cache = self.response_cache
+        entry = None
+        conditional: Dict[str, str] = {}
+        if cache is not None:
+            hit, entry, conditional = cache.before_request(url, params)
+            if hit is not None:
+                self.metrics.observe_cache_hit("GET", url)
+                return hit
+
+        kwargs: Dict[str, Any] = {} if timeout is None else {"timeout": timeout}
+        if params is not None:
+            kwargs["params"] = params
+        if conditional:
+            kwargs["headers"] = conditional
+        resp = self._send_hedged(url, kwargs)
+
+        if cache is not None:
+            revalidated = cache.after_response(
+                url, params, entry, resp.status_code, resp.text, resp.headers
+            )
+            if revalidated is not None:
+                return revalidated
+        return resp
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self._hedge_workers, thread_name_prefix="hedge"
+                )
+            return self._hedge_executor
+
+    def _spare_capacity(self) -> bool:
+        """True when some key may send now and the in-flight limit has a free slot."""
+        limit = self.concurrency_limit
+        return self.credentials.ready_in() == 0 and (limit is None or limit.spare() > 0)
+
+    def _send_hedged(self, url: str, kwargs: Dict[str, Any]) -> Any:
+        """``_send("GET")``, sent once more if it outlasts the endpoint's p95 (see ``HedgePolicy``)."""
+        policy = self.hedge_policy
+        if policy is None:
+            return self._send("GET", url, **kwargs)
+        once = retries_disabled()
+        policy.sent()
+        on_wire = threading.Event()
+        attempts: List[Future] = [self._hedge_pool().submit(self._hedge_attempt, url, kwargs, once, on_wire)]
+        delay = policy.delay(endpoint_template(url))
+        if delay is not None:
+            # Time queued for a slot or the rate limiter is not latency; the clock starts at send.
+            on_wire.wait()
+            checks = 0
+            # Re-checked every p95 until the answer arrives: slots free up as a batch drains.
+            while not wait(attempts, timeout=delay).done:
+                if policy.try_hedge(self._spare_capacity(), first_check=not checks):
+                    attempts.append(self._hedge_pool().submit(self._hedge_attempt, url, kwargs, once, None))
+                    break
+                checks += 1
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in (a for a in attempts if a in done):
+                if attempt.exception() is None and attempt.result().status_code not in RETRY_STATUSES:
+                    if attempt is not attempts[0]:
+                        policy.hedge_won()
+                    # A hedge still queued is dropped; one already sent finishes unread.
+                    for other in pending:
+                        other.cancel()
+                    return attempt.result()
+        return attempts[0].result()
+
+    def _hedge_attempt(
+        self, url: str, kwargs: Dict[str, Any], once: bool, on_wire: Optional[threading.Event]
+    ) -> Any:
+        """One attempt of a hedged GET, in the caller's ``no_retries()`` mode."""
+        try:
+            with no_retries() if once else nullcontext():
+                return self._send("GET", url, on_wire=on_wire, **kwargs)
+        finally:
+            if on_wire is not None:
+                on_wire.set()
+
+    def _send(self, method: str, url: str, *, on_wire: Optional[threading.Event] = None, **kwargs: Any) -> Any:
+        """Rate-limited ``session.<method>`` call, timed and recorded in ``metrics``.
+
+        ``on_wire`` is set once the request has its slot and is being sent.
+        With ``concurrency_limit`` set, the timeout comes from the endpoint's
+        recent latencies; a ``timeout`` the caller passes is kept as a floor.
+        """
+        limit = self.concurrency_limit
+        template = endpoint_template(url)
+        requested = kwargs.get("timeout")
+        if limit is not None:
+            limit.acquire()
+            adaptive = limit.timeout(template)
+            kwargs["timeout"] = adaptive if requested is None else max(requested, adaptive)
+        elif requested is None:
+            kwargs["timeout"] = DEFAULT_TIMEOUT
+        credential = self.credentials.acquire()
+        waited = 0.0
+        latency: Optional[float] = None
+        ok = False
+        try:
+            waited = credential.rate_limiter.wait()
+            if on_wire is not None:
+                on_wire.set()
+            started = time.monotonic()
+            try:
+                resp = getattr(credential.session, method.lower())(url, **kwargs)
+            except requests.RequestException:
+                self.metrics.observe(
+                    method, url, status=None, latency=time.monotonic() - started, limiter_wait=waited
+                )
+                raise
+            latency = time.monotonic() - started
+            ok = resp.status_code not in RETRY_STATUSES
+        finally:
+            self.credentials.release(credential)
+            if limit is not None:
+                limit.release(latency if ok else None, ok, waited, key=template)
+        self.metrics.observe_response(method, url, resp, latency, waited)
+        if ok and self.hedge_policy is not None and method.upper() == "GET":
+            self.hedge_policy.record(template, latency)
+        if method.upper() != "GET" and resp.status_code < 400:
+            self.single_flight.invalidate(url)
+        return resp
+
+    def request_metrics(self) -> Dict[str, Any]:
+        """Per-endpoint metrics plus rate limiter totals, for run reports."""
+        return {
+            **self.metrics.snapshot(),
+            "rate_limiter": self.rate_limiter.stats(),
+            "single_flight": self.single_flight.stats(),
+            "connections": self.connection_stats(),
+            **({"concurrency": self.concurrency_limit.stats()} if self.concurrency_limit is not None else {}),
+            **({"credentials": self.credentials.stats()} if len(self.credentials) > 1 else {}),
+            **({"hedging": self.hedge_policy.stats()} if self.hedge_policy is not None else {}),
+        }
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Connections opened vs requests sent (urllib3 counters, retries included)."""
+        opened = sent = pools = 0
+        adapters = {
+            id(adapter): adapter
+            for credential in self.credentials
+            for adapter in credential.session.adapters.values()
+        }
+        for adapter in adapters.values():
+            manager = getattr(adapter, "poolmanager", None)
+            if manager is None:
+                continue
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None:
+                    continue
+                pools += 1
+                opened += pool.num_connections
+                sent += pool.num_requests
+        return {"pools": pools, "connections_opened": opened, "requests": sent, "reused": max(0, sent - opened)}
@@ -0,0 +1,514 @@
+"""Optional SQLite inventory backend (``discovery.py --store sqlite|both``).
+
+Every inventory document is stored losslessly (one row per top-level entry,
+in order), so ``load()`` and ``export_json()`` reproduce the ``*_inventory.json``
+files exactly. Typed, indexed tables (users, teams, memberships, rotations,
+shifts, policies, policy steps/entries, routing keys, alert rules, contact
+emails) are derived from the same documents for cross-inventory lookups.
+
+Export to JSON files::
+
+    python3 -m utils.inventory_store inventory
+    python3 -m utils.inventory_store inventory --output-format compact
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+STORE_FILENAME = "inventory.sqlite"
+
+ROTATION_GROUP_EXECUTION_TYPES = ("rotation_group", "rotation_group_next", "rotation_group_previous")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    container TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS document_entries (
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    key TEXT,
+    value TEXT NOT NULL,
+    PRIMARY KEY (name, position)
+);
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    email TEXT,
+    first_name TEXT,
+    last_name TEXT
+);
+CREATE INDEX IF NOT EXISTS users_email ON users (email);
+CREATE TABLE IF NOT EXISTS teams (
+    slug TEXT PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS memberships (
+    team_slug TEXT NOT NULL,
+    username TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memberships_team ON memberships (team_slug);
+CREATE INDEX IF NOT EXISTS memberships_username ON memberships (username);
+CREATE TABLE IF NOT EXISTS rotations (
+    team_slug TEXT NOT NULL,
+    label TEXT,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rotations_team ON rotations (team_slug);
+CREATE TABLE IF NOT EXISTS shifts (
+    team_slug TEXT NOT NULL,
+    rotation_label TEXT,
+    shift_label TEXT,
+    username TEXT
+);
+CREATE INDEX IF NOT EXISTS shifts_team ON shifts (team_slug);
+CREATE INDEX IF NOT EXISTS shifts_username ON shifts (username);
+CREATE TABLE IF NOT EXISTS policies (
+    slug TEXT PRIMARY KEY,
+    team_slug TEXT,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS policies_team ON policies (team_slug);
+CREATE TABLE IF NOT EXISTS policy_details (
+    slug TEXT PRIMARY KEY,
+    step_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS policy_steps (
+    policy_slug TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    timeout INTEGER
+);
+CREATE INDEX IF NOT EXISTS policy_steps_policy ON policy_steps (policy_slug);
+CREATE TABLE IF NOT EXISTS policy_entries (
+    policy_slug TEXT NOT NULL,
+    step_index INTEGER NOT NULL,
+    entry_index INTEGER NOT NULL,
+    execution_type TEXT,
+    target TEXT,
+    label TEXT
+);
+CREATE INDEX IF NOT EXISTS policy_entries_policy ON policy_entries (policy_slug);
+CREATE INDEX IF NOT EXISTS policy_entries_target ON policy_entries (execution_type, target);
+CREATE TABLE IF NOT EXISTS routing_keys (
+    routing_key TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS routing_key_targets (
+    routing_key TEXT NOT NULL,
+    policy_slug TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS routing_key_targets_policy ON routing_key_targets (policy_slug);
+CREATE TABLE IF NOT EXISTS alert_rules (
+    position INTEGER NOT NULL,
+    rule_id TEXT,
+    rank INTEGER,
+    alert_field TEXT,
+    match_value TEXT
+);
+CREATE INDEX IF NOT EXISTS alert_rules_match ON alert_rules (match_value);
+CREATE TABLE IF NOT EXISTS contact_emails (
+    username TEXT NOT NULL,
+    address TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contact_emails_username ON contact_emails (username);
+"""
+
+Row = Tuple[Any, ...]
+
+
+def _dicts(items: Any) -> Iterable[Dict[str, Any]]:
+    return (item for item in (items or []) if isinstance(item, dict))
+
+
+def _team_user_entries(payload: Any) -> List[Any]:
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        for key in ("members", "admins"):
+            if isinstance(payload.get(key), list):
+                return payload[key]
+    return []
+
+
+def _entry_target(entry: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(target, label)`` referenced by one escalation policy entry."""
+    execution_type = entry.get("executionType")
+    if execution_type == "user":
+        return (entry.get("user") or {}).get("username"), None
+    if execution_type in ROTATION_GROUP_EXECUTION_TYPES:
+        group = entry.get("rotationGroup") or {}
+        return group.get("slug"), group.get("label")
+    if execution_type == "policy_routing":
+        return (entry.get("targetPolicy") or {}).get("policySlug"), None
+    if execution_type == "email":
+        return (entry.get("email") or {}).get("address"), None
+    group = entry.get("rotationGroup")
+    if isinstance(group, dict):
+        return group.get("slug"), group.get("label")
+    return None, None
+
+
+def _routing_target_slug(target: Dict[str, Any]) -> str:
+    slug = target.get("policySlug")
+    if slug:
+        return slug
+    policy_url = target.get("policyUrl") or target.get("_policyUrl") or ""
+    return policy_url.rstrip("/").split("/")[-1] if policy_url else ""
+
+
+# --- typed-table indexers: (table, columns, rows) for one inventory document ---
+
+TableRows = List[Tuple[str, Sequence[str], List[Row]]]
+
+
+def _index_users(data: Any) -> TableRows:
+    rows = [
+        (u["username"], u.get("email"), u.get("firstName"), u.get("lastName"))
+        for u in _dicts(data) if u.get("username")
+    ]
+    return [("users", ("username", "email", "first_name", "last_name"), rows)]
+
+
+def _index_teams(data: Any) -> TableRows:
+    rows = [(t["slug"], t.get("name")) for t in _dicts(data) if t.get("slug")]
+    return [("teams", ("slug", "name"), rows)]
+
+
+def _membership_indexer(role: str) -> Callable[[Any], TableRows]:
+    def index(data: Any) -> TableRows:
+        rows: List[Row] = []
+        for team_slug, payload in (data or {}).items():
+            for entry in _dicts(_team_user_entries(payload)):
+                if entry.get("username"):
+                    rows.append((team_slug, entry["username"], role))
+        return [("memberships", ("team_slug", "username", "role"), rows)]
+
+    return index
+
+
+def _index_rotations(data: Any) -> TableRows:
+    rotations: List[Row] = []
+    shifts: List[Row] = []
+    for team_slug, payload in (data or {}).items():
+        if not isinstance(payload, dict):
+            continue
+        for position, rotation in enumerate(_dicts(payload.get("rotations"))):
+            label = rotation.get("label")
+            rotations.append((team_slug, label, position))
+            for shift in _dicts(rotation.get("shifts")):
+                members = [m.get("username") for m in _dicts(shift.get("shiftMembers")) if m.get("username")]
+                for username in members or [None]:
+                    shifts.append((team_slug, label, shift.get("label"), username))
+    return [
+        ("rotations", ("team_slug", "label", "position"), rotations),
+        ("shifts", ("team_slug", "rotation_label", "shift_label", "username"), shifts),
+    ]
+
+
+def _index_policies(data: Any) -> TableRows:
+    rows: List[Row] = []
+    for team_slug, entries in (data or {}).items():
+        for entry in _dicts(entries):
+            policy = entry.get("policy") or {}
+            if policy.get("slug"):
+                rows.append((policy["slug"], team_slug, policy.get("name")))
+    return [("policies", ("slug", "team_slug", "name"), rows)]
+
+
+def _index_policy_details(data: Any) -> TableRows:
+    details: List[Row] = []
+    steps: List[Row] = []
+    entries: List[Row] = []
+    for slug, policy_steps in (data or {}).items():
+        policy_steps = policy_steps if isinstance(policy_steps, list) else []
+        details.append((slug, len(policy_steps)))
+        for step_index, step in enumerate(policy_steps):
+            if not isinstance(step, dict):
+                continue
+            steps.append((slug, step_index, step.get("timeout")))
+            for entry_index, entry in enumerate(step.get("entries") or []):
+                if not isinstance(entry, dict):
+                    continue
+                target, label = _entry_target(entry)
+                entries.append((slug, step_index, entry_index, entry.get("executionType"), target, label))
+    return [
+        ("policy_details", ("slug", "step_count"), details),
+        ("policy_steps", ("policy_slug", "step_index", "timeout"), steps),
+        (
+            "policy_entries",
+            ("policy_slug", "step_index", "entry_index", "execution_type", "target", "label"),
+            entries,
+        ),
+    ]
+
+
+def _index_routing_keys(data: Any) -> TableRows:
+    keys: List[Row] = []
+    targets: List[Row] = []
+    for routing_key in _dicts(data):
+        name = routing_key.get("routingKey")
+        if not name:
+            continue
+        keys.append((name,))
+        for target in _dicts(routing_key.get("targets")):
+            slug = _routing_target_slug(target)
+            if slug:
+                targets.append((name, slug))
+    return [
+        ("routing_keys", ("routing_key",), keys),
+        ("routing_key_targets", ("routing_key", "policy_slug"), targets),
+    ]
+
+
+def _index_alert_rules(data: Any) -> TableRows:
+    rows = [
+        (position, str(rule.get("id")) if rule.get("id") is not None else None,
+         rule.get("rank"), rule.get("alertField"), rule.get("alertValueMatch"))
+        for position, rule in enumerate(_dicts(data))
+    ]
+    return [("alert_rules", ("position", "rule_id", "rank", "alert_field", "match_value"), rows)]
+
+
+def _index_contact_methods(data: Any) -> TableRows:
+    rows: List[Row] = []
+    for username, methods in (data or {}).items():
+        if not isinstance(methods, dict):
+            continue
+        category = methods.get("emails")
+        if not isinstance(category, dict):
+            continue
+        for method in _dicts(category.get("contactMethods")):
+            if method.get("value"):
+                rows.append((username, method["value"]))
+    return [("contact_emails", ("username", "address"), rows)]
+
+
+INDEXERS: Dict[str, Callable[[Any], TableRows]] = {
+    "users_inventory": _index_users,
+    "teams_inventory": _index_teams,
+    "team_members_inventory": _membership_indexer("member"),
+    "team_admins_inventory": _membership_indexer("admin"),
+    "rotation_definitions_inventory": _index_rotations,
+    "escalation_policies_inventory": _index_policies,
+    "escalation_policy_details_inventory": _index_policy_details,
+    "routing_keys_inventory": _index_routing_keys,
+    "alert_rules_inventory": _index_alert_rules,
+    "contact_methods_inventory": _index_contact_methods,
+}
+
+# memberships is shared by two documents; rows are replaced per role.
+_TABLE_FILTERS = {
+    "team_members_inventory": ("memberships", "role = 'member'"),
+    "team_admins_inventory": ("memberships", "role = 'admin'"),
+}
+
+
+class InventoryStore:
+    """SQLite file holding every inventory document plus indexed typed tables.
+
+    Safe to share between threads (writes are serialised). Open read-only
+    with ``readonly=True`` from downstream stages.
+    """
+
+    def __init__(self, path: Path, readonly: bool = False):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(
+                f"{self.path.resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False
+            )
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "InventoryStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # --- documents ---
+
+    def save(self, name: str, data: Any) -> None:
+        """Replace document ``name`` and its typed rows in one transaction."""
+        if isinstance(data, Mapping):
+            container = "dict"
+            entries = (
+                (name, position, key, json.dumps(value, separators=(",", ":")))
+                for position, (key, value) in enumerate(data.items())
+            )
+        elif isinstance(data, list):
+            container = "list"
+            entries = (
+                (name, position, None, json.dumps(value, separators=(",", ":")))
+                for position, value in enumerate(data)
+            )
+        else:
+            container = "value"
+            entries = iter([(name, 0, None, json.dumps(data, separators=(",", ":")))])
+
+        indexer = INDEXERS.get(name)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM document_entries WHERE name = ?", (name,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (name, container) VALUES (?, ?)", (name, container)
+            )
+            self._conn.executemany(
+                "INSERT INTO document_entries (name, position, key, value) VALUES (?, ?, ?, ?)", entries
+            )
+            if indexer is None:
+                return
+            tables = indexer(data)
+            for table, _columns, _rows in tables:
+                table_filter = _TABLE_FILTERS.get(name)
+                where = f" WHERE {table_filter[1]}" if table_filter and table_filter[0] == table else ""
+                self._conn.execute(f"DELETE FROM {table}{where}")
+            for table, columns, rows in tables:
+                placeholders = ", ".join("?" for _ in columns)
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                    rows,
+                )
+
+    def has(self, name: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT name FROM documents ORDER BY name")]
+
+    def load(self, name: str, default: Any = None) -> Any:
+        """Rebuild document ``name`` exactly as it was saved (``default`` if absent)."""
+        with self._lock:
+            row = self._conn.execute("SELECT container FROM documents WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return default
+            entries = self._conn.execute(
+                "SELECT key, value FROM document_entries WHERE name = ? ORDER BY position", (name,)
+            ).fetchall()
+        container = row[0]
+        if container == "dict":
+            return {key: json.loads(value) for key, value in entries}
+        if container == "list":
+            return [json.loads(value) for _key, value in entries]
+        return json.loads(entries[0][1]) if entries else None
+
+    def export_json(self, output_dir: Path, output_format: str = "json") -> List[str]:
+        """Write every stored document to ``output_dir/<name>.json``; return the names."""
+        from utils.inventory_writer import write_inventory
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        names = self.names()
+        for name in names:
+            write_inventory(output_dir / f"{name}.json", self.load(name), output_format)
+        return names
+
+    # --- indexed lookups used by downstream stages ---
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def policy_team_map(self) -> Dict[str, str]:
+        """Policy slug -> owning team slug (from escalation_policies_inventory)."""
+        return dict(self._query("SELECT slug, team_slug FROM policies ORDER BY rowid"))
+
+    def rotation_group_labels(self) -> Dict[str, str]:
+        """Rotation group slug -> label, as referenced by escalation policy entries."""
+        placeholders = ", ".join("?" for _ in ROTATION_GROUP_EXECUTION_TYPES)
+        return dict(self._query(
+            "SELECT target, label FROM policy_entries "
+            f"WHERE execution_type IN ({placeholders}) AND target IS NOT NULL AND label IS NOT NULL "
+            "ORDER BY rowid",
+            ROTATION_GROUP_EXECUTION_TYPES,
+        ))
+
+    def rotation_groups_by_team(self) -> Dict[str, Dict[str, str]]:
+        """Team slug -> {rotation group slug: label}, as referenced by that team's policies.
+
+        Labels come only from an entry's ``rotationGroup``, so every entry naming a group counts.
+        """
+        index: Dict[str, Dict[str, str]] = {}
+        for team_slug, target, label in self._query(
+            "SELECT p.team_slug, e.target, e.label FROM policy_entries e "
+            "JOIN policies p ON p.slug = e.policy_slug "
+            "WHERE e.target IS NOT NULL AND e.label IS NOT NULL "
+            "AND p.team_slug IS NOT NULL ORDER BY e.rowid",
+        ):
+            index.setdefault(team_slug, {})[target] = label
+        return index
+
+    def policies_referencing(self, execution_type: str, target: str) -> List[str]:
+        """Policy slugs with an entry of ``execution_type`` pointing at ``target``."""
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT policy_slug FROM policy_entries WHERE execution_type = ? AND target = ? "
+            "ORDER BY policy_slug",
+            (execution_type, target),
+        )]
+
+    def teams_for_user(self, username: str) -> List[Tuple[str, str]]:
+        """``(team_slug, role)`` pairs for ``username`` across members and admins."""
+        return self._query(
+            "SELECT team_slug, role FROM memberships WHERE username = ? ORDER BY team_slug, role",
+            (username,),
+        )
+
+    def routing_targets_missing_details(self) -> List[Tuple[str, str]]:
+        """``(routing_key, policy_slug)`` targets with no escalation policy details."""
+        return self._query(
+            "SELECT t.routing_key, t.policy_slug FROM routing_key_targets t "
+            "LEFT JOIN policy_details d ON d.slug = t.policy_slug "
+            "WHERE d.slug IS NULL ORDER BY t.rowid"
+        )
+
+    def email_addresses(self) -> List[str]:
+        """Distinct addresses from users, contact methods, and email policy entries."""
+        return [row[0] for row in self._query(
+            "SELECT email FROM users WHERE email IS NOT NULL "
+            "UNION SELECT address FROM contact_emails "
+            "UNION SELECT target FROM policy_entries WHERE execution_type = 'email' AND target IS NOT NULL "
+            "ORDER BY 1"
+        )]
+
+
+def open_store(inventory_dir: Path) -> Optional[InventoryStore]:
+    """Open ``inventory_dir/inventory.sqlite`` read-only, or return None when absent."""
+    path = Path(inventory_dir) / STORE_FILENAME
+    if not path.exists():
+        return None
+    return InventoryStore(path, readonly=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description=f"Export {STORE_FILENAME} documents back to *_inventory.json files.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("inventory", help=f"Directory containing {STORE_FILENAME}.")
+    parser.add_argument("--output-dir", help="Where to write the JSON files (default: the inventory directory).")
+    parser.add_argument("--output-format", choices=("json", "compact", "ndjson"), default="json")
+    args = parser.parse_args(argv)
+
+    store = open_store(Path(args.inventory))
+    if store is None:
+        raise SystemExit(f"No {STORE_FILENAME} in {args.inventory}")
+    with store:
+        names = store.export_json(Path(args.output_dir or args.inventory), args.output_format)
+    print(f"Exported {len(names)} document(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Streaming inventory writers and on-disk per-entity shards (no HTTP).
+
+``write_inventory`` serialises one value at a time, so a ``Mapping`` backed by
+an ``EntityShard`` is written without materialising the whole inventory. The
+``json`` format is byte-for-byte identical to ``json.dumps(data, indent=2)``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.io import NDJSON_HEADER_KEY
+
+OUTPUT_FORMATS = ("json", "compact", "ndjson")
+
+_COMPACT = (",", ":")
+
+
+def write_inventory(path: Path, data: Any, output_format: str = "json") -> None:
+    """Atomically write ``data`` to ``path`` in ``output_format``, streaming dicts and lists."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    temp_path = path.with_suffix(".tmp")
+    with temp_path.open("w") as f:
+        if isinstance(data, Mapping):
+            _write_mapping(f, data, output_format)
+        elif isinstance(data, list):
+            _write_list(f, data, output_format)
+        elif output_format == "json":
+            f.write(json.dumps(data, indent=2))
+        else:
+            f.write(json.dumps(data, separators=_COMPACT))
+    temp_path.replace(path)
+
+
+def _write_mapping(f: IO[str], data: Mapping, output_format: str) -> None:
+    if output_format == "ndjson":
+        f.write(json.dumps({NDJSON_HEADER_KEY: "dict"}) + "\n")
+        for key, value in data.items():
+            f.write(json.dumps([key, value], separators=_COMPACT) + "\n")
+        return
+    if not data:
+        f.write("{}")
+        return
+    if output_format == "compact":
+        f.write("{")
+        for i, (key, value) in enumerate(data.items()):
+            f.write(("," if i else "") + json.dumps(key) + ":" + json.dumps(value, separators=_COMPACT))
+        f.write("}")
+        return
+    f.write("{")
+    for i, (key, value) in enumerate(data.items()):
+        f.write(("," if i else "") + "\n  " + json.dumps(key) + ": " + _indented(value))
+    f.write("\n}")
+
+
+def _write_list(f: IO[str], data: List[Any], output_format: str) -> None:
+    if output_format == "ndjson":
+        f.write(json.dumps({NDJSON_HEADER_KEY: "list"}) + "\n")
+        for item in data:
+            f.write(json.dumps(item, separators=_COMPACT) + "\n")
+        return
+    if output_format == "compact":
+        f.write(json.dumps(data, separators=_COMPACT))
+        return
+    if not data:
+        f.write("[]")
+        return
+    f.write("[")
+    for i, item in enumerate(data):
+        f.write(("," if i else "") + "\n  " + _indented(item))
+    f.write("\n]")
+
+
+def _indented(value: Any) -> str:
+    # Encoded JSON has no raw newlines inside strings, so nesting is a line prefix.
+    return json.dumps(value, indent=2).replace("\n", "\n  ")
+
+
+class EntityShard(Mapping):
+    """Per-entity results appended to an NDJSON file as they arrive; read back lazily.
+
+    Thread-safe for concurrent ``__setitem__`` from fetch workers. Iteration
+    follows ``reorder()`` (input order) once set, else arrival order. Only byte
+    offsets stay in memory.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = path.open("w+b")
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._order: Optional[List[str]] = None
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        line = (json.dumps([key, value], separators=_COMPACT) + "\n").encode("utf-8")
+        with self._lock:
+            offset = self._fh.seek(0, os.SEEK_END)
+            self._fh.write(line)
+            self._offsets[key] = (offset, len(line))
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            offset, length = self._offsets[key]
+            self._fh.seek(offset)
+            raw = self._fh.read(length)
+        return json.loads(raw)[1]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._order if self._order is not None else list(self._offsets))
+
+    def __len__(self) -> int:
+        return len(self._order) if self._order is not None else len(self._offsets)
+
+    def reorder(self, keys: Iterable[str]) -> None:
+        """Fix iteration order to ``keys`` (unknown and repeated keys are dropped)."""
+        seen: Dict[str, None] = {}
+        for key in keys:
+            if key in self._offsets:
+                seen.setdefault(key, None)
+        self._order = list(seen)
+
+    def discard(self) -> None:
+        """Close and delete the shard file."""
+        with self._lock:
+            self._fh.close()
+        self.path.unlink(missing_ok=True)
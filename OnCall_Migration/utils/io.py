@@ -1,11 +1,16 @@
-"""Shared JSON loading helper for migration scripts."""
+"""Shared JSON loading helpers for migration scripts (pretty, compact, NDJSON, or SQLite inventories)."""
 
 from __future__ import annotations
 
 import json
 import logging
 from pathlib import Path
-from typing import Any, Optional
+from typing import IO, Any, Dict, List, Optional
+
+# First line of an NDJSON inventory (``discovery.py --output-format ndjson``):
+# ``{"__ndjson__": "dict"}`` -> one ``[key, value]`` per line; ``"list"`` -> one item per line.
+NDJSON_HEADER_KEY = "__ndjson__"
+_NDJSON_PREFIX = '{"' + NDJSON_HEADER_KEY + '"'
 
 
 def load_json(path: Path, default: Any = None, *, logger: Optional[logging.Logger] = None) -> Any:
@@ -14,6 +19,8 @@ def load_json(path: Path, default: Any = None, *, logger: Optional[logging.Logge
     Returns ``default`` when the file is missing. When ``logger`` is provided,
     a missing file is logged at warning level and a parse error is logged at
     error level and returns ``default``; without a logger, parse errors propagate.
+    NDJSON inventories are detected by their header line and returned as the
+    same dict or list the pretty-printed layout would hold.
     """
     if not path.exists():
         if logger:
@@ -21,9 +28,50 @@ def load_json(path: Path, default: Any = None, *, logger: Optional[logging.Logge
         return default
     try:
         with path.open("r") as f:
+            is_ndjson = f.read(len(_NDJSON_PREFIX)) == _NDJSON_PREFIX
+            f.seek(0)
+            if is_ndjson:
+                header = json.loads(f.readline())
+                return _read_ndjson(f, header[NDJSON_HEADER_KEY])
             return json.load(f)
     except json.JSONDecodeError:
         if logger:
             logger.error(f"Failed to parse {path}")
             return default
         raise
+
+
+def load_inventory(
+    inventory_dir: Path, name: str, default: Any = None, *, logger: Optional[logging.Logger] = None
+) -> Any:
+    """Load inventory document ``name`` from ``inventory_dir``.
+
+    ``<name>.json`` wins when present; otherwise the document is read from
+    ``inventory.sqlite`` (``discovery.py --store sqlite``). Missing from both
+    behaves like ``load_json`` on a missing file.
+    """
+    path = Path(inventory_dir) / f"{name}.json"
+    if not path.exists():
+        from utils.inventory_store import open_store
+
+        store = open_store(inventory_dir)
+        if store is not None:
+            with store:
+                if store.has(name):
+                    return store.load(name)
+    return load_json(path, default, logger=logger)
+
+
+def _read_ndjson(f: IO[str], container: str) -> Any:
+    if container == "dict":
+        merged: Dict[str, Any] = {}
+        for line in f:
+            if line.strip():
+                key, value = json.loads(line)
+                merged[key] = value
+        return merged
+    items: List[Any] = []
+    for line in f:
+        if line.strip():
+            items.append(json.loads(line))
+    return items
@@ -0,0 +1,222 @@
+"""Append-only JSON Lines journals for resumable pipeline runs."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class JsonlJournal:
+    """Thread-safe append-only journal: one JSON object per line, fsynced per record.
+
+    A crash can leave at most a truncated final line; ``load()`` skips lines that
+    do not parse and ``append()`` starts a fresh line after such a tail.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.corrupt_lines = 0
+        self._lock = threading.Lock()
+        self._fh: Optional[IO[str]] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        self.corrupt_lines = 0
+        if not self.path.exists():
+            return records
+        with self.path.open("r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    self.corrupt_lines += 1
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+        if self.corrupt_lines:
+            log.warning(f"Ignored {self.corrupt_lines} incomplete line(s) in {self.path.name}")
+        return records
+
+    def _open(self) -> IO[str]:
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            needs_newline = False
+            if self.path.exists() and self.path.stat().st_size:
+                with self.path.open("rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+            self._fh = self.path.open("a")
+            if needs_newline:
+                self._fh.write("\n")
+        return self._fh
+
+    def append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            fh = self._open()
+            fh.write(line + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def discard(self) -> None:
+        """Close and delete the journal (e.g. after a run completed successfully)."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
+
+
+class FetchJournal:
+    """Completed per-entity discovery fetches, keyed by endpoint and entity id.
+
+    With ``resume=True`` entries from a previous interrupted run are reloaded;
+    otherwise any stale journal is discarded and recording starts fresh.
+    Bodies are held in memory only for reloaded entries, each until its first
+    ``lookup()``; fetches recorded by this run keep just their key.
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        self._journal = JsonlJournal(path)
+        self._done: Set[str] = set()
+        self._loaded: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.reused = 0
+        if resume:
+            for record in self._journal.load():
+                key = record.get("key")
+                if isinstance(key, str):
+                    self._done.add(key)
+                    self._loaded[key] = record.get("data")
+            if self._done:
+                log.info(f"Resuming: {len(self._done)} completed fetch(es) loaded from {path.name}")
+        else:
+            self._journal.discard()
+
+    @property
+    def path(self) -> Path:
+        return self._journal.path
+
+    @staticmethod
+    def key(endpoint: str, use_v2: bool) -> str:
+        return f"{'v2' if use_v2 else 'v1'}:{endpoint}"
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def lookup(self, endpoint: str, use_v2: bool) -> Tuple[bool, Any]:
+        """Return ``(found, data)`` for a reloaded fetch, once; ``data`` may be None for a 404."""
+        key = self.key(endpoint, use_v2)
+        with self._lock:
+            if key not in self._loaded:
+                return False, None
+            self.reused += 1
+            return True, self._loaded.pop(key)
+
+    def record(self, endpoint: str, use_v2: bool, entity_id: str, data: Any) -> None:
+        key = self.key(endpoint, use_v2)
+        self._journal.append({"key": key, "id": entity_id, "data": data})
+        with self._lock:
+            self._done.add(key)
+            self._loaded.pop(key, None)
+
+    def close(self) -> None:
+        self._journal.close()
+
+    def discard(self) -> None:
+        self._journal.discard()
+
+
+class ApplyJournal:
+    """Results of apply's create POSTs against one target org, keyed by step and source key.
+
+    Every result, success or not, is appended when the response arrives. On the
+    next run the successful ones are loaded back, so those creates are skipped
+    without an existence read and the slugs they returned are reused. Records
+    for other orgs in the same file are ignored (with a warning); ``reset=True``
+    deletes the file and starts a fresh journal.
+    """
+
+    def __init__(self, path: Path, org_slug: str, reset: bool = False):
+        self._journal = JsonlJournal(path)
+        self.org_slug = org_slug
+        self._confirmed: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.replayed = 0
+        if reset:
+            self._journal.discard()
+        other_orgs: Dict[str, int] = {}
+        for record in self._journal.load():
+            if record.get("org") != org_slug:
+                other = str(record.get("org"))
+                other_orgs[other] = other_orgs.get(other, 0) + 1
+                continue
+            if not record.get("ok"):
+                continue
+            step, key = record.get("step"), record.get("key")
+            if isinstance(step, str) and isinstance(key, str):
+                self._confirmed[(step, key)] = record
+        if other_orgs:
+            log.warning(
+                f"Ignored {sum(other_orgs.values())} record(s) in {path.name} for other org(s): "
+                f"{', '.join(sorted(other_orgs))}"
+            )
+        if self._confirmed:
+            log.info(f"Resuming: {len(self._confirmed)} confirmed create(s) loaded from {path.name}")
+
+    @property
+    def path(self) -> Path:
+        return self._journal.path
+
+    def __len__(self) -> int:
+        return len(self._confirmed)
+
+    def confirmed(self, step: str, key: str) -> Optional[Dict[str, Any]]:
+        """The successful record for this create, if an earlier run made it."""
+        record = self._confirmed.get((step, key))
+        if record is not None:
+            with self._lock:
+                self.replayed += 1
+        return record
+
+    def confirmed_in(self, step: str) -> List[Dict[str, Any]]:
+        return [record for (record_step, _key), record in self._confirmed.items() if record_step == step]
+
+    def record(self, step: str, key: str, endpoint: str, status: int, response: Any, ok: bool) -> None:
+        slug = response.get("slug") if isinstance(response, dict) else None
+        record = {
+            "org": self.org_slug,
+            "step": step,
+            "key": key,
+            "endpoint": endpoint,
+            "status": status,
+            "ok": ok,
+            "slug": slug,
+            "response": response,
+        }
+        self._journal.append(record)
+        with self._lock:
+            self.recorded += 1
+            if ok:
+                self._confirmed[(step, key)] = record
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": str(self.path), "recorded": self.recorded, "replayed": self.replayed}
+
+    def close(self) -> None:
+        self._journal.close()
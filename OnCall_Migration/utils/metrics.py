@@ -0,0 +1,252 @@
+"""Per-endpoint request metrics for the VictorOps clients.
+
+URLs are folded into endpoint templates (``v1/user/{u}/contact-methods``), so
+an endpoint hit once per entity is one row. Each row keeps the request count,
+status codes, urllib3 retries, bytes received, cache hits, single-flight
+de-duplications, and histograms of latency and time spent blocked in
+``RateLimiter.wait``. ``snapshot()`` is written to ``discovery_metadata.json``
+/ ``apply_report.json``; ``write_prometheus()`` renders the same data in
+Prometheus text format.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LIMITER_WAIT_BUCKETS = (0.0, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Path segment -> placeholder for the segment that follows it.
+_ID_PLACEHOLDERS = {
+    "user": "{u}",
+    "profile": "{u}",
+    "team": "{t}",
+    "teams": "{t}",
+    "policies": "{p}",
+}
+
+
+def endpoint_template(url: str) -> str:
+    """``https://.../api-public/v1/user/alice/contact-methods?x=1`` -> ``v1/user/{u}/contact-methods``."""
+    path = urlsplit(url).path if "://" in url else url.split("?", 1)[0]
+    segments = [segment for segment in path.split("/") if segment]
+    if "api-public" in segments:
+        segments = segments[segments.index("api-public") + 1:]
+    template: List[str] = []
+    placeholder: Optional[str] = None
+    for segment in segments:
+        if placeholder is not None:
+            template.append(placeholder)
+            placeholder = None
+            continue
+        template.append(segment)
+        placeholder = _ID_PLACEHOLDERS.get(segment)
+    return "/".join(template)
+
+
+def _retry_count(resp: Any) -> int:
+    """urllib3 retries behind a ``requests`` response (0 when unknown)."""
+    history = getattr(getattr(getattr(resp, "raw", None), "retries", None), "history", None)
+    return len(history) if isinstance(history, tuple) else 0
+
+
+def _body_size(resp: Any) -> int:
+    """Decoded body size; ``Content-Length`` is absent for chunked or compressed replies."""
+    content = getattr(resp, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    text = getattr(resp, "text", None)
+    return len(text.encode("utf-8")) if isinstance(text, str) else 0
+
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus ``le`` semantics."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        rows: List[Tuple[str, int]] = []
+        for bound, count in zip([f"{b:g}" for b in self.buckets] + ["+Inf"], self.counts):
+            running += count
+            rows.append((bound, running))
+        return rows
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "max": round(self.max, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else 0.0,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_received = 0
+        self.cache_hits = 0
+        self.deduplicated = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.limiter_wait = Histogram(LIMITER_WAIT_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "statuses": dict(sorted(self.statuses.items())),
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "cache_hits": self.cache_hits,
+            "deduplicated": self.deduplicated,
+            "latency_seconds": self.latency.snapshot(),
+            "limiter_wait_seconds": self.limiter_wait.snapshot(),
+        }
+
+
+class RequestMetrics:
+    """Thread-safe per-(method, endpoint template) request statistics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def _stats(self, method: str, url: str) -> EndpointStats:
+        key = (method.upper(), endpoint_template(url))
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats()
+        return stats
+
+    def observe(
+        self,
+        method: str,
+        url: str,
+        *,
+        status: Optional[int],
+        latency: float,
+        limiter_wait: float = 0.0,
+        retries: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """Record one request; ``status=None`` means it failed without a response."""
+        with self._lock:
+            stats = self._stats(method, url)
+            stats.requests += 1
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[str(status)] = stats.statuses.get(str(status), 0) + 1
+            stats.retries += retries
+            stats.bytes_received += bytes_received
+            stats.latency.observe(latency)
+            stats.limiter_wait.observe(limiter_wait)
+
+    def observe_response(self, method: str, url: str, resp: Any, latency: float, limiter_wait: float) -> None:
+        self.observe(
+            method,
+            url,
+            status=resp.status_code,
+            latency=latency,
+            limiter_wait=limiter_wait,
+            retries=_retry_count(resp),
+            bytes_received=_body_size(resp),
+        )
+
+    def observe_cache_hit(self, method: str, url: str) -> None:
+        with self._lock:
+            self._stats(method, url).cache_hits += 1
+
+    def observe_deduplicated(self, method: str, url: str) -> None:
+        """A GET answered by ``SingleFlight`` (shared in-flight call or memo) without a request."""
+        with self._lock:
+            self._stats(method, url).deduplicated += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {
+                f"{method} {template}": stats.snapshot()
+                for (method, template), stats in sorted(self._endpoints.items())
+            }
+        totals = {
+            field: sum(row[field] for row in endpoints.values())
+            for field in ("requests", "errors", "retries", "bytes_received", "cache_hits", "deduplicated")
+        }
+        totals["latency_seconds"] = round(sum(row["latency_seconds"]["sum"] for row in endpoints.values()), 3)
+        totals["limiter_wait_seconds"] = round(
+            sum(row["limiter_wait_seconds"]["sum"] for row in endpoints.values()), 3
+        )
+        return {"totals": totals, "endpoints": endpoints}
+
+    def prometheus_text(self, labels: Optional[Dict[str, str]] = None) -> str:
+        base = dict(labels or {})
+        lines: List[str] = []
+
+        def fmt(extra: Dict[str, str]) -> str:
+            merged = {**base, **extra}
+            body = ",".join(f'{k}="{_escape(v)}"' for k, v in merged.items())
+            return f"{{{body}}}" if body else ""
+
+        with self._lock:
+            rows = sorted(self._endpoints.items())
+            counters = [
+                ("victorops_requests_total", "Requests sent, by response status.", None),
+                ("victorops_request_errors_total", "Requests that failed without a response.", "errors"),
+                ("victorops_request_retries_total", "urllib3 retries behind final responses.", "retries"),
+                ("victorops_response_bytes_total", "Decoded response body bytes.", "bytes_received"),
+                ("victorops_cache_hits_total", "GETs answered from the response cache.", "cache_hits"),
+                ("victorops_deduplicated_total", "GETs answered by single-flight without a request.", "deduplicated"),
+            ]
+            for name, help_text, attr in counters:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for (method, template), stats in rows:
+                    endpoint = {"method": method, "endpoint": template}
+                    if attr is None:
+                        for status, count in sorted(stats.statuses.items()):
+                            lines.append(f"{name}{fmt({**endpoint, 'status': status})} {count}")
+                    else:
+                        lines.append(f"{name}{fmt(endpoint)} {getattr(stats, attr)}")
+            histograms = [
+                ("victorops_request_latency_seconds", "Request latency including retries.", "latency"),
+                ("victorops_limiter_wait_seconds", "Time blocked in RateLimiter.wait.", "limiter_wait"),
+            ]
+            for name, help_text, attr in histograms:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (method, template), stats in rows:
+                    endpoint = {"method": method, "endpoint": template}
+                    histogram: Histogram = getattr(stats, attr)
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{name}_bucket{fmt({**endpoint, 'le': bound})} {count}")
+                    lines.append(f"{name}_sum{fmt(endpoint)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{fmt(endpoint)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path, labels: Optional[Dict[str, str]] = None) -> None:
+        """Atomically write ``prometheus_text()`` (e.g. for a node_exporter textfile collector)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        temp_path.write_text(self.prometheus_text(labels))
+        temp_path.replace(path)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,84 @@
+"""Transport-independent VictorOps pagination (shared by sync and async clients)."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+PageRequest = Tuple[str, Dict[str, Any]]
+PageGenerator = Generator[PageRequest, Any, Any]
+
+DEFAULT_PAGE_LIMIT = 100
+
+
+def page_requests(
+    url: str,
+    params: Optional[Dict[str, Any]],
+    paginate: bool,
+    resolve_url: Callable[[str], str],
+) -> PageGenerator:
+    """Yield ``(url, params)`` page requests; receive parsed JSON; return the merged result.
+
+    Drivers send each decoded page body back into the generator and read the
+    final value from ``StopIteration.value``. Semantics:
+
+    - bare list: returned as-is when ``paginate`` is False, else merged (single page);
+    - dict with one list key: items merged across ``nextPage`` links or offset pages;
+    - dict with several list keys (e.g. contact methods): returned intact;
+    - anything else: returned as-is.
+    """
+    merged: List[Any] = []
+    is_list_response = False
+    current_params = dict(params or {})
+    if paginate:
+        current_params.setdefault("limit", DEFAULT_PAGE_LIMIT)
+        current_params.setdefault("offset", 0)
+
+    data: Any = None
+    next_request: Optional[str] = url
+    while next_request:
+        data = yield next_request, current_params
+
+        if isinstance(data, list):
+            if not paginate:
+                return data
+            is_list_response = True
+            merged.extend(data)
+            break
+
+        if isinstance(data, dict):
+            list_keys = [k for k, v in data.items() if isinstance(v, list)]
+            if list_keys and paginate:
+                if len(list_keys) > 1:
+                    # Multi-list dict (e.g. contact-methods) returned intact to prevent data loss
+                    return data
+
+                is_list_response = True
+                page_items = primary_page_items(data, list_keys)
+                merged.extend(page_items)
+
+                next_url = data.get("nextPage") or data.get("next_page") or data.get("next")
+                if next_url:
+                    next_request = resolve_url(next_url)
+                    current_params = {}
+                    continue
+
+                limit = current_params.get("limit", DEFAULT_PAGE_LIMIT)
+                if page_items and len(page_items) == limit and isinstance(page_items[0], dict):
+                    current_params = dict(current_params)
+                    current_params["offset"] = current_params.get("offset", 0) + limit
+                    continue
+                break
+            return data
+
+        next_request = None
+
+    return merged if is_list_response else data
+
+
+def primary_page_items(data: Dict[str, Any], list_keys: List[str]) -> List[Any]:
+    """Return the list holding page items (first non-empty list of dicts, else the first list)."""
+    primary_key = next(
+        (k for k in list_keys if data[k] and isinstance(data[k][0], dict)),
+        list_keys[0],
+    )
+    return data[primary_key]
@@ -0,0 +1,172 @@
+"""Request-count plans, wall-time estimates, and a live ETA line for discovery.
+
+``CallPlan`` holds the requests a discovery run will send, per endpoint
+template. ``throughput()`` is the model behind every estimate: per-entity
+fetches are capped both by the rate limiter and by how many requests the
+workers can hold open at the measured latency. ``ProgressTracker`` applies the
+same model during a real run, over the calls of every phase planned so far. It
+uses the predicted throughput until enough calls have completed to measure the
+actual one.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Latency assumed before any request has been timed.
+DEFAULT_LATENCY_SECONDS = 0.25
+# Completed calls needed before the measured rate replaces the predicted one.
+MIN_MEASURED_CALLS = 20
+DEFAULT_LOG_INTERVAL = 10.0
+
+
+def throughput(rate_hz: float, latency_seconds: float, workers: int) -> float:
+    """Requests per second for ``workers`` concurrent callers under a ``rate_hz`` limit."""
+    in_flight = workers / latency_seconds if latency_seconds > 0 else math.inf
+    capacity = min(rate_hz if rate_hz > 0 else math.inf, in_flight)
+    return capacity if math.isfinite(capacity) else 0.0
+
+
+def format_duration(seconds: float) -> str:
+    """``4000`` -> ``"1h 06m 40s"``; ``65`` -> ``"1m 05s"``; ``7`` -> ``"7s"``."""
+    hours, rest = divmod(int(round(seconds)), 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m {secs:02d}s"
+    if minutes:
+        return f"{minutes}m {secs:02d}s"
+    return f"{secs}s"
+
+
+class CallPlan:
+    """Requests a run would send, per endpoint template, split into listings and per-entity calls."""
+
+    def __init__(self) -> None:
+        self.listing: Dict[str, int] = {}
+        self.per_entity: Dict[str, int] = {}
+
+    def add_listing(self, template: str, calls: int) -> None:
+        self.listing[template] = self.listing.get(template, 0) + calls
+
+    def add_per_entity(self, template: str, calls: int) -> None:
+        if calls:
+            self.per_entity[template] = self.per_entity.get(template, 0) + calls
+
+    @property
+    def listing_calls(self) -> int:
+        return sum(self.listing.values())
+
+    @property
+    def per_entity_calls(self) -> int:
+        return sum(self.per_entity.values())
+
+    @property
+    def total_calls(self) -> int:
+        return self.listing_calls + self.per_entity_calls
+
+    def estimate(self, rate_hz: float, latency_seconds: float, workers: int) -> Dict[str, Any]:
+        """Predicted wall time for the whole run; ``rate_hz <= 0`` means no rate limit."""
+        rate = throughput(rate_hz, latency_seconds, workers)
+        seconds = self.total_calls / rate if rate > 0 else 0.0
+        return {
+            "rate_hz": round(rate_hz, 3),
+            "latency_seconds": round(latency_seconds, 3),
+            "workers": workers,
+            "throughput_per_second": round(rate, 3),
+            "estimated_seconds": round(seconds, 1),
+            "estimated": format_duration(seconds),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "listing_calls": self.listing_calls,
+            "per_entity_calls": self.per_entity_calls,
+            "total_calls": self.total_calls,
+            "listing": dict(sorted(self.listing.items())),
+            "per_entity": dict(sorted(self.per_entity.items())),
+        }
+
+
+class ProgressTracker:
+    """Thread-safe done / total count of per-entity calls, logged with rate and ETA.
+
+    As soon as a listing sizes a phase, ``plan()`` records that phase's calls
+    under its endpoint template. A phase that starts reports its actual calls
+    with ``expect()``, replacing its planned count, and reports each call with
+    ``advance()``. The total, and so the ETA, covers every planned phase, not
+    only those already started. A line is logged at most every ``log_interval``
+    seconds and whenever all known work is done. Until ``MIN_MEASURED_CALLS``
+    calls have completed the ETA divides by ``predicted_rate()``; after that it
+    uses the measured rate.
+    """
+
+    def __init__(
+        self,
+        predicted_rate: Callable[[], float],
+        *,
+        log_interval: float = DEFAULT_LOG_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.predicted_rate = predicted_rate
+        self.log_interval = log_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.expected = 0
+        self.done = 0
+        # Planned calls of phases that have not started, by endpoint template.
+        self.planned: Dict[str, int] = {}
+        self._started: Optional[float] = None
+        self._last_logged: Optional[float] = None
+
+    @property
+    def total(self) -> int:
+        return self.expected + sum(self.planned.values())
+
+    def plan(self, template: str, calls: int) -> None:
+        with self._lock:
+            self.planned[template] = calls
+
+    def expect(self, calls: int, template: Optional[str] = None) -> None:
+        with self._lock:
+            if self._started is None:
+                self._started = self._clock()
+            if template is not None:
+                self.planned.pop(template, None)
+            self.expected += calls
+
+    def advance(self, label: str, calls: int = 1) -> None:
+        with self._lock:
+            self.done += calls
+            now = self._clock()
+            finished = self.done >= self.total
+            due = self._last_logged is None or now - self._last_logged >= self.log_interval
+            if not (finished or due):
+                return
+            self._last_logged = now
+            line = self._line(label, now)
+        log.info(line)
+
+    def _rate(self, now: float) -> float:
+        elapsed = now - self._started if self._started is not None else 0.0
+        if self.done >= MIN_MEASURED_CALLS and elapsed > 0:
+            return self.done / elapsed
+        return self.predicted_rate()
+
+    def _line(self, label: str, now: float) -> str:
+        rate = self._rate(now)
+        total = self.total
+        remaining = max(total - self.done, 0)
+        percent = 100 * self.done // total if total else 100
+        if not remaining:
+            eta = "done"
+        elif rate > 0:
+            eta = f"ETA {format_duration(remaining / rate)}"
+        else:
+            eta = "ETA unknown"
+        return f"  [{self.done}/{total}] {percent}% of per-entity calls ({label}) | {rate:.1f}/s | {eta}"
@@ -2,22 +2,154 @@
 
 from __future__ import annotations
 
+import asyncio
 import threading
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
 
 
 class RateLimiter:
-    """Thread-safe rate limiter for VictorOps API throttling."""
+    """Thread-safe token-bucket rate limiter for VictorOps API throttling.
 
-    def __init__(self, rate_hz: float = 2.0):
-        self.delay = 1.0 / rate_hz
-        self.last_call = 0.0
+    Callers reserve a send slot under the lock and sleep outside it, so waiting
+    threads queue in arrival order without blocking each other. ``burst`` lets
+    idle capacity be spent immediately (``burst=1`` is strict spacing);
+    ``rate_hz=0`` disables spacing.
+    A server-requested backoff (HTTP 429 / ``Retry-After``) pauses every caller.
+    """
+
+    def __init__(self, rate_hz: float = 2.0, burst: float = 1.0):
+        self.delay = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self.burst = max(float(burst), 1.0)
         self.lock = threading.Lock()
+        # Theoretical arrival time of the next request (GCRA virtual schedule).
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        # Total seconds reservations were pushed back by backoffs.
+        self._shifted = 0.0
+        self._calls = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._throttled = 0
+        self._backoff_seconds = 0.0
+
+    def _slot(self, now: float) -> Tuple[float, float]:
+        """``(slot, allowed_at)`` for a caller arriving at ``now``; call with the lock held."""
+        tolerance = (self.burst - 1.0) * self.delay
+        slot = max(self._next_slot, now)
+        return slot, max(slot - tolerance, self._blocked_until)
+
+    def _reserve(self) -> Tuple[float, float]:
+        """Reserve the next send slot; return ``(sleep seconds, shift marker)``."""
+        with self.lock:
+            now = time.monotonic()
+            slot, allowed_at = self._slot(now)
+            self._next_slot = max(slot, allowed_at) + self.delay
+            return max(allowed_at - now, 0.0), self._shifted
+
+    def _shifted_since(self, marker: float) -> Tuple[float, float]:
+        """How far backoffs moved a reserved slot since ``marker``; and a new marker."""
+        with self.lock:
+            return self._shifted - marker, self._shifted
+
+    def ready_in(self) -> float:
+        """Seconds a caller arriving now would wait, without reserving a slot."""
+        with self.lock:
+            now = time.monotonic()
+            return max(self._slot(now)[1] - now, 0.0)
 
-    def wait(self) -> None:
+    def _record_wait(self, waited: float) -> None:
+        with self.lock:
+            self._calls += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def wait(self) -> float:
+        """Block until the caller may send; return seconds spent waiting."""
+        waited = 0.0
+        delay, marker = self._reserve()
+        # A backoff imposed while this caller slept moves its slot; no new one is taken.
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            delay, marker = self._shifted_since(marker)
+        self._record_wait(waited)
+        return waited
+
+    async def wait_async(self) -> float:
+        """Coroutine form of ``wait()`` sharing the same bucket (no thread is blocked)."""
+        waited = 0.0
+        delay, marker = self._reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay, marker = self._shifted_since(marker)
+        self._record_wait(waited)
+        return waited
+
+    def backoff(self, seconds: float) -> None:
+        """Pause all callers for ``seconds`` (e.g. from a 429 ``Retry-After``)."""
+        if seconds <= 0:
+            return
         with self.lock:
             now = time.monotonic()
-            elapsed = now - self.last_call
-            if elapsed < self.delay:
-                time.sleep(self.delay - elapsed)
-            self.last_call = time.monotonic()
+            until = now + seconds
+            if until > self._blocked_until:
+                # Reserved slots move back by the extension, keeping their order.
+                shift = until - max(self._blocked_until, now)
+                self._shifted += shift
+                self._blocked_until = until
+                # Resume at the base rate after the pause, without a burst.
+                tolerance = (self.burst - 1.0) * self.delay
+                self._next_slot = max(self._next_slot + shift, until + tolerance)
+            self._throttled += 1
+            self._backoff_seconds += seconds
+
+    def observe_response(self, resp: Any, retry_backoff: float = 0.0) -> Optional[float]:
+        """Apply a global backoff when ``resp`` is a 429 or carries ``Retry-After``.
+
+        A 429 without ``Retry-After`` backs off at least ``retry_backoff`` (the
+        caller's exponential retry delay), and never less than one burst.
+        """
+        headers = getattr(resp, "headers", None) or {}
+        status = getattr(resp, "status_code", None) or getattr(resp, "status", None)
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None and status == 429:
+            retry_after = max(self.delay * self.burst, retry_backoff)
+        if retry_after is None:
+            return None
+        self.backoff(retry_after)
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cumulative wait and throttle counters."""
+        with self.lock:
+            return {
+                "calls": self._calls,
+                "total_wait_seconds": round(self._total_wait, 3),
+                "max_wait_seconds": round(self._max_wait, 3),
+                "avg_wait_seconds": round(self._total_wait / self._calls, 3) if self._calls else 0.0,
+                "throttled": self._throttled,
+                "backoff_seconds": round(self._backoff_seconds, 3),
+            }
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    if not isinstance(value, (str, int, float)) or value == "":
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,246 @@
+"""Opt-in on-disk cache of GET responses for repeated discovery runs.
+
+Entries are keyed by credential namespace, URL and query params. A fresh entry
+(younger than the TTL) is served without touching the network or the rate
+limiter; a stale entry with an ``ETag``/``Last-Modified`` validator is
+revalidated with a conditional GET, and a ``304`` refreshes it in place.
+The cache directory is bounded in size; least recently used entries go first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CachedResponse:
+    """Minimal ``requests.Response`` stand-in for a body served from the cache."""
+
+    def __init__(self, text: str, headers: Optional[Dict[str, str]] = None, url: str = ""):
+        self.status_code = 200
+        self.text = text
+        self.headers = headers or {}
+        self.url = url
+        self.from_cache = True
+
+    def json(self) -> Any:
+        return json.loads(self.text) if self.text else None
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class CacheEntry:
+    """One cached 200 response and its validators."""
+
+    def __init__(self, path: Path, record: Dict[str, Any]):
+        self.path = path
+        self.url: str = record.get("url", "")
+        self.stored_at: float = float(record.get("stored_at", 0.0))
+        self.etag: Optional[str] = record.get("etag")
+        self.last_modified: Optional[str] = record.get("last_modified")
+        self.text: str = record.get("text", "")
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.stored_at
+
+    def response(self) -> CachedResponse:
+        return CachedResponse(self.text, {"X-Cache": "HIT"}, self.url)
+
+
+class ResponseCache:
+    """Thread-safe, size-bounded GET response cache in ``cache_dir``.
+
+    ``namespace`` (e.g. org slug and API id) keeps entries from different
+    credentials apart. ``ttl_seconds=0`` always revalidates. Entry sizes are
+    kept in least-recently-used order with a running total, so eviction never
+    re-scans the directory (file mtimes carry the order across runs).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        namespace: str = "",
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)
+        self.max_bytes = max(int(max_bytes), 0)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        existing = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            existing.append((stat.st_mtime, path, stat.st_size))
+        self._sizes: "OrderedDict[Path, int]" = OrderedDict(
+            (path, size) for _mtime, path, size in sorted(existing)
+        )
+        self._bytes = sum(self._sizes.values())
+
+    def key(self, url: str, params: Optional[Dict[str, Any]]) -> str:
+        material = json.dumps(
+            [self.namespace, url, sorted((str(k), str(v)) for k, v in (params or {}).items())]
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, url: str, params: Optional[Dict[str, Any]]) -> Path:
+        return self.cache_dir / f"{self.key(url, params)}.json"
+
+    def lookup(self, url: str, params: Optional[Dict[str, Any]]) -> Optional[CacheEntry]:
+        path = self._path(url, params)
+        try:
+            record = json.loads(path.read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.warning(f"Discarding unreadable cache entry {path.name}")
+            self._remove(path)
+            return None
+        if not isinstance(record, dict) or record.get("url") != url:
+            return None
+        return CacheEntry(path, record)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        if entry is None:
+            return {}
+        headers: Dict[str, str] = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def before_request(
+        self, url: str, params: Optional[Dict[str, Any]]
+    ) -> Tuple[Optional[CachedResponse], Optional[CacheEntry], Dict[str, str]]:
+        """Return ``(hit, entry, conditional_headers)`` for an outgoing GET.
+
+        ``hit`` is set when the entry is fresh and no request is needed.
+        """
+        entry = self.lookup(url, params)
+        if entry is not None and self.is_fresh(entry):
+            self._touch(entry.path)
+            self._count("_hits")
+            return entry.response(), entry, {}
+        return None, entry, self.conditional_headers(entry)
+
+    def after_response(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        entry: Optional[CacheEntry],
+        status_code: int,
+        text: str,
+        headers: Any,
+    ) -> Optional[CachedResponse]:
+        """Record a network response; return the cached body when it was a ``304``."""
+        if status_code == 304 and entry is not None:
+            self._write(entry.path, url, entry.text, headers, entry)
+            self._count("_revalidated")
+            return entry.response()
+        self._count("_misses")
+        if status_code == 200:
+            self._write(self._path(url, params), url, text, headers)
+            self._count("_stores")
+        return None
+
+    def _write(
+        self, path: Path, url: str, text: str, headers: Any, previous: Optional[CacheEntry] = None
+    ) -> None:
+        headers = headers or {}
+        record = {
+            "url": url,
+            "stored_at": time.time(),
+            "etag": headers.get("ETag") or (previous.etag if previous else None),
+            "last_modified": headers.get("Last-Modified") or (previous.last_modified if previous else None),
+            "text": text,
+        }
+        payload = json.dumps(record, separators=(",", ":"))
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp.write_text(payload)
+            os.replace(tmp, path)
+        except OSError as exc:
+            log.warning(f"Could not write cache entry {path.name}: {exc}")
+            return
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            self._bytes += size - self._sizes.pop(path, 0)
+            self._sizes[path] = size
+        self._evict()
+
+    def _touch(self, path: Path) -> None:
+        with self._lock:
+            if path in self._sizes:
+                self._sizes.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remove(self, path: Path) -> int:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            log.warning(f"Could not remove cache entry {path.name}: {exc}")
+        with self._lock:
+            size = self._sizes.pop(path, 0)
+            self._bytes -= size
+            return size
+
+    def _evict(self) -> None:
+        while True:
+            with self._lock:
+                if self._bytes <= self.max_bytes or not self._sizes:
+                    return
+                oldest = next(iter(self._sizes))
+            self._remove(oldest)
+            self._count("_evictions")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for ``discovery_metadata.json``."""
+        with self._lock:
+            lookups = self._hits + self._revalidated + self._misses
+            return {
+                "hits": self._hits,
+                "revalidated": self._revalidated,
+                "misses": self._misses,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._revalidated) / lookups, 3) if lookups else 0.0,
+                "entries": len(self._sizes),
+                "bytes": self._bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
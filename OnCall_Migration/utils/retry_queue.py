@@ -0,0 +1,208 @@
+"""Deferred retries with jittered backoff and per-endpoint circuit breaking.
+
+Discovery's per-entity workers send each request once. When one fails
+transiently (429, 5xx, transport error) the entity is parked in a
+``RetryQueue`` and the worker moves on; the phase drains the queue after its
+first pass. The ``CircuitBreaker`` is keyed by endpoint template
+(``v2/team/{t}/rotations``): after ``failure_threshold`` consecutive failures
+that endpoint is not called for ``cooldown`` seconds, so one failing endpoint
+neither burns the rate budget nor holds worker slots.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.exceptions import TransientError
+
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN = 30.0
+
+
+def _call(fn: Callable[[Any], None], item: Any) -> Optional[BaseException]:
+    try:
+        fn(item)
+    except Exception as exc:  # handed back to drain(), which re-raises non-transient errors
+        return exc
+    return None
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure breaker per key (closed -> open -> half-open)."""
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self.trips = 0
+
+    def retry_in(self, key: str) -> float:
+        """Seconds until ``key`` may be called again (0 when closed or half-open)."""
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return 0.0
+            return max(0.0, opened_at + self.cooldown - self._clock())
+
+    def allow(self, key: str) -> bool:
+        return self.retry_in(key) == 0.0
+
+    def record(self, key: str, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._failures.pop(key, None)
+                self._opened_at.pop(key, None)
+                return
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            if failures >= self.failure_threshold:
+                # A failed half-open probe re-opens for another full cooldown.
+                if key not in self._opened_at:
+                    self.trips += 1
+                self._opened_at[key] = self._clock()
+
+    def open_keys(self) -> List[str]:
+        now = self._clock()
+        with self._lock:
+            return sorted(key for key, at in self._opened_at.items() if at + self.cooldown > now)
+
+
+class RetryQueue:
+    """Items whose first attempt failed transiently, retried later with jittered backoff.
+
+    ``drain(fn)`` retries oldest-ready first, in batches of items that are ready
+    together. It waits for each item's backoff and for its key's breaker to
+    close. An item that still fails after ``max_attempts`` attempts (the first
+    one included) re-raises its error, so a phase never finishes with entities
+    silently missing. ``requeue()`` parks an item that was never sent because
+    its breaker was open; that costs it no attempt.
+    """
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        *,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, str, Any, int]] = []
+        self._seq = itertools.count()
+        self.deferred = 0
+        self.recovered = 0
+        self.retries = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before attempt ``attempt + 1``: half fixed, half random (equal jitter)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay / 2 + self._rng.uniform(0, delay / 2)
+
+    def defer(self, key: str, item: Any, attempt: int = 1) -> None:
+        """Park ``item`` after its ``attempt``-th failure."""
+        self._park(key, item, attempt, self.backoff(attempt))
+        if attempt == 1:
+            self._count_deferred()
+
+    def requeue(self, key: str, item: Any) -> None:
+        """Park ``item`` without sending it (its breaker is open); no attempt is counted."""
+        self._park(key, item, 0, 0.0)
+        self._count_deferred()
+
+    def _park(self, key: str, item: Any, attempt: int, delay: float) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (self._clock() + delay, next(self._seq), key, item, attempt))
+
+    def _count_deferred(self) -> None:
+        with self._lock:
+            self.deferred += 1
+
+    def drain(self, fn: Callable[[Any], None], executor: Optional[Executor] = None) -> int:
+        """Retry every parked item with ``fn(item)``; return how many recovered.
+
+        Items that are ready at the same time run as one batch, on ``executor``
+        when given (e.g. the phase's worker pool), else in the calling thread.
+        """
+        recovered = 0
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return recovered
+            if executor is not None:
+                outcomes = [(entry, executor.submit(fn, entry[3])) for entry in batch]
+                errors = [(entry, future.exception()) for entry, future in outcomes]
+            else:
+                errors = [(entry, _call(fn, entry[3])) for entry in batch]
+            exhausted: Optional[BaseException] = None
+            for (_ready_at, _seq, key, item, attempt), error in errors:
+                self.retries += 1
+                if error is None:
+                    self.breaker.record(key, ok=True)
+                    recovered += 1
+                    self.recovered += 1
+                    continue
+                if not isinstance(error, TransientError):
+                    exhausted = exhausted or error
+                    continue
+                self.breaker.record(key, ok=False)
+                if attempt + 1 >= self.max_attempts:
+                    exhausted = exhausted or error
+                else:
+                    self._park(key, item, attempt + 1, self.backoff(attempt + 1))
+            if exhausted is not None:
+                raise exhausted
+
+    def _next_batch(self) -> Optional[List[Tuple[float, int, str, Any, int]]]:
+        """Wait for the earliest item (and its breaker), then pop it and everything else ready."""
+        with self._lock:
+            if not self._heap:
+                return None
+            ready_at, _seq, key, _item, _attempt = self._heap[0]
+        wait = max(ready_at - self._clock(), self.breaker.retry_in(key))
+        if wait > 0:
+            self._sleep(wait)
+        now = self._clock()
+        with self._lock:
+            batch = [heapq.heappop(self._heap)]
+            deferred = []
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                # Items on an endpoint whose breaker is still open keep waiting.
+                (batch if self.breaker.allow(entry[2]) else deferred).append(entry)
+            for entry in deferred:
+                heapq.heappush(self._heap, (now + self.breaker.retry_in(entry[2]), *entry[1:]))
+        return batch
+
+    def stats(self) -> Dict[str, int]:
+        return {"deferred": self.deferred, "retries": self.retries, "recovered": self.recovered}
@@ -0,0 +1,145 @@
+"""Per-run single-flight GET de-duplication with a short-lived memo.
+
+Identical GETs issued while one is in flight wait for it and share its result
+instead of spending another rate-limiter slot. Successful results are kept for
+``ttl_seconds`` so repeat reads within a run (e.g. ``teams/{t}/rotations`` per
+rotation) are answered locally; ``no_memo()`` skips the memo for one-shot
+reads. ``invalidate(url)`` drops every memoized GET on the written resource's
+path, its parents, and its children; clients call it after each write.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+
+_memo_state = threading.local()
+
+
+def memo_disabled() -> bool:
+    return getattr(_memo_state, "disabled", False)
+
+
+@contextmanager
+def no_memo() -> Iterator[None]:
+    """Still share this thread's in-flight GETs, but do not memoize their results."""
+    previous = memo_disabled()
+    _memo_state.disabled = True
+    try:
+        yield
+    finally:
+        _memo_state.disabled = previous
+
+
+def _path(url: str) -> str:
+    return urlsplit(url).path.rstrip("/") if "://" in url else url.split("?", 1)[0].rstrip("/")
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Merge concurrent identical calls; memoize results accepted by ``cacheable``.
+
+    The memo is kept in expiry order, so each insert first drops expired
+    entries from its head and a run of unique keys pins nothing past the TTL.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        cacheable: Callable[[Any], bool] = lambda result: True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.cacheable = cacheable
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _Flight] = {}
+        self._memo: "OrderedDict[Hashable, Tuple[float, str, Any]]" = OrderedDict()
+        # Bumped by every invalidate(); a GET that raced a write is not memoized.
+        self._generation = 0
+        self.shared = 0
+        self.memo_hits = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        return url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+    def do(self, key: Tuple[str, Any], fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, deduplicated)``; ``deduplicated`` is True when ``fn`` was not run."""
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is not None:
+                if memo[0] > time.monotonic():
+                    self.memo_hits += 1
+                    return memo[2], True
+                del self._memo[key]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+                generation = self._generation
+                memoize = self.ttl_seconds > 0 and not memo_disabled()
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if (
+                    flight.error is None
+                    and memoize
+                    and generation == self._generation
+                    and self.cacheable(flight.result)
+                ):
+                    now = time.monotonic()
+                    while self._memo and next(iter(self._memo.values()))[0] <= now:
+                        self._memo.popitem(last=False)
+                    self._memo.pop(key, None)
+                    self._memo[key] = (now + self.ttl_seconds, _path(key[0]), flight.result)
+                    while len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+            flight.done.set()
+        return flight.result, False
+
+    def invalidate(self, url: str) -> int:
+        """Forget memoized GETs at, above, or below ``url``'s path; return how many."""
+        path = _path(url)
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, (_expires, memo_path, _result) in self._memo.items()
+                if memo_path == path
+                or memo_path.startswith(path + "/")
+                or path.startswith(memo_path + "/")
+            ]
+            for key in stale:
+                del self._memo[key]
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"shared": self.shared, "memo_hits": self.memo_hits, "memoized": len(self._memo)}
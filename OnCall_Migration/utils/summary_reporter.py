@@ -7,7 +7,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from utils.io import load_json
+from utils.io import load_inventory
 from utils.migration_types import InventoryCounts
 
 log = logging.getLogger(__name__)
@@ -182,7 +182,7 @@ class SummaryReporter:
         log.info("  -> Saved inventory summary to inventory_summary.md")
 
     def _load_inventory_json(self, name: str) -> Any:
-        return load_json(self.output_dir / f"{name}.json")
+        return load_inventory(self.output_dir, name)
 
     def _format_duration(self, elapsed_seconds: float) -> str:
         minutes, seconds = divmod(int(elapsed_seconds), 60)
@@ -0,0 +1,194 @@
+"""What already exists in the target org, read once with bulk listings.
+
+``ApplyPipeline`` needs to know, for every inventory object, whether the target
+org already has it. ``TargetState.fetch()`` answers all of those questions with
+one listing per category plus the members and rotation groups of each team, so
+``apply.py --plan`` costs O(categories + teams) reads instead of one GET per
+object. The pipeline updates the state as it creates objects, and the state
+round-trips through ``to_dict()``/``from_dict()`` so a plan file carries the
+snapshot it was computed against.
+
+Without a snapshot the same object is a lazy per-team cache:
+``team_members()`` and ``rotation_groups()`` read a team on first use and keep
+the result, so a team costs one read however many members or rotations are
+added to it.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+AlertRuleSignature = Tuple[Any, Any, Any]
+
+
+def listing_items(data: Any, key: str) -> List[Dict[str, Any]]:
+    """Objects from a listing body: a bare list, a list of pages, or ``{key: [...]}``."""
+    if isinstance(data, dict):
+        data = data.get(key) or []
+    if not isinstance(data, list):
+        return []
+    if data and isinstance(data[0], list):
+        data = list(itertools.chain.from_iterable(data))
+    return [item for item in data if isinstance(item, dict)]
+
+
+def team_slugs_by_name(data: Any) -> Dict[str, str]:
+    return {t.get("name"): t.get("slug") for t in listing_items(data, "teams") if t.get("name")}
+
+
+def routing_key_names(data: Any) -> Set[str]:
+    return {rk["routingKey"] for rk in listing_items(data, "routingKeys") if rk.get("routingKey")}
+
+
+def alert_rule_signature(alert_field: Any, match_value: Any, rank: Any) -> AlertRuleSignature:
+    return (alert_field, match_value, rank)
+
+
+def alert_rule_signatures(data: Any) -> Set[AlertRuleSignature]:
+    # The public API lists rules under "rules"; older responses used "alertRules".
+    key = "alertRules" if isinstance(data, dict) and "alertRules" in data else "rules"
+    return {
+        alert_rule_signature(rule.get("alertField"), rule.get("alertValueMatch", ""), rule.get("rank", 1))
+        for rule in listing_items(data, key)
+    }
+
+
+def member_usernames(data: Any) -> Set[str]:
+    return {m["username"] for m in listing_items(data, "members") if m.get("username")}
+
+
+def rotation_group_slugs(data: Any) -> Dict[str, str]:
+    """``{label: slug}`` of a team's rotation groups."""
+    return {
+        g["label"]: g["slug"]
+        for g in listing_items(data, "rotationGroups")
+        if g.get("label") and g.get("slug")
+    }
+
+
+class TargetState:
+    """Users, teams, members, rotation groups, policies, routing keys and alert rules of one org."""
+
+    def __init__(self) -> None:
+        self.users: Set[str] = set()
+        self.teams: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {}
+        self.rotations: Dict[str, Dict[str, str]] = {}
+        self.policies: Dict[str, str] = {}
+        self.routing_keys: Set[str] = set()
+        self.alert_rules: Set[AlertRuleSignature] = set()
+        # True for a full snapshot; otherwise only the per-team caches are filled, on demand.
+        self.complete = False
+        self.reads = 0
+
+    @classmethod
+    def fetch(cls, client: Any) -> "TargetState":
+        """Read the org through ``client.get(endpoint, allow_404=True)``."""
+        state = cls()
+        state.users = {u["username"] for u in listing_items(state._get(client, "user"), "users") if u.get("username")}
+        state.teams = team_slugs_by_name(state._get(client, "team"))
+        for entry in listing_items(state._get(client, "policies"), "policies"):
+            policy = entry.get("policy", {})
+            if policy.get("slug"):
+                state.policies[policy["slug"]] = policy.get("name", policy["slug"])
+        state.routing_keys = routing_key_names(state._get(client, "org/routing-keys"))
+        state.alert_rules = alert_rule_signatures(state._get(client, "alertRules"))
+        for slug in sorted(filter(None, state.teams.values())):
+            state.members[slug] = state.team_members(client, slug) or set()
+            state.rotations[slug] = state.rotation_groups(client, slug) or {}
+        state.complete = True
+        log.info(
+            f"Target snapshot: {len(state.users)} users, {len(state.teams)} teams, "
+            f"{len(state.policies)} policies in {state.reads} reads"
+        )
+        return state
+
+    def _read(self, client: Any, endpoint: str) -> Tuple[Optional[Any], int]:
+        self.reads += 1
+        return client.get(endpoint, allow_404=True)
+
+    def _get(self, client: Any, endpoint: str) -> Optional[Any]:
+        data, status = self._read(client, endpoint)
+        return data if status == 200 else None
+
+    def team_members(self, client: Any, team_slug: str) -> Optional[Set[str]]:
+        """Usernames on the team, read once and then kept; the caller adds to the set after a POST.
+
+        A 404 (no such team yet) is cached as empty. Other errors return None
+        and are not cached, so the next call reads again.
+        """
+        members = self.members.get(team_slug)
+        if members is not None:
+            return members
+        data, status = self._read(client, f"team/{team_slug}/members")
+        if status == 404:
+            members = set()
+        elif status == 200 and isinstance(data, dict):
+            members = member_usernames(data)
+        else:
+            return None
+        self.members[team_slug] = members
+        return members
+
+    def rotation_groups(self, client: Any, team_slug: str, refresh: bool = False) -> Optional[Dict[str, str]]:
+        """``{label: slug}`` of the team's rotation groups, cached like ``team_members()``.
+
+        The caller records each created group in the dict; ``refresh`` re-reads
+        the team when a create response did not include the new group's slug.
+        """
+        groups = None if refresh else self.rotations.get(team_slug)
+        if groups is not None:
+            return groups
+        data, status = self._read(client, f"teams/{team_slug}/rotations")
+        if status == 404:
+            groups = {}
+        elif status == 200 and isinstance(data, dict):
+            groups = rotation_group_slugs(data)
+        else:
+            return None
+        self.rotations[team_slug] = groups
+        return groups
+
+    def add_team(self, name: str, slug: str) -> None:
+        """A team created on the target starts with no members and no rotation groups."""
+        self.teams[name] = slug
+        self.members.setdefault(slug, set())
+        self.rotations.setdefault(slug, {})
+
+    def resume_team(self, name: str, slug: str) -> None:
+        """A team an interrupted apply created may already hold members and rotation groups.
+
+        Its cached members and groups are dropped so the next lookup reads them
+        from the target.
+        """
+        self.teams[name] = slug
+        self.members.pop(slug, None)
+        self.rotations.pop(slug, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "users": sorted(self.users),
+            "teams": dict(sorted(self.teams.items())),
+            "members": {team: sorted(users) for team, users in sorted(self.members.items())},
+            "rotations": {team: dict(sorted(groups.items())) for team, groups in sorted(self.rotations.items())},
+            "policies": dict(sorted(self.policies.items())),
+            "routing_keys": sorted(self.routing_keys),
+            "alert_rules": sorted((list(sig) for sig in self.alert_rules), key=repr),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TargetState":
+        state = cls()
+        state.users = set(data.get("users", []))
+        state.teams = dict(data.get("teams", {}))
+        state.members = {team: set(users) for team, users in data.get("members", {}).items()}
+        state.rotations = {team: dict(groups) for team, groups in data.get("rotations", {}).items()}
+        state.policies = dict(data.get("policies", {}))
+        state.routing_keys = set(data.get("routing_keys", []))
+        state.alert_rules = {alert_rule_signature(*sig) for sig in data.get("alert_rules", [])}
+        state.complete = True
+        return state
@@ -0,0 +1,137 @@
+"""Dependency-ordered task scheduler for overlapping discovery phases and apply items (no HTTP)."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+TaskFunc = Callable[[Dict[str, Any]], Any]
+
+DEFAULT_MAX_PARALLEL = 8
+
+
+class TaskGraph:
+    """Run named tasks as soon as the tasks they depend on have finished.
+
+    Each task receives a dict of its dependencies' results. Tasks run on
+    coordinator threads; they are expected to spend their time waiting on the
+    shared per-entity worker pool, not doing CPU work. The first failure stops
+    new tasks from starting and is re-raised from ``run()``.
+
+    Ready tasks start in the order they were added, at most ``max_parallel`` at
+    a time, and finishing a task only visits its own dependents, so graphs of
+    thousands of small tasks (one per apply item) schedule in linear time.
+    """
+
+    def __init__(self, max_parallel: int = DEFAULT_MAX_PARALLEL):
+        self.max_parallel = max_parallel
+        self._tasks: Dict[str, Tuple[TaskFunc, Tuple[str, ...]]] = {}
+        self.durations: Dict[str, float] = {}
+        self.wall_seconds = 0.0
+
+    def add(self, name: str, func: TaskFunc, deps: Iterable[str] = ()) -> None:
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        self._tasks[name] = (func, tuple(deps))
+
+    def _validate(self) -> None:
+        for name, (_func, deps) in self._tasks.items():
+            unknown = [dep for dep in deps if dep not in self._tasks]
+            if unknown:
+                raise ValueError(f"Task '{name}' depends on unknown task(s): {', '.join(unknown)}")
+        # Depth-first with an explicit stack: item graphs can chain thousands of tasks.
+        visiting: Dict[str, bool] = {}
+        for root in self._tasks:
+            if root in visiting:
+                continue
+            path: List[str] = [root]
+            stack = [iter(self._tasks[root][1])]
+            visiting[root] = False
+            while stack:
+                dep = next(stack[-1], None)
+                if dep is None:
+                    visiting[path.pop()] = True
+                    stack.pop()
+                    continue
+                state = visiting.get(dep)
+                if state is False:
+                    raise ValueError(f"Dependency cycle: {' -> '.join(path + [dep])}")
+                if state is None:
+                    visiting[dep] = False
+                    path.append(dep)
+                    stack.append(iter(self._tasks[dep][1]))
+
+    def run(self) -> Dict[str, Any]:
+        """Execute every task; return results keyed by task name."""
+        self._validate()
+        results: Dict[str, Any] = {}
+        order = {name: index for index, name in enumerate(self._tasks)}
+        waiting = {name: len(set(deps)) for name, (_func, deps) in self._tasks.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self._tasks}
+        for name, (_func, deps) in self._tasks.items():
+            for dep in set(deps):
+                dependents[dep].append(name)
+        ready = [(order[name], name) for name, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+        running: Dict[Future, str] = {}
+        lock = threading.Lock()
+        failure: Optional[BaseException] = None
+        start = time.monotonic()
+
+        def execute(name: str, func: TaskFunc, deps: Tuple[str, ...]) -> Any:
+            with lock:
+                inputs = {dep: results[dep] for dep in deps}
+            task_start = time.monotonic()
+            try:
+                return func(inputs)
+            finally:
+                self.durations[name] = time.monotonic() - task_start
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="task") as pool:
+            while ready or running:
+                while failure is None and ready and len(running) < self.max_parallel:
+                    _index, name = heapq.heappop(ready)
+                    func, deps = self._tasks[name]
+                    running[pool.submit(execute, name, func, deps)] = name
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        value = future.result()
+                    except BaseException as exc:  # includes SystemExit from fail-fast checks
+                        if failure is None:
+                            failure = exc
+                        continue
+                    with lock:
+                        results[name] = value
+                    for child in dependents[name]:
+                        waiting[child] -= 1
+                        if waiting[child] == 0:
+                            heapq.heappush(ready, (order[child], child))
+
+        self.wall_seconds = time.monotonic() - start
+        if failure is not None:
+            raise failure
+        return results
+
+    def timing(self) -> Dict[str, Any]:
+        """Wall time versus back-to-back execution of the same tasks.
+
+        ``sequential_seconds`` sums each task's own duration, so ``saved_seconds``
+        is an upper-bound estimate: overlapping tasks share one rate budget.
+        """
+        sequential = sum(self.durations.values())
+        return {
+            "wall_seconds": round(self.wall_seconds, 1),
+            "sequential_seconds": round(sequential, 1),
+            "saved_seconds": round(max(sequential - self.wall_seconds, 0.0), 1),
+            "tasks": {name: round(seconds, 1) for name, seconds in sorted(self.durations.items())},
+        }
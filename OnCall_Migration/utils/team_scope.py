@@ -81,23 +81,32 @@ def team_slugs_for_policies(policies_list: List[Any], policy_slugs: Set[str]) ->
     return teams
 
 
+def policy_routing_targets(steps: Any) -> Set[str]:
+    """Policy slugs a policy's ``policy_routing`` entries hand off to."""
+    targets: Set[str] = set()
+    for step in steps or []:
+        if not isinstance(step, dict):
+            continue
+        for entry in step.get("entries", []) or []:
+            if not isinstance(entry, dict):
+                continue
+            if entry.get("executionType") != "policy_routing":
+                continue
+            dep = (entry.get("targetPolicy") or {}).get("policySlug")
+            if dep:
+                targets.add(dep)
+    return targets
+
+
 def expand_policy_closure(details: Dict[str, Any], seed_slugs: Set[str]) -> Set[str]:
     expanded = set(seed_slugs)
     pending = list(seed_slugs)
     while pending:
         slug = pending.pop()
-        for step in details.get(slug, []) or []:
-            if not isinstance(step, dict):
-                continue
-            for entry in step.get("entries", []) or []:
-                if not isinstance(entry, dict):
-                    continue
-                if entry.get("executionType") != "policy_routing":
-                    continue
-                dep = (entry.get("targetPolicy") or {}).get("policySlug")
-                if dep and dep not in expanded:
-                    expanded.add(dep)
-                    pending.append(dep)
+        for dep in policy_routing_targets(details.get(slug)):
+            if dep not in expanded:
+                expanded.add(dep)
+                pending.append(dep)
     return expanded
 
 
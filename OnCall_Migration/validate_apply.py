@@ -16,7 +16,7 @@ from pathlib import Path
 from typing import Any, Dict
 
 from utils.cli import print_help_and_exit_if_requested
-from utils.io import load_json
+from utils.io import load_inventory, load_json
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 log = logging.getLogger(__name__)
@@ -48,6 +48,9 @@ class PreFlightValidator:
     def _load_json(self, path: Path) -> Any:
         return load_json(path)
 
+    def _load_inventory(self, name: str) -> Any:
+        return load_inventory(self.inventory_dir, name)
+
     def _policy_slug_from_target(self, target: Dict[str, Any]) -> str:
         if target.get("policySlug"):
             return target["policySlug"]
@@ -122,7 +125,7 @@ class PreFlightValidator:
             return
 
         log.info("Validating user email references...")
-        users = self._load_json(self.inventory_dir / "users_inventory.json") or []
+        users = self._load_inventory("users_inventory") or []
         mapped_users = remapping.get("users", {})
 
         for user in users:
@@ -151,7 +154,7 @@ class PreFlightValidator:
             return
 
         log.info("Validating escalation policy email references...")
-        details = self._load_json(self.inventory_dir / "escalation_policy_details_inventory.json") or {}
+        details = self._load_inventory("escalation_policy_details_inventory") or {}
         mapped_policies = remapping.get("escalation_policies", {})
 
         if not isinstance(details, dict):
@@ -188,7 +191,7 @@ class PreFlightValidator:
 
     def _validate_routing_key_policies(self, remapping: Dict[str, Any]) -> None:
         log.info("Validating routing key targets...")
-        routing_keys = self._load_json(self.inventory_dir / "routing_keys_inventory.json") or []
+        routing_keys = self._load_inventory("routing_keys_inventory") or []
         mapped_keys = remapping.get("routing_keys", {})
         mapped_policies = remapping.get("escalation_policies", {})
 
@@ -220,7 +223,7 @@ class PreFlightValidator:
 
     def _validate_policy_teams(self, remapping: Dict[str, Any]) -> None:
         log.info("Validating escalation policy team dependencies...")
-        policies_grouped = self._load_json(self.inventory_dir / "escalation_policies_inventory.json") or {}
+        policies_grouped = self._load_inventory("escalation_policies_inventory") or {}
         mapped_teams = remapping.get("teams", {})
         mapped_policies = remapping.get("escalation_policies", {})
 
@@ -244,7 +247,7 @@ class PreFlightValidator:
     def _validate_team_members(self, remapping: Dict[str, Any]) -> None:
         log.info("Validating team member user references...")
         self._validate_team_user_refs(
-            "team_members_inventory.json",
+            "team_members_inventory",
             remapping.get("teams", {}),
             remapping.get("users", {}),
             "team_members",
@@ -253,7 +256,7 @@ class PreFlightValidator:
     def _validate_team_admins(self, remapping: Dict[str, Any]) -> None:
         log.info("Validating team admin user references...")
         self._validate_team_user_refs(
-            "team_admins_inventory.json",
+            "team_admins_inventory",
             remapping.get("teams", {}),
             remapping.get("users", {}),
             "team_admins",
@@ -261,12 +264,12 @@ class PreFlightValidator:
 
     def _validate_team_user_refs(
         self,
-        inventory_file: str,
+        inventory_name: str,
         mapped_teams: Dict[str, Any],
         mapped_users: Dict[str, Any],
         label: str,
     ) -> None:
-        team_data = self._load_json(self.inventory_dir / inventory_file) or {}
+        team_data = self._load_inventory(inventory_name) or {}
         if not isinstance(team_data, dict):
             return
 
@@ -296,7 +299,7 @@ class PreFlightValidator:
 
     def _validate_rotation_user_refs(self, remapping: Dict[str, Any]) -> None:
         log.info("Validating rotation shift member user references...")
-        rotations_by_team = self._load_json(self.inventory_dir / "rotation_definitions_inventory.json") or {}
+        rotations_by_team = self._load_inventory("rotation_definitions_inventory") or {}
         mapped_teams = remapping.get("teams", {})
         mapped_users = remapping.get("users", {})
 
@@ -342,7 +345,7 @@ class PreFlightValidator:
             return
 
         log.info("Validating alert rule routing key references...")
-        rules = self._load_json(self.inventory_dir / "alert_rules_inventory.json") or []
+        rules = self._load_inventory("alert_rules_inventory") or []
         mapped_rules = remapping.get("alert_rules", {})
         mapped_keys = remapping.get("routing_keys", {})
 
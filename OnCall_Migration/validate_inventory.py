@@ -16,7 +16,7 @@ from pathlib import Path
 from typing import Any
 
 from utils.cli import print_help_and_exit_if_requested
-from utils.io import load_json
+from utils.io import load_inventory
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 log = logging.getLogger(__name__)
@@ -59,9 +59,8 @@ class InventoryValidator:
         self.warnings = 0
 
     def _load_json(self, name: str) -> Any:
-        path = self.inventory_dir / f"{name}.json"
         try:
-            return load_json(path)
+            return load_inventory(self.inventory_dir, name)
         except json.JSONDecodeError:
             self.errors += 1
             log.error(f"Failed to parse {name}.json (invalid JSON).")